@@ -0,0 +1,167 @@
+"""
+Agent Pool - 编译后 Agent 的进程内复用
+
+create_*_agent 在每次节点调用（骨架构建器每个批次一次）都会读取 Prompt 文件
+并调用 create_react_agent 重新编译 ReAct 图。
+
+AgentPool 按 (agent 类型, Prompt + 工具指纹, 模型实例) 缓存编译结果：
+- Prompt 输入和模型都相同时直接返回已编译的 Agent（编译图无状态，可并发调用）
+- LRU 淘汰，最多保留 agent_pool_size 个
+- read_prompt_file() 按文件修改时间缓存 Prompt 模板，不再逐次读盘
+
+统计：
+- 全局：每种 agent 的构建次数、复用次数、平均构建耗时、累计节省耗时
+- 单次请求：track_request() 返回的字典在请求内累计复用次数和节省耗时
+
+Usage:
+    from backend.agents.agent_pool import get_agent_pool
+
+    agent = await get_agent_pool().get_or_create(
+        "editor", model=model, tools=[], prompt=system_prompt
+    )
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+import structlog
+from langgraph.prebuilt import create_react_agent
+
+from backend.config import settings
+
+logger = structlog.get_logger(__name__)
+
+# 当前请求的复用统计（由 track_request() 设置）
+_request_metrics: ContextVar[Optional[Dict[str, Any]]] = ContextVar(
+    "agent_pool_request_metrics", default=None
+)
+
+# (path, mtime_ns) → 文件内容
+_prompt_files: Dict[str, tuple[int, str]] = {}
+
+
+def read_prompt_file(path: Path) -> str:
+    """读取 Prompt 模板文件（文件未修改时返回缓存内容）"""
+    key = str(path)
+    mtime = path.stat().st_mtime_ns
+    cached = _prompt_files.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    _prompt_files[key] = (mtime, content)
+    return content
+
+
+def track_request() -> Dict[str, Any]:
+    """开始统计当前请求（及其派生任务）中的 Agent 复用情况"""
+    metrics = {"agents_built": 0, "agents_reused": 0, "build_ms": 0.0, "saved_ms": 0.0}
+    _request_metrics.set(metrics)
+    return metrics
+
+
+@dataclass
+class _PooledAgent:
+    agent: Any
+    model: Any  # 持有模型引用，保证 id(model) 在条目存活期间不会被复用
+
+
+class AgentPool:
+    """编译后 Agent 的 LRU 缓存"""
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size if max_size is not None else settings.agent_pool_size
+        self._agents: OrderedDict[tuple, _PooledAgent] = OrderedDict()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    async def get_or_create(
+        self,
+        agent_type: str,
+        model: Any,
+        tools: Sequence[Any],
+        prompt: str,
+    ) -> Any:
+        """返回 (agent_type, prompt, tools, model) 对应的已编译 ReAct Agent"""
+        key = (agent_type, self.fingerprint(prompt, tools), id(model))
+        stats = self._stats.setdefault(
+            agent_type, {"built": 0, "reused": 0, "build_ms": 0.0, "saved_ms": 0.0}
+        )
+        request = _request_metrics.get()
+
+        pooled = self._agents.get(key)
+        if pooled is not None and pooled.model is model:
+            self._agents.move_to_end(key)
+            saved_ms = stats["build_ms"] / stats["built"] if stats["built"] else 0.0
+            stats["reused"] += 1
+            stats["saved_ms"] += saved_ms
+            if request is not None:
+                request["agents_reused"] += 1
+                request["saved_ms"] += saved_ms
+            logger.debug("Agent reused", agent_type=agent_type, saved_ms=round(saved_ms, 2))
+            return pooled.agent
+
+        started = time.perf_counter()
+        agent = create_react_agent(model=model, tools=list(tools), prompt=prompt)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        stats["built"] += 1
+        stats["build_ms"] += build_ms
+        if request is not None:
+            request["agents_built"] += 1
+            request["build_ms"] += build_ms
+
+        if self.max_size > 0:
+            self._agents[key] = _PooledAgent(agent=agent, model=model)
+            while len(self._agents) > self.max_size:
+                self._agents.popitem(last=False)
+
+        logger.debug("Agent built", agent_type=agent_type, build_ms=round(build_ms, 2))
+        return agent
+
+    @staticmethod
+    def fingerprint(prompt: str, tools: Sequence[Any]) -> str:
+        """Prompt 内容和工具列表的指纹"""
+        digest = hashlib.sha256(prompt.encode("utf-8"))
+        for tool in tools:
+            digest.update(b"\0")
+            digest.update(str(getattr(tool, "name", tool)).encode("utf-8"))
+        return digest.hexdigest()
+
+    def clear(self) -> None:
+        """清空缓存（例如模型路由变更后）"""
+        self._agents.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """按 agent 类型汇总的构建/复用统计"""
+        by_type = {}
+        for agent_type, stats in self._stats.items():
+            built = stats["built"]
+            by_type[agent_type] = {
+                "built": built,
+                "reused": stats["reused"],
+                "avg_build_ms": round(stats["build_ms"] / built, 2) if built else None,
+                "saved_ms": round(stats["saved_ms"], 2),
+            }
+        return {
+            "size": len(self._agents),
+            "max_size": self.max_size,
+            "saved_ms": round(sum(s["saved_ms"] for s in self._stats.values()), 2),
+            "agents": by_type,
+        }
+
+
+_agent_pool: Optional[AgentPool] = None
+
+
+def get_agent_pool() -> AgentPool:
+    """获取全局 AgentPool"""
+    global _agent_pool
+    if _agent_pool is None:
+        _agent_pool = AgentPool()
+    return _agent_pool
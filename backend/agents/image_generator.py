@@ -5,7 +5,7 @@ Image Generator Agent - Module C+ 图片生成师
 """
 
 from pathlib import Path
-from langgraph.prebuilt import create_react_agent
+from backend.agents.agent_pool import get_agent_pool, read_prompt_file
 from backend.services.model_router import get_model_router
 from backend.schemas.model_config import TaskType
 from backend.skills.image_generation import (
@@ -22,8 +22,7 @@ def _load_image_generator_prompt() -> str:
     prompt_path = Path(__file__).parent.parent / "prompts" / "11_Image_Generator.md"
 
     try:
-        with open(prompt_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = read_prompt_file(prompt_path)
 
         # 提取 Markdown 内容（去掉开头的标题）
         lines = content.split("\n")
@@ -62,7 +61,8 @@ async def create_image_generator_agent(user_id: str, project_id: str = None):
 
     # 创建 Agent - 使用 create_react_agent
     # 使用 Skills 生成和优化图片提示词
-    agent = create_react_agent(
+    agent = await get_agent_pool().get_or_create(
+        "image_generator",
         model=model,
         tools=[
             storyboard_to_image_prompt,  # Skill: 分镜转图片提示词
@@ -5,7 +5,7 @@ Market Analyst Agent - Level 1 市场分析
 """
 
 from pathlib import Path
-from langgraph.prebuilt import create_react_agent
+from backend.agents.agent_pool import get_agent_pool, read_prompt_file
 from backend.services.model_router import get_model_router
 from backend.schemas.model_config import TaskType
 
@@ -27,8 +27,7 @@ def _load_market_analyst_prompt() -> str:
     prompt_path = Path(__file__).parent.parent / "prompts" / "1_Market_Analyst.md"
 
     try:
-        with open(prompt_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = read_prompt_file(prompt_path)
 
         # 提取 Markdown 内容（去掉开头的标题）
         lines = content.split("\n")
@@ -65,7 +64,8 @@ async def create_market_analyst_agent(user_id: str, project_id: str = None):
     )
 
     # 创建 Agent - 使用 Skills 替代直接 Tools
-    agent = create_react_agent(
+    agent = await get_agent_pool().get_or_create(
+        "market_analyst",
         model=model,
         tools=[
             load_genre_context,  # ✅ 加载题材上下文
@@ -31,6 +31,7 @@ from langchain_core.messages import SystemMessage, HumanMessage, BaseMessage
 
 from backend.schemas.agent_state import AgentState, WorkflowStep
 from backend.services.model_router import get_model_router
+from backend.agents.agent_pool import read_prompt_file
 from backend.agents.registry import AgentRegistry
 from backend.schemas.model_config import TaskType
 from backend.utils.message_converter import normalize_messages
@@ -50,8 +51,7 @@ def _load_master_router_prompt_base() -> str:
     prompt_path = Path(__file__).parent.parent / "prompts" / "0_Master_Router.md"
 
     try:
-        with open(prompt_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = read_prompt_file(prompt_path)
 
         # 提取 Markdown 内容（去掉开头的标题）
         lines = content.split("\n")
@@ -7,7 +7,7 @@ Editor Agent - 毒舌审阅官
 
 from pathlib import Path
 from typing import Dict, Optional
-from langgraph.prebuilt import create_react_agent
+from backend.agents.agent_pool import get_agent_pool, read_prompt_file
 from backend.services.model_router import get_model_router
 from backend.services.review_service import calculate_weights, get_checkpoints
 from backend.schemas.model_config import TaskType
@@ -15,6 +15,8 @@ import structlog
 
 logger = structlog.get_logger(__name__)
 
+EDITOR_PROMPT_PATH = Path(__file__).parent.parent / "prompts" / "7_Editor_Reviewer.md"
+
 
 async def _load_editor_prompt(
     content_type: str,
@@ -24,11 +26,8 @@ async def _load_editor_prompt(
     total_episodes: int,
 ) -> str:
     """从文件加载 Editor 的 System Prompt"""
-    prompt_path = Path(__file__).parent.parent / "prompts" / "7_Editor_Reviewer.md"
-
     try:
-        with open(prompt_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = read_prompt_file(EDITOR_PROMPT_PATH)
 
         # 注入权重信息
         weights_text = "\n".join([f"- {key}: {value * 100:.0f}%" for key, value in weights.items()])
@@ -120,7 +119,8 @@ async def create_editor_agent(
     )
 
     # 创建 Agent（Editor 不需要 Tools，纯审阅任务）
-    agent = create_react_agent(
+    agent = await get_agent_pool().get_or_create(
+        "editor",
         model=model,
         tools=[],  # 纯审阅任务，不需要外部工具
         prompt=system_prompt,
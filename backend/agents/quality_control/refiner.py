@@ -7,7 +7,7 @@ Refiner Agent - 冷静修复工程师
 
 from pathlib import Path
 from typing import Dict, Optional
-from langgraph.prebuilt import create_react_agent
+from backend.agents.agent_pool import get_agent_pool, read_prompt_file
 from backend.services.model_router import get_model_router
 from backend.schemas.model_config import TaskType
 import structlog
@@ -24,8 +24,7 @@ async def _load_refiner_prompt(
     prompt_path = Path(__file__).parent.parent / "prompts" / "8_Refiner.md"
 
     try:
-        with open(prompt_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = read_prompt_file(prompt_path)
 
         # 注入文风DNA
         if style_dna:
@@ -95,7 +94,8 @@ async def create_refiner_agent(
     )
 
     # 创建 Agent（Refiner 不需要 Tools，纯修复任务）
-    agent = create_react_agent(
+    agent = await get_agent_pool().get_or_create(
+        "refiner",
         model=model,
         tools=[],  # 纯修复任务，不需要外部工具
         prompt=system_prompt,
@@ -5,7 +5,7 @@ Script Adapter Agent - Module B 剧本改编师
 """
 
 from pathlib import Path
-from langgraph.prebuilt import create_react_agent
+from backend.agents.agent_pool import get_agent_pool, read_prompt_file
 from backend.services.model_router import get_model_router
 from backend.schemas.model_config import TaskType
 from backend.skills.script_adaptation import (
@@ -23,8 +23,7 @@ def _load_script_adapter_prompt() -> str:
     prompt_path = Path(__file__).parent.parent / "prompts" / "5_Script_Adapter.md"
 
     try:
-        with open(prompt_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = read_prompt_file(prompt_path)
 
         # 提取 Markdown 内容（去掉开头的标题）
         lines = content.split("\n")
@@ -61,7 +60,8 @@ async def create_script_adapter_agent(user_id: str, project_id: str = None):
 
     # 创建 Agent - 使用 create_react_agent
     # 使用 Skills 而不是直接调用 Tools
-    agent = create_react_agent(
+    agent = await get_agent_pool().get_or_create(
+        "script_adapter",
         model=model,
         tools=[
             novel_to_script,  # Skill: 小说转剧本
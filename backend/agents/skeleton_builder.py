@@ -8,7 +8,7 @@ Skeleton Builder Agent - Level 3 大纲架构师
 
 from pathlib import Path
 from typing import Dict, Optional
-from langgraph.prebuilt import create_react_agent
+from backend.agents.agent_pool import get_agent_pool, read_prompt_file
 from backend.services.model_router import get_model_router
 from backend.schemas.model_config import TaskType
 from backend.services.tension_service import generate_tension_curve
@@ -46,8 +46,7 @@ async def _load_skeleton_builder_prompt(
     prompt_path = Path(__file__).parent.parent / "prompts" / "3_Skeleton_Builder.md"
 
     try:
-        with open(prompt_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = read_prompt_file(prompt_path)
 
         # 基础变量注入
         content = content.replace("{total_episodes}", str(user_config.get("total_episodes", 80)))
@@ -207,7 +206,8 @@ async def create_skeleton_builder_agent(
         analyze_genre_compatibility,  # 分析题材兼容性（双题材时）
     ]
 
-    agent = create_react_agent(
+    agent = await get_agent_pool().get_or_create(
+        "skeleton_builder",
         model=model,
         tools=tools,  # Agent 自主决定何时调用这些 Tools
         prompt=system_prompt,
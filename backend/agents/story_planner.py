@@ -7,7 +7,7 @@ Story Planner Agent - Level 2 故事策划
 
 from pathlib import Path
 from typing import Optional
-from langgraph.prebuilt import create_react_agent
+from backend.agents.agent_pool import get_agent_pool, read_prompt_file
 from backend.services.model_router import get_model_router
 from backend.services.market_analysis import get_market_analysis_service
 from backend.schemas.model_config import TaskType
@@ -60,10 +60,11 @@ def _genre_to_slug(genre: str) -> Optional[str]:
 async def _get_all_theme_slugs() -> list[str]:
     """从数据库动态获取所有可用主题的slug列表"""
     try:
-        from backend.services.database import get_db_service
+        from backend.services.theme_snapshot import get_theme_snapshot
 
-        db = get_db_service()
-        themes = await db.get_all_themes(active_only=True)
+        # 每次创建 Story Planner 都需要主题列表：从题材库内存快照读取，不访问数据库
+        snapshot = await get_theme_snapshot()
+        themes = snapshot.query("themes", {"order": "market_score.desc"})
         slugs = [theme["slug"] for theme in themes if theme.get("is_active", True)]
         logger.info(f"Dynamically loaded {len(slugs)} themes from database")
         return slugs
@@ -98,8 +99,7 @@ async def _load_story_planner_prompt(
     prompt_path = Path(__file__).parent.parent.parent / "prompts" / "2_Story_Planner.md"
 
     try:
-        with open(prompt_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = read_prompt_file(prompt_path)
 
         # 提取 Markdown 内容
         lines = content.split("\n")
@@ -448,7 +448,8 @@ async def create_story_planner_agent(
         base_prompt = base_prompt + "\n\n" + dedup_context
 
     # 6. 创建 Agent（使用 Skills）
-    agent = create_react_agent(
+    agent = await get_agent_pool().get_or_create(
+        "story_planner",
         model=model,
         tools=[
             # ✅ Theme Library Skills
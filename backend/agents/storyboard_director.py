@@ -5,7 +5,7 @@ Storyboard Director Agent - Module C 分镜导演
 """
 
 from pathlib import Path
-from langgraph.prebuilt import create_react_agent
+from backend.agents.agent_pool import get_agent_pool, read_prompt_file
 from backend.services.model_router import get_model_router
 from backend.schemas.model_config import TaskType
 from backend.skills.storyboard import (
@@ -24,8 +24,7 @@ def _load_storyboard_director_prompt() -> str:
     prompt_path = Path(__file__).parent.parent / "prompts" / "6_Storyboard_Director.md"
 
     try:
-        with open(prompt_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = read_prompt_file(prompt_path)
 
         # 提取 Markdown 内容（去掉开头的标题）
         lines = content.split("\n")
@@ -62,7 +61,8 @@ async def create_storyboard_director_agent(user_id: str, project_id: str = None)
 
     # 创建 Agent - 使用 create_react_agent
     # 使用 Skills 进行分镜设计
-    agent = create_react_agent(
+    agent = await get_agent_pool().get_or_create(
+        "storyboard_director",
         model=model,
         tools=[
             design_shots,  # Skill: 镜头设计
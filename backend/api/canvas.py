@@ -4,30 +4,50 @@ Canvas API
 画布状态管理端点 - v6.0 每集独立画布架构。
 """
 
+import asyncio
 from uuid import UUID
 import structlog
 from fastapi import APIRouter, Depends, HTTPException, status
 
-from backend.schemas.canvas import CanvasData, CanvasViewport, CanvasSaveRequest
+from backend.schemas.canvas import (
+    CanvasData,
+    CanvasDeltaRequest,
+    CanvasDeltaResponse,
+    CanvasSaveRequest,
+    CanvasViewport,
+)
 from backend.schemas.common import SuccessResponse
 from backend.services import get_db_service, DatabaseService
+from backend.services.database import CanvasVersionConflict
+from backend.api.deps import Loaders
 
 router = APIRouter(prefix="/episodes", tags=["Canvas"])
 logger = structlog.get_logger(__name__)
 
 
+def _conflict(e: CanvasVersionConflict) -> HTTPException:
+    """版本冲突：客户端需要重新获取画布后再提交"""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={"message": "Canvas version conflict", "version": e.current_version},
+    )
+
+
 @router.get("/{episode_id}/canvas", response_model=SuccessResponse[CanvasData])
 async def get_canvas(
     episode_id: UUID,
+    loaders: Loaders,
     db: DatabaseService = Depends(get_db_service),
 ):
     """获取剧集画布状态"""
-    # 验证剧集是否存在
-    episode = await db.get_episode(str(episode_id))
+    # 验证剧集是否存在（与画布读取并发）
+    episode, canvas_data = await asyncio.gather(
+        loaders.episodes.load(str(episode_id)),
+        db.get_episode_canvas(str(episode_id)),
+    )
     if not episode:
         raise HTTPException(status_code=404, detail="Episode not found")
 
-    canvas_data = await db.get_episode_canvas(str(episode_id))
     if not canvas_data:
         # 返回空白画布
         return SuccessResponse.of(CanvasData.empty(str(episode_id)))
@@ -41,38 +61,74 @@ async def save_canvas(
     data: CanvasSaveRequest,
     db: DatabaseService = Depends(get_db_service),
 ):
-    """保存剧集画布状态"""
-    # 验证剧集是否存在
-    episode = await db.get_episode(str(episode_id))
-    if not episode:
-        raise HTTPException(status_code=404, detail="Episode not found")
-
+    """全量保存剧集画布状态（大画布请使用 PATCH 增量保存）"""
     canvas_data = {
         "viewport": data.viewport.model_dump(),
-        "nodes": [node.model_dump() for node in data.nodes],
+        "nodes": [node.model_dump(mode="json") for node in data.nodes],
         "connections": [conn.model_dump() for conn in data.connections],
     }
 
-    result = await db.save_episode_canvas(episode_id=str(episode_id), canvas_data=canvas_data)
-    logger.info("Canvas saved", episode_id=str(episode_id))
+    try:
+        result = await db.save_episode_canvas(
+            episode_id=str(episode_id), canvas_data=canvas_data, base_version=data.base_version
+        )
+    except CanvasVersionConflict as e:
+        raise _conflict(e)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Episode not found")
+
+    logger.info("Canvas saved", episode_id=str(episode_id), version=result["version"])
     return SuccessResponse.of(CanvasData(**result))
 
 
-@router.patch("/{episode_id}/canvas/viewport", response_model=SuccessResponse[CanvasData])
+@router.patch("/{episode_id}/canvas", response_model=SuccessResponse[CanvasDeltaResponse])
+async def apply_canvas_delta(
+    episode_id: UUID,
+    data: CanvasDeltaRequest,
+    db: DatabaseService = Depends(get_db_service),
+):
+    """
+    增量保存剧集画布
+
+    只提交变化的节点 / 连线，由服务端合并。base_version 与服务端版本不一致时返回 409，
+    响应 detail 中带有当前版本号，客户端重新获取画布后再提交。
+    """
+    version = data.base_version
+    if data.ops:
+        try:
+            version = await db.apply_canvas_delta(
+                str(episode_id),
+                [op.model_dump(mode="json") for op in data.ops],
+                base_version=data.base_version,
+            )
+        except CanvasVersionConflict as e:
+            raise _conflict(e)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Episode not found")
+
+    if data.viewport is not None:
+        viewport = await db.update_episode_viewport(str(episode_id), **data.viewport.model_dump())
+        if viewport is None:
+            raise HTTPException(status_code=404, detail="Episode not found")
+
+    logger.info(
+        "Canvas delta applied", episode_id=str(episode_id), ops=len(data.ops), version=version
+    )
+    return SuccessResponse.of(CanvasDeltaResponse(episode_id=str(episode_id), version=version))
+
+
+@router.patch("/{episode_id}/canvas/viewport", response_model=SuccessResponse[CanvasViewport])
 async def update_viewport(
     episode_id: UUID,
     viewport: CanvasViewport,
     db: DatabaseService = Depends(get_db_service),
 ):
-    """仅更新画布视口状态"""
-    # 验证剧集是否存在
-    episode = await db.get_episode(str(episode_id))
-    if not episode:
-        raise HTTPException(status_code=404, detail="Episode not found")
-
+    """仅更新画布视口状态（不读取也不改写节点数据）"""
     result = await db.update_episode_viewport(
         episode_id=str(episode_id), x=viewport.x, y=viewport.y, zoom=viewport.zoom
     )
+    if result is None:
+        raise HTTPException(status_code=404, detail="Episode not found")
     logger.info(
         "Viewport updated",
         episode_id=str(episode_id),
@@ -80,4 +136,4 @@ async def update_viewport(
         y=viewport.y,
         zoom=viewport.zoom,
     )
-    return SuccessResponse.of(CanvasData(**result))
+    return SuccessResponse.of(viewport)
@@ -4,6 +4,7 @@ Connections API
 节点连线管理端点 - v6.0 每集独立画布架构。
 """
 
+import asyncio
 from uuid import UUID
 from typing import Literal
 import structlog
@@ -13,6 +14,7 @@ from pydantic import BaseModel, Field
 from backend.schemas.canvas import Connection
 from backend.schemas.common import SuccessResponse
 from backend.services import get_db_service, DatabaseService
+from backend.api.deps import Loaders
 
 router = APIRouter(prefix="/episodes", tags=["Connections"])
 logger = structlog.get_logger(__name__)
@@ -51,20 +53,22 @@ async def list_connections(
 async def create_connection(
     episode_id: UUID,
     data: ConnectionCreate,
+    loaders: Loaders,
     db: DatabaseService = Depends(get_db_service),
 ):
     """创建连线"""
-    # 验证剧集是否存在
-    episode = await db.get_episode(str(episode_id))
+    # 剧集和两个分镜并发读取，两个分镜合并为一次查询
+    episode, (source_shot, target_shot) = await asyncio.gather(
+        loaders.episodes.load(str(episode_id)),
+        loaders.shots.load_many([str(data.source_shot_id), str(data.target_shot_id)]),
+    )
     if not episode:
         raise HTTPException(status_code=404, detail="Episode not found")
 
     # 验证源分镜和目标分镜是否属于该剧集
-    source_shot = await db.get_shot_node(str(data.source_shot_id))
     if not source_shot or str(source_shot.get("episode_id")) != str(episode_id):
         raise HTTPException(status_code=404, detail="Source shot not found in this episode")
 
-    target_shot = await db.get_shot_node(str(data.target_shot_id))
     if not target_shot or str(target_shot.get("episode_id")) != str(episode_id):
         raise HTTPException(status_code=404, detail="Target shot not found in this episode")
 
@@ -12,6 +12,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import httpx
 
 from backend.config import settings
+from backend.services import get_db_service, DatabaseService
+from backend.services.loader import DatabaseLoaders
 
 logger = structlog.get_logger(__name__)
 
@@ -120,6 +122,21 @@ CurrentUser = Annotated[AuthUser, Depends(get_current_user)]
 CurrentUserId = Annotated[str, Depends(get_current_user_id)]
 
 
+async def get_loaders(
+    db: DatabaseService = Depends(get_db_service),
+) -> DatabaseLoaders:
+    """
+    获取当前请求的批量读取器
+
+    FastAPI 在同一请求内只解析一次依赖，端点和其他依赖拿到的是同一个实例；
+    请求结束后请求内缓存随之丢弃。
+    """
+    return DatabaseLoaders(db)
+
+
+Loaders = Annotated[DatabaseLoaders, Depends(get_loaders)]
+
+
 async def require_authenticated(user: CurrentUser) -> AuthUser:
     """
     要求已认证用户 (非匿名)
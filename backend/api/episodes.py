@@ -16,7 +16,7 @@ from backend.schemas.episode import (
 )
 from backend.schemas.common import SuccessResponse
 from backend.services import get_db_service, DatabaseService
-from backend.api.deps import get_current_user_id
+from backend.api.deps import Loaders, get_current_user_id
 
 router = APIRouter(prefix="/projects", tags=["Episodes"])
 logger = structlog.get_logger(__name__)
@@ -36,10 +36,10 @@ async def list_episodes(
 async def get_episode(
     project_id: UUID,
     episode_id: UUID,
-    db: DatabaseService = Depends(get_db_service),
+    loaders: Loaders,
 ):
     """获取单个剧集详情"""
-    episode = await db.get_episode(str(episode_id))
+    episode = await loaders.episodes.load(str(episode_id))
     if not episode:
         raise HTTPException(status_code=404, detail="Episode not found")
     # 验证剧集是否属于该项目
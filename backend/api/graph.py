@@ -14,6 +14,9 @@ import json
 from datetime import datetime
 from backend.graph.main_graph import get_graph_for_request
 from backend.schemas.agent_state import create_initial_state
+from backend.services.streaming import streaming_manager
+from backend.services.http_pool import get_pool_stats
+from backend.agents.agent_pool import get_agent_pool, track_request
 from backend.services.chat_init_service import (
     is_cold_start_message,
     create_welcome_message,
@@ -57,6 +60,49 @@ def content_to_string(content) -> str:
     return str(content)
 
 
+def chunk_to_string(chunk) -> str:
+    """提取流式事件 chunk 中的文本（AIMessageChunk.content 或 GenerationChunk.text）"""
+    if chunk is None:
+        return ""
+    if hasattr(chunk, "content"):
+        return content_to_string(chunk.content)
+    if isinstance(chunk, dict):
+        return content_to_string(chunk.get("content") or chunk.get("text"))
+    return str(getattr(chunk, "text", "") or "")
+
+
+# 只有这些节点的 LLM 输出会作为 token_delta 流式发送到聊天气泡；
+# master_router 的 JSON 路由决策、质检 / 校验等内部调用不转发，等最终消息整体替换
+TOKEN_STREAM_NODES = frozenset(
+    {
+        "cold_start",
+        "market_analyst",
+        "story_planner",
+        "skeleton_builder",
+        "script_adapter",
+        "storyboard_director",
+    }
+)
+# create_react_agent 内部调用模型的节点（"tools" 节点中的 LLM 调用不转发）
+_AGENT_MODEL_NODE = "agent"
+
+
+def is_token_stream_event(metadata: dict) -> bool:
+    """
+    判断 LLM 流式事件是否来自面向用户的节点
+
+    metadata["langgraph_node"] 是产生事件的（最内层）节点，
+    langgraph_checkpoint_ns 的第一段是主图中的顶层节点（"skeleton_builder:<task_id>|..."）。
+    顶层节点在 TOKEN_STREAM_NODES 中，且事件来自该节点本身或其 ReAct Agent 的模型节点时才转发。
+    """
+    node = metadata.get("langgraph_node")
+    namespace = metadata.get("langgraph_checkpoint_ns") or ""
+    root = namespace.split("|", 1)[0].split(":", 1)[0] or node
+    if root not in TOKEN_STREAM_NODES:
+        return False
+    return node == root or node == _AGENT_MODEL_NODE
+
+
 def format_message_content(content: str) -> str:
     """将消息内容转换为友好格式，处理 action JSON 和 Master Router JSON"""
     if not content:
@@ -655,11 +701,21 @@ async def chat_reset_endpoint(request: ChatInitRequest):
 @router.get("/health")
 async def graph_health_check():
     """Health check for graph system"""
+    from backend.graph.main_graph import get_graph_cache_stats
+    from backend.services.prescreen_service import get_prescreen_stats
+    from backend.services.review_cache import get_review_cache
+
     return {
         "status": "ok",
         "component": "graph",
         "version": "4.1.0",
         "features": ["workflow_plan", "multi_step", "agent_registry", "cold_start", "chat_init"],
+        "graph_cache": get_graph_cache_stats(),
+        "streaming": streaming_manager.get_stats(),
+        "agent_pool": get_agent_pool().get_stats(),
+        "http_pool": get_pool_stats(),
+        "review_cache": get_review_cache().get_stats(),
+        "prescreen": get_prescreen_stats().get_stats(),
     }
 
 
@@ -816,57 +872,81 @@ async def chat_sse_endpoint(
             }
 
             # 运行 graph 并流式获取事件
-            result = None
-            current_node = None
-
-            async for event in graph.astream_events(state, config, version="v2"):
-                event_type = event.get("event")
-
-                # 处理节点级别的事件
-                if event_type == "on_chain_start":
-                    # 获取节点名称
-                    metadata = event.get("metadata", {})
-                    node_name = metadata.get("langgraph_node")
-
-                    if node_name:
-                        current_node = node_name
-                        desc = node_descriptions.get(node_name, f"⏳ 正在执行: {node_name}")
-                        yield f"data: {json.dumps({'type': 'node_start', 'node': node_name, 'desc': desc})}\n\n"
-                        await asyncio.sleep(0.01)
-
-                elif event_type == "on_chain_end":
-                    metadata = event.get("metadata", {})
-                    node_name = metadata.get("langgraph_node")
-
-                    if node_name:
-                        yield f"data: {json.dumps({'type': 'node_end', 'node': node_name})}\n\n"
-                        await asyncio.sleep(0.01)
-
-                elif event_type == "on_llm_start":
-                    # LLM 开始生成
-                    if current_node == "skeleton_builder":
-                        yield f"data: {json.dumps({'type': 'progress', 'desc': '🤖 AI 正在构思大纲结构...'})}\n\n"
-
-                elif event_type == "on_llm_stream":
-                    # LLM 流式输出（可以用来显示实时生成进度）
-                    if current_node == "skeleton_builder":
-                        chunk = event.get("data", {}).get("chunk", {})
-                        if hasattr(chunk, "content") and chunk.content:
-                            # 每 500 字符发送一次进度更新
-                            content = chunk.content
-                            if len(content) % 500 < 50:  # 粗略估计
-                                yield f"data: {json.dumps({'type': 'progress', 'desc': f'📝 正在生成大纲... ({len(content) // 500 * 500}+ 字符)'})}\n\n"
-
-                elif event_type == "on_custom_event":
-                    # 处理自定义事件
-                    data = event.get("data", {})
-                    event_name = data.get("name")
-                    event_data = data.get("data", {})
-
-                    if event_name == "skeleton_progress":
-                        progress = event_data.get("progress", 0)
-                        stage = event_data.get("stage", "")
-                        yield f"data: {json.dumps({'type': 'progress', 'desc': f'📝 {stage} ({progress}%)'})}\n\n"
+            # graph 在生产者任务中执行，事件经有界通道转发给 SSE 客户端：
+            # LLM token 按 stream_coalesce_ms 合并后以 token_delta 实时发出，
+            # 客户端读取过慢时通道写满，生产者等待（背压）
+            stream_thread_id = config["configurable"]["thread_id"]
+            channel = streaming_manager.open_stream(stream_thread_id)
+            # 统计本次请求中 Agent 的构建/复用（生产者任务继承该上下文）
+            agent_metrics = track_request()
+
+            async def produce_events():
+                current_node = None
+                try:
+                    async for event in graph.astream_events(state, config, version="v2"):
+                        event_type = event.get("event")
+                        metadata = event.get("metadata", {})
+                        node_name = metadata.get("langgraph_node")
+
+                        # 处理节点级别的事件
+                        if event_type == "on_chain_start":
+                            if node_name:
+                                current_node = node_name
+                                desc = node_descriptions.get(
+                                    node_name, f"⏳ 正在执行: {node_name}"
+                                )
+                                await channel.put(
+                                    {"type": "node_start", "node": node_name, "desc": desc}
+                                )
+
+                        elif event_type == "on_chain_end":
+                            if node_name:
+                                await channel.put({"type": "node_end", "node": node_name})
+
+                        elif event_type in ("on_llm_start", "on_chat_model_start"):
+                            # LLM 开始生成
+                            if current_node == "skeleton_builder":
+                                await channel.put(
+                                    {"type": "progress", "desc": "🤖 AI 正在构思大纲结构..."}
+                                )
+
+                        elif event_type in ("on_llm_stream", "on_chat_model_stream"):
+                            # LLM 流式输出：逐 token 转发（通道内合并），只转发面向用户的节点
+                            if not is_token_stream_event(metadata):
+                                continue
+                            chunk = event.get("data", {}).get("chunk")
+                            token = chunk_to_string(chunk)
+                            if token:
+                                await channel.put_token(token, node_name or current_node)
+
+                        elif event_type == "on_custom_event":
+                            # 处理自定义事件
+                            data = event.get("data", {})
+                            event_name = data.get("name")
+                            event_data = data.get("data", {})
+
+                            if event_name == "skeleton_progress":
+                                progress = event_data.get("progress", 0)
+                                stage = event_data.get("stage", "")
+                                await channel.put(
+                                    {"type": "progress", "desc": f"📝 {stage} ({progress}%)"}
+                                )
+                finally:
+                    await channel.aclose()
+
+            producer = asyncio.create_task(produce_events())
+            try:
+                async for stream_event in channel.events():
+                    yield f"data: {json.dumps(stream_event)}\n\n"
+                # graph 执行异常在这里抛出，由外层统一返回 error 事件
+                await producer
+            finally:
+                # 客户端断开时中止通道并取消 graph 执行
+                streaming_manager.end_stream(stream_thread_id, channel)
+                if not producer.done():
+                    producer.cancel()
+                if agent_metrics["agents_built"] or agent_metrics["agents_reused"]:
+                    logger.info("Agent pool usage", thread_id=stream_thread_id, **agent_metrics)
 
             # 获取最终结果
             # 重要：从 checkpoint 读取 astream_events 完成后的最终状态
@@ -956,7 +1036,7 @@ async def chat_sse_endpoint(
 
             display_content = extract_display_content(ai_content)
 
-            # 一次性发送完整内容（不再分词模拟流式）
+            # 发送清洗后的完整内容，前端用它替换流式累积的 token_delta
             if display_content:
                 yield f"data: {json.dumps({'type': 'token', 'content': display_content})}\n\n"
 
@@ -1015,29 +1095,23 @@ async def chat_sse_endpoint(
 
             if accumulated_content and (is_skeleton_node or has_batch_info):
                 try:
-                    from backend.api.skeleton_builder import parse_skeleton_to_outline
                     from backend.services.database import get_db_service
-
-                    db = get_db_service()
-                    outline_data = parse_skeleton_to_outline(accumulated_content, project_id)
-
-                    # 添加批次进度信息到 metadata
-                    outline_data["metadata"] = outline_data.get("metadata", {})
-                    outline_data["metadata"]["current_batch"] = current_batch_index
-                    outline_data["metadata"]["total_batches"] = total_batches
-                    outline_data["metadata"]["needs_next_batch"] = (
-                        current_batch_index < total_batches
+                    from backend.services.outline_store import get_outline_store
+
+                    # 只追加本批次新增的骨架文本和剧集，不再重写完整大纲
+                    saved = await get_outline_store(get_db_service()).save_batch(
+                        project_id,
+                        accumulated_content,
+                        batch_index=current_batch_index,
+                        total_batches=total_batches,
                     )
-                    outline_data["metadata"]["batch_progress"] = (
-                        f"{current_batch_index}/{total_batches}"
-                    )
-
-                    await db.save_outline(project_id, outline_data)
                     logger.info(
                         "Outline saved to database from graph chat",
                         project_id=project_id,
                         batch=f"{current_batch_index}/{total_batches}",
-                        episodes_count=len(outline_data.get("episodes", [])),
+                        version=saved["version"],
+                        episodes_written=saved["episodes_written"],
+                        chars_written=saved["chars_written"],
                         needs_next_batch=current_batch_index < total_batches,
                     )
                 except Exception as save_error:
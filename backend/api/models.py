@@ -22,6 +22,7 @@ from backend.schemas.model_config import (
 )
 from backend.schemas.common import SuccessResponse
 from backend.services import get_db_service, DatabaseService
+from backend.services.model_router import invalidate_model_routing
 from backend.api.deps import get_current_user_id
 
 router = APIRouter(prefix="/models", tags=["Models"])
@@ -41,6 +42,7 @@ async def create_provider(
 ):
     """添加 LLM 服务商"""
     provider = await db.create_provider(user_id, data.model_dump())
+    invalidate_model_routing(user_id=user_id)
     logger.info("Provider created", provider_id=provider.get("id"))
     return SuccessResponse.of(provider)
 
@@ -71,6 +73,7 @@ async def update_provider(
     provider = await db.update_provider(provider_id, data.model_dump(exclude_unset=True))
     if not provider:
         raise HTTPException(status_code=404, detail="Provider not found")
+    invalidate_model_routing(provider_id=provider_id)
     return SuccessResponse.of(provider)
 
 
@@ -83,6 +86,7 @@ async def delete_provider(
     success = await db.delete_provider(provider_id)
     if not success:
         raise HTTPException(status_code=404, detail="Provider not found")
+    invalidate_model_routing(provider_id=provider_id)
     return SuccessResponse.of(None)
 
 
@@ -257,6 +261,7 @@ async def create_mapping(
 ):
     """创建任务-模型映射"""
     mapping = await db.create_mapping(user_id, data.model_dump(mode="json"))
+    invalidate_model_routing(user_id=user_id)
     logger.info("Mapping created", task_type=data.task_type)
     return SuccessResponse.of(mapping)
 
@@ -274,6 +279,7 @@ async def update_mapping(
     )
     if not mapping:
         raise HTTPException(status_code=404, detail="Mapping not found")
+    invalidate_model_routing(user_id=user_id, mapping_id=str(mapping_id))
     logger.info("Mapping updated", mapping_id=str(mapping_id))
     return SuccessResponse.of(mapping)
 
@@ -288,6 +294,7 @@ async def delete_mapping(
     success = await db.delete_mapping(str(mapping_id))
     if not success:
         raise HTTPException(status_code=404, detail="Mapping not found")
+    invalidate_model_routing(user_id=user_id, mapping_id=str(mapping_id))
     logger.info("Mapping deleted", mapping_id=str(mapping_id))
 
 
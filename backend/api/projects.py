@@ -4,6 +4,7 @@ Projects API
 项目 CRUD 端点。
 """
 
+import asyncio
 from uuid import UUID
 import structlog
 from fastapi import APIRouter, Depends, HTTPException, status
@@ -11,7 +12,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from backend.schemas.project import ProjectCreate, ProjectResponse, ProjectUpdate
 from backend.schemas.common import SuccessResponse, PaginatedResponse
 from backend.services import get_db_service, DatabaseService
-from backend.api.deps import get_current_user_id
+from backend.api.deps import Loaders, get_current_user_id
 
 router = APIRouter(prefix="/projects", tags=["Projects"])
 logger = structlog.get_logger(__name__)
@@ -40,18 +41,20 @@ async def list_projects(
 ):
     """获取项目列表"""
     offset = (page - 1) * page_size
-    projects = await db.list_projects(user_id, limit=page_size, offset=offset)
-    total = await db.count_projects(user_id)
+    projects, total = await asyncio.gather(
+        db.list_projects(user_id, limit=page_size, offset=offset),
+        db.count_projects(user_id),
+    )
     return PaginatedResponse.of(projects, total, page, page_size)
 
 
 @router.get("/{project_id}", response_model=SuccessResponse[ProjectResponse])
 async def get_project(
     project_id: UUID,
-    db: DatabaseService = Depends(get_db_service),
+    loaders: Loaders,
 ):
     """获取项目详情"""
-    project = await db.get_project(str(project_id))
+    project = await loaders.projects.load(str(project_id))
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return SuccessResponse.of(project)
@@ -11,6 +11,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from backend.schemas.scene import SceneCreate, SceneResponse, SceneUpdate
 from backend.schemas.common import SuccessResponse
 from backend.services import get_db_service, DatabaseService
+from backend.api.deps import Loaders
 
 router = APIRouter(prefix="/episodes", tags=["Scenes"])
 logger = structlog.get_logger(__name__)
@@ -30,10 +31,10 @@ async def list_scenes(
 async def get_scene(
     episode_id: UUID,
     scene_id: UUID,
-    db: DatabaseService = Depends(get_db_service),
+    loaders: Loaders,
 ):
     """获取单个场景详情"""
-    scene = await db.get_scene(str(scene_id))
+    scene = await loaders.scenes.load(str(scene_id))
     if not scene:
         raise HTTPException(status_code=404, detail="Scene not found")
     # 验证场景是否属于该剧集
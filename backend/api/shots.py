@@ -18,6 +18,7 @@ from backend.schemas.shot import (
 )
 from backend.schemas.common import SuccessResponse
 from backend.services import get_db_service, DatabaseService
+from backend.api.deps import Loaders
 
 router = APIRouter(prefix="/episodes", tags=["Shots"])
 logger = structlog.get_logger(__name__)
@@ -41,10 +42,10 @@ async def list_shots(
 async def get_shot(
     episode_id: UUID,
     shot_id: UUID,
-    db: DatabaseService = Depends(get_db_service),
+    loaders: Loaders,
 ):
     """获取单个分镜详情"""
-    shot = await db.get_shot_node(str(shot_id))
+    shot = await loaders.shots.load(str(shot_id))
     if not shot:
         raise HTTPException(status_code=404, detail="Shot not found")
     # 验证分镜是否属于该剧集
@@ -156,10 +157,15 @@ async def batch_update_shot_positions(
             }
         )
 
-    result = await db.batch_update_shot_positions(positions)
-    logger.info("Shot positions batch updated", count=len(positions))
+    updated_count = await db.batch_update_shot_positions(str(episode_id), positions)
+    # 没有行被更新时才确认剧集是否存在（位置未变化也会返回 0），正常拖动仍只有一次请求
+    if not updated_count and not await db.get_episode(str(episode_id)):
+        raise HTTPException(status_code=404, detail="Episode not found")
+    logger.info(
+        "Shot positions batch updated", count=len(positions), updated_count=updated_count
+    )
     return SuccessResponse.of(
-        {"updated_count": len(positions), "message": "Positions updated successfully"}
+        {"updated_count": updated_count, "message": "Positions updated successfully"}
     )
 
 
@@ -9,6 +9,9 @@ from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
 from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+from contextlib import nullcontext
+import asyncio
+import hashlib
 import structlog
 import re
 import json
@@ -16,6 +19,7 @@ import json
 from backend.schemas.agent_state import AgentState, create_initial_state
 from backend.schemas.project import ProjectUpdate
 from backend.services.database import get_db_service
+from backend.utils.outline_index import ChapterIndex
 from backend.graph.workflows.quality_control_graph import (
     build_quality_control_graph,
     run_quality_review,
@@ -27,6 +31,9 @@ logger = structlog.get_logger(__name__)
 
 router = APIRouter(prefix="/skeleton", tags=["skeleton-builder"])
 
+# 场景清单条目：1. **场景1**：地点 - 事件
+_SCENE_ITEM_PATTERN = re.compile(r"(\d+)\.\s*\*\*([^*]+)\*\*\s*[:：]\s*([^\n]+)")
+
 
 # ===== 数据模型 =====
 
@@ -82,6 +89,139 @@ class ConfirmOutlineResponse(BaseModel):
 # ===== 辅助函数 =====
 
 
+def extract_outline_metadata(skeleton_content: str) -> Dict[str, Any]:
+    """
+    提取骨架内容中的 JSON 元数据（chapter_map, paywall_info, actions 等）
+
+    未找到或解析失败时返回空字典。
+    """
+    # 尝试解析 JSON 部分
+    json_match = re.search(r"```json\s*([\s\S]*?)\s*```", skeleton_content)
+    if json_match:
+        json_str = json_match.group(1)
+    else:
+        # 尝试直接找 JSON 对象
+        json_match = re.search(
+            r'\{\s*"chapter_map"[\s\S]*?"actions"\s*:\s*\[[\s\S]*?\]\s*\}', skeleton_content
+        )
+        if json_match:
+            json_str = json_match.group(0)
+        else:
+            json_str = "{}"
+
+    try:
+        metadata = json.loads(json_str)
+    except json.JSONDecodeError as e:
+        logger.warning("Failed to parse skeleton JSON metadata", error=str(e))
+        return {}
+
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def parse_episode_range(episode_range: Any) -> List[int]:
+    """解析剧集范围，格式如 "1-2" 或 "3" """
+    if not episode_range:
+        return []
+    episode_range = str(episode_range)
+    # 处理格式如 "1-2" 或 "3"
+    if "-" in episode_range:
+        start, end = episode_range.split("-")
+        return list(range(int(start), int(end) + 1))
+    return [int(episode_range)]
+
+
+def build_outline_episodes(
+    skeleton_content: str,
+    project_id: str,
+    chapter_map: List[Dict[str, Any]],
+    paywall_info: Optional[Dict[str, Any]] = None,
+    chapter_index: Optional[ChapterIndex] = None,
+    chapters: Optional[set] = None,
+) -> List[Dict[str, Any]]:
+    """
+    根据 chapter_map 和章节索引构建 episodes 列表（按剧集编号排序）
+
+    Args:
+        skeleton_content: 骨架内容（完整内容或单个批次的内容）
+        project_id: 项目 ID
+        chapter_map: 章节 → 剧集范围映射
+        paywall_info: 付费卡点信息
+        chapter_index: 已建立的章节索引（为空时从 skeleton_content 建立）
+        chapters: 只构建这些章节的剧集（增量保存时使用），为空表示全部
+    """
+    episodes = []
+    # 一次扫描建立章节索引，避免每章对全文重复执行 re.search
+    if chapter_index is None:
+        chapter_index = ChapterIndex(skeleton_content)
+    paywall_chapter = paywall_info.get("chapter") if paywall_info else None
+
+    for chapter_info in chapter_map:
+        chapter_num = chapter_info.get("chapter", 0)
+        if chapters is not None and chapter_num not in chapters:
+            continue
+
+        episode_nums = parse_episode_range(chapter_info.get("episodes", ""))
+
+        # 检查是否是付费卡点
+        is_paid_wall = bool(paywall_chapter) and chapter_num == paywall_chapter
+
+        # 从索引中读取章节标题、摘要和场景清单（每章只处理一次）
+        chapter_title = f"第{chapter_num}章"
+        chapter_summary = ""
+        scene_matches = []
+        chapter = chapter_index.get(chapter_num)
+        if chapter:
+            chapter_title = chapter.title or chapter_title
+            chapter_summary = chapter.summary
+            # 解析每个场景（格式如：1. **场景1**：地点 - 事件）
+            scene_matches = _SCENE_ITEM_PATTERN.findall(chapter_index.scene_text(chapter_num))[
+                :5
+            ]  # 最多5个场景
+
+        # 为每个剧集创建 episode
+        for ep_num in episode_nums:
+            episode_id = f"ep_{project_id}_{ep_num}"
+
+            scenes = []
+            for idx, (scene_num, scene_title, scene_desc) in enumerate(scene_matches, 1):
+                scenes.append(
+                    {
+                        "sceneId": f"scene_{project_id}_{ep_num}_{idx}",
+                        "sceneNumber": idx,
+                        "title": scene_title.strip(),
+                        "content": scene_desc.strip(),
+                        "shots": [],  # 镜头数据暂不解析
+                    }
+                )
+
+            # 如果没有解析到场景，创建一个默认场景
+            if not scenes:
+                scenes.append(
+                    {
+                        "sceneId": f"scene_{project_id}_{ep_num}_1",
+                        "sceneNumber": 1,
+                        "title": "主要场景",
+                        "content": chapter_summary or f"第{chapter_num}章主要场景",
+                        "shots": [],
+                    }
+                )
+
+            episode = {
+                "episodeId": episode_id,
+                "episodeNumber": ep_num,
+                "title": chapter_title,
+                "summary": chapter_summary,
+                "scenes": scenes,
+                "reviewStatus": "pending",
+                "isPaidWall": is_paid_wall,
+            }
+            episodes.append(episode)
+
+    # 按剧集编号排序
+    episodes.sort(key=lambda x: x["episodeNumber"])
+    return episodes
+
+
 def parse_skeleton_to_outline(skeleton_content: str, project_id: str) -> Dict[str, Any]:
     """
     解析骨架构建器的输出，转换为标准的 OutlineData 格式
@@ -93,11 +233,6 @@ def parse_skeleton_to_outline(skeleton_content: str, project_id: str) -> Dict[st
     转换为：
     - OutlineData 格式，包含 episodes 数组
     """
-    import json
-    import re
-    from datetime import datetime
-
-    # 尝试从内容中提取 JSON 部分
     outline_data = {
         "projectId": project_id,
         "episodes": [],
@@ -107,21 +242,7 @@ def parse_skeleton_to_outline(skeleton_content: str, project_id: str) -> Dict[st
     }
 
     try:
-        # 尝试解析 JSON 部分
-        json_match = re.search(r"```json\s*([\s\S]*?)\s*```", skeleton_content)
-        if json_match:
-            json_str = json_match.group(1)
-        else:
-            # 尝试直接找 JSON 对象
-            json_match = re.search(
-                r'\{\s*"chapter_map"[\s\S]*?"actions"\s*:\s*\[[\s\S]*?\]\s*\}', skeleton_content
-            )
-            if json_match:
-                json_str = json_match.group(0)
-            else:
-                json_str = "{}"
-
-        metadata = json.loads(json_str)
+        metadata = extract_outline_metadata(skeleton_content)
 
         # 提取元数据
         chapter_map = metadata.get("chapter_map", [])
@@ -129,103 +250,9 @@ def parse_skeleton_to_outline(skeleton_content: str, project_id: str) -> Dict[st
 
         # 从 chapter_map 构建 episodes
         if chapter_map:
-            episodes = []
-            for chapter_info in chapter_map:
-                chapter_num = chapter_info.get("chapter", 0)
-                episode_range = chapter_info.get("episodes", "")
-
-                # 解析剧集范围
-                episode_nums = []
-                if episode_range:
-                    # 处理格式如 "1-2" 或 "3"
-                    if "-" in episode_range:
-                        start, end = episode_range.split("-")
-                        episode_nums = list(range(int(start), int(end) + 1))
-                    else:
-                        episode_nums = [int(episode_range)]
-
-                # 为每个剧集创建 episode
-                for ep_num in episode_nums:
-                    episode_id = f"ep_{project_id}_{ep_num}"
-
-                    # 检查是否是付费卡点
-                    is_paid_wall = False
-                    if paywall_info:
-                        paywall_chapter = paywall_info.get("chapter")
-                        if paywall_chapter and chapter_num == paywall_chapter:
-                            is_paid_wall = True
-
-                    # 查找章节大纲文本
-                    chapter_title = f"第{chapter_num}章"
-                    chapter_summary = ""
-
-                    # 尝试从文本中提取章节标题和摘要
-                    chapter_pattern = rf"Chapter\s*{chapter_num}[\s:：]+([^\n]+)"
-                    chapter_match = re.search(chapter_pattern, skeleton_content, re.IGNORECASE)
-                    if chapter_match:
-                        chapter_title = chapter_match.group(1).strip()
-
-                    # 提取摘要（查找摘要部分）
-                    summary_pattern = rf"Chapter\s*{chapter_num}[^\n]*\n.*?摘要[\s:：]+([^\n]+)"
-                    summary_match = re.search(
-                        summary_pattern, skeleton_content, re.IGNORECASE | re.DOTALL
-                    )
-                    if summary_match:
-                        chapter_summary = summary_match.group(1).strip()
-
-                    # 尝试从文本中提取场景清单
-                    scenes = []
-                    # 查找该章节下的场景部分
-                    scene_section_pattern = rf"Chapter\s*{chapter_num}[^\n]*\n.*?场景清单[\s:：]*\n([\s\S]*?)(?=Chapter|\Z)"
-                    scene_section_match = re.search(
-                        scene_section_pattern, skeleton_content, re.IGNORECASE | re.DOTALL
-                    )
-
-                    if scene_section_match:
-                        scene_section = scene_section_match.group(1)
-                        # 解析每个场景（格式如：1. **场景1**：地点 - 事件）
-                        scene_pattern = r"(\d+)\.\s*\*\*([^*]+)\*\*\s*[:：]\s*([^\n]+)"
-                        scene_matches = re.findall(scene_pattern, scene_section)
-
-                        for idx, (scene_num, scene_title, scene_desc) in enumerate(
-                            scene_matches[:5], 1
-                        ):  # 最多5个场景
-                            scene_id = f"scene_{project_id}_{ep_num}_{idx}"
-                            scenes.append(
-                                {
-                                    "sceneId": scene_id,
-                                    "sceneNumber": idx,
-                                    "title": scene_title.strip(),
-                                    "content": scene_desc.strip(),
-                                    "shots": [],  # 镜头数据暂不解析
-                                }
-                            )
-
-                    # 如果没有解析到场景，创建一个默认场景
-                    if not scenes:
-                        scenes.append(
-                            {
-                                "sceneId": f"scene_{project_id}_{ep_num}_1",
-                                "sceneNumber": 1,
-                                "title": "主要场景",
-                                "content": chapter_summary or f"第{chapter_num}章主要场景",
-                                "shots": [],
-                            }
-                        )
-
-                    episode = {
-                        "episodeId": episode_id,
-                        "episodeNumber": ep_num,
-                        "title": chapter_title,
-                        "summary": chapter_summary,
-                        "scenes": scenes,
-                        "reviewStatus": "pending",
-                        "isPaidWall": is_paid_wall,
-                    }
-                    episodes.append(episode)
-
-            # 按剧集编号排序
-            episodes.sort(key=lambda x: x["episodeNumber"])
+            episodes = build_outline_episodes(
+                skeleton_content, project_id, chapter_map, paywall_info
+            )
             outline_data["episodes"] = episodes
             outline_data["totalEpisodes"] = len(episodes)
 
@@ -543,6 +570,23 @@ async def get_outline(project_id: str):
         raise HTTPException(status_code=500, detail=f"获取大纲失败: {str(e)}")
 
 
+@router.get("/{project_id}/delta", response_model=Dict[str, Any])
+async def get_outline_delta(project_id: str, since_version: int = 0):
+    """
+    获取大纲增量
+
+    分批生成期间，前端携带已知版本号轮询，只返回 since_version 之后写入的剧集和骨架文本片段；
+    since_version=0 或大纲不是增量存储时返回完整大纲（full=true）。
+    """
+    try:
+        db = get_db_service()
+        return await db.get_outline_delta(project_id, since_version=since_version)
+
+    except Exception as e:
+        logger.error("Failed to get outline delta", error=str(e))
+        raise HTTPException(status_code=500, detail=f"获取大纲增量失败: {str(e)}")
+
+
 @router.patch("/{project_id}/nodes/{node_id}")
 async def update_node(project_id: str, node_id: str, request: UpdateNodeRequest):
     """
@@ -743,8 +787,20 @@ async def trigger_global_review(
     触发全局审阅
 
     审阅整个大纲，返回包含 chapterReviews 的完整报告。
-    实现真正的逐章审阅：先全局审阅，再逐章审阅每个剧集。
+    全局审阅与逐章审阅并发执行，同一 LLM 服务商的并发数受 ReviewScheduler 限制；
+    每完成 review_checkpoint_every 章保存一次进度（status=pending），
+    部分章节或全局审阅失败时已完成的章节不会丢失，重新触发时跳过内容未变的已审章节。
+    内容和审阅配置未变的章节（以及全局大纲）直接复用审阅缓存，不占用并发额度、不调用 Editor。
     """
+    from backend.config import settings
+    from backend.services.review_cache import (
+        get_review_cache,
+        resolve_editor_model,
+        review_cache_key,
+        review_fingerprint,
+    )
+    from backend.services.review_scheduler import get_review_scheduler
+
     db = get_db_service()
     user_config = await db.get_user_config(project_id)
     user_id = user_config.get("user_id", "default")
@@ -752,35 +808,78 @@ async def trigger_global_review(
     if outline_text is None:
         outline_text = format_outline_for_review(outline_data)
 
-    # 第一步：全局审阅（获取整体评分和分类评分）
-    logger.info("Starting global review", project_id=project_id)
+    scheduler = get_review_scheduler()
+    provider = await scheduler.resolve_provider(db, user_id, "editor", project_id)
+
+    episodes = outline_data.get("episodes", [])
+    chapter_texts = {
+        episode.get("episodeId"): format_chapter_for_review(episode) for episode in episodes
+    }
+
+    # 上一次未完成的审阅：复用内容未变化且审阅成功的章节
+    chapter_reviews: Dict[str, Dict[str, Any]] = {}
+    review_state: Dict[str, Any] = {}
+    previous = await db.get_outline_review(project_id)
+    if previous and previous.get("status") == "pending":
+        review_state["reviewId"] = previous.get("reviewId")
+        for ep_id, review in (previous.get("chapterReviews") or {}).items():
+            if (
+                ep_id in chapter_texts
+                and not review.get("failed")
+                and review.get("contentHash") == _content_hash(chapter_texts[ep_id])
+            ):
+                chapter_reviews[ep_id] = review
+
+    pending_episodes = [ep for ep in episodes if ep.get("episodeId") not in chapter_reviews]
+
+    # 一次请求载入全局大纲和所有待审章节的审阅缓存
+    review_cache = get_review_cache()
+    editor_model = await resolve_editor_model(user_id, project_id)
+    chapter_fingerprint = review_fingerprint(
+        "chapter_review", "outline", user_config, editor_model
+    )
+    chapter_keys = {
+        ep_id: review_cache_key(chapter_texts[ep_id], chapter_fingerprint)
+        for ep_id in (ep.get("episodeId") for ep in pending_episodes)
+    }
+    global_key = review_cache_key(
+        outline_text, review_fingerprint("global_review", "outline", user_config, editor_model)
+    )
+    await review_cache.prefetch(db, project_id, [global_key, *chapter_keys.values()])
 
-    global_result = await run_quality_review(
-        user_id=user_id,
+    logger.info(
+        "Starting global and chapter reviews",
         project_id=project_id,
-        content=outline_text,
-        content_type="outline",
+        provider=provider[0],
+        concurrency=scheduler.limit_for(*provider),
+        chapters_total=len(episodes),
+        chapters_resumed=len(chapter_reviews),
+        chapters_cached=sum(
+            1 for key in chapter_keys.values() if review_cache.contains(project_id, key)
+        ),
     )
 
-    global_review_report = global_result.get("review_report")
-    if not global_review_report:
-        raise Exception("全局审阅报告生成失败")
+    # 第一步：全局审阅（获取整体评分和分类评分），占用同一服务商的并发额度
+    async def review_global() -> Dict[str, Any]:
+        # 命中缓存时不调用 Editor，无需等待并发额度
+        cached = review_cache.contains(project_id, global_key)
+        async with nullcontext() if cached else scheduler.slot(*provider):
+            return await run_quality_review(
+                user_id=user_id,
+                project_id=project_id,
+                content=outline_text,
+                content_type="outline",
+                user_config=user_config,
+            )
 
     # 第二步：逐章审阅（真正调用 Editor 审阅每个章节）
-    logger.info("Starting chapter-by-chapter review", project_id=project_id)
-
-    chapter_reviews = {}
-    episodes = outline_data.get("episodes", [])
-
-    for episode in episodes:
+    async def review_chapter(episode: Dict[str, Any]) -> Dict[str, Any]:
         ep_id = episode.get("episodeId")
         ep_number = episode.get("episodeNumber", 0)
+        chapter_text = chapter_texts[ep_id]
 
         logger.info(f"Reviewing chapter {ep_number}", episode_id=ep_id)
 
-        # 格式化单章内容
-        chapter_text = format_chapter_for_review(episode)
-
         try:
             # 调用 Editor 审阅单章
             chapter_result = await run_chapter_review(
@@ -789,31 +888,125 @@ async def trigger_global_review(
                 chapter_id=ep_id,
                 content=chapter_text,
                 content_type="outline",
+                user_config=user_config,
             )
 
-            chapter_report = chapter_result.get("review_report", {})
+            chapter_report = chapter_result.get("review_report") or {}
 
             # 构建单章审阅结果
-            chapter_reviews[ep_id] = {
+            return {
                 "score": chapter_report.get("overall_score", 80),
                 "status": "passed" if chapter_report.get("overall_score", 80) >= 80 else "warning",
                 "issues": chapter_report.get("issues", []),
                 "comment": chapter_report.get("verdict", "审阅完成"),
                 "episodeNumber": ep_number,
+                "contentHash": _content_hash(chapter_text),
             }
 
         except Exception as e:
             logger.error(f"Failed to review chapter {ep_number}", episode_id=ep_id, error=str(e))
-            # 审阅失败时，使用全局评分作为后备
-            chapter_reviews[ep_id] = {
-                "score": global_review_report.get("overall_score", 80),
+            # 审阅失败时，汇总阶段使用全局评分作为后备
+            return {
+                "score": None,
                 "status": "warning",
                 "issues": [{"description": f"审阅失败: {str(e)}"}],
                 "comment": "审阅过程出错",
                 "episodeNumber": ep_number,
+                "failed": True,
             }
 
+    save_lock = asyncio.Lock()
+    completed = 0
+
+    async def save_progress() -> None:
+        # 上一次进度保存尚未完成时跳过，下一个检查点会包含本次结果
+        if save_lock.locked():
+            return
+        async with save_lock:
+            snapshot = build_global_review(
+                project_id, outline_data, user_config, {}, dict(chapter_reviews)
+            )
+            snapshot["status"] = "pending"
+            snapshot["summary"] = f"审阅进行中（{len(chapter_reviews)}/{len(episodes)} 章）"
+            snapshot.update(review_state)
+            await db.save_outline_review(project_id, snapshot)
+            review_state["reviewId"] = snapshot.get("reviewId")
+
+    async def on_chapter_reviewed(episode: Dict[str, Any], review: Dict[str, Any]) -> None:
+        nonlocal completed
+        chapter_reviews[episode.get("episodeId")] = review
+        completed += 1
+        checkpoint_every = max(1, settings.review_checkpoint_every)
+        if completed % checkpoint_every == 0 and completed < len(pending_episodes):
+            await save_progress()
+
+    global_task = asyncio.create_task(review_global())
+    try:
+        # 命中缓存的章节直接取缓存结果，不进入调度器
+        cached_episodes = [
+            ep
+            for ep in pending_episodes
+            if review_cache.contains(project_id, chapter_keys[ep.get("episodeId")])
+        ]
+        if cached_episodes:
+            cached_reviews = await asyncio.gather(*(review_chapter(ep) for ep in cached_episodes))
+            for episode, review in zip(cached_episodes, cached_reviews):
+                chapter_reviews[episode.get("episodeId")] = review
+            pending_episodes = [
+                ep for ep in pending_episodes if ep.get("episodeId") not in chapter_reviews
+            ]
+
+        await scheduler.map(
+            pending_episodes, review_chapter, provider=provider, on_result=on_chapter_reviewed
+        )
+        global_result = await global_task
+    except Exception:
+        if not global_task.done():
+            global_task.cancel()
+        # 保留已完成的章节，重新触发时继续
+        await save_progress()
+        raise
+
+    global_review_report = global_result.get("review_report")
+    if not global_review_report:
+        await save_progress()
+        raise Exception("全局审阅报告生成失败")
+
     # 第三步：构建完整的全局审阅报告
+    for review in chapter_reviews.values():
+        if review.get("score") is None:
+            review["score"] = global_review_report.get("overall_score", 80)
+
+    global_review = build_global_review(
+        project_id, outline_data, user_config, global_review_report, chapter_reviews
+    )
+    global_review.update(review_state)
+
+    # 保存到数据库（更新进度记录为 completed）
+    async with save_lock:
+        await db.save_outline_review(project_id, global_review)
+
+    logger.info(
+        "Global review completed",
+        project_id=project_id,
+        overall_score=global_review["overallScore"],
+        chapters_reviewed=len(chapter_reviews),
+        chapters_failed=sum(1 for review in chapter_reviews.values() if review.get("failed")),
+        scheduler=scheduler.get_stats(),
+        review_cache=review_cache.get_stats(),
+    )
+
+    return global_review
+
+
+def build_global_review(
+    project_id: str,
+    outline_data: Dict[str, Any],
+    user_config: Dict[str, Any],
+    global_review_report: Dict[str, Any],
+    chapter_reviews: Dict[str, Dict[str, Any]],
+) -> Dict[str, Any]:
+    """组装完整的全局审阅报告（全局审阅尚未完成时 global_review_report 为空）"""
     from backend.services.tension_service import generate_tension_curve
     from backend.services.review_service import calculate_weights
 
@@ -826,8 +1019,7 @@ async def trigger_global_review(
     # 计算权重
     weights = calculate_weights(genre_combination)
 
-    # 组装完整的全局审阅报告
-    global_review = {
+    return {
         "generatedAt": datetime.now().isoformat(),
         "overallScore": global_review_report.get("overall_score", 0),
         "categories": {
@@ -848,17 +1040,9 @@ async def trigger_global_review(
         "recommendations": global_review_report.get("recommendations", []),
     }
 
-    # 保存到数据库
-    await db.save_outline_review(project_id, global_review)
-
-    logger.info(
-        "Global review completed",
-        project_id=project_id,
-        overall_score=global_review["overallScore"],
-        chapters_reviewed=len(chapter_reviews),
-    )
 
-    return global_review
+def _content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
 
 
 async def trigger_chapter_review(project_id: str, chapter_id: str) -> Dict[str, Any]:
@@ -886,6 +1070,7 @@ async def trigger_chapter_review(project_id: str, chapter_id: str) -> Dict[str,
         chapter_id=chapter_id,
         content=chapter_text,
         content_type="outline",
+        user_config=user_config,
     )
 
     review_report = result.get("review_report")
@@ -9,6 +9,8 @@ import json
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
+from backend.utils.outline_index import ChapterIndex
+
 
 class SimpleLogger:
     @staticmethod
@@ -22,6 +24,11 @@ class SimpleLogger:
 
 logger = SimpleLogger()
 
+# 场景条目：1. **场景1**: 描述（描述可跨行，直到下一个条目）
+_SCENE_ITEM_PATTERN = re.compile(
+    r"(\d+)\.\s*\*\*([^*]+)\*\*[\s:：]*(.*?)(?=\n\s*\d+\.\s*\*\*|\n\s*\*\*|$)", re.DOTALL
+)
+
 
 def parse_skeleton_to_outline(skeleton_content: str, project_id: str) -> Dict[str, Any]:
     """
@@ -301,6 +308,7 @@ def build_episodes_from_chapter_map(
     """
     episodes = []
     paywall_chapter = paywall_info.get("chapter", 0)
+    chapter_index = ChapterIndex(skeleton_content)
 
     for chapter_info in chapter_map:
         chapter_num = chapter_info.get("chapter", 0)
@@ -316,7 +324,7 @@ def build_episodes_from_chapter_map(
                 episode_nums = [int(episode_range)]
 
         # 提取章节详细信息
-        chapter_detail = extract_chapter_detail(skeleton_content, chapter_num)
+        chapter_detail = extract_chapter_detail(skeleton_content, chapter_num, chapter_index)
 
         # 为每个剧集创建 episode
         for ep_num in episode_nums:
@@ -341,7 +349,9 @@ def build_episodes_from_chapter_map(
     return episodes
 
 
-def extract_chapter_detail(content: str, chapter_num: int) -> Dict[str, Any]:
+def extract_chapter_detail(
+    content: str, chapter_num: int, chapter_index: Optional[ChapterIndex] = None
+) -> Dict[str, Any]:
     """
     提取单个章节的详细信息
 
@@ -350,63 +360,41 @@ def extract_chapter_detail(content: str, chapter_num: int) -> Dict[str, Any]:
     **摘要**: 内容
     **场景清单**:
     1. **场景1**: 描述
+
+    Args:
+        content: 完整骨架内容
+        chapter_num: 章节号
+        chapter_index: 已建立的章节索引（批量提取时复用，避免重复扫描全文）
     """
     result = {"title": f"第{chapter_num}章", "summary": "", "content": "", "scenes": []}
 
-    # 匹配 Chapter X 部分
-    pattern = rf"###\s*Chapter\s*{chapter_num}[\s:：]*(.*?)\n"
-    title_match = re.search(pattern, content, re.IGNORECASE)
-
-    if title_match:
-        result["title"] = title_match.group(1).strip() or f"第{chapter_num}章"
-
-        # 找到本章内容的起始位置
-        start_pos = title_match.end()
-
-        # 找到下一个 Chapter 或部分结束
-        next_chapter = re.search(
-            rf"###\s*Chapter\s*{chapter_num + 1}", content[start_pos:], re.IGNORECASE
-        )
-        if next_chapter:
-            chapter_content = content[start_pos : start_pos + next_chapter.start()]
-        else:
-            chapter_content = content[start_pos:]
-
-        result["content"] = chapter_content.strip()
-
-        # 提取摘要
-        summary_match = re.search(
-            r"\*\*摘要\*\*[\s:：]*(.*?)(?=\n\s*\*\*|\n\s*#{1,3}|$)",
-            chapter_content,
-            re.DOTALL | re.IGNORECASE,
-        )
-        if summary_match:
-            result["summary"] = summary_match.group(1).strip()
-
-        # 提取场景
-        scene_section = re.search(
-            r"场景清单.*?\n([\s\S]*?)(?=\n\s*#{1,3}|\n\s*\*\*|$)", chapter_content, re.IGNORECASE
+    if chapter_index is None:
+        chapter_index = ChapterIndex(content)
+
+    chapter = chapter_index.get(chapter_num)
+    if chapter is None:
+        return result
+
+    result["title"] = chapter.title or f"第{chapter_num}章"
+    result["content"] = chapter_index.body(chapter_num).strip()
+    result["summary"] = chapter.summary
+
+    # 解析场景列表
+    scene_text = chapter_index.scene_text(chapter_num)
+    for match in _SCENE_ITEM_PATTERN.finditer(scene_text):
+        scene_num = match.group(1)
+        scene_title = match.group(2).strip()
+        scene_desc = match.group(3).strip()
+
+        result["scenes"].append(
+            {
+                "sceneId": f"scene_ch{chapter_num}_{scene_num}",
+                "sceneNumber": int(scene_num),
+                "title": scene_title,
+                "content": scene_desc,
+                "shots": [],
+            }
         )
-        if scene_section:
-            scene_text = scene_section.group(1)
-            # 解析场景列表
-            scene_pattern = (
-                r"(\d+)\.\s*\*\*([^*]+)\*\*[\s:：]*(.*?)(?=\n\s*\d+\.\s*\*\*|\n\s*\*\*|$)"
-            )
-            for match in re.finditer(scene_pattern, scene_text, re.DOTALL):
-                scene_num = match.group(1)
-                scene_title = match.group(2).strip()
-                scene_desc = match.group(3).strip()
-
-                result["scenes"].append(
-                    {
-                        "sceneId": f"scene_ch{chapter_num}_{scene_num}",
-                        "sceneNumber": int(scene_num),
-                        "title": scene_title,
-                        "content": scene_desc,
-                        "shots": [],
-                    }
-                )
 
     return result
 
@@ -10,7 +10,12 @@ import structlog
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from backend.schemas.common import SuccessResponse, PaginatedResponse
-from backend.services import get_db_service, DatabaseService
+from backend.services.theme_snapshot import (
+    ThemeLibrarySnapshot,
+    get_theme_snapshot,
+    get_theme_snapshot_store,
+    paginate,
+)
 from backend.api.deps import get_current_user_id
 
 router = APIRouter(prefix="/themes", tags=["Theme Library"])
@@ -25,7 +30,7 @@ logger = structlog.get_logger(__name__)
 @router.get("", response_model=SuccessResponse[list])
 async def list_themes(
     category: Optional[str] = Query(None, description="按分类筛选: drama, romance, suspense, etc."),
-    db: DatabaseService = Depends(get_db_service),
+    snapshot: ThemeLibrarySnapshot = Depends(get_theme_snapshot),
 ):
     """获取所有主题/题材列表
 
@@ -33,17 +38,8 @@ async def list_themes(
     可按分类筛选。
     """
     try:
-        # 构建查询参数
-        params = {"select": "*", "order": "name.asc"}
-        if category:
-            params["category"] = f"eq.{category}"
-
-        # 查询 themes 表
-        import httpx
-
-        response = await db._client.get(f"{db._rest_url}/themes", params=params)
-        response.raise_for_status()
-        themes = response.json() or []
+        # 快照中的主题已按名称排序
+        themes = [t for t in snapshot.themes if not category or t.get("category") == category]
 
         logger.info("Themes listed", count=len(themes), category=category)
         return SuccessResponse.of(themes)
@@ -62,7 +58,7 @@ async def list_hook_templates(
     min_effectiveness: Optional[int] = Query(None, ge=0, le=100, description="最低有效性评分"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
-    db: DatabaseService = Depends(get_db_service),
+    snapshot: ThemeLibrarySnapshot = Depends(get_theme_snapshot),
 ):
     """获取所有钩子模板
 
@@ -70,35 +66,14 @@ async def list_hook_templates(
     支持按类型和有效性评分筛选。
     """
     try:
-        # 构建查询
-        params = {
-            "select": "*",
-            "order": "effectiveness_score.desc",
-            "limit": page_size,
-            "offset": (page - 1) * page_size,
-        }
-
-        if hook_type:
-            params["hook_type"] = f"eq.{hook_type}"
-        if min_effectiveness is not None:
-            params["effectiveness_score"] = f"gte.{min_effectiveness}"
-
-        # 查询钩子模板
-        response = await db._client.get(f"{db._rest_url}/hook_templates", params=params)
-        response.raise_for_status()
-        hooks = response.json() or []
-
-        # 获取总数
-        count_response = await db._client.get(
-            f"{db._rest_url}/hook_templates",
-            params={k: v for k, v in params.items() if k not in ["limit", "offset"]},
-            headers={**db._headers, "Prefer": "count=exact"},
+        # 快照中的钩子模板已按有效性评分降序排列，分页和总数在内存中计算
+        matched = tuple(
+            h
+            for h in snapshot.hooks
+            if (not hook_type or h.get("hook_type") == hook_type)
+            and (min_effectiveness is None or (h.get("effectiveness_score") or 0) >= min_effectiveness)
         )
-        count_header = count_response.headers.get("content-range", "0-0/0")
-        try:
-            total = int(count_header.split("/")[1])
-        except (ValueError, IndexError):
-            total = len(hooks)
+        hooks, total = paginate(matched, page, page_size)
 
         logger.info("Hook templates listed", count=len(hooks), total=total)
 
@@ -117,36 +92,31 @@ async def search_elements(
     query: str = Query(..., min_length=1, description="搜索关键词"),
     theme_slug: Optional[str] = Query(None, description="限定主题"),
     limit: int = Query(10, ge=1, le=50, description="返回数量"),
-    db: DatabaseService = Depends(get_db_service),
+    snapshot: ThemeLibrarySnapshot = Depends(get_theme_snapshot),
 ):
     """搜索爆款元素
 
-    在元素名称和描述中搜索关键词，返回最相关的元素。
+    在元素名称、描述、情绪效果和使用指导中搜索关键词（多个关键词用空格分隔），
+    按命中字段和有效性评分排序，返回最相关的元素。
     可用于快速查找特定类型的元素。
     """
     try:
-        # 构建基础查询
-        params = {"select": "*,themes(name,slug)", "limit": limit}
-
-        # 使用 ilike 进行模糊搜索
-        if query:
-            # 搜索名称或描述
-            params["or"] = f"(name.ilike.*{query}*,description.ilike.*{query}*)"
-
-        # 如果指定了主题，先获取主题ID
-        if theme_slug:
-            theme_response = await db._client.get(
-                f"{db._rest_url}/themes", params={"slug": f"eq.{theme_slug}", "select": "id"}
-            )
-            theme_response.raise_for_status()
-            themes = theme_response.json()
-            if themes:
-                params["theme_id"] = f"eq.{themes[0]['id']}"
+        # 指定了存在的主题时只在该主题的元素中搜索
+        theme = snapshot.theme(theme_slug) if theme_slug else None
+        hits = snapshot.element_index.search(
+            query.split(), theme_id=theme["id"] if theme else None, limit=limit
+        )
 
-        # 执行搜索
-        response = await db._client.get(f"{db._rest_url}/theme_elements", params=params)
-        response.raise_for_status()
-        elements = response.json() or []
+        elements = []
+        for hit in hits:
+            owner = snapshot.themes_by_id.get(str(hit.element.get("theme_id"))) or {}
+            elements.append(
+                {
+                    **hit.element,
+                    "themes": {"name": owner.get("name"), "slug": owner.get("slug")},
+                    "relevance": hit.score,
+                }
+            )
 
         logger.info("Elements searched", query=query, theme_slug=theme_slug, results=len(elements))
 
@@ -159,6 +129,32 @@ async def search_elements(
         )
 
 
+@router.get("/cache/stats", response_model=SuccessResponse[dict])
+async def get_theme_cache_stats(
+    user_id: str = Depends(get_current_user_id),
+):
+    """获取题材库缓存统计（内存快照的版本和加载次数）"""
+    return SuccessResponse.of({"snapshot": get_theme_snapshot_store().get_stats()})
+
+
+@router.post("/cache/invalidate", response_model=SuccessResponse[dict])
+async def invalidate_theme_cache(
+    genre: Optional[str] = Query(None, description="题材 slug，不传则清除全部题材库缓存"),
+    user_id: str = Depends(get_current_user_id),
+):
+    """使题材库缓存失效
+
+    题材、元素、钩子模板或案例数据写入（导入脚本、后台编辑）后调用，
+    使技能和 API 立即读到新数据。当前进程的题材库快照立即重新加载；其他进程的快照
+    在 theme_snapshot_refresh_interval 秒内检查到版本号变化后重新加载。
+    快照整体替换，genre 只用于记录日志。
+    """
+    await get_theme_snapshot_store().refresh(force=True)
+
+    logger.info("Theme cache invalidated", genre=genre, user_id=user_id)
+    return SuccessResponse.of({"invalidated": genre or "all"})
+
+
 # ============================================================================
 # Parameterized routes (must be defined AFTER static routes)
 # ============================================================================
@@ -170,7 +166,7 @@ async def get_theme(
     include_elements: bool = Query(True, description="是否包含爆款元素"),
     include_hooks: bool = Query(True, description="是否包含钩子模板"),
     include_examples: bool = Query(True, description="是否包含标杆案例"),
-    db: DatabaseService = Depends(get_db_service),
+    snapshot: ThemeLibrarySnapshot = Depends(get_theme_snapshot),
 ):
     """获取指定主题的详细信息
 
@@ -182,49 +178,26 @@ async def get_theme(
     """
     try:
         # 1. 获取主题基本信息
-        response = await db._client.get(
-            f"{db._rest_url}/themes", params={"slug": f"eq.{theme_slug}", "select": "*"}
-        )
-        response.raise_for_status()
-        themes = response.json()
-
-        if not themes:
+        found = snapshot.theme(theme_slug)
+        if not found:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail=f"Theme '{theme_slug}' not found"
             )
 
-        theme = themes[0]
+        # 快照中的行是共享对象，复制后再附加关联数据
+        theme = dict(found)
         theme_id = theme["id"]
 
         # 2. 获取关联数据
         if include_elements:
-            elements_response = await db._client.get(
-                f"{db._rest_url}/theme_elements",
-                params={
-                    "theme_id": f"eq.{theme_id}",
-                    "select": "*",
-                    "order": "effectiveness_score.desc",
-                },
-            )
-            elements_response.raise_for_status()
-            theme["elements"] = elements_response.json() or []
+            theme["elements"] = list(snapshot.theme_elements(theme_id))
 
         if include_hooks:
             # 钩子模板是全局的，不按主题筛选
-            hooks_response = await db._client.get(
-                f"{db._rest_url}/hook_templates",
-                params={"select": "*", "order": "effectiveness_score.desc"},
-            )
-            hooks_response.raise_for_status()
-            theme["hooks"] = hooks_response.json() or []
+            theme["hooks"] = list(snapshot.hooks)
 
         if include_examples:
-            examples_response = await db._client.get(
-                f"{db._rest_url}/theme_examples",
-                params={"theme_id": f"eq.{theme_id}", "select": "*", "order": "release_year.desc"},
-            )
-            examples_response.raise_for_status()
-            theme["examples"] = examples_response.json() or []
+            theme["examples"] = list(snapshot.theme_examples(theme_id))
 
         logger.info("Theme retrieved", theme_slug=theme_slug)
         return SuccessResponse.of(theme)
@@ -246,7 +219,7 @@ async def list_theme_elements(
     min_effectiveness: Optional[int] = Query(None, ge=0, le=100, description="最低有效性评分"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(20, ge=1, le=100, description="每页数量"),
-    db: DatabaseService = Depends(get_db_service),
+    snapshot: ThemeLibrarySnapshot = Depends(get_theme_snapshot),
 ):
     """获取指定主题的所有爆款元素
 
@@ -254,50 +227,21 @@ async def list_theme_elements(
     按有效性评分降序排列。
     """
     try:
-        # 1. 获取主题ID
-        theme_response = await db._client.get(
-            f"{db._rest_url}/themes", params={"slug": f"eq.{theme_slug}", "select": "id"}
-        )
-        theme_response.raise_for_status()
-        themes = theme_response.json()
-
-        if not themes:
+        # 1. 获取主题
+        theme = snapshot.theme(theme_slug)
+        if not theme:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail=f"Theme '{theme_slug}' not found"
             )
 
-        theme_id = themes[0]["id"]
-
-        # 2. 构建查询
-        params = {
-            "theme_id": f"eq.{theme_id}",
-            "select": "*",
-            "order": "effectiveness_score.desc",
-            "limit": page_size,
-            "offset": (page - 1) * page_size,
-        }
-
-        if element_type:
-            params["element_type"] = f"eq.{element_type}"
-        if min_effectiveness is not None:
-            params["effectiveness_score"] = f"gte.{min_effectiveness}"
-
-        # 3. 查询元素
-        response = await db._client.get(f"{db._rest_url}/theme_elements", params=params)
-        response.raise_for_status()
-        elements = response.json() or []
-
-        # 4. 获取总数
-        count_response = await db._client.get(
-            f"{db._rest_url}/theme_elements",
-            params={k: v for k, v in params.items() if k not in ["limit", "offset"]},
-            headers={**db._headers, "Prefer": "count=exact"},
+        # 2. 筛选元素（已按有效性评分降序），分页和总数在内存中计算
+        matched = tuple(
+            e
+            for e in snapshot.theme_elements(theme["id"])
+            if (not element_type or e.get("element_type") == element_type)
+            and (min_effectiveness is None or (e.get("effectiveness_score") or 0) >= min_effectiveness)
         )
-        count_header = count_response.headers.get("content-range", "0-0/0")
-        try:
-            total = int(count_header.split("/")[1])
-        except (ValueError, IndexError):
-            total = len(elements)
+        elements, total = paginate(matched, page, page_size)
 
         logger.info(
             "Theme elements listed", theme_slug=theme_slug, count=len(elements), total=total
@@ -321,55 +265,27 @@ async def list_theme_examples(
     example_type: Optional[str] = Query(None, description="案例类型: domestic, international"),
     page: int = Query(1, ge=1, description="页码"),
     page_size: int = Query(10, ge=1, le=50, description="每页数量"),
-    db: DatabaseService = Depends(get_db_service),
+    snapshot: ThemeLibrarySnapshot = Depends(get_theme_snapshot),
 ):
     """获取指定主题的所有标杆案例
 
     包含国内外成功的短剧案例，用于学习和参考。
     """
     try:
-        # 1. 获取主题ID
-        theme_response = await db._client.get(
-            f"{db._rest_url}/themes", params={"slug": f"eq.{theme_slug}", "select": "id"}
-        )
-        theme_response.raise_for_status()
-        themes = theme_response.json()
-
-        if not themes:
+        # 1. 获取主题
+        theme = snapshot.theme(theme_slug)
+        if not theme:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail=f"Theme '{theme_slug}' not found"
             )
 
-        theme_id = themes[0]["id"]
-
-        # 2. 构建查询
-        params = {
-            "theme_id": f"eq.{theme_id}",
-            "select": "*",
-            "order": "release_year.desc",
-            "limit": page_size,
-            "offset": (page - 1) * page_size,
-        }
-
-        if example_type:
-            params["example_type"] = f"eq.{example_type}"
-
-        # 3. 查询案例
-        response = await db._client.get(f"{db._rest_url}/theme_examples", params=params)
-        response.raise_for_status()
-        examples = response.json() or []
-
-        # 4. 获取总数
-        count_response = await db._client.get(
-            f"{db._rest_url}/theme_examples",
-            params={k: v for k, v in params.items() if k not in ["limit", "offset"]},
-            headers={**db._headers, "Prefer": "count=exact"},
+        # 2. 筛选案例（已按发布年份降序），分页和总数在内存中计算
+        matched = tuple(
+            e
+            for e in snapshot.theme_examples(theme["id"])
+            if not example_type or e.get("example_type") == example_type
         )
-        count_header = count_response.headers.get("content-range", "0-0/0")
-        try:
-            total = int(count_header.split("/")[1])
-        except (ValueError, IndexError):
-            total = len(examples)
+        examples, total = paginate(matched, page, page_size)
 
         logger.info(
             "Theme examples listed", theme_slug=theme_slug, count=len(examples), total=total
@@ -394,7 +310,7 @@ async def get_theme_recommendations(
     emotion_target: Optional[str] = Query(
         None, description="目标情绪: tension, relief, excitement"
     ),
-    db: DatabaseService = Depends(get_db_service),
+    snapshot: ThemeLibrarySnapshot = Depends(get_theme_snapshot),
 ):
     """获取针对特定场景的元素推荐
 
@@ -403,51 +319,32 @@ async def get_theme_recommendations(
     """
     try:
         # 1. 获取主题信息
-        theme_response = await db._client.get(
-            f"{db._rest_url}/themes", params={"slug": f"eq.{theme_slug}", "select": "*"}
-        )
-        theme_response.raise_for_status()
-        themes = theme_response.json()
-
-        if not themes:
+        theme = snapshot.theme(theme_slug)
+        if not theme:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail=f"Theme '{theme_slug}' not found"
             )
 
-        theme = themes[0]
-        theme_id = theme["id"]
-
-        # 2. 获取该主题的所有元素
-        elements_response = await db._client.get(
-            f"{db._rest_url}/theme_elements",
-            params={
-                "theme_id": f"eq.{theme_id}",
-                "select": "*",
-                "order": "effectiveness_score.desc",
-            },
+        # 2. 根据目标集数确定阶段关键词（匹配 usage_guidance）
+        if target_episode <= 5:
+            stage_keywords = ["开头", "铺垫"]
+        elif target_episode <= 30:
+            stage_keywords = ["发展", "升级"]
+        elif target_episode <= 70:
+            stage_keywords = ["高潮", "冲突"]
+        else:
+            stage_keywords = ["结局", "收尾"]
+
+        # 3. 用元素倒排索引筛选该主题适用的元素
+        index = snapshot.element_index
+        applicable = index.search(
+            [*stage_keywords, "全剧", "任何"],
+            fields=("usage_guidance",),
+            theme_id=theme["id"],
         )
-        elements_response.raise_for_status()
-        elements = elements_response.json() or []
-
-        # 3. 根据目标集数筛选适用的元素
-        # 解析 usage_guidance 中的适用集数范围
-        applicable_elements = []
-        for elem in elements:
-            guidance = elem.get("usage_guidance", "")
-            # 简单判断：如果 guidance 包含目标集数或在范围内
-            # 这里使用简化逻辑，实际可以更复杂
-            if target_episode <= 5 and ("开头" in guidance or "铺垫" in guidance):
-                applicable_elements.append(elem)
-            elif 6 <= target_episode <= 30 and ("发展" in guidance or "升级" in guidance):
-                applicable_elements.append(elem)
-            elif 31 <= target_episode <= 70 and ("高潮" in guidance or "冲突" in guidance):
-                applicable_elements.append(elem)
-            elif target_episode > 70 and ("结局" in guidance or "收尾" in guidance):
-                applicable_elements.append(elem)
-            elif "全剧" in guidance or "任何" in guidance:
-                applicable_elements.append(elem)
-
-        # 4. 根据情绪目标进一步筛选
+        applicable_elements = [hit.element for hit in applicable]
+
+        # 4. 根据情绪目标进一步筛选，按命中关键词数和有效性评分排序
         if emotion_target and applicable_elements:
             emotion_keywords = {
                 "tension": ["冲突", "紧张", "危机", "对峙", "压力"],
@@ -459,23 +356,22 @@ async def get_theme_recommendations(
 
             keywords = emotion_keywords.get(emotion_target, [])
             if keywords:
-                filtered = []
-                for elem in applicable_elements:
-                    desc = elem.get("description", "")
-                    emotional_impact = elem.get("emotional_impact", "")
-                    if any(kw in desc or kw in emotional_impact for kw in keywords):
-                        filtered.append(elem)
+                allowed = {id(elem) for elem in applicable_elements}
+                filtered = [
+                    hit.element
+                    for hit in index.search(
+                        keywords,
+                        fields=("description", "emotional_impact"),
+                        theme_id=theme["id"],
+                    )
+                    if id(hit.element) in allowed
+                ]
 
                 if filtered:
                     applicable_elements = filtered
 
         # 5. 获取推荐的钩子模板
-        hooks_response = await db._client.get(
-            f"{db._rest_url}/hook_templates",
-            params={"select": "*", "order": "effectiveness_score.desc", "limit": 3},
-        )
-        hooks_response.raise_for_status()
-        recommended_hooks = hooks_response.json() or []
+        recommended_hooks = list(snapshot.hooks[:3])
 
         # 6. 组装推荐结果
         recommendations = {
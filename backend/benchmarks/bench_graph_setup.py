@@ -0,0 +1,93 @@
+"""
+Benchmark: 主图请求准备耗时（编译缓存前后对比）
+
+对比两种请求准备方式的 p50/p99 耗时：
+- before: 每个请求调用 create_main_graph() 重新编译（旧行为）
+- after:  get_graph_for_request() 命中进程级编译图缓存
+
+使用 MemorySaver 作为 checkpointer，不需要数据库连接。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video
+    python -m backend.benchmarks.bench_graph_setup --requests 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from backend.graph.main_graph import (
+    clear_graph_cache,
+    create_main_graph,
+    get_graph_cache_stats,
+    get_graph_for_request,
+)
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    """计算百分位数（最近秩法）"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _report(label: str, samples: list[float]) -> None:
+    print(
+        f"{label:<8} n={len(samples):<5} "
+        f"p50={_percentile(samples, 50):8.3f}ms  "
+        f"p99={_percentile(samples, 99):8.3f}ms  "
+        f"mean={statistics.mean(samples):8.3f}ms"
+    )
+
+
+async def bench_before(checkpointer: MemorySaver, requests: int) -> list[float]:
+    """旧行为：每个请求重新编译主图"""
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        create_main_graph(checkpointer)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def bench_after(checkpointer: MemorySaver, requests: int) -> list[float]:
+    """新行为：命中进程级编译图缓存"""
+    clear_graph_cache()
+    samples = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await get_graph_for_request(checkpointer)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+async def main(requests: int) -> None:
+    checkpointer = MemorySaver()
+
+    print("=" * 60)
+    print(f"Graph request setup benchmark ({requests} requests)")
+    print("=" * 60)
+
+    before = await bench_before(checkpointer, requests)
+    after = await bench_after(checkpointer, requests)
+
+    _report("before", before)
+    _report("after", after)
+    print(f"cache: {get_graph_cache_stats()}")
+
+    speedup = _percentile(before, 50) / max(_percentile(after, 50), 1e-6)
+    print(f"p50 speedup: {speedup:.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200, help="模拟请求数")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
@@ -0,0 +1,120 @@
+"""
+Benchmark: 规则预筛耗时与判定
+
+在合成的 Skeleton Builder 格式大纲（每章含核心要素、峰值张力、场景清单）上测量
+prescreen_content 的耗时，并打印几种典型大纲的预筛判定：
+- complete:  结构完整，峰值张力贴合标准曲线        → pass（跳过 Editor）
+- flat:      结构完整，张力曲线平淡                  → review（交给 Editor）
+- truncated: 只生成了一半章节、缺少关键部分和章节要素 → fail（直接重新生成）
+
+与 Editor 评分的一致率只能在线统计，见 /api/graph/health 中的 prescreen。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video
+    python -m backend.benchmarks.bench_prescreen --chapters 60 80 120
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.prescreen_service import prescreen_content
+from backend.services.tension_service import generate_standard_curve
+
+
+def build_outline(chapters: int, tension: list[float], elements: bool = True) -> str:
+    """生成与骨架构建器输出格式一致的合成大纲"""
+    parts = [
+        "# 《合成测试》小说大纲\n\n## 一、元数据（Metadata）\n- **付费卡点**: 第12集\n\n",
+        "## 二、核心设定（Core Setting）\n世界观架构\n\n",
+        "## 三、人物体系（Character System）\n主要人物\n\n",
+        "## 四、情节架构（Plot Architecture）\n核心梗概\n\n",
+        "## 五、章节大纲（Chapter Outlines）\n\n",
+    ]
+    for n in range(1, chapters + 1):
+        parts.append(
+            f"### Chapter {n}: 第{n}章标题\n"
+            "**元数据**:\n"
+            f"- **章节序号**: {n}/{chapters}\n"
+            "- **故事阶段**: 发展\n\n"
+            "**核心要素**:\n"
+            + (
+                "- **核心任务**: 主角在这一章遭遇新的冲突并做出选择\n"
+                "- **核心冲突**: 身份暴露的危机逐步升级\n"
+                if elements
+                else ""
+            )
+            + "\n**节奏设计**:\n"
+            "- **钩子类型**: 情境钩子\n\n"
+            "**情绪曲线**:\n"
+            f"- **起始张力**: {max(tension[n - 1] - 15, 0):.0f}\n"
+            f"- **峰值张力**: {tension[n - 1]:.0f}\n\n"
+            "**场景清单**:\n"
+            "1. **宴会厅**: 众人齐聚，暗流涌动\n"
+            "2. **后花园**: 主角与盟友密谈\n\n"
+            "---\n\n"
+        )
+    return "".join(parts)
+
+
+def variants(chapters: int) -> dict[str, tuple[str, int]]:
+    """(大纲, 期望章节数)"""
+    curve = generate_standard_curve(chapters)
+    truncated = build_outline(chapters // 2, curve, elements=False)
+    return {
+        "complete": (build_outline(chapters, curve), chapters),
+        "flat": (build_outline(chapters, [65.0] * chapters), chapters),
+        "truncated": (truncated.replace("人物体系", "").replace("情节架构", ""), chapters),
+    }
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    """计算百分位数（最近秩法）"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _report(label: str, samples: list[float]) -> None:
+    print(
+        f"{label:<10} n={len(samples):<5} "
+        f"p50={_percentile(samples, 50):8.3f}ms  "
+        f"p99={_percentile(samples, 99):8.3f}ms  "
+        f"mean={statistics.mean(samples):8.3f}ms"
+    )
+
+
+def bench(chapters: int, rounds: int) -> None:
+    print(f"\n{chapters} chapters")
+    for label, (content, expected) in variants(chapters).items():
+        samples = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            result = prescreen_content(content, expected_chapters=expected)
+            samples.append((time.perf_counter() - started) * 1000)
+        _report(label, samples)
+        print(
+            f"{'':<10} {len(content):,} chars  verdict={result['verdict']} "
+            f"overall={result['overall_score']} structure={result['structure_score']} "
+            f"pacing={result['pacing_score']}"
+        )
+
+
+def main(chapters: list[int], rounds: int) -> None:
+    print("=" * 72)
+    print(f"Prescreen benchmark ({rounds} rounds)")
+    print("=" * 72)
+    for count in chapters:
+        bench(count, rounds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chapters", type=int, nargs="+", default=[60, 80, 120], help="大纲章节数")
+    parser.add_argument("--rounds", type=int, default=200, help="每种大纲的预筛次数")
+    args = parser.parse_args()
+    main(args.chapters, args.rounds)
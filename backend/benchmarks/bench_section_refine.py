@@ -0,0 +1,242 @@
+"""
+Benchmark: 整篇修复循环 vs 按章节定向修复
+
+在合成的多章节大纲上对比一次质量控制循环的 LLM 调用次数、送入 LLM 的字数和耗时：
+- full:    full_cycle 模式，每轮把整篇大纲送给 Refiner 并输出整篇，再整篇重新审阅
+- section: run_section_quality_cycle，一次全局审阅找出不达标章节，每轮一次 Refiner 调用
+           只读写这些章节，合并后整篇审阅一次
+- cached:  同上，但审阅缓存中已有上一次质检的审阅结果（例如修改大纲后重新质检），
+           未修改的内容不再调用 LLM，调用次数和字数只随不达标章节数增长
+
+送入 LLM 的字数包含每次调用都要携带的系统提示词（Editor / Refiner 的 Prompt 模板，
+默认取 prompts/ 下模板的实际长度）：调用次数越多，这部分开销越大，
+只统计正文字数会低估多次调用的成本。out 为 Refiner 输出的字数；
+vs_full 为送入和输出字数之和相对 full 模式的比例。
+
+LLM 用模拟图代替：每次调用按送入的字数（含系统提示词）等待 --ms-per-kchar 毫秒
+（并发调用互不阻塞，章节审阅受 ReviewScheduler 并发上限约束）。
+--defects 指定不达标的章节数，修复一次即达标；full 模式的整篇审阅在
+仍有不达标章节时给出低于目标的总分，全局审阅的 chapter_reviews 给出每章评分。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video
+    python -m backend.benchmarks.bench_section_refine --chapters 80 --defects 1 2 5 10
+"""
+
+import argparse
+import asyncio
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.graph.workflows import quality_control_graph
+from backend.services import database, review_cache
+from backend.services.review_cache import ReviewCache
+
+FIXED = "【已修复】"
+
+PROMPTS_DIR = Path(__file__).parent.parent.parent / "prompts"
+
+
+def _prompt_chars(name: str) -> int:
+    path = PROMPTS_DIR / name
+    return len(path.read_text(encoding="utf-8")) if path.exists() else 0
+
+
+def build_outline(chapters: int) -> str:
+    """生成与骨架构建器输出格式一致的合成大纲"""
+    parts = ["# 《合成测试》小说大纲\n", "## 五、章节大纲（Chapter Outlines）\n"]
+    for n in range(1, chapters + 1):
+        parts.append(
+            f"### Chapter {n}: 第{n}章标题\n"
+            f"**摘要**：第{n}章的剧情摘要，主角在这一章遭遇新的冲突并做出选择。\n\n"
+            "**核心要素**：\n"
+            "- 冲突：身份暴露的危机逐步升级\n"
+            "- 爽点：反派当众受挫\n\n"
+            "**场景清单**：\n"
+            "1. **宴会厅**：众人齐聚，暗流涌动\n"
+            "2. **后花园**：主角与盟友密谈\n\n"
+        )
+    parts.append("## 六、改编映射（Adaptation Mapping）\n\n**整体比例**：1章 ≈ 1.5集\n")
+    return "".join(parts)
+
+
+class SimulatedGraph:
+    """按送入字数（含系统提示词）计时的模拟 Editor / Refiner"""
+
+    def __init__(
+        self, defective: set[int], ms_per_kchar: float, stats: dict, prompt_chars: dict[str, int]
+    ):
+        self.defective = defective
+        self.ms_per_kchar = ms_per_kchar
+        self.stats = stats
+        self.prompt_chars = prompt_chars
+
+    async def _call(self, text: str, role: str) -> None:
+        chars = len(text) + self.prompt_chars[role]
+        self.stats["calls"] += 1
+        self.stats["chars"] += chars
+        self.stats["prompt_chars"] += self.prompt_chars[role]
+        await asyncio.sleep(chars / 1000 * self.ms_per_kchar / 1000)
+
+    def _is_open(self, text: str, n: int) -> bool:
+        return (
+            n in self.defective
+            and f"### Chapter {n}:" in text
+            and FIXED not in text.split(f"### Chapter {n}:", 1)[1].split("### Chapter", 1)[0]
+        )
+
+    async def ainvoke(self, state: dict) -> dict:
+        mode = state["mode"]
+        text = state.get("refined_content") or state["input_content"]
+
+        if mode in ("refine_only", "refine"):
+            await self._call(text, "refiner")
+            # 修复所有不达标章节
+            refined = text
+            for n in self.defective:
+                marker = f"第{n}章的剧情摘要"
+                refined = refined.replace(marker, marker + FIXED, 1)
+            self.stats["output_chars"] += len(refined)
+            return {"refined_content": refined}
+
+        await self._call(text, "editor")
+        chapters = [int(n) for n in re.findall(r"### Chapter (\d+):", text)]
+        chapter_reviews = {
+            f"chapter_{n:03d}": {"score": 60 if self._is_open(text, n) else 90, "status": "passed"}
+            for n in chapters
+        }
+        score = 60 if any(self._is_open(text, n) for n in chapters) else 90
+        report = {"overall_score": score, "categories": {}, "chapter_reviews": chapter_reviews}
+        return {"review_report": report, "final_score": score}
+
+
+async def run_full_cycle(graph: SimulatedGraph, outline: str, max_iterations: int) -> dict:
+    """full_cycle 模式的审阅 → 整篇修复 → 整篇重审循环（与 route_after_editor 相同的终止条件）"""
+    state = {"mode": "full_cycle", "input_content": outline, "refined_content": None}
+    iterations = 0
+    while True:
+        report = (await graph.ainvoke(state))["review_report"]
+        if report["overall_score"] >= 80 or iterations >= max_iterations:
+            return {"final_score": report["overall_score"], "iterations": iterations}
+        state["refined_content"] = (await graph.ainvoke({**state, "mode": "refine"}))[
+            "refined_content"
+        ]
+        iterations += 1
+
+
+async def bench(
+    chapters: int,
+    defects: int,
+    ms_per_kchar: float,
+    max_iterations: int,
+    prompt_chars: dict[str, int],
+) -> None:
+    outline = build_outline(chapters)
+    step = max(1, chapters // max(defects, 1))
+    defective = set(range(1, chapters + 1, step)[:defects])
+
+    async def run_section() -> dict:
+        return await quality_control_graph.run_section_quality_cycle(
+            "bench", "bench", outline, max_iterations=max_iterations, category_threshold=70
+        )
+
+    # 模拟的审阅结果取决于不达标章节集合（不在文本中），每个场景使用独立的审阅缓存表
+    database._db_service = _MemoryDB()
+    full_chars = 0
+    for label in ("full", "section", "cached"):
+        review_cache._review_cache = ReviewCache(enabled=label == "cached")
+        if label == "cached":
+            # 上一次质检写入的审阅缓存
+            previous = SimulatedGraph(defective, 0, _empty_stats(), prompt_chars)
+            quality_control_graph.build_quality_control_graph = lambda checkpointer=None: previous
+            await run_section()
+
+        stats = _empty_stats()
+        graph = SimulatedGraph(defective, ms_per_kchar, stats, prompt_chars)
+        quality_control_graph.build_quality_control_graph = lambda checkpointer=None: graph
+
+        started = time.perf_counter()
+        if label == "full":
+            result = await run_full_cycle(graph, outline, max_iterations)
+        else:
+            result = await run_section()
+        elapsed = time.perf_counter() - started
+        total = stats["chars"] + stats["output_chars"]
+        if label == "full":
+            full_chars = total
+
+        print(
+            f"{defects:>7} {label:<8} calls={stats['calls']:<5} "
+            f"chars={stats['chars']:<10,} (prompt {stats['prompt_chars']:<10,}) "
+            f"out={stats['output_chars']:<7,} vs_full={total / full_chars:5.2f}  "
+            f"time={elapsed * 1000:9.1f}ms  "
+            f"score={result['final_score']} iterations={result['iterations']}"
+        )
+
+
+def _empty_stats() -> dict:
+    return {"calls": 0, "chars": 0, "prompt_chars": 0, "output_chars": 0}
+
+
+class _MemoryDB:
+    """没有模型映射（使用默认服务商），review_cache 表保存在内存中"""
+
+    def __init__(self):
+        self.review_cache = {}
+
+    async def get_model_mapping(self, user_id, task_type, project_id=None):
+        return None
+
+    async def get_cached_reviews(self, project_id, cache_keys):
+        return {key: self.review_cache[key] for key in cache_keys if key in self.review_cache}
+
+    async def save_cached_review(self, project_id, cache_key, review_report, *args):
+        self.review_cache[cache_key] = review_report
+
+
+async def main(
+    chapters: int,
+    defects: list[int],
+    ms_per_kchar: float,
+    max_iterations: int,
+    prompt_chars: dict[str, int],
+) -> None:
+    print("=" * 72)
+    print(
+        f"Section refinement benchmark ({chapters} chapters, "
+        f"{len(build_outline(chapters)):,} chars, {ms_per_kchar}ms/kchar, "
+        f"system prompt editor={prompt_chars['editor']:,} refiner={prompt_chars['refiner']:,} chars)"
+    )
+    print("=" * 72)
+    print("defects mode")
+    for count in defects:
+        await bench(chapters, count, ms_per_kchar, max_iterations, prompt_chars)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chapters", type=int, default=80, help="大纲章节数")
+    parser.add_argument("--defects", type=int, nargs="+", default=[1, 2, 5, 10], help="不达标章节数")
+    parser.add_argument("--ms-per-kchar", type=float, default=200.0, help="每千字的模拟 LLM 耗时")
+    parser.add_argument("--max-iterations", type=int, default=3, help="最大修复轮数")
+    parser.add_argument(
+        "--editor-prompt-chars",
+        type=int,
+        default=_prompt_chars("7_Editor_Reviewer.md"),
+        help="每次 Editor 调用携带的系统提示词字数",
+    )
+    parser.add_argument(
+        "--refiner-prompt-chars",
+        type=int,
+        default=_prompt_chars("8_Refiner.md"),
+        help="每次 Refiner 调用携带的系统提示词字数",
+    )
+    args = parser.parse_args()
+    prompt_chars = {"editor": args.editor_prompt_chars, "refiner": args.refiner_prompt_chars}
+    asyncio.run(
+        main(args.chapters, args.defects, args.ms_per_kchar, args.max_iterations, prompt_chars)
+    )
@@ -0,0 +1,161 @@
+"""
+Benchmark: 元素倒排索引 vs 逐元素子串扫描
+
+在合并去重后的完整题材库（theme_library_deduplicated.json 的 tropes_library +
+txt_tropes_unique，按导入脚本映射为 theme_elements 行）上对比两种关键词查询：
+- legacy: 推荐接口旧版的嵌套扫描，对每个元素执行
+          any(kw in desc or kw in emotional_impact for kw in keywords)
+- index:  ElementIndex.search（二元组倒排表求交 + 子串校验 + 排序）
+
+--scale 把题材库复制 N 份（名称和描述加编号后缀），模拟题材库增长后的规模。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video
+    python -m backend.benchmarks.bench_theme_index --scale 1
+    python -m backend.benchmarks.bench_theme_index --scale 100 --rounds 200
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.theme_index import ElementIndex
+
+LIBRARY_PATH = Path(__file__).parent.parent.parent / "theme_library_deduplicated.json"
+
+# 推荐接口使用的情绪关键词和阶段关键词，外加几个元素搜索的典型查询
+QUERIES = [
+    ["冲突", "紧张", "危机", "对峙", "压力"],
+    ["解决", "和解", "释怀", "放下", "团圆"],
+    ["高潮", "爆发", "反击", "胜利", "反转"],
+    ["甜宠", "暧昧", "浪漫", "心动", "宠溺"],
+    ["悬疑", "揭秘", "追查", "线索", "真相"],
+    ["开头", "铺垫", "全剧", "任何"],
+    ["身份"],
+    ["隐藏大佬"],
+    ["打脸", "逆袭"],
+]
+
+
+def load_elements(path: Path, scale: int) -> list[dict]:
+    """按 import_deduplicated_to_supabase.py 的映射生成 theme_elements 行"""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    theme_ids = [str(t["id"]) for t in data.get("themes", [])] or ["1"]
+
+    base = []
+    for category, items in data.get("tropes_library", {}).items():
+        for item in items:
+            base.append(
+                {
+                    "name": item["name"],
+                    "category": category,
+                    "description": item.get("description") or item.get("mechanism", ""),
+                    "emotional_impact": item.get("emotional_tension", ""),
+                    "usage_guidance": item.get("best_timing", ""),
+                    "effectiveness_score": item.get("effectiveness_score", 0)
+                    or item.get("success_rate", 0),
+                    "theme_id": None,
+                }
+            )
+    for item in data.get("txt_tropes_unique", []):
+        base.append(
+            {
+                "name": item["name"],
+                "category": "genre_specific",
+                "description": item.get("description", ""),
+                "emotional_impact": "",
+                "usage_guidance": item.get("usage_timing", ""),
+                "effectiveness_score": item.get("effectiveness_score", 0),
+                "theme_id": str(item["theme_id"]) if item.get("theme_id") else None,
+            }
+        )
+
+    elements = []
+    for copy in range(scale):
+        for n, row in enumerate(base):
+            suffix = f"（{copy}）" if copy else ""
+            elements.append(
+                {
+                    **row,
+                    "id": f"{copy}-{n}",
+                    "name": row["name"] + suffix,
+                    "description": row["description"] + suffix,
+                    "theme_id": row["theme_id"] or theme_ids[(copy + n) % len(theme_ids)],
+                }
+            )
+    return elements
+
+
+def legacy_search(elements: list[dict], keywords: list[str]) -> list[dict]:
+    """推荐接口旧版的嵌套扫描"""
+    results = []
+    for elem in elements:
+        desc = elem.get("description", "")
+        emotional_impact = elem.get("emotional_impact", "")
+        if any(kw in desc or kw in emotional_impact for kw in keywords):
+            results.append(elem)
+    return results
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    """计算百分位数（最近秩法）"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _report(label: str, samples: list[float]) -> None:
+    print(
+        f"{label:<8} n={len(samples):<5} "
+        f"p50={_percentile(samples, 50):8.3f}ms  "
+        f"p99={_percentile(samples, 99):8.3f}ms  "
+        f"mean={statistics.mean(samples):8.3f}ms"
+    )
+
+
+def _time_ms(fn, rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        for keywords in QUERIES:
+            started = time.perf_counter()
+            fn(keywords)
+            samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main(path: Path, scale: int, rounds: int) -> None:
+    elements = load_elements(path, scale)
+
+    started = time.perf_counter()
+    index = ElementIndex(elements)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    print("=" * 60)
+    print(f"Theme element index ({len(elements)} elements, {len(QUERIES)} queries x {rounds})")
+    print("=" * 60)
+    print(f"index build: {build_ms:.2f}ms, {index.get_stats()}")
+
+    # 相同字段上两种方式命中的元素集合一致
+    fields = ("description", "emotional_impact")
+    for keywords in QUERIES:
+        expected = {e["id"] for e in legacy_search(elements, keywords)}
+        actual = {hit.element["id"] for hit in index.search(keywords, fields=fields)}
+        assert actual == expected, keywords
+
+    _report("legacy", _time_ms(lambda kws: legacy_search(elements, kws), rounds))
+    _report("index", _time_ms(lambda kws: index.search(kws, fields=fields), rounds))
+    _report("index@5", _time_ms(lambda kws: index.search(kws, limit=5), rounds))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--library", type=Path, default=LIBRARY_PATH, help="合并去重后的题材库 JSON")
+    parser.add_argument("--scale", type=int, default=1, help="题材库复制份数")
+    parser.add_argument("--rounds", type=int, default=500, help="每个查询的重复次数")
+    args = parser.parse_args()
+    main(args.library, args.scale, args.rounds)
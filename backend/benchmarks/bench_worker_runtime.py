@@ -0,0 +1,122 @@
+"""
+Benchmark: Celery Worker 任务吞吐（每任务新建事件循环 vs 长驻事件循环）
+
+对比两种执行方式在相同并发槽位数下的 jobs/min：
+- before: 每个任务新建事件循环、重新初始化数据库服务和共享 HTTP client，
+          结束时关闭连接和循环（旧 run_async）；每个槽位串行执行
+- after:  所有槽位把任务提交到同一个 WorkerRuntime 长驻循环上并发执行
+
+模拟任务包含：
+- 获取数据库服务与共享 HTTP client（真实创建 httpx.AsyncClient）
+- --compile-ms: 每个事件循环首次执行时重建编译图 / 模型缓存的 CPU 耗时
+- --io-ms:      任务内等待 Supabase / LLM 响应的 I/O 时间
+
+不需要 Redis、Celery 或数据库连接。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video
+    python -m backend.benchmarks.bench_worker_runtime --jobs 200 --slots 8
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+import time
+import weakref
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services import database
+from backend.services.http_pool import close_http_client, get_http_client, get_pool_stats
+from backend.tasks.runtime import WorkerRuntime
+
+# 模拟按事件循环缓存的编译图（与 main_graph 的缓存键一致：每个循环编译一次）
+_warm_loops: "weakref.WeakSet[asyncio.AbstractEventLoop]" = weakref.WeakSet()
+
+
+async def fake_job(compile_ms: float, io_ms: float) -> None:
+    await database.init_db_service()
+    get_http_client()
+
+    loop = asyncio.get_running_loop()
+    if loop not in _warm_loops:
+        time.sleep(compile_ms / 1000)
+        _warm_loops.add(loop)
+
+    await asyncio.sleep(io_ms / 1000)
+
+
+def run_per_task_loop(coro) -> None:
+    """旧 run_async：每个任务一个新循环，服务随进程级全局变量重新初始化"""
+    database._db_service = None
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(coro)
+    finally:
+        loop.run_until_complete(close_http_client())
+        loop.close()
+
+
+def _run_slots(slots: int, jobs: int, execute) -> float:
+    """把 jobs 个任务分给 slots 个线程执行，返回 jobs/min"""
+    remaining = iter(range(jobs))
+    lock = threading.Lock()
+
+    def worker() -> None:
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            execute()
+
+    threads = [threading.Thread(target=worker) for _ in range(slots)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return jobs / elapsed * 60
+
+
+def bench_before(jobs: int, slots: int, compile_ms: float, io_ms: float) -> float:
+    # 旧行为下 prefork 的每个槽位是独立进程，同一时刻只执行一个任务
+    return _run_slots(slots, jobs, lambda: run_per_task_loop(fake_job(compile_ms, io_ms)))
+
+
+def bench_after(jobs: int, slots: int, compile_ms: float, io_ms: float) -> float:
+    runtime = WorkerRuntime(name="bench-runtime")
+    runtime.start()
+    try:
+        return _run_slots(slots, jobs, lambda: runtime.submit(fake_job(compile_ms, io_ms)))
+    finally:
+        print(f"runtime: {runtime.get_stats()}")
+        runtime.shutdown()
+
+
+def main(jobs: int, slots: int, compile_ms: float, io_ms: float) -> None:
+    print("=" * 60)
+    print(
+        f"Worker runtime benchmark ({jobs} jobs, {slots} slots, "
+        f"compile={compile_ms}ms, io={io_ms}ms)"
+    )
+    print("=" * 60)
+
+    before = bench_before(jobs, slots, compile_ms, io_ms)
+    print(f"{'before':<8} {before:10.1f} jobs/min")
+    after = bench_after(jobs, slots, compile_ms, io_ms)
+    print(f"{'after':<8} {after:10.1f} jobs/min")
+    print(f"http pool: {get_pool_stats()}")
+    print(f"throughput: {after / max(before, 1e-6):.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=200, help="模拟任务数")
+    parser.add_argument("--slots", type=int, default=8, help="并发槽位数 (worker_concurrency)")
+    parser.add_argument("--compile-ms", type=float, default=40.0, help="每个事件循环的预热耗时")
+    parser.add_argument("--io-ms", type=float, default=50.0, help="每个任务的 I/O 等待时间")
+    args = parser.parse_args()
+    main(args.jobs, args.slots, args.compile_ms, args.io_ms)
@@ -54,6 +54,15 @@ class Settings(BaseSettings):
         description="PostgreSQL 连接 URL (用于 LangGraph Checkpointer，直接连接 PostgreSQL 5432 端口)",
     )
 
+    # ===== HTTP Pool (Supabase REST / Storage) =====
+    http_timeout: float = Field(default=30.0, description="Supabase REST 请求超时 (秒)")
+    http2_enabled: bool = Field(default=True, description="启用 HTTP/2 (需安装 h2)")
+    http_max_connections: int = Field(default=100, description="每个事件循环的最大连接数")
+    http_max_keepalive_connections: int = Field(
+        default=20, description="每个事件循环保留的 keep-alive 空闲连接数"
+    )
+    http_keepalive_expiry: float = Field(default=30.0, description="空闲连接保留时间 (秒)")
+
     # ===== Redis =====
     redis_url: str = Field(default="redis://localhost:6379/0", description="Redis 连接 URL")
     celery_broker_url: str = Field(
@@ -62,6 +71,11 @@ class Settings(BaseSettings):
     celery_result_backend: str = Field(
         default="redis://localhost:6379/2", description="Celery Result Backend URL"
     )
+    celery_worker_pool: Literal["prefork", "threads", "solo"] = Field(
+        default="threads",
+        description="Celery 执行池；threads 池的任务共享进程内的长驻事件循环并发执行",
+    )
+    celery_worker_concurrency: int = Field(default=8, description="每个 Worker 的并发任务数")
 
     # ===== Checkpointer =====
     checkpointer_type: Literal["memory", "redis", "postgres"] = Field(
@@ -96,6 +110,24 @@ class Settings(BaseSettings):
     # 视频生成超时设置
     video_generation_timeout: int = Field(default=300, description="视频生成超时时间 (秒)")
 
+    # 视频生成流水线
+    video_concurrency: int = Field(default=4, description="每个视频提供商同时进行中的生成数上限")
+    video_provider_concurrency: dict[str, int] = Field(
+        default_factory=dict, description='按提供商覆盖并发上限，如 {"runway": 8}'
+    )
+    video_poll_initial_interval: float = Field(default=2.0, description="生成状态初始轮询间隔 (秒)")
+    video_poll_max_interval: float = Field(default=15.0, description="生成状态最大轮询间隔 (秒)")
+    video_poll_backoff: float = Field(default=1.5, description="状态未变化时轮询间隔的增长倍数")
+    video_progress_interval: float = Field(default=2.0, description="任务进度最短写入间隔 (秒)")
+
+    # ===== Job Progress =====
+    job_progress_interval: float = Field(
+        default=5.0, description="任务进度合并写入的最短间隔 (秒)"
+    )
+    job_progress_min_delta: int = Field(
+        default=10, description="进度增量达到该百分比时不等间隔立即写入"
+    )
+
     # ===== Feature Flags =====
     enable_vector_store: bool = Field(default=True, description="启用向量存储 (RAG)")
     enable_semantic_cache: bool = Field(default=True, description="启用语义缓存 (降低 API 成本)")
@@ -105,6 +137,70 @@ class Settings(BaseSettings):
     enable_circuit_breaker: bool = Field(default=True, description="启用熔断器 (防止 API 崩坏)")
     enable_watchdog: bool = Field(default=True, description="启用看门狗 (清理僵尸任务)")
 
+    # ===== Streaming (SSE) =====
+    stream_queue_size: int = Field(
+        default=256, description="每个 SSE 线程的事件队列上限 (满时生产者等待)"
+    )
+    stream_coalesce_ms: int = Field(
+        default=50, description="token 合并发送间隔 (毫秒，0 表示逐 token 发送)"
+    )
+    stream_coalesce_chars: int = Field(default=512, description="合并缓冲达到该字符数时立即发送")
+
+    # ===== Counters =====
+    counter_flush_delay: float = Field(
+        default=0.5, description="分镜计数增量的合并写入窗口 (秒)"
+    )
+
+    # ===== Model Routing =====
+    routing_cache_ttl: float = Field(
+        default=300.0, description="任务-模型路由结果的进程内缓存时间 (秒)"
+    )
+    routing_negative_ttl: float = Field(
+        default=30.0, description="未配置模型映射的路由结果缓存时间 (秒)"
+    )
+
+    # ===== Agent Pool =====
+    agent_pool_size: int = Field(
+        default=64, description="进程内复用的已编译 Agent 数量上限 (0 表示不复用)"
+    )
+
+    # ===== Theme Library Snapshot =====
+    theme_snapshot_refresh_interval: float = Field(
+        default=60.0, description="题材库内存快照检查版本号的最短间隔 (秒)"
+    )
+
+    # ===== Quality Review =====
+    review_concurrency: int = Field(default=4, description="每个 LLM 服务商的默认审阅并发上限")
+    review_provider_concurrency: dict[str, int] = Field(
+        default_factory=dict,
+        description='按服务商名称或协议覆盖审阅并发上限，如 {"deepseek": 8, "gemini": 2}',
+    )
+    review_checkpoint_every: int = Field(
+        default=5, description="逐章审阅每完成 N 章保存一次审阅进度"
+    )
+    review_cache_enabled: bool = Field(
+        default=True, description="按内容哈希复用审阅结果（文本和审阅配置未变时不再调用 Editor）"
+    )
+    review_cache_size: int = Field(default=2048, description="进程内审阅结果缓存的最大条目数")
+    qc_section_refine: bool = Field(
+        default=True, description="质量控制循环按章节定向修复（Refiner 只修复不达标的章节）"
+    )
+    qc_category_threshold: int = Field(
+        default=70, description="定向修复中任一分类评分低于该值的章节需要修复"
+    )
+    qc_prescreen_enabled: bool = Field(
+        default=True, description="调用 Editor 前先用规则预筛大纲（结构分 + 张力曲线节奏分）"
+    )
+    qc_prescreen_fail_score: int = Field(
+        default=50, description="预筛结构分低于该值视为明显不合格，不调用 Editor，直接重新生成"
+    )
+    qc_prescreen_pass_score: int = Field(
+        default=90, description="预筛结构分和节奏分都不低于该值时跳过 Editor"
+    )
+    qc_prescreen_audit_rate: float = Field(
+        default=0.1, description="预筛判定合格的大纲仍按该比例送 Editor 审阅，用于统计一致率"
+    )
+
     # ===== Rate Limiting =====
     rate_limit_per_minute: int = Field(default=60, description="每分钟 API 请求限制")
 
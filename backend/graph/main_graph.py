@@ -10,9 +10,14 @@ LangGraph 主图定义，实现 Master Router 单一入口架构。
 - Module A 使用子图封装 Writer-Editor-Refiner 闭环
 """
 
+from collections import OrderedDict
 from typing import Any, Dict, Optional
+import asyncio
 import json
 import re
+import threading
+import time
+import weakref
 import structlog
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.base import BaseCheckpointSaver
@@ -40,6 +45,17 @@ logger = structlog.get_logger(__name__)
 # 全局编译后的图实例
 _compiled_graph = None
 
+# 进程级编译图缓存
+# key: (id(checkpointer), id(event_loop))
+# value: (checkpointer, weakref(event_loop), compiled_graph)
+# 编译后的图本身不持有请求状态（状态按 thread_id 存在 checkpointer 中），
+# 因此同一事件循环内的并发请求可以安全共享同一个实例。
+# 保存 checkpointer 强引用，防止其被回收后 id 被复用导致误命中。
+_GRAPH_CACHE_MAX_SIZE = 8
+_graph_cache: "OrderedDict[tuple[int, int], tuple[Any, Any, Any]]" = OrderedDict()
+_graph_cache_lock = threading.Lock()
+_graph_cache_stats = {"hits": 0, "misses": 0, "compile_ms_total": 0.0}
+
 
 # ===== 辅助函数 =====
 
@@ -1512,14 +1528,89 @@ def get_compiled_graph():
     return _compiled_graph
 
 
+def _get_cached_graph(checkpointer: BaseCheckpointSaver | None):
+    """
+    按 (checkpointer, 事件循环) 获取编译后的主图，未命中时编译并缓存
+
+    同一进程内每个事件循环只编译一次，避免 asyncio Event Loop 冲突的同时
+    消除每个请求重新构建节点、边和子图的开销。
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    key = (id(checkpointer), id(loop))
+
+    with _graph_cache_lock:
+        entry = _graph_cache.get(key)
+        if entry is not None:
+            cached_checkpointer, loop_ref, compiled = entry
+            cached_loop = loop_ref() if loop_ref is not None else None
+            if cached_checkpointer is checkpointer and cached_loop is loop:
+                _graph_cache.move_to_end(key)
+                _graph_cache_stats["hits"] += 1
+                return compiled
+            # id 被复用（旧循环已销毁），丢弃失效条目
+            del _graph_cache[key]
+
+        # 清理已关闭事件循环的条目
+        for stale_key in [
+            k
+            for k, (_, ref, _) in _graph_cache.items()
+            if ref is not None and (ref() is None or ref().is_closed())
+        ]:
+            del _graph_cache[stale_key]
+
+        started = time.perf_counter()
+        compiled = create_main_graph(checkpointer)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        _graph_cache[key] = (
+            checkpointer,
+            weakref.ref(loop) if loop is not None else None,
+            compiled,
+        )
+        while len(_graph_cache) > _GRAPH_CACHE_MAX_SIZE:
+            _graph_cache.popitem(last=False)
+
+        _graph_cache_stats["misses"] += 1
+        _graph_cache_stats["compile_ms_total"] += elapsed_ms
+
+    logger.info(
+        "Main graph compiled and cached",
+        compile_ms=round(elapsed_ms, 2),
+        cache_size=len(_graph_cache),
+    )
+    return compiled
+
+
+def clear_graph_cache() -> None:
+    """清空编译图缓存（checkpointer 重建或应用关闭时调用）"""
+    with _graph_cache_lock:
+        _graph_cache.clear()
+
+
+def get_graph_cache_stats() -> dict:
+    """获取编译图缓存统计"""
+    with _graph_cache_lock:
+        return {
+            "size": len(_graph_cache),
+            "max_size": _GRAPH_CACHE_MAX_SIZE,
+            "hits": _graph_cache_stats["hits"],
+            "misses": _graph_cache_stats["misses"],
+            "compile_ms_total": round(_graph_cache_stats["compile_ms_total"], 2),
+        }
+
+
 async def get_graph_for_request(checkpointer=None):
     """
     为当前请求获取 Graph 实例
 
-    这是修复 asyncio Event Loop 冲突的关键：
-    - 每个请求创建新的 Graph 实例
-    - 使用当前请求的事件循环
-    - 避免跨事件循环的 Event 绑定问题
+    修复 asyncio Event Loop 冲突的同时避免重复编译：
+    - 编译结果按 (checkpointer, 当前事件循环) 缓存在进程内
+    - 不同事件循环（如 Celery 任务）各自持有独立实例
+    - 请求状态按 thread_id 存在 checkpointer 中，实例可在并发请求间共享
     """
     from backend.graph.checkpointer import checkpointer_manager
 
@@ -1530,9 +1621,7 @@ async def get_graph_for_request(checkpointer=None):
         # 使用管理器的 checkpointer 实例（用于 LangGraph 长期运行）
         checkpointer = checkpointer_manager._checkpointer
 
-    graph = create_main_graph(checkpointer)
-    logger.debug("Created new graph instance for request")
-    return graph
+    return _get_cached_graph(checkpointer)
 
 
 # ===== 开发测试入口 =====
@@ -12,10 +12,18 @@ Quality Control Graph - 独立的质量控制工作流
 3. full_cycle: 审阅 → 修复 → 审阅循环
 4. chapter_review: 单章审阅（新增）
 
+run_section_quality_cycle 是 full_cycle 的按章节定向版本：把大纲拆成章节单元，
+只修复、重审评分不达标的章节，再按原顺序合并回全文。
+
+global_review / chapter_review 的结果按内容哈希缓存（services/review_cache.py）：
+送审文本和审阅配置都未变化时直接返回缓存的 review_report，不调用 Editor。
+
 可被任何模块调用：skeleton_builder, novel_writer, script_adapter, storyboard_director
 """
 
-from typing import Dict, Any, Literal, Optional, TypedDict
+import json
+import re
+from typing import Dict, Any, List, Literal, Optional, TypedDict
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.base import BaseCheckpointSaver
 
@@ -289,6 +297,76 @@ def build_quality_control_graph(checkpointer: Optional[BaseCheckpointSaver] = No
 
 # ===== 便捷函数 =====
 
+# content_type → editor_node 用于判断内容类型的 current_stage
+_CONTENT_TYPE_STAGES = {
+    "outline": "L3",
+    "novel": "ModA",
+    "script": "ModB",
+    "storyboard": "ModC",
+}
+
+
+async def _run_cached_review(
+    initial_state: QualityControlState,
+    content_type: str,
+    user_config: Optional[Dict[str, Any]],
+    use_cache: bool,
+    checkpointer: Optional[BaseCheckpointSaver],
+) -> Dict[str, Any]:
+    """
+    执行单次审阅（global_review / chapter_review），按内容哈希复用审阅结果
+
+    Returns:
+        {"review_report", "final_score", "cached"}
+    """
+    from backend.services.database import get_db_service
+    from backend.services.review_cache import (
+        get_review_cache,
+        resolve_editor_model,
+        review_cache_key,
+        review_fingerprint,
+    )
+
+    mode = initial_state["mode"]
+    project_id = initial_state["project_id"]
+    initial_state["user_config"] = user_config or {}
+    initial_state["current_stage"] = _CONTENT_TYPE_STAGES.get(content_type, "L3")
+
+    cache = get_review_cache()
+    key = None
+    if use_cache and cache.enabled and project_id:
+        editor_model = await resolve_editor_model(initial_state["user_id"], project_id)
+        key = review_cache_key(
+            initial_state["input_content"],
+            review_fingerprint(mode, content_type, user_config, editor_model),
+        )
+        cached = await cache.get(get_db_service(), project_id, key)
+        if cached is not None:
+            logger.info(
+                "Review served from cache",
+                mode=mode,
+                chapter_id=initial_state.get("chapter_id"),
+                score=cached.get("overall_score"),
+            )
+            return {
+                "review_report": cached,
+                "final_score": cached.get("overall_score", 0),
+                "cached": True,
+            }
+
+    graph = build_quality_control_graph(checkpointer=checkpointer)
+    result = await graph.ainvoke(initial_state)
+    review_report = result.get("review_report")
+
+    if key is not None:
+        await cache.put(get_db_service(), project_id, key, review_report, mode, content_type)
+
+    return {
+        "review_report": review_report,
+        "final_score": result.get("final_score", 0),
+        "cached": False,
+    }
+
 
 async def run_quality_review(
     user_id: str,
@@ -296,18 +374,19 @@ async def run_quality_review(
     content: str,
     content_type: str = "outline",
     checkpointer: Optional[BaseCheckpointSaver] = None,
+    user_config: Optional[Dict[str, Any]] = None,
+    use_cache: bool = True,
 ) -> Dict[str, Any]:
     """
     运行全局质量审阅 (global_review 模式)
 
-    适用于全局审阅
+    适用于全局审阅。user_config 提供 Editor 使用的题材组合、结局类型和总集数；
+    内容和配置与之前某次审阅相同时直接返回缓存结果（cached=True）。
     """
     from langchain_core.messages import HumanMessage
 
     logger.info("Running global quality review", user_id=user_id, content_type=content_type)
 
-    graph = build_quality_control_graph(checkpointer=checkpointer)
-
     # 构建初始状态
     initial_state: QualityControlState = {
         "mode": "global_review",
@@ -326,11 +405,14 @@ async def run_quality_review(
         "qc_status": "pending",
     }
 
-    result = await graph.ainvoke(initial_state)
+    result = await _run_cached_review(
+        initial_state, content_type, user_config, use_cache, checkpointer
+    )
 
     return {
-        "review_report": result.get("review_report"),
-        "quality_score": result.get("final_score", 0),
+        "review_report": result["review_report"],
+        "quality_score": result["final_score"],
+        "cached": result["cached"],
     }
 
 
@@ -341,11 +423,13 @@ async def run_chapter_review(
     content: str,
     content_type: str = "outline",
     checkpointer: Optional[BaseCheckpointSaver] = None,
+    user_config: Optional[Dict[str, Any]] = None,
+    use_cache: bool = True,
 ) -> Dict[str, Any]:
     """
     运行单章质量审阅 (chapter_review 模式)
 
-    适用于单章审阅
+    适用于单章审阅。章节文本和审阅配置与之前某次审阅相同时直接返回缓存结果（cached=True）。
     """
     from langchain_core.messages import HumanMessage
 
@@ -356,8 +440,6 @@ async def run_chapter_review(
         content_type=content_type,
     )
 
-    graph = build_quality_control_graph(checkpointer=checkpointer)
-
     # 构建初始状态
     initial_state: QualityControlState = {
         "mode": "chapter_review",
@@ -376,12 +458,15 @@ async def run_chapter_review(
         "qc_status": "pending",
     }
 
-    result = await graph.ainvoke(initial_state)
+    result = await _run_cached_review(
+        initial_state, content_type, user_config, use_cache, checkpointer
+    )
 
     return {
-        "review_report": result.get("review_report"),
-        "quality_score": result.get("final_score", 0),
+        "review_report": result["review_report"],
+        "quality_score": result["final_score"],
         "chapter_id": chapter_id,
+        "cached": result["cached"],
     }
 
 
@@ -393,9 +478,12 @@ async def run_full_quality_cycle(
     target_score: int = 80,
     max_iterations: int = 3,
     checkpointer: Optional[BaseCheckpointSaver] = None,
+    user_config: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     运行完整质量控制循环 (full_cycle 模式)
+
+    user_config 提供 Editor / Refiner 使用的题材组合、结局类型和总集数。
     """
     from langchain_core.messages import HumanMessage
 
@@ -414,6 +502,7 @@ async def run_full_quality_cycle(
         "mode": "full_cycle",
         "user_id": user_id,
         "project_id": project_id,
+        "user_config": user_config or {},
         "input_content": content,
         "messages": [HumanMessage(content=content)],
         "target_score": target_score,
@@ -437,6 +526,416 @@ async def run_full_quality_cycle(
     }
 
 
+# ===== 按章节定向修复 =====
+
+REVIEW_CATEGORIES = ["logic", "pacing", "character", "conflict", "world", "hook"]
+
+_UNIT_NUMBER_RE = re.compile(r"(\d+)\s*$")
+
+
+def unit_defects(
+    report: Optional[Dict[str, Any]], target_score: int, category_threshold: int
+) -> List[str]:
+    """
+    单元审阅报告中不达标的项
+
+    Returns:
+        总分低于 target_score 时包含 "overall"，以及评分低于 category_threshold 的分类；
+        全部达标（或没有报告）时为空列表
+    """
+    if not report:
+        return []
+    defects = []
+    if (report.get("overall_score") or 0) < target_score:
+        defects.append("overall")
+    for category, detail in (report.get("categories") or {}).items():
+        score = detail.get("score") if isinstance(detail, dict) else detail
+        if isinstance(score, (int, float)) and score < category_threshold:
+            defects.append(category)
+    return defects
+
+
+def _unit_id(number: int) -> str:
+    return f"chapter_{number:03d}"
+
+
+def global_unit_reports(
+    report: Optional[Dict[str, Any]], numbers: List[int]
+) -> Dict[int, Dict[str, Any]]:
+    """
+    从全局审阅报告的 chapter_reviews 取出各章节的评分
+
+    chapter_reviews 的键以章节号结尾（"chapter_003" / "ep_003" / "3"），
+    值为 {score, status, issues, comment, categories}；categories 的值可以是
+    {"score": 72} 或直接是分数。没有数值评分或不属于 numbers 的条目忽略。
+
+    Returns:
+        {章节号: 单元审阅报告}，格式与 chapter_review 的报告一致，可直接用于 unit_defects
+    """
+    wanted = set(numbers)
+    units: Dict[int, Dict[str, Any]] = {}
+    for key, review in ((report or {}).get("chapter_reviews") or {}).items():
+        match = _UNIT_NUMBER_RE.search(str(key))
+        if not match or not isinstance(review, dict):
+            continue
+        number = int(match.group(1))
+        score = review.get("score")
+        if number not in wanted or not isinstance(score, (int, float)):
+            continue
+        categories = review.get("categories")
+        units[number] = {
+            "overall_score": score,
+            "categories": {
+                category: detail if isinstance(detail, dict) else {"score": detail}
+                for category, detail in categories.items()
+            }
+            if isinstance(categories, dict)
+            else {},
+            "issues": review.get("issues") or [],
+            "verdict": review.get("comment", ""),
+        }
+    return units
+
+
+def _keep_header(original: str, refined: str, number: int) -> str:
+    """Refiner 丢掉章节标题行时补回原标题，保证合并后章节边界不变"""
+    from backend.utils.outline_index import ChapterIndex
+
+    if number in ChapterIndex(refined):
+        return refined
+    header = original.splitlines()[0] if original else ""
+    return f"{header}\n{refined.strip()}"
+
+
+def aggregate_unit_reports(reports: Dict[int, Optional[Dict[str, Any]]]) -> Dict[str, Any]:
+    """把各章节的审阅报告汇总为全文报告（总分和分类评分取章节平均值）"""
+    scored = {number: report for number, report in reports.items() if report}
+
+    def mean(values: List[float]) -> int:
+        return round(sum(values) / len(values)) if values else 0
+
+    categories = {}
+    for category in REVIEW_CATEGORIES:
+        scores = [
+            detail["score"]
+            for report in scored.values()
+            if isinstance(detail := (report.get("categories") or {}).get(category), dict)
+            and isinstance(detail.get("score"), (int, float))
+        ]
+        if scores:
+            categories[category] = {"score": mean(scores), "min_score": min(scores)}
+
+    issues = []
+    chapter_reviews = {}
+    for number, report in sorted(scored.items()):
+        score = report.get("overall_score", 0)
+        unit_issues = [
+            {**issue, "location": issue.get("location") or f"Chapter {number}"}
+            if isinstance(issue, dict)
+            else {"description": str(issue), "location": f"Chapter {number}"}
+            for issue in report.get("issues") or []
+        ]
+        issues.extend(unit_issues)
+        chapter_reviews[_unit_id(number)] = {
+            "score": score,
+            "status": "passed" if score >= 80 else "warning",
+            "issues": unit_issues,
+            "comment": report.get("verdict") or report.get("summary", ""),
+        }
+
+    return {
+        "overall_score": mean([report.get("overall_score") or 0 for report in scored.values()]),
+        "categories": categories,
+        "chapter_reviews": chapter_reviews,
+        "issues": issues,
+        "summary": f"按章节审阅 {len(scored)}/{len(reports)} 章",
+    }
+
+
+async def _refine_sections(
+    user_id: str,
+    project_id: str,
+    sections: Dict[int, str],
+    reports: Dict[int, Optional[Dict[str, Any]]],
+    content_type: str,
+    user_config: Optional[Dict[str, Any]],
+    checkpointer: Optional[BaseCheckpointSaver],
+) -> Dict[int, str]:
+    """
+    用一次 refine_only 调用修复多个章节
+
+    Refiner 的系统提示词每轮只发送一次，送入的正文只有待修复的章节。
+
+    Returns:
+        {章节号: 修复后的章节文本}；Refiner 输出中缺少的章节不包含在内
+    """
+    from langchain_core.messages import HumanMessage
+    from backend.utils.outline_index import ChapterIndex
+
+    numbers = sorted(sections)
+    text = "\n\n".join(sections[number].strip() for number in numbers)
+    unit_reports = {_unit_id(number): reports.get(number) or {} for number in numbers}
+    report_text = json.dumps(unit_reports, ensure_ascii=False, indent=2)
+    message = (
+        f"【章节定向修复 - Chapter {', '.join(map(str, numbers))}】\n"
+        "只修复下面这些章节，保留每章的章节标题行，"
+        "refined_content 按原顺序输出修复后的这些章节的完整 Markdown。\n\n"
+        f"{text}\n\n【各章审阅报告】\n```json\n{report_text}\n```"
+    )
+
+    graph = build_quality_control_graph(checkpointer=checkpointer)
+    result = await graph.ainvoke(
+        {
+            "mode": "refine_only",
+            "user_id": user_id,
+            "project_id": project_id,
+            "user_config": user_config or {},
+            "current_stage": _CONTENT_TYPE_STAGES.get(content_type, "L3"),
+            "input_content": text,
+            "messages": [HumanMessage(content=message)],
+            "target_score": 80,
+            "max_iterations": 1,
+            "chapter_id": _unit_id(numbers[0]) if len(numbers) == 1 else None,
+            "review_report": {"chapter_reviews": unit_reports},
+            "refined_content": None,
+            "refine_log": None,
+            "final_score": 0,
+            "iterations_performed": 0,
+            "qc_status": "pending",
+        }
+    )
+
+    refined = result.get("refined_content")
+    if not isinstance(refined, str) or not refined.strip():
+        logger.warning("Refiner returned no section text", chapters=numbers)
+        return {}
+    if len(numbers) == 1:
+        return {numbers[0]: _keep_header(sections[numbers[0]], refined, numbers[0])}
+
+    index = ChapterIndex(refined)
+    missing = [number for number in numbers if number not in index]
+    if missing:
+        logger.warning("Refiner output is missing chapters", chapters=missing)
+    return {number: index.section(number) for number in numbers if number in index}
+
+
+async def run_section_quality_cycle(
+    user_id: str,
+    project_id: str,
+    content: str,
+    content_type: str = "outline",
+    target_score: int = 80,
+    max_iterations: int = 3,
+    category_threshold: Optional[int] = None,
+    user_config: Optional[Dict[str, Any]] = None,
+    checkpointer: Optional[BaseCheckpointSaver] = None,
+) -> Dict[str, Any]:
+    """
+    按章节定向修复的质量控制循环
+
+    1. 按 "Chapter N" 标题把内容拆成章节单元，对全文做一次全局审阅（global_review），
+       从报告的 chapter_reviews 取各章评分和分类评分；报告中缺少的章节才逐章审阅（chapter_review）
+    2. 总分低于 target_score 或任一分类低于 category_threshold 的章节进入修复
+       （每一遍都用 unit_defects 判定）
+    3. 每轮用一次 Refiner 调用只修复不达标章节，修复后的章节按原顺序替换回全文
+       （ChapterIndex.replace_sections），其余内容原样保留
+    4. 合并后的全文审阅一次，更新本轮修改过的章节的评分，仍不达标的章节进入下一轮，
+       最多 max_iterations 轮
+
+    final_score 与 run_full_quality_cycle 一样取最新一次全文审阅的 overall_score，分类评分、
+    张力曲线也来自这次审阅；全局审阅失败时退回各章评分的平均值。
+    与整篇修复循环相比，每轮的审阅次数相同，Refiner 只读写不达标的章节，
+    修复的字数与不达标章节数成正比。命中审阅缓存的审阅不调用 LLM。
+
+    没有章节标题的内容，或全文总分不达标但没有不达标章节（问题不在具体章节上）时，
+    退回 run_full_quality_cycle。
+
+    Returns:
+        与 run_full_quality_cycle 相同的字段，另含 initial_score（修复前的总分）/
+        units_total / units_refined / stats
+    """
+    from backend.config import settings
+    from backend.services.database import get_db_service
+    from backend.services.review_scheduler import get_review_scheduler
+    from backend.utils.outline_index import ChapterIndex
+
+    async def full_cycle() -> Dict[str, Any]:
+        return await run_full_quality_cycle(
+            user_id=user_id,
+            project_id=project_id,
+            content=content,
+            content_type=content_type,
+            target_score=target_score,
+            max_iterations=max_iterations,
+            checkpointer=checkpointer,
+            user_config=user_config,
+        )
+
+    index = ChapterIndex(content)
+    if not len(index):
+        logger.info("No chapter units found, running full quality cycle")
+        return await full_cycle()
+
+    threshold = settings.qc_category_threshold if category_threshold is None else category_threshold
+    db = get_db_service()
+    scheduler = get_review_scheduler()
+    editor_provider = await scheduler.resolve_provider(db, user_id, "editor", project_id)
+
+    numbers = index.numbers()
+    sections = {number: index.section(number) for number in numbers}
+    reports: Dict[int, Optional[Dict[str, Any]]] = {}
+    stats = {
+        "global_reviews": 0,
+        "reviews": 0,
+        "cached_reviews": 0,
+        "review_chars": 0,
+        "refines": 0,
+        "refine_chars": 0,
+    }
+
+    async def global_review(text: str) -> Dict[str, Any]:
+        try:
+            result = await run_quality_review(
+                user_id=user_id,
+                project_id=project_id,
+                content=text,
+                content_type=content_type,
+                checkpointer=checkpointer,
+                user_config=user_config,
+            )
+        except Exception as e:
+            logger.error("Global review failed", error=str(e))
+            return {}
+        if result.get("cached"):
+            stats["cached_reviews"] += 1
+        else:
+            stats["global_reviews"] += 1
+            stats["review_chars"] += len(text)
+        return result.get("review_report") or {}
+
+    async def chapter_review(number: int) -> Optional[Dict[str, Any]]:
+        try:
+            result = await run_chapter_review(
+                user_id=user_id,
+                project_id=project_id,
+                chapter_id=_unit_id(number),
+                content=sections[number],
+                content_type=content_type,
+                checkpointer=checkpointer,
+                user_config=user_config,
+            )
+        except Exception as e:
+            logger.error("Section review failed", chapter=number, error=str(e))
+            return None
+        if result.get("cached"):
+            stats["cached_reviews"] += 1
+        else:
+            stats["reviews"] += 1
+            stats["review_chars"] += len(sections[number])
+        return result.get("review_report")
+
+    async def review_units(units: List[int], text: str) -> Dict[str, Any]:
+        """一次全局审阅 text，按其 chapter_reviews 更新 units 的报告，缺少的章节逐章审阅"""
+        report = await global_review(text)
+        scored = global_unit_reports(report, units)
+        reports.update(scored)
+        unscored = [n for n in units if n not in scored]
+        if unscored:
+            reviewed = await scheduler.map(unscored, chapter_review, provider=editor_provider)
+            reports.update(zip(unscored, reviewed))
+        return report
+
+    def defects(units: List[int]) -> List[int]:
+        return [n for n in units if unit_defects(reports.get(n), target_score, threshold)]
+
+    # 第一遍：一次全局审阅，按其逐章评分找出不达标的章节
+    gate_report = await review_units(numbers, content)
+    initial_score = {**aggregate_unit_reports(reports), **gate_report}["overall_score"]
+    defective = defects(numbers)
+
+    if not defective and "overall_score" in gate_report and initial_score < target_score:
+        logger.info(
+            "Overall score below target without defective chapters, running full quality cycle",
+            initial_score=initial_score,
+        )
+        return await full_cycle()
+
+    logger.info(
+        "Section quality cycle started",
+        units_total=len(numbers),
+        units_defective=len(defective),
+        initial_score=initial_score,
+        target_score=target_score,
+        category_threshold=threshold,
+    )
+
+    refined_units: set[int] = set()
+    iterations = 0
+    while defective and iterations < max_iterations:
+        iterations += 1
+        stats["refines"] += 1
+        stats["refine_chars"] += sum(len(sections[n]) for n in defective)
+        try:
+            refined = await _refine_sections(
+                user_id,
+                project_id,
+                {n: sections[n] for n in defective},
+                reports,
+                content_type,
+                user_config,
+                checkpointer,
+            )
+        except Exception as e:
+            logger.error("Section refine failed", chapters=defective, error=str(e))
+            break
+        if not refined:
+            break
+        changed = sorted(refined)
+        sections.update(refined)
+        refined_units.update(changed)
+
+        # 合并后的全文审阅一次：作为新的全文总分，并更新本轮修改过的章节的评分
+        merged = index.replace_sections({number: sections[number] for number in refined_units})
+        gate_report = await review_units(changed, merged)
+        defective = defects(changed)
+
+        logger.info(
+            "Section refinement iteration completed",
+            iteration=iterations,
+            units_refined=len(changed),
+            units_defective=len(defective),
+        )
+
+    refined_content = (
+        index.replace_sections({number: sections[number] for number in refined_units})
+        if refined_units
+        else None
+    )
+
+    # 章节评分按最新的章节报告汇总；总分、分类评分、张力曲线等全文字段取最新的全文审阅
+    aggregated = aggregate_unit_reports(reports)
+    review_report = {**aggregated, **gate_report, "chapter_reviews": aggregated["chapter_reviews"]}
+
+    logger.info(
+        "Section quality cycle completed",
+        final_score=review_report["overall_score"],
+        iterations=iterations,
+        units_refined=len(refined_units),
+        **stats,
+    )
+
+    return {
+        "review_report": review_report,
+        "refined_content": refined_content,
+        "final_score": review_report["overall_score"],
+        "initial_score": initial_score,
+        "iterations": iterations,
+        "units_total": len(numbers),
+        "units_refined": sorted(refined_units),
+        "stats": stats,
+    }
+
+
 # ===== 测试入口 =====
 
 if __name__ == "__main__":
@@ -16,9 +16,11 @@ from langchain_core.messages import AIMessage
 
 from backend.schemas.agent_state import AgentState, ApprovalStatus, StageType
 from backend.agents.skeleton_builder import skeleton_builder_node
+from backend.config import settings
 from backend.graph.workflows.quality_control_graph import (
     build_quality_control_graph,
     QualityControlState,
+    run_section_quality_cycle,
 )
 
 import structlog
@@ -298,6 +300,24 @@ def check_beat_consistency(batch_range: str, content: str, beat_sheet: Dict) ->
     return {"valid": True, "issue": ""}
 
 
+def _record_prescreen_agreement(
+    prescreen: Dict[str, Any] | None, llm_score: float | None, target_score: int
+) -> None:
+    """记录预筛结论与 Editor 评分的对比"""
+    if prescreen is None or llm_score is None:
+        return
+    from backend.services.prescreen_service import get_prescreen_stats
+
+    agreed = get_prescreen_stats().record_llm_score(prescreen, llm_score, target_score)
+    logger.info(
+        "Prescreen compared with editor",
+        verdict=prescreen["verdict"],
+        prescreen_score=prescreen["overall_score"],
+        llm_score=llm_score,
+        agreed=agreed,
+    )
+
+
 # ===== 普通函数 Nodes =====
 
 
@@ -307,6 +327,9 @@ async def quality_control_node(state: AgentState) -> Dict[str, Any]:
 
     调用独立的 quality_control_graph 子图进行审阅和修复
     支持 full_cycle 模式：审阅 → 修复 → 审阅循环
+    qc_section_refine 开启时按章节定向修复：只修复、重审不达标的章节
+    qc_prescreen_enabled 开启时先做规则预筛：预筛判定合格（pass）的大纲不调用 Editor，
+    其余情况照常审阅，并记录预筛与 Editor 评分的一致率
     """
     user_id = state.get("user_id")
     project_id = state.get("project_id")
@@ -329,7 +352,71 @@ async def quality_control_node(state: AgentState) -> Dict[str, Any]:
             "last_successful_node": "quality_control_error",
         }
 
+    prescreen = None
+    if settings.qc_prescreen_enabled:
+        import random
+
+        from backend.services.prescreen_service import (
+            get_prescreen_stats,
+            prescreen_content,
+            prescreen_report,
+        )
+
+        prescreen = prescreen_content(
+            skeleton_content,
+            expected_chapters=(state.get("chapter_mapping") or {}).get("total_chapters"),
+            genre_combination=(state.get("user_config") or {}).get("sub_tags"),
+        )
+        # 按 qc_prescreen_audit_rate 抽检 pass 判定，仍交给 Editor 以统计一致率
+        short_circuit = (
+            prescreen["verdict"] == "pass" and random.random() >= settings.qc_prescreen_audit_rate
+        )
+        get_prescreen_stats().record_verdict(prescreen["verdict"], short_circuit=short_circuit)
+
+        if short_circuit:
+            logger.info(
+                "Prescreen passed, skipping editor",
+                overall_score=prescreen["overall_score"],
+                structure_score=prescreen["structure_score"],
+                pacing_score=prescreen["pacing_score"],
+            )
+            return {
+                "review_report": prescreen_report(prescreen),
+                "quality_score": prescreen["overall_score"],
+                "refined_content": None,
+                "revision_count": revision_count,
+                "last_successful_node": "quality_control",
+            }
+
     try:
+        if settings.qc_section_refine:
+            result = await run_section_quality_cycle(
+                user_id=user_id,
+                project_id=project_id,
+                content=skeleton_content,
+                target_score=80,
+                max_iterations=max(0, 3 - revision_count),  # 考虑已进行的迭代次数
+                user_config=state.get("user_config", {}),
+            )
+            iterations = result.get("iterations", 0)
+            _record_prescreen_agreement(prescreen, result.get("initial_score"), 80)
+
+            logger.info(
+                "Section quality control completed",
+                final_score=result.get("final_score", 0),
+                iterations=iterations,
+                units_total=result.get("units_total"),
+                units_refined=result.get("units_refined"),
+            )
+
+            return {
+                "review_report": result.get("review_report"),
+                "quality_score": result.get("final_score", 0),
+                "refined_content": result.get("refined_content"),
+                "revision_count": revision_count + iterations,
+                "last_successful_node": "quality_control",
+            }
+
         # 构建 quality_control_graph 子图
         qc_graph = build_quality_control_graph()
 
@@ -353,6 +440,9 @@ async def quality_control_node(state: AgentState) -> Dict[str, Any]:
         refined_content = result.get("refined_content")
         final_score = result.get("final_score", 0)
         iterations = result.get("iterations_performed", 0)
+        if iterations == revision_count:
+            # 没有经过修复，final_score 即初次审阅的评分
+            _record_prescreen_agreement(prescreen, final_score, 80)
 
         logger.info(
             "Quality Control completed",
@@ -924,9 +1014,10 @@ async def validate_output_node(state: AgentState) -> Dict[str, Any]:
         issues.append("缺少付费卡点专项设计")
 
     # 检查3：关键字段
-    required_sections = ["元数据", "核心设定", "人物体系", "情节架构", "章节大纲"]
+    from backend.services.prescreen_service import REQUIRED_SECTIONS
+
     missing_sections = []
-    for section in required_sections:
+    for section in REQUIRED_SECTIONS:
         if section not in content_to_validate:
             missing_sections.append(section)
     if missing_sections:
@@ -949,6 +1040,22 @@ async def validate_output_node(state: AgentState) -> Dict[str, Any]:
         if not beat_check["valid"]:
             issues.append(f"节拍一致性: {beat_check['issue']}")
 
+        # 检查6：规则预筛明显不合格时直接重新生成，不再交给 Editor 审阅
+        if settings.qc_prescreen_enabled:
+            from backend.services.prescreen_service import get_prescreen_stats, prescreen_content
+
+            prescreen = prescreen_content(
+                content_to_validate,
+                expected_chapters=total_chapters_expected,
+                genre_combination=(state.get("user_config") or {}).get("sub_tags"),
+            )
+            if prescreen["verdict"] == "fail":
+                get_prescreen_stats().record_verdict("fail", short_circuit=True)
+                issues.append(
+                    f"预筛未通过: 结构分 {prescreen['structure_score']}"
+                    f"（{'；'.join(issue['description'] for issue in prescreen['issues'][:3])}）"
+                )
+
         if issues:
             current_retry = state.get("retry_count", 0)
             new_retry_count = current_retry + 1
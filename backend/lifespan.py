@@ -63,10 +63,16 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning("Checkpointer initialization failed", error=str(e))
 
-    # 4. 预编译 LangGraph 主图（用于验证，实际使用时每个请求会创建新实例）
-    # 注意：不再全局存储 Graph 实例，避免 asyncio Event Loop 冲突
-    # 每个请求会调用 get_graph_for_request() 创建新的 Graph 实例
-    logger.info("Graph will be created per-request to avoid event loop issues")
+    # 4. 预编译 LangGraph 主图
+    # 编译结果按 (checkpointer, 事件循环) 缓存在进程内，
+    # 后续请求通过 get_graph_for_request() 直接复用，不再逐请求重新编译
+    try:
+        from backend.graph.main_graph import get_graph_for_request
+
+        await get_graph_for_request()
+        logger.info("Main graph precompiled and cached")
+    except Exception as e:
+        logger.warning("Main graph precompile failed", error=str(e))
 
     # 5. 初始化模型路由器
     if db_service:
@@ -99,6 +105,15 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning("Redis not available", error=str(e))
 
+    # 7.1 加载题材库内存快照（失败时首次读取再加载）
+    if db_service:
+        try:
+            from backend.services.theme_snapshot import get_theme_snapshot_store
+
+            await get_theme_snapshot_store().refresh(force=True)
+        except Exception as e:
+            logger.warning("Theme snapshot load failed", error=str(e))
+
     # 8. 启动临时项目清理任务
     if db_service:
         try:
@@ -139,6 +154,10 @@ async def lifespan(app: FastAPI):
 
         await close_checkpointer()
         logger.info("Checkpointer connection closed")
+
+        from backend.graph.main_graph import clear_graph_cache
+
+        clear_graph_cache()
     except Exception as e:
         logger.warning("Failed to close checkpointer", error=str(e))
 
@@ -152,4 +171,13 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning("Failed to close storage service", error=str(e))
 
+    # 关闭 Supabase REST / Storage 共享连接池
+    try:
+        from backend.services.http_pool import close_http_client
+
+        await close_http_client()
+        logger.info("HTTP pool closed")
+    except Exception as e:
+        logger.warning("Failed to close HTTP pool", error=str(e))
+
     logger.info("Application shutdown complete")
@@ -66,7 +66,8 @@ def start_celery():
                 "backend.tasks.celery_app",
                 "worker",
                 "--loglevel=info",
-                "--concurrency=1",
+                f"--pool={settings.celery_worker_pool}",
+                f"--concurrency={settings.celery_worker_concurrency}",
                 "-n",
                 "worker@%h",
             ],
@@ -197,7 +198,14 @@ def create_app() -> FastAPI:
 
     @app.get("/health")
     async def health_check():
-        return {"status": "ok", "version": "4.1.0", "features": ["workflow_plan", "multi_step"]}
+        from backend.services.http_pool import get_pool_stats
+
+        return {
+            "status": "ok",
+            "version": "4.1.0",
+            "features": ["workflow_plan", "multi_step"],
+            "http_pool": get_pool_stats(),
+        }
 
     return app
 
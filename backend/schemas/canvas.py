@@ -5,9 +5,9 @@ Canvas Schemas
 对应: Product-Spec.md Section 2.6
 """
 
-from typing import List, Dict, Any, Optional
+from typing import Annotated, List, Dict, Any, Literal, Optional, Union
 from uuid import UUID
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 from backend.schemas.shot import ShotResponse
 
@@ -33,6 +33,7 @@ class CanvasData(BaseModel):
     """画布完整数据 - v6.0"""
 
     episode_id: str = Field(..., description="剧集 ID")
+    version: int = Field(0, description="画布版本号（增量保存时作为 base_version）")
     viewport: CanvasViewport = Field(default_factory=CanvasViewport)
     nodes: List[ShotResponse] = Field(default_factory=list, description="所有节点")
     connections: List[Connection] = Field(default_factory=list, description="所有连线")
@@ -49,8 +50,79 @@ class CanvasData(BaseModel):
 
 
 class CanvasSaveRequest(BaseModel):
-    """保存画布请求"""
+    """保存画布请求（全量）"""
 
     viewport: CanvasViewport
     nodes: List[ShotResponse]
     connections: List[Connection]
+    base_version: Optional[int] = Field(
+        None, description="客户端持有的版本号，不一致时返回 409；为空时直接覆盖"
+    )
+
+
+# ===== 增量操作 =====
+
+
+class NodeUpsertOp(BaseModel):
+    """新增节点或按 shot_id 合并节点字段"""
+
+    op: Literal["node_upsert"]
+    node: Dict[str, Any] = Field(..., description="节点数据（至少包含 shot_id）")
+
+    @field_validator("node")
+    @classmethod
+    def validate_node(cls, v: Dict[str, Any]) -> Dict[str, Any]:
+        if not v.get("shot_id"):
+            raise ValueError("node.shot_id is required")
+        return v
+
+
+class NodeMoveOp(BaseModel):
+    """移动节点"""
+
+    op: Literal["node_move"]
+    id: str = Field(..., description="节点 shot_id")
+    x: float
+    y: float
+
+
+class NodeRemoveOp(BaseModel):
+    """删除节点（同时删除引用它的连线）"""
+
+    op: Literal["node_remove"]
+    id: str = Field(..., description="节点 shot_id")
+
+
+class ConnectionAddOp(BaseModel):
+    """新增连线（同 id 时替换）"""
+
+    op: Literal["connection_add"]
+    connection: Connection
+
+
+class ConnectionRemoveOp(BaseModel):
+    """删除连线"""
+
+    op: Literal["connection_remove"]
+    id: str = Field(..., description="连线 ID")
+
+
+CanvasOp = Annotated[
+    Union[NodeUpsertOp, NodeMoveOp, NodeRemoveOp, ConnectionAddOp, ConnectionRemoveOp],
+    Field(discriminator="op"),
+]
+
+
+class CanvasDeltaRequest(BaseModel):
+    """增量保存画布请求"""
+
+    base_version: int = Field(..., description="客户端持有的版本号")
+    ops: List[CanvasOp] = Field(default_factory=list, description="按顺序应用的增量操作")
+    viewport: Optional[CanvasViewport] = Field(None, description="同时更新视口（不影响版本号）")
+
+
+class CanvasDeltaResponse(BaseModel):
+    """增量保存结果"""
+
+    episode_id: str
+    version: int = Field(..., description="保存后的版本号")
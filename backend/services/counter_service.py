@@ -0,0 +1,106 @@
+"""
+Counter Service
+
+剧集/场景分镜计数的延迟维护。
+
+旧实现在每次创建、删除分镜后执行一次 count=exact 查询加一次 PATCH，
+批量操作会对同一剧集重复执行。
+
+新实现：
+- 写操作只在内存中记录计数增量（按 episode_id / scene_id 合并）
+- 增量在 counter_flush_delay 秒的窗口后通过一次 RPC 写入（apply_shot_count_deltas）
+- reconcile() 通过 reconcile_shot_counts 离线重新统计精确计数，
+  修正进程崩溃等原因丢失的增量（Celery Beat 定时执行）
+"""
+
+import asyncio
+from collections import defaultdict
+from typing import Any, Optional
+
+import structlog
+
+from backend.config import settings
+
+logger = structlog.get_logger(__name__)
+
+
+class ShotCounterService:
+    """分镜计数增量缓冲"""
+
+    def __init__(self, db, flush_delay: Optional[float] = None):
+        self._db = db
+        self._flush_delay = (
+            flush_delay if flush_delay is not None else settings.counter_flush_delay
+        )
+        self._episode_deltas: dict[str, int] = defaultdict(int)
+        self._scene_deltas: dict[str, int] = defaultdict(int)
+        self._flush_task: asyncio.Task | None = None
+        self.stats: dict[str, Any] = {"recorded": 0, "flushes": 0, "failed_flushes": 0}
+
+    @property
+    def pending(self) -> int:
+        """尚未写入的计数条目数"""
+        return len(self._episode_deltas) + len(self._scene_deltas)
+
+    def record(self, episode_id: Optional[str], scene_id: Optional[str] = None, delta: int = 1):
+        """记录分镜数量变化，并安排一次延迟写入"""
+        if not delta:
+            return
+        if episode_id:
+            self._episode_deltas[str(episode_id)] += delta
+        if scene_id:
+            self._scene_deltas[str(scene_id)] += delta
+        self.stats["recorded"] += 1
+        self._schedule_flush()
+
+    async def flush(self) -> int:
+        """立即写入所有累积的增量（一次 RPC），返回写入的条目数"""
+        episode_deltas = {k: v for k, v in self._episode_deltas.items() if v}
+        scene_deltas = {k: v for k, v in self._scene_deltas.items() if v}
+        self._episode_deltas = defaultdict(int)
+        self._scene_deltas = defaultdict(int)
+        if not episode_deltas and not scene_deltas:
+            return 0
+
+        try:
+            await self._db.apply_shot_count_deltas(episode_deltas, scene_deltas)
+        except Exception as e:
+            # 放回缓冲区，下次写入时重试；长期失败由 reconcile 修正
+            for key, value in episode_deltas.items():
+                self._episode_deltas[key] += value
+            for key, value in scene_deltas.items():
+                self._scene_deltas[key] += value
+            self.stats["failed_flushes"] += 1
+            logger.warning("Failed to flush shot counters", error=str(e), pending=self.pending)
+            return 0
+
+        self.stats["flushes"] += 1
+        return len(episode_deltas) + len(scene_deltas)
+
+    async def reconcile(self, episode_ids: Optional[list[str]] = None) -> int:
+        """重新统计精确计数（episode_ids 为空表示全部），返回被修正的行数"""
+        await self.flush()
+        fixed = await self._db.reconcile_shot_counts(episode_ids)
+        if fixed:
+            logger.info("Shot counters reconciled", fixed=fixed)
+        return fixed
+
+    def _schedule_flush(self) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        task = self._flush_task
+        # 已有同一事件循环上的待执行写入：合并到该次写入
+        if task is not None and not task.done() and task.get_loop() is loop:
+            return
+        self._flush_task = loop.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        await asyncio.sleep(self._flush_delay)
+        await self.flush()
+        # 写入期间 record() 新增的增量（该任务未结束，record 不会另行安排），
+        # 或写入失败放回的增量：重新安排下一次写入
+        if self.pending:
+            self._flush_task = asyncio.get_running_loop().create_task(self._delayed_flush())
@@ -7,20 +7,50 @@ Database Service
 import asyncio
 import uuid
 from datetime import datetime, timezone
-from typing import Any, TypeVar
+from typing import Any, Literal, TypeVar
 
-import httpx
 import structlog
 
 from backend.config import settings
 from backend.schemas.project import ProjectCreate, ProjectResponse, ProjectUpdate
 from backend.schemas.node import NodeCreate, NodeResponse, NodeLayoutUpdate
 from backend.schemas.job import JobCreate, JobResponse, JobStatus, JobProgress
+from backend.services.counter_service import ShotCounterService
+from backend.services.http_pool import ScopedClient
 
 logger = structlog.get_logger(__name__)
 
 T = TypeVar("T")
 
+# PostgREST 计数方式：
+# - exact:     COUNT(*)，精确但需要扫描所有匹配行
+# - planned:   查询计划器估算值，几乎无开销，过滤条件下误差较大
+# - estimated: 不超过 db-max-rows 时精确，超过后使用估算值
+CountMode = Literal["exact", "planned", "estimated"]
+
+# 全量保存大纲时按行存储、不写入大纲头信息的字段
+_OUTLINE_ROW_FIELDS = frozenset({"episodes", "content", "projectId", "updatedAt", "version"})
+
+# 计数时忽略的查询参数（只保留过滤条件）
+_NON_FILTER_PARAMS = frozenset({"select", "order", "limit", "offset"})
+
+
+def _parse_content_range(header: str | None) -> int | None:
+    """解析 Content-Range 头中的总数，如 "0-24/3573" 或 "*/3573" """
+    if not header or "/" not in header:
+        return None
+    total = header.rsplit("/", 1)[1]
+    return int(total) if total.isdigit() else None
+
+
+class CanvasVersionConflict(Exception):
+    """画布版本冲突：客户端基于的版本已被其他保存覆盖"""
+
+    def __init__(self, episode_id: str, current_version: int):
+        super().__init__(f"Canvas of episode {episode_id} is at version {current_version}")
+        self.episode_id = episode_id
+        self.current_version = current_version
+
 
 class DatabaseService:
     """
@@ -28,8 +58,8 @@ class DatabaseService:
 
     使用 httpx 调用 Supabase PostgREST API。
 
-    注意：使用懒加载 client 模式，自动处理 event loop 变化问题。
-    每次访问 client 时检查当前事件循环，如果变化则重新创建 client。
+    注意：请求通过 http_pool 的共享连接池发出，连接按事件循环隔离，
+    与 StorageService 共用同一个池。
     """
 
     def __init__(self, base_url: str, service_key: str):
@@ -41,41 +71,15 @@ class DatabaseService:
             "Content-Type": "application/json",
             "Prefer": "return=representation",
         }
-        # 不立即创建 client，使用懒加载
-        self._client: httpx.AsyncClient | None = None
-        self._loop: asyncio.AbstractEventLoop | None = None
-
-    @property
-    def _client(self) -> httpx.AsyncClient:
-        """懒加载 HTTP client，自动检测 event loop 变化"""
-        current_loop = asyncio.get_running_loop()
-
-        # 如果 client 不存在或 event loop 已变化，重新创建 client
-        if self.__client is None or self._loop is not current_loop:
-            if self.__client is not None and self._loop is not current_loop:
-                # Event loop 变化，关闭旧 client
-                try:
-                    # 使用 asyncio.run_coroutine_thread_safe 或忽略关闭
-                    pass
-                except Exception:
-                    pass
-
-            self.__client = httpx.AsyncClient(headers=self._headers, timeout=30.0)
-            self._loop = current_loop
-            logger.debug("Created new httpx client", loop_id=id(current_loop))
-
-        return self.__client
-
-    @_client.setter
-    def _client(self, value: httpx.AsyncClient | None):
-        self.__client = value
+        # 共享连接池（按事件循环创建，见 http_pool）
+        self._client = ScopedClient(self._headers, timeout=settings.http_timeout)
+        # 分镜计数增量（延迟合并写入）
+        self.shot_counters = ShotCounterService(self)
 
     async def close(self):
-        """关闭 HTTP 客户端"""
-        if self.__client is not None:
-            await self.__client.aclose()
-            self.__client = None
-            self._loop = None
+        """写入尚未提交的分镜计数（连接池由 http_pool.close_http_client 统一关闭）"""
+        if self.shot_counters.pending:
+            await self.shot_counters.flush()
 
     # ===== Project CRUD =====
 
@@ -98,30 +102,34 @@ class DatabaseService:
         return ProjectResponse(**result[0], node_count=0, episode_count=0)
 
     async def get_project(self, project_id: str) -> ProjectResponse | None:
-        """获取项目详情"""
-        # 显式指定字段名以确保正确映射（Supabase 默认返回 camelCase）
-        response = await self._client.get(
-            f"{self._rest_url}/projects",
-            params={
-                "id": f"eq.{project_id}",
-                "select": "id,user_id,name,cover_image,meta,is_temporary,created_at,updated_at",
-            },
-        )
-        response.raise_for_status()
-        result = response.json()
-
-        if not result:
-            return None
-
-        node_count = await self._count_nodes(project_id)
-        episode_count = await self._count_episodes(project_id)
+        """获取项目详情（项目行和节点计数并发查询）"""
+        projects = await self.get_projects_by_ids([project_id])
+        return projects.get(str(project_id))
 
-        return ProjectResponse(**result[0], node_count=node_count, episode_count=episode_count)
+    async def get_projects_by_ids(self, project_ids: list[str]) -> dict[str, ProjectResponse]:
+        """批量获取项目详情（一次 in.(…) 查询 + 一次批量计数）"""
+        # 显式指定字段名以确保正确映射（Supabase 默认返回 camelCase）
+        rows, counts = await asyncio.gather(
+            self._get_rows_by_ids(
+                "projects",
+                "id",
+                project_ids,
+                select="id,user_id,name,cover_image,meta,is_temporary,created_at,updated_at",
+            ),
+            self.count_project_nodes(project_ids),
+        )
+        projects = {}
+        for project_id, row in rows.items():
+            node_count, episode_count = counts.get(project_id, (0, 0))
+            projects[project_id] = ProjectResponse(
+                **row, node_count=node_count, episode_count=episode_count
+            )
+        return projects
 
     async def list_projects(
         self, user_id: str, limit: int = 20, offset: int = 0
     ) -> list[ProjectResponse]:
-        """获取用户的项目列表"""
+        """获取用户的项目列表（整页项目的节点计数用一次 RPC 查询）"""
         response = await self._client.get(
             f"{self._rest_url}/projects",
             params={
@@ -134,10 +142,15 @@ class DatabaseService:
         )
         response.raise_for_status()
 
+        rows = response.json() or []
+        counts = await self.count_project_nodes([row["id"] for row in rows])
+
         projects = []
-        for row in response.json() or []:
-            node_count = await self._count_nodes(row["id"])
-            projects.append(ProjectResponse(**row, node_count=node_count, episode_count=0))
+        for row in rows:
+            node_count, episode_count = counts.get(str(row["id"]), (0, 0))
+            projects.append(
+                ProjectResponse(**row, node_count=node_count, episode_count=episode_count)
+            )
 
         return projects
 
@@ -191,17 +204,9 @@ class DatabaseService:
 
     async def count_temp_projects(self, user_id: str) -> int:
         """统计用户的临时项目数量"""
-        response = await self._client.get(
-            f"{self._rest_url}/projects",
-            params={
-                "user_id": f"eq.{user_id}",
-                "is_temporary": "eq.true",
-                "select": "count",
-            },
+        return await self.count_rows(
+            "projects", {"user_id": f"eq.{user_id}", "is_temporary": "eq.true"}
         )
-        response.raise_for_status()
-        result = response.json()
-        return len(result) if result else 0
 
     async def delete_oldest_temp_project(self, user_id: str) -> bool:
         """删除用户最旧的临时项目"""
@@ -316,6 +321,65 @@ class DatabaseService:
             parent_id=data.parent_id,
         )
 
+    async def create_nodes(
+        self,
+        project_id: str,
+        node_type: str,
+        nodes: list[tuple[NodeCreate, NodeLayoutUpdate | None]],
+        replace_existing: bool = False,
+    ) -> list[str]:
+        """批量创建同类型节点及其布局（单次 RPC，同一事务）
+
+        Args:
+            project_id: 项目 ID
+            node_type: 节点类型
+            nodes: (节点数据, 布局) 列表
+            replace_existing: 是否先删除该项目下同类型的全部节点
+
+        Returns:
+            按输入顺序排列的节点 ID 列表
+        """
+        if not nodes and not replace_existing:
+            return []
+
+        node_ids = [str(uuid.uuid4()) for _ in nodes]
+        payload = [
+            {
+                "node_id": node_id,
+                "parent_id": str(data.parent_id) if data.parent_id else None,
+                "content": data.content,
+                "layout": layout.model_dump(exclude={"node_id"}) if layout else None,
+            }
+            for node_id, (data, layout) in zip(node_ids, nodes)
+        ]
+
+        response = await self._client.post(
+            f"{self._rest_url}/rpc/insert_story_nodes",
+            json={
+                "p_project_id": project_id,
+                "p_type": node_type,
+                "p_nodes": payload,
+                "p_replace": replace_existing,
+            },
+        )
+        response.raise_for_status()
+
+        return node_ids
+
+    async def _get_rows_by_ids(
+        self, table: str, id_column: str, ids: list[str], select: str = "*"
+    ) -> dict[str, dict[str, Any]]:
+        """按主键批量读取行，返回 {id: row}（不存在的 ID 不出现在结果中）"""
+        if not ids:
+            return {}
+
+        response = await self._client.get(
+            f"{self._rest_url}/{table}",
+            params={id_column: f"in.({','.join(str(i) for i in ids)})", "select": select},
+        )
+        response.raise_for_status()
+        return {str(row[id_column]): row for row in response.json() or []}
+
     async def get_node(self, node_id: str) -> NodeResponse | None:
         """获取节点详情"""
         response = await self._client.get(
@@ -960,67 +1024,98 @@ class DatabaseService:
 
     # ===== Helper Methods =====
 
-    async def _count_nodes(self, project_id: str) -> int:
-        """统计项目节点数"""
-        response = await self._client.get(
-            f"{self._rest_url}/story_nodes",
-            params={"project_id": f"eq.{project_id}", "select": "node_id"},
-            headers={**self._headers, "Prefer": "count=exact"},
+    async def count_rows(
+        self,
+        table: str,
+        filters: dict[str, Any] | None = None,
+        mode: CountMode = "exact",
+    ) -> int:
+        """
+        统计表中匹配过滤条件的行数
+
+        使用 HEAD 请求，只返回 Content-Range 头，不传输任何行数据。
+        filters 中的 select/order/limit/offset 会被忽略，可直接传入列表查询的参数。
+        """
+        params = {k: v for k, v in (filters or {}).items() if k not in _NON_FILTER_PARAMS}
+        response = await self._client.head(
+            f"{self._rest_url}/{table}",
+            params=params,
+            headers={"Prefer": f"count={mode}"},
         )
-        count_header = response.headers.get("content-range", "0-0/0")
-        try:
-            return int(count_header.split("/")[1])
-        except (ValueError, IndexError):
-            return len(response.json() or [])
+        response.raise_for_status()
 
-    async def _count_episodes(self, project_id: str) -> int:
-        """统计已生成集数"""
-        response = await self._client.get(
-            f"{self._rest_url}/story_nodes",
-            params={"project_id": f"eq.{project_id}", "type": "eq.episode", "select": "node_id"},
-            headers={**self._headers, "Prefer": "count=exact"},
+        total = _parse_content_range(response.headers.get("content-range"))
+        if total is None:
+            logger.warning("Missing count in Content-Range", table=table, mode=mode)
+            return 0
+        return total
+
+    async def fetch_all_rows(
+        self,
+        table: str,
+        params: dict[str, Any] | None = None,
+        page_size: int = 1000,
+    ) -> list[dict[str, Any]]:
+        """
+        分页读取表中所有匹配的行
+
+        PostgREST 的 db-max-rows 会静默截断不带 limit 的响应，这里按 limit/offset 逐页读取，
+        直到返回的行数少于 page_size（page_size 不应超过 db-max-rows，Supabase 默认 1000）。
+        分页需要稳定的顺序：params 中没有 order 时按 id 排序。请求失败时抛出异常，
+        不返回不完整的结果。
+        """
+        params = {"select": "*", "order": "id", **(params or {})}
+        rows: list[dict[str, Any]] = []
+        while True:
+            response = await self._client.get(
+                f"{self._rest_url}/{table}",
+                params={**params, "limit": page_size, "offset": len(rows)},
+            )
+            response.raise_for_status()
+            page = response.json() or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+
+    async def count_project_nodes(self, project_ids: list[str]) -> dict[str, tuple[int, int]]:
+        """
+        批量统计项目的节点数和剧集数（一次 RPC）
+
+        Returns:
+            {project_id: (node_count, episode_count)}，没有节点的项目也会返回 (0, 0)
+        """
+        if not project_ids:
+            return {}
+
+        response = await self._client.post(
+            f"{self._rest_url}/rpc/count_project_nodes",
+            json={"p_project_ids": [str(pid) for pid in project_ids]},
         )
-        count_header = response.headers.get("content-range", "0-0/0")
-        try:
-            return int(count_header.split("/")[1])
-        except (ValueError, IndexError):
-            return len(response.json() or [])
+        response.raise_for_status()
+        return {
+            str(row["project_id"]): (int(row["node_count"]), int(row["episode_count"]))
+            for row in response.json() or []
+        }
 
     async def count_projects(self, user_id: str) -> int:
         """统计用户项目总数"""
-        response = await self._client.get(
-            f"{self._rest_url}/projects",
-            params={"user_id": f"eq.{user_id}", "select": "id"},
-            headers={**self._headers, "Prefer": "count=exact"},
-        )
-        count_header = response.headers.get("content-range", "0-0/0")
-        try:
-            return int(count_header.split("/")[1])
-        except (ValueError, IndexError):
-            return len(response.json() or [])
+        return await self.count_rows("projects", {"user_id": f"eq.{user_id}"})
 
     async def count_jobs(
         self,
         project_id: str | None = None,
         status: str | None = None,
     ) -> int:
-        """统计任务总数"""
-        params = {"select": "job_id"}
+        """统计任务总数（不带过滤条件时统计全表，使用 estimated 避免全表 COUNT）"""
+        params = {}
         if project_id:
             params["project_id"] = f"eq.{project_id}"
         if status:
             params["status"] = f"eq.{status}"
 
-        response = await self._client.get(
-            f"{self._rest_url}/job_queue",
-            params=params,
-            headers={**self._headers, "Prefer": "count=exact"},
+        return await self.count_rows(
+            "job_queue", params, mode="exact" if params else "estimated"
         )
-        count_header = response.headers.get("content-range", "0-0/0")
-        try:
-            return int(count_header.split("/")[1])
-        except (ValueError, IndexError):
-            return len(response.json() or [])
 
     # ===== v6.0 Episodes CRUD =====
 
@@ -1093,6 +1188,10 @@ class DatabaseService:
         result = response.json()
         return result[0] if result else None
 
+    async def get_episodes_by_ids(self, episode_ids: list[str]) -> dict[str, dict[str, Any]]:
+        """批量获取剧集详情"""
+        return await self._get_rows_by_ids("episodes", "episode_id", episode_ids)
+
     async def update_episode(
         self,
         episode_id: str,
@@ -1150,38 +1249,82 @@ class DatabaseService:
     # ===== v6.0 Canvas Management =====
 
     async def get_episode_canvas(self, episode_id: str) -> dict[str, Any] | None:
-        """获取剧集画布数据"""
+        """获取剧集画布数据（节点、连线、视口和版本号）"""
         response = await self._client.get(
             f"{self._rest_url}/episodes",
-            params={"episode_id": f"eq.{episode_id}", "select": "canvas_data"},
+            params={
+                "episode_id": f"eq.{episode_id}",
+                "select": "canvas_data,canvas_version,canvas_viewport",
+            },
         )
         response.raise_for_status()
         result = response.json()
-        if result and result[0].get("canvas_data"):
-            canvas_data = result[0]["canvas_data"]
-            canvas_data["episode_id"] = episode_id
-            return canvas_data
-        return None
+        if not result:
+            return None
 
-    async def save_episode_canvas(
+        row = result[0]
+        canvas_data = row.get("canvas_data") or {}
+        return {
+            "episode_id": episode_id,
+            "version": row.get("canvas_version") or 0,
+            # 迁移 015 之前的视口保存在 canvas_data 中
+            "viewport": row.get("canvas_viewport") or canvas_data.get("viewport") or {},
+            "nodes": canvas_data.get("nodes") or [],
+            "connections": canvas_data.get("connections") or [],
+        }
+
+    async def apply_canvas_delta(
         self,
         episode_id: str,
-        canvas_data: dict[str, Any],
-    ) -> dict[str, Any]:
-        """保存剧集画布数据"""
-        payload = {
-            "canvas_data": canvas_data,
-            "updated_at": datetime.now(timezone.utc).isoformat(),
-        }
+        ops: list[dict[str, Any]],
+        base_version: int | None = None,
+    ) -> int | None:
+        """
+        在服务端合并画布增量操作（见迁移 015 的 apply_canvas_delta）
 
-        response = await self._client.patch(
-            f"{self._rest_url}/episodes",
-            params={"episode_id": f"eq.{episode_id}"},
-            json=payload,
-            headers=self._headers,
+        Returns:
+            保存后的版本号；剧集不存在时返回 None
+
+        Raises:
+            CanvasVersionConflict: base_version 与当前版本不一致
+        """
+        response = await self._client.post(
+            f"{self._rest_url}/rpc/apply_canvas_delta",
+            json={"p_episode_id": episode_id, "p_base_version": base_version, "p_ops": ops},
         )
         response.raise_for_status()
-        return canvas_data
+        result = response.json() or {}
+
+        if not result.get("found"):
+            return None
+        if result.get("conflict"):
+            raise CanvasVersionConflict(episode_id, result["version"])
+        return result["version"]
+
+    async def save_episode_canvas(
+        self,
+        episode_id: str,
+        canvas_data: dict[str, Any],
+        base_version: int | None = None,
+    ) -> dict[str, Any] | None:
+        """全量保存剧集画布（节点和连线整体替换，视口单独写入）"""
+        version = await self.apply_canvas_delta(
+            episode_id,
+            [
+                {
+                    "op": "replace",
+                    "nodes": canvas_data.get("nodes") or [],
+                    "connections": canvas_data.get("connections") or [],
+                }
+            ],
+            base_version=base_version,
+        )
+        if version is None:
+            return None
+
+        if canvas_data.get("viewport"):
+            await self.update_episode_viewport(episode_id, **canvas_data["viewport"])
+        return {**canvas_data, "episode_id": episode_id, "version": version}
 
     async def update_episode_viewport(
         self,
@@ -1189,23 +1332,24 @@ class DatabaseService:
         x: float,
         y: float,
         zoom: float,
-    ) -> dict[str, Any]:
-        """仅更新视口状态"""
-        # 获取现有画布数据
-        existing = await self.get_episode_canvas(episode_id)
+    ) -> dict[str, Any] | None:
+        """
+        仅更新视口状态（单独的 canvas_viewport 列，不读取也不改写节点数据）
 
-        if existing:
-            existing["viewport"] = {"x": x, "y": y, "zoom": zoom}
-            return await self.save_episode_canvas(episode_id, existing)
-        else:
-            # 创建新的画布数据
-            new_canvas = {
-                "episode_id": episode_id,
-                "viewport": {"x": x, "y": y, "zoom": zoom},
-                "nodes": [],
-                "connections": [],
-            }
-            return await self.save_episode_canvas(episode_id, new_canvas)
+        Returns:
+            写入的视口；剧集不存在时返回 None
+        """
+        viewport = {"x": x, "y": y, "zoom": zoom}
+        response = await self._client.patch(
+            f"{self._rest_url}/episodes",
+            params={"episode_id": f"eq.{episode_id}"},
+            json={"canvas_viewport": viewport},
+            headers={"Prefer": "return=minimal,count=exact"},
+        )
+        response.raise_for_status()
+        if _parse_content_range(response.headers.get("content-range")) == 0:
+            return None
+        return viewport
 
     async def sync_shot_nodes_from_canvas(
         self,
@@ -1302,8 +1446,8 @@ class DatabaseService:
         response.raise_for_status()
         result = response.json()
 
-        # 更新剧集的分镜计数
-        await self._update_episode_shot_count(episode_id)
+        # 记录剧集/场景的分镜计数变化（延迟合并写入）
+        self.shot_counters.record(episode_id, scene_id, 1)
 
         return result[0] if result else payload
 
@@ -1342,8 +1486,9 @@ class DatabaseService:
         )
         response.raise_for_status()
 
-        # 更新剧集的分镜计数
-        await self._update_episode_shot_count(episode_id)
+        # 记录剧集/场景的分镜计数变化（延迟合并写入）
+        for payload in payloads:
+            self.shot_counters.record(episode_id, payload["scene_id"], 1)
 
         return response.json() or payloads
 
@@ -1357,6 +1502,10 @@ class DatabaseService:
         result = response.json()
         return result[0] if result else None
 
+    async def get_shot_nodes_by_ids(self, shot_ids: list[str]) -> dict[str, dict[str, Any]]:
+        """批量获取分镜详情"""
+        return await self._get_rows_by_ids("shot_nodes", "shot_id", shot_ids)
+
     async def update_shot_node(
         self,
         shot_id: str,
@@ -1368,8 +1517,8 @@ class DatabaseService:
         thumbnail_url: str | None = None,
         image_url: str | None = None,
         details: dict[str, Any] | None = None,
-    ) -> dict[str, Any]:
-        """更新分镜节点"""
+    ) -> dict[str, Any] | None:
+        """更新分镜节点（分镜不存在时返回 None）"""
         payload = {"updated_at": datetime.now(timezone.utc).isoformat()}
 
         if title is not None:
@@ -1389,6 +1538,7 @@ class DatabaseService:
         if details is not None:
             payload["details"] = details
 
+        # 更新不会改变剧集的分镜数量，直接使用 PATCH 返回的行（return=representation）
         response = await self._client.patch(
             f"{self._rest_url}/shot_nodes",
             params={"shot_id": f"eq.{shot_id}"},
@@ -1396,32 +1546,44 @@ class DatabaseService:
             headers=self._headers,
         )
         response.raise_for_status()
+        result = response.json()
 
-        # 获取 episode_id 以更新计数
-        shot = await self.get_shot_node(shot_id)
-        if shot:
-            await self._update_episode_shot_count(shot["episode_id"])
-
-        return await self.get_shot_node(shot_id) or payload
+        return result[0] if result else None
 
     async def batch_update_shot_positions(
         self,
         episode_id: str,
-        positions: dict[str, tuple[float, float]],
-    ) -> None:
-        """批量更新节点位置"""
-        for shot_id, (x, y) in positions.items():
-            await self.update_shot_node(
-                shot_id=shot_id,
-                position_x=x,
-                position_y=y,
-            )
+        positions: list[dict[str, Any]] | dict[str, tuple[float, float]],
+    ) -> int:
+        """批量更新节点位置
+
+        一次 RPC 更新所有位置，只修改坐标：不逐行回查，也不重新统计分镜数量。
+
+        Args:
+            episode_id: 剧集 ID（只更新属于该剧集的分镜）
+            positions: [{"shot_id", "x", "y"}] 或 {shot_id: (x, y)}
+
+        Returns:
+            实际发生变化的分镜数量
+        """
+        if isinstance(positions, dict):
+            positions = [
+                {"shot_id": shot_id, "x": x, "y": y} for shot_id, (x, y) in positions.items()
+            ]
+        if not positions:
+            return 0
+
+        response = await self._client.post(
+            f"{self._rest_url}/rpc/batch_update_shot_positions",
+            json={"p_episode_id": episode_id, "p_positions": positions},
+        )
+        response.raise_for_status()
+        return response.json() or 0
 
     async def delete_shot_node(self, shot_id: str) -> bool:
         """删除分镜节点"""
-        # 获取 episode_id 以更新计数
+        # 获取 episode_id / scene_id 以更新计数
         shot = await self.get_shot_node(shot_id)
-        episode_id = shot.get("episode_id") if shot else None
 
         # 删除关联的连线
         await self._client.delete(
@@ -1437,39 +1599,32 @@ class DatabaseService:
             params={"shot_id": f"eq.{shot_id}"},
         )
 
-        # 更新剧集计数
-        if episode_id:
-            await self._update_episode_shot_count(episode_id)
+        deleted = response.status_code in (200, 204)
 
-        return response.status_code in (200, 204)
+        # 记录剧集/场景的分镜计数变化（延迟合并写入）
+        if deleted and shot:
+            self.shot_counters.record(shot.get("episode_id"), shot.get("scene_id"), -1)
 
-    async def _update_episode_shot_count(self, episode_id: str) -> None:
-        """更新剧集的分镜计数"""
-        # 统计分镜数量
-        response = await self._client.get(
-            f"{self._rest_url}/shot_nodes",
-            params={
-                "episode_id": f"eq.{episode_id}",
-                "select": "shot_id",
-            },
-            headers={**self._headers, "Prefer": "count=exact"},
+        return deleted
+
+    async def apply_shot_count_deltas(
+        self, episode_deltas: dict[str, int], scene_deltas: dict[str, int]
+    ) -> None:
+        """一次 RPC 把分镜计数增量应用到剧集和场景"""
+        response = await self._client.post(
+            f"{self._rest_url}/rpc/apply_shot_count_deltas",
+            json={"p_episode_deltas": episode_deltas, "p_scene_deltas": scene_deltas},
         )
-        count_header = response.headers.get("content-range", "0-0/0")
-        try:
-            count = int(count_header.split("/")[1])
-        except (ValueError, IndexError):
-            count = len(response.json() or [])
+        response.raise_for_status()
 
-        # 更新剧集
-        await self._client.patch(
-            f"{self._rest_url}/episodes",
-            params={"episode_id": f"eq.{episode_id}"},
-            json={
-                "storyboard_shot_count": count,
-                "updated_at": datetime.now(timezone.utc).isoformat(),
-            },
-            headers=self._headers,
+    async def reconcile_shot_counts(self, episode_ids: list[str] | None = None) -> int:
+        """重新统计剧集和场景的精确分镜计数，返回被修正的行数"""
+        response = await self._client.post(
+            f"{self._rest_url}/rpc/reconcile_shot_counts",
+            json={"p_episode_ids": episode_ids},
         )
+        response.raise_for_status()
+        return response.json() or 0
 
     # ===== v6.0 Scenes CRUD =====
 
@@ -1545,6 +1700,10 @@ class DatabaseService:
         result = response.json()
         return result[0] if result else None
 
+    async def get_scenes_by_ids(self, scene_ids: list[str]) -> dict[str, dict[str, Any]]:
+        """批量获取场景详情"""
+        return await self._get_rows_by_ids("scenes", "scene_id", scene_ids)
+
     async def update_scene(
         self,
         scene_id: str,
@@ -1588,32 +1747,6 @@ class DatabaseService:
         )
         return response.status_code in (200, 204)
 
-    async def _update_scene_shot_count(self, scene_id: str) -> None:
-        """更新场景的分镜计数"""
-        response = await self._client.get(
-            f"{self._rest_url}/shot_nodes",
-            params={
-                "scene_id": f"eq.{scene_id}",
-                "select": "shot_id",
-            },
-            headers={**self._headers, "Prefer": "count=exact"},
-        )
-        count_header = response.headers.get("content-range", "0-0/0")
-        try:
-            count = int(count_header.split("/")[1])
-        except (ValueError, IndexError):
-            count = len(response.json() or [])
-
-        await self._client.patch(
-            f"{self._rest_url}/scenes",
-            params={"scene_id": f"eq.{scene_id}"},
-            json={
-                "shot_count": count,
-                "updated_at": datetime.now(timezone.utc).isoformat(),
-            },
-            headers=self._headers,
-        )
-
     # ===== v6.0 Shot Connections CRUD =====
 
     async def list_shot_connections(self, episode_id: str) -> list[dict[str, Any]]:
@@ -1764,6 +1897,19 @@ class DatabaseService:
             logger.error("Failed to get theme by slug", slug=slug, error=str(e))
             return None
 
+    async def get_theme_library_version(self) -> int | None:
+        """读取题材库版本号（theme_library_version 表）；表不存在或读取失败时返回 None"""
+        try:
+            response = await self._client.get(
+                f"{self._rest_url}/theme_library_version", params={"select": "version"}
+            )
+            response.raise_for_status()
+            rows = response.json() or []
+        except Exception as e:
+            logger.debug("Theme library version unavailable", error=str(e))
+            return None
+        return int(rows[0]["version"]) if rows else None
+
     # ===== Plan History Methods (for Deduplication) =====
 
     async def get_recent_plans(
@@ -1917,53 +2063,82 @@ class DatabaseService:
 
             try:
                 outline_data = json.loads(content.get("content", "{}"))
-                outline_data["projectId"] = project_id
-                outline_data["updatedAt"] = content.get("updated_at")
-                return outline_data
             except json.JSONDecodeError:
                 logger.error("Failed to parse outline content", project_id=project_id)
                 return None
 
+            if outline_data.get("storage") == "incremental":
+                # 增量存储：剧集和骨架文本分别存放在 outline_episodes / outline_batches
+                episodes, skeleton_content = await asyncio.gather(
+                    self.list_outline_episodes(project_id),
+                    self.get_outline_skeleton_content(project_id),
+                )
+                outline_data["episodes"] = episodes
+                outline_data["content"] = skeleton_content
+                outline_data.setdefault("metadata", {})["skeleton_content"] = skeleton_content
+
+            outline_data["projectId"] = project_id
+            outline_data["updatedAt"] = content.get("updated_at")
+            outline_data["version"] = (content.get("metadata") or {}).get("version", 1)
+            return outline_data
+
         except Exception as e:
             logger.error("Failed to get outline", project_id=project_id, error=str(e))
             return None
 
     async def save_outline(self, project_id: str, outline_data: dict[str, Any]) -> bool:
-        """保存项目大纲
+        """保存项目大纲（全量）
 
-        保存到 project_content 表中
+        按增量存储格式写入：大纲头信息一次 upsert（同时递增版本号），
+        剧集写入 outline_episodes，骨架文本写入 outline_batches，
+        最后删除本次没有覆盖到的旧行。
         """
         try:
             import json
 
-            payload = {
-                "project_id": project_id,
-                "content_type": "outline",
-                "title": outline_data.get("title", "未命名大纲"),
-                "content": json.dumps(outline_data),
-                "metadata": {
+            episodes = outline_data.get("episodes") or []
+            content = outline_data.get("content") or ""
+
+            header = {k: v for k, v in outline_data.items() if k not in _OUTLINE_ROW_FIELDS}
+            header["storage"] = "incremental"
+            header_metadata = dict(header.get("metadata") or {})
+            header_metadata.pop("skeleton_content", None)
+            header["metadata"] = header_metadata
+
+            version = await self.bump_outline_header(
+                project_id,
+                title=outline_data.get("title", "未命名大纲"),
+                content=json.dumps(header),
+                metadata={
+                    "storage": "incremental",
                     "total_episodes": outline_data.get("totalEpisodes", 80),
-                    "version": outline_data.get("version", 1),
+                    "chapter_map": header_metadata.get("chapter_map") or [],
+                    "paywall_info": header_metadata.get("paywall_info") or {},
                 },
-                "status": "draft",
-            }
+                reset=True,
+            )
 
-            # 检查是否已存在
-            existing = await self.get_outline(project_id)
-            if existing:
-                # 更新现有记录
-                response = await self._client.patch(
-                    f"{self._rest_url}/project_content",
-                    params={"project_id": f"eq.{project_id}", "content_type": "eq.outline"},
-                    json=payload,
-                )
-            else:
-                # 创建新记录
-                response = await self._client.post(
-                    f"{self._rest_url}/project_content", json=payload
+            writes = [self.upsert_outline_episodes(project_id, episodes, version=version)]
+            if content:
+                writes.append(
+                    self.append_outline_batch(
+                        project_id, batch_index=0, content=content, content_offset=0, version=version
+                    )
                 )
+            await asyncio.gather(*writes)
 
-            response.raise_for_status()
+            # 本次写入的行版本号都是 version，更早的行属于旧大纲
+            stale = {"project_id": f"eq.{project_id}", "version": f"lt.{version}"}
+            responses = await asyncio.gather(
+                self._client.delete(f"{self._rest_url}/outline_episodes", params=stale),
+                self._client.delete(f"{self._rest_url}/outline_batches", params=stale),
+            )
+            for response in responses:
+                response.raise_for_status()
+
+            logger.info(
+                "Outline saved", project_id=project_id, version=version, episodes=len(episodes)
+            )
             return True
 
         except Exception as e:
@@ -1973,9 +2148,22 @@ class DatabaseService:
     async def get_outline_node(self, project_id: str, node_id: str) -> dict[str, Any] | None:
         """获取大纲节点（剧集）
 
-        从 episodes 表中获取
+        优先从 outline_episodes 按 episodeId 读取单行，找不到时再查 episodes 表
         """
         try:
+            response = await self._client.get(
+                f"{self._rest_url}/outline_episodes",
+                params={
+                    "project_id": f"eq.{project_id}",
+                    "data->>episodeId": f"eq.{node_id}",
+                    "select": "data",
+                },
+            )
+            response.raise_for_status()
+            result = response.json()
+            if result:
+                return result[0]["data"]
+
             response = await self._client.get(
                 f"{self._rest_url}/episodes",
                 params={
@@ -1999,16 +2187,38 @@ class DatabaseService:
     async def update_outline_node(
         self, project_id: str, node_id: str, data: dict[str, Any]
     ) -> bool:
-        """更新大纲节点"""
+        """更新大纲节点
+
+        只修改该剧集在 outline_episodes 中的一行（服务端合并字段），不读写完整大纲。
+        旧版整体存储的大纲先转换为按行存储，再修改。
+        """
         try:
-            # 构建更新 payload
-            payload = {}
+            patch: dict[str, Any] = {}
+            if "title" in data:
+                patch["title"] = data["title"]
+            if "content" in data:
+                patch["summary"] = data["content"]
+            if "metadata" in data:
+                patch["metadata"] = data["metadata"]
+
+            if await self.patch_outline_episode(project_id, node_id, patch) is not None:
+                return True
+
+            header = await self.get_outline_header(project_id)
+            if header and (header.get("metadata") or {}).get("storage") != "incremental":
+                outline = await self.get_outline(project_id)
+                if outline and await self.save_outline(project_id, outline):
+                    logger.info("Outline converted to row storage", project_id=project_id)
+                    if await self.patch_outline_episode(project_id, node_id, patch) is not None:
+                        return True
+
+            # 不在大纲中的节点：按 episodes 表的剧集处理
+            payload: dict[str, Any] = {}
             if "title" in data:
                 payload["title"] = data["title"]
             if "content" in data:
                 payload["summary"] = data["content"]
             if "metadata" in data:
-                # 合并 metadata
                 import json
 
                 payload["script_scenes"] = json.dumps(data["metadata"])
@@ -2027,6 +2237,225 @@ class DatabaseService:
             logger.error("Failed to update outline node", node_id=node_id, error=str(e))
             return False
 
+    async def patch_outline_episode(
+        self, project_id: str, episode_id: str, patch: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """按 episodeId 修改单个大纲剧集行（见迁移 016），剧集不存在时返回 None"""
+        response = await self._client.post(
+            f"{self._rest_url}/rpc/patch_outline_episode",
+            json={"p_project_id": project_id, "p_episode_id": episode_id, "p_patch": patch},
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def bump_outline_header(
+        self,
+        project_id: str,
+        title: str,
+        content: str,
+        metadata: dict[str, Any],
+        reset: bool = False,
+    ) -> int:
+        """Upsert 大纲头信息并递增版本号（一次请求），返回新版本号"""
+        response = await self._client.post(
+            f"{self._rest_url}/rpc/bump_outline_header",
+            json={
+                "p_project_id": project_id,
+                "p_title": title,
+                "p_content": content,
+                "p_metadata": metadata,
+                "p_reset": reset,
+            },
+        )
+        response.raise_for_status()
+        return int(response.json())
+
+    # ===== Incremental Outline Storage =====
+
+    async def get_outline_header(self, project_id: str) -> dict[str, Any] | None:
+        """获取大纲头信息（不含正文），用于读取版本号和增量存储状态"""
+        response = await self._client.get(
+            f"{self._rest_url}/project_content",
+            params={
+                "project_id": f"eq.{project_id}",
+                "content_type": "eq.outline",
+                "select": "id,title,metadata,updated_at",
+                "limit": "1",
+            },
+        )
+        response.raise_for_status()
+        result = response.json()
+        return result[0] if result else None
+
+    async def upsert_outline_episodes(
+        self,
+        project_id: str,
+        episodes: list[dict[str, Any]],
+        version: int,
+        batch_index: int = 0,
+    ) -> int:
+        """批量 upsert 大纲剧集（一次请求），返回写入行数"""
+        if not episodes:
+            return 0
+
+        rows = [
+            {
+                "project_id": project_id,
+                "episode_number": episode["episodeNumber"],
+                "chapter_number": episode.get("chapterNumber"),
+                "batch_index": batch_index,
+                "data": episode,
+                "version": version,
+            }
+            for episode in episodes
+        ]
+        response = await self._client.post(
+            f"{self._rest_url}/outline_episodes",
+            params={"on_conflict": "project_id,episode_number"},
+            json=rows,
+            headers={**self._headers, "Prefer": "resolution=merge-duplicates,return=minimal"},
+        )
+        response.raise_for_status()
+        return len(rows)
+
+    async def append_outline_batch(
+        self,
+        project_id: str,
+        batch_index: int,
+        content: str,
+        content_offset: int,
+        version: int,
+    ) -> None:
+        """追加骨架文本片段
+
+        片段按 (project_id, content_offset) 唯一：同一批次多次保存时各自追加，
+        只有从同一偏移重新写入（全量保存）时才覆盖。
+        """
+        response = await self._client.post(
+            f"{self._rest_url}/outline_batches",
+            params={"on_conflict": "project_id,content_offset"},
+            json={
+                "project_id": project_id,
+                "batch_index": batch_index,
+                "content_offset": content_offset,
+                "content": content,
+                "version": version,
+            },
+            headers={**self._headers, "Prefer": "resolution=merge-duplicates,return=minimal"},
+        )
+        response.raise_for_status()
+
+    async def clear_outline_rows(self, project_id: str) -> None:
+        """清除项目的增量大纲行（重新生成大纲时调用）"""
+        await asyncio.gather(
+            self._client.delete(
+                f"{self._rest_url}/outline_episodes", params={"project_id": f"eq.{project_id}"}
+            ),
+            self._client.delete(
+                f"{self._rest_url}/outline_batches", params={"project_id": f"eq.{project_id}"}
+            ),
+        )
+
+    async def list_outline_episodes(
+        self, project_id: str, since_version: int | None = None
+    ) -> list[dict[str, Any]]:
+        """获取增量存储的大纲剧集，可只取 version > since_version 的行"""
+        params = {
+            "project_id": f"eq.{project_id}",
+            "select": "data",
+            "order": "episode_number.asc",
+        }
+        if since_version is not None:
+            params["version"] = f"gt.{since_version}"
+
+        response = await self._client.get(f"{self._rest_url}/outline_episodes", params=params)
+        response.raise_for_status()
+        return [row["data"] for row in response.json() or []]
+
+    async def list_outline_batches(
+        self, project_id: str, since_version: int | None = None
+    ) -> list[dict[str, Any]]:
+        """获取骨架文本片段（按偏移排序），可只取 version > since_version 的片段"""
+        params = {
+            "project_id": f"eq.{project_id}",
+            "select": "batch_index,content_offset,content,version",
+            "order": "content_offset.asc",
+        }
+        if since_version is not None:
+            params["version"] = f"gt.{since_version}"
+
+        response = await self._client.get(f"{self._rest_url}/outline_batches", params=params)
+        response.raise_for_status()
+        return response.json() or []
+
+    async def get_outline_skeleton_content(self, project_id: str) -> str:
+        """拼接增量存储的完整骨架文本"""
+        batches = await self.list_outline_batches(project_id)
+        return "".join(batch["content"] for batch in batches)
+
+    async def get_outline_delta(self, project_id: str, since_version: int = 0) -> dict[str, Any]:
+        """获取自 since_version 以来的大纲增量
+
+        Returns:
+            {
+                "version": 当前版本号,
+                "full": 是否为全量结果（非增量存储或无法计算增量时为 True）,
+                "episodes": 变更的剧集,
+                "contentAppends": 新增的骨架文本片段 [{"offset", "content"}],
+                "metadata": 大纲头信息中的 metadata,
+            }
+        """
+        header = await self.get_outline_header(project_id)
+        if not header:
+            return {
+                "version": 0,
+                "full": True,
+                "episodes": [],
+                "contentAppends": [],
+                "metadata": {},
+            }
+
+        metadata = header.get("metadata") or {}
+        version = metadata.get("version", 1)
+
+        if version <= since_version:
+            return {
+                "version": version,
+                "full": False,
+                "episodes": [],
+                "contentAppends": [],
+                "metadata": metadata,
+            }
+
+        if metadata.get("storage") != "incremental":
+            outline = await self.get_outline(project_id) or {}
+            return {
+                "version": version,
+                "full": True,
+                "episodes": outline.get("episodes", []),
+                "contentAppends": [{"offset": 0, "content": outline.get("content", "")}],
+                "metadata": metadata,
+            }
+
+        # 增量行在 base_version 时被重建（重新生成），更早的版本只能取全量
+        if since_version < metadata.get("base_version", 0):
+            since_version = 0
+
+        episodes, batches = await asyncio.gather(
+            self.list_outline_episodes(project_id, since_version=since_version),
+            self.list_outline_batches(project_id, since_version=since_version),
+        )
+        return {
+            "version": version,
+            "full": since_version == 0,
+            "episodes": episodes,
+            "contentAppends": [
+                {"offset": batch["content_offset"], "content": batch["content"]}
+                for batch in batches
+            ],
+            "metadata": metadata,
+        }
+
     # ===== Story Plans Methods =====
 
     async def get_plan(self, plan_id: str) -> dict[str, Any] | None:
@@ -2102,6 +2531,8 @@ class DatabaseService:
             review = result[0]
             # 转换字段名称为驼峰式
             return {
+                "reviewId": review.get("review_id"),
+                "status": review.get("status", "completed"),
                 "generatedAt": review.get("created_at"),
                 "overallScore": review.get("overall_score"),
                 "categories": review.get("categories", {}),
@@ -2117,7 +2548,12 @@ class DatabaseService:
             return None
 
     async def save_outline_review(self, project_id: str, review_data: dict[str, Any]) -> bool:
-        """保存大纲审阅结果"""
+        """保存大纲审阅结果
+
+        review_data 带 reviewId 时更新该条审阅记录（逐章审阅的进度保存），
+        否则新建一条记录，并把新记录的 reviewId 写回 review_data。
+        status 为 pending 表示审阅仍在进行中。
+        """
         try:
             # 获取当前用户ID
             # 注意：实际应该从请求上下文中获取
@@ -2135,11 +2571,25 @@ class DatabaseService:
                 "issues": review_data.get("issues", []),
                 "summary": review_data.get("summary", ""),
                 "recommendations": review_data.get("recommendations", []),
-                "status": "completed",
+                "status": review_data.get("status", "completed"),
             }
 
+            review_id = review_data.get("reviewId")
+            if review_id:
+                payload.pop("user_id")
+                response = await self._client.patch(
+                    f"{self._rest_url}/content_reviews",
+                    params={"review_id": f"eq.{review_id}"},
+                    json=payload,
+                )
+                response.raise_for_status()
+                return True
+
             response = await self._client.post(f"{self._rest_url}/content_reviews", json=payload)
             response.raise_for_status()
+            result = response.json()
+            if result:
+                review_data["reviewId"] = result[0].get("review_id")
             return True
 
         except Exception as e:
@@ -2207,6 +2657,48 @@ class DatabaseService:
             logger.error("Failed to save chapter review", chapter_id=chapter_id, error=str(e))
             return False
 
+    async def get_cached_reviews(
+        self, project_id: str, cache_keys: list[str]
+    ) -> dict[str, dict[str, Any]]:
+        """按缓存键批量读取缓存的审阅报告（一次请求），返回 {cache_key: review_report}"""
+        if not cache_keys:
+            return {}
+
+        response = await self._client.get(
+            f"{self._rest_url}/review_cache",
+            params={
+                "project_id": f"eq.{project_id}",
+                "cache_key": f"in.({','.join(cache_keys)})",
+                "select": "cache_key,review_report",
+            },
+        )
+        response.raise_for_status()
+        return {row["cache_key"]: row["review_report"] for row in response.json() or []}
+
+    async def save_cached_review(
+        self,
+        project_id: str,
+        cache_key: str,
+        review_report: dict[str, Any],
+        review_mode: str,
+        content_type: str,
+    ) -> None:
+        """写入（或覆盖同键的）缓存审阅报告"""
+        response = await self._client.post(
+            f"{self._rest_url}/review_cache",
+            params={"on_conflict": "project_id,cache_key"},
+            json={
+                "project_id": project_id,
+                "cache_key": cache_key,
+                "review_mode": review_mode,
+                "content_type": content_type,
+                "overall_score": review_report.get("overall_score"),
+                "review_report": review_report,
+            },
+            headers={**self._headers, "Prefer": "resolution=merge-duplicates,return=minimal"},
+        )
+        response.raise_for_status()
+
     # ===== User Config Methods =====
 
     async def get_user_config(self, project_id: str) -> dict[str, Any]:
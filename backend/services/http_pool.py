@@ -0,0 +1,159 @@
+"""
+HTTP Pool - Supabase REST / Storage 共享的连接池
+
+每个事件循环一个 httpx.AsyncClient（httpx 连接绑定在创建它的事件循环上），
+DatabaseService 和 StorageService 通过 ScopedClient 共用同一个连接池：
+- 安装 h2 时启用 HTTP/2，同一连接上多路复用并发请求
+- keep-alive 连接数和空闲过期时间可配置，复用 TLS 连接
+- 事件循环结束前调用 close_http_client() 关闭该循环的连接；
+  已关闭但未清理的循环在下次获取 client 时被移除并计入 abandoned
+
+统计（get_pool_stats）：请求数、各事件循环的连接数 / 空闲连接数、client 的创建与关闭次数。
+
+Usage:
+    from backend.services.http_pool import ScopedClient, close_http_client
+
+    client = ScopedClient(headers={"apikey": key}, timeout=30.0)
+    response = await client.get(url, params={...})
+
+    # Celery 任务结束、事件循环关闭之前
+    await close_http_client()
+"""
+
+import asyncio
+import importlib.util
+from typing import Any
+
+import httpx
+import structlog
+
+from backend.config import settings
+
+logger = structlog.get_logger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# 事件循环 → 该循环上的共享 client
+_clients: dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+_stats = {"requests": 0, "created": 0, "closed": 0, "abandoned": 0}
+
+
+def _prune_closed_loops() -> None:
+    """移除已关闭事件循环的 client（连接已无法在原循环上正常关闭）"""
+    for loop in [loop for loop in _clients if loop.is_closed()]:
+        _clients.pop(loop)
+        _stats["abandoned"] += 1
+        logger.warning("HTTP client abandoned with closed event loop", loop_id=id(loop))
+
+
+async def _count_request(request: httpx.Request) -> None:
+    _stats["requests"] += 1
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """获取当前事件循环的共享 client（不存在时创建）"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is not None and not client.is_closed:
+        return client
+
+    _prune_closed_loops()
+    http2 = settings.http2_enabled and HTTP2_AVAILABLE
+    client = httpx.AsyncClient(
+        http2=http2,
+        timeout=settings.http_timeout,
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        event_hooks={"request": [_count_request]},
+    )
+    _clients[loop] = client
+    _stats["created"] += 1
+    logger.debug("Created shared HTTP client", loop_id=id(loop), http2=http2)
+    return client
+
+
+async def close_http_client() -> None:
+    """关闭当前事件循环的共享 client"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+        _stats["closed"] += 1
+
+
+def _pool_connections(client: httpx.AsyncClient) -> tuple[int, int]:
+    """(连接数, 空闲连接数)，读取 httpcore 连接池的内部状态"""
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", []) or [])
+    idle = 0
+    for connection in connections:
+        try:
+            idle += bool(connection.is_idle())
+        except Exception:
+            pass
+    return len(connections), idle
+
+
+def get_pool_stats() -> dict[str, Any]:
+    """连接池统计（用于健康检查）"""
+    loops = []
+    for loop, client in list(_clients.items()):
+        connections, idle = _pool_connections(client)
+        loops.append(
+            {
+                "loop_id": id(loop),
+                "loop_closed": loop.is_closed(),
+                "connections": connections,
+                "idle": idle,
+            }
+        )
+    return {
+        **_stats,
+        "http2": settings.http2_enabled and HTTP2_AVAILABLE,
+        "max_connections": settings.http_max_connections,
+        "max_keepalive_connections": settings.http_max_keepalive_connections,
+        "clients": len(_clients),
+        "loops": loops,
+    }
+
+
+class ScopedClient:
+    """
+    带默认请求头的共享 client 视图
+
+    每次请求时获取当前事件循环的共享 client，合并默认请求头和调用方传入的请求头，
+    接口与 httpx.AsyncClient 的 get/post/patch/delete/head 一致。
+    """
+
+    def __init__(self, headers: dict[str, str], timeout: float | None = None):
+        self.headers = headers
+        self._timeout = timeout
+
+    async def request(
+        self, method: str, url: str, *, headers: dict[str, str] | None = None, **kwargs: Any
+    ) -> httpx.Response:
+        if self._timeout is not None:
+            kwargs.setdefault("timeout", self._timeout)
+        return await get_http_client().request(
+            method, url, headers={**self.headers, **(headers or {})}, **kwargs
+        )
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def head(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("HEAD", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
@@ -0,0 +1,165 @@
+"""
+Job Progress Reporter
+
+合并写入的任务进度上报。
+
+小说写作任务原先对 astream_events 的每个 on_chain_end（包括节点内部的每个
+Runnable）都写一次 job_queue 并发布一次 WebSocket 事件，一个任务会产生上千次写入。
+JobProgressReporter 按任务合并进度：
+- 进度增量达到 job_progress_min_delta 时立即写入
+- 否则最多每 job_progress_interval 秒写入一次最新状态（尾随写入保证最后一次更新不丢失）
+- 内容与上次写入相同时不写
+- 状态切换（完成 / 失败）前调用 flush() / close() 立即写入或丢弃待写内容
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable
+
+import structlog
+
+from backend.config import settings
+from backend.schemas.job import JobProgress
+
+logger = structlog.get_logger(__name__)
+
+PublishFn = Callable[[str, str, dict[str, Any]], Awaitable[Any]]
+
+
+class JobProgressReporter:
+    """
+    单个任务的进度上报器
+
+    使用方式:
+        reporter = JobProgressReporter(db, job_id, project_id, job_type, publish=publish_event)
+        await reporter.report(30, "Processing writer")
+        ...
+        await reporter.close()
+    """
+
+    def __init__(
+        self,
+        db: Any,
+        job_id: str,
+        project_id: str | None = None,
+        job_type: str | None = None,
+        publish: PublishFn | None = None,
+        min_interval: float | None = None,
+        min_delta: int | None = None,
+    ):
+        self._db = db
+        self._job_id = job_id
+        self._project_id = project_id
+        self._job_type = job_type
+        self._publish = publish
+        self._min_interval = (
+            settings.job_progress_interval if min_interval is None else min_interval
+        )
+        self._min_delta = settings.job_progress_min_delta if min_delta is None else min_delta
+
+        self._pending: tuple[int, str] | None = None
+        self._written: tuple[int, str] | None = None
+        self._last_write = float("-inf")
+        self._trailing: asyncio.TimerHandle | None = None
+        self._trailing_flush: asyncio.Future | None = None
+        self._lock = asyncio.Lock()
+        self.stats = {"reports": 0, "writes": 0, "coalesced": 0}
+
+    @property
+    def progress(self) -> int:
+        """最近一次上报的进度（含未写入的）"""
+        latest = self._pending or self._written
+        return latest[0] if latest else 0
+
+    async def report(self, progress: int, step: str, force: bool = False) -> None:
+        """上报进度（进度只增不减）；是否立即写入由时间和增量阈值决定"""
+        self.stats["reports"] += 1
+        update = (max(progress, self.progress), step)
+        if update == (self._pending or self._written):
+            return
+
+        self._pending = update
+        written_progress = self._written[0] if self._written else 0
+        elapsed = time.monotonic() - self._last_write
+
+        if (
+            force
+            or update[0] - written_progress >= self._min_delta
+            or elapsed >= self._min_interval
+        ):
+            await self.flush()
+        else:
+            self.stats["coalesced"] += 1
+            self._schedule_trailing(self._min_interval - elapsed)
+
+    async def flush(self) -> None:
+        """立即写入待写的进度"""
+        self._cancel_trailing()
+        async with self._lock:
+            if self._pending is None:
+                return
+            update, self._pending = self._pending, None
+            if update == self._written:
+                return
+
+            self._written = update
+            self._last_write = time.monotonic()
+            self.stats["writes"] += 1
+            await self._write(*update)
+
+    async def close(self, flush: bool = True) -> None:
+        """结束上报；flush=False 时丢弃待写内容（例如随后的状态更新会覆盖进度）"""
+        if flush:
+            await self.flush()
+        else:
+            self._cancel_trailing()
+            # 持锁后不会有进行中的写入；已触发但尚未持锁的尾随写入直接取消，
+            # 保证返回后不会再有进度写入覆盖随后的状态更新
+            async with self._lock:
+                self._pending = None
+                if self._trailing_flush is not None:
+                    self._trailing_flush.cancel()
+                    self._trailing_flush = None
+        logger.debug("Job progress reporter closed", job_id=self._job_id, **self.stats)
+
+    async def _write(self, progress: int, step: str) -> None:
+        try:
+            await self._db.update_job_progress(
+                self._job_id, JobProgress(progress_percent=progress, current_step=step)
+            )
+        except Exception as e:
+            logger.warning("Failed to write job progress", job_id=self._job_id, error=str(e))
+
+        if self._publish is None or self._project_id is None:
+            return
+        # 发布进度更新事件（失败不影响主流程）
+        try:
+            await self._publish(
+                self._project_id,
+                "job.progress",
+                {
+                    "job_id": self._job_id,
+                    "type": self._job_type,
+                    "progress": progress,
+                    "current_step": step,
+                },
+            )
+        except Exception as e:
+            logger.warning("Failed to publish WebSocket event", error=str(e))
+
+    # ===== 尾随写入 =====
+
+    def _schedule_trailing(self, delay: float) -> None:
+        if self._trailing is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._trailing = loop.call_later(max(0.0, delay), self._fire_trailing)
+
+    def _fire_trailing(self) -> None:
+        self._trailing = None
+        self._trailing_flush = asyncio.ensure_future(self.flush())
+
+    def _cancel_trailing(self) -> None:
+        if self._trailing is not None:
+            self._trailing.cancel()
+            self._trailing = None
@@ -0,0 +1,145 @@
+"""
+Data Loaders - 按 ID 读取的批量合并与请求内缓存
+
+同一事件循环轮次内发起的多个 load(id) 会合并为一次 `id=in.(…)` 查询，
+结果按 ID 分发回各个调用方；同一请求内重复读取同一 ID 直接返回缓存结果。
+
+DatabaseLoaders 按请求创建（见 backend.api.deps.get_loaders），
+缓存只在单个请求内有效，写操作之后如需读取最新数据应调用 clear()。
+
+Usage:
+    from backend.api.deps import Loaders
+
+    @router.get("/{project_id}")
+    async def get_project(project_id: UUID, loaders: Loaders):
+        project = await loaders.projects.load(str(project_id))
+
+    # 并发读取多个 ID 只产生一次查询
+    source, target = await loaders.shots.load_many([source_id, target_id])
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Generic, Hashable, Iterable, TypeVar
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# PostgREST 的 in.(…) 参数在 URL 中，限制单次批量的 ID 数量
+DEFAULT_MAX_BATCH_SIZE = 100
+
+
+class DataLoader(Generic[K, V]):
+    """
+    合并同一轮次的按键读取
+
+    batch_fn 接收去重后的键列表，返回 {key: value}；缺失的键解析为 None。
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[K]], Awaitable[dict[K, V]]],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        name: str = "loader",
+    ):
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._name = name
+        self._cache: dict[K, asyncio.Future] = {}
+        self._queue: list[tuple[K, asyncio.Future]] = []
+        # 事件循环只保留任务的弱引用，查询任务完成前由这里持有
+        self._tasks: set[asyncio.Task] = set()
+        self.stats = {"loads": 0, "batches": 0, "keys": 0}
+
+    def load(self, key: K) -> "asyncio.Future[V | None]":
+        """读取单个键（返回可 await 的 Future）"""
+        self.stats["loads"] += 1
+        future = self._cache.get(key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._cache[key] = future
+        if not self._queue:
+            # 等当前轮次的其他协程也提交完键之后再发起查询
+            loop.call_soon(self._dispatch)
+        self._queue.append((key, future))
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> list[V | None]:
+        """读取多个键，按传入顺序返回"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        """写入已知结果（如列表查询得到的行），后续 load 不再查询"""
+        if key in self._cache:
+            return
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._cache[key] = future
+
+    def clear(self, key: K | None = None) -> None:
+        """清除单个键或全部缓存"""
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    def _dispatch(self) -> None:
+        queued, self._queue = self._queue, []
+        for start in range(0, len(queued), self._max_batch_size):
+            task = asyncio.create_task(
+                self._run_batch(queued[start : start + self._max_batch_size])
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: list[tuple[K, asyncio.Future]]) -> None:
+        self.stats["batches"] += 1
+        self.stats["keys"] += len(batch)
+        try:
+            results = await self._batch_fn([key for key, _ in batch])
+        except Exception as e:
+            logger.warning("Batch load failed", loader=self._name, keys=len(batch), error=str(e))
+            for key, future in batch:
+                # 失败结果不缓存，后续 load 重新查询
+                if self._cache.get(key) is future:
+                    del self._cache[key]
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in batch:
+            if not future.done():
+                future.set_result(results.get(key))
+
+
+class DatabaseLoaders:
+    """单个请求内使用的 DatabaseService 批量读取器"""
+
+    def __init__(self, db: Any):
+        self.projects: DataLoader[str, Any] = DataLoader(db.get_projects_by_ids, name="projects")
+        self.episodes: DataLoader[str, dict] = DataLoader(db.get_episodes_by_ids, name="episodes")
+        self.scenes: DataLoader[str, dict] = DataLoader(db.get_scenes_by_ids, name="scenes")
+        self.shots: DataLoader[str, dict] = DataLoader(db.get_shot_nodes_by_ids, name="shots")
+
+    def _loaders(self) -> dict[str, DataLoader]:
+        return {
+            "projects": self.projects,
+            "episodes": self.episodes,
+            "scenes": self.scenes,
+            "shots": self.shots,
+        }
+
+    def clear(self) -> None:
+        """清除全部请求内缓存"""
+        for loader in self._loaders().values():
+            loader.clear()
+
+    def get_stats(self) -> dict[str, dict[str, int]]:
+        """各读取器的调用次数、实际查询批次和查询的键数"""
+        return {name: dict(loader.stats) for name, loader in self._loaders().items()}
@@ -0,0 +1,49 @@
+"""
+Local Cache
+
+进程内 LRU + TTL 缓存，供审阅结果缓存（review_cache）等进程内一级缓存使用。
+
+get() 未命中或条目过期时返回 MISSING 哨兵，缓存值本身可以是 None。
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any
+
+# 未命中标记（区分未命中和缓存值为 None）
+MISSING = object()
+
+
+class LocalCache:
+    """进程内 LRU + TTL 缓存"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Any:
+        """获取缓存值，未命中或已过期返回 MISSING"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
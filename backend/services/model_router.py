@@ -2,8 +2,18 @@
 Model Router Service
 
 实现 Task-Model Routing，将不同任务路由到合适的 LLM。
+
+路由结果按 (user_id, task_type, project_id) 缓存在进程内：
+- 命中时直接返回模型实例，不访问数据库
+- 未配置映射 / API Key 的结果也会缓存（routing_negative_ttl），
+  避免未配置的任务每次都查询数据库
+- api/models.py 修改服务商或映射后调用 invalidate_model_routing() 失效；
+  其他进程（如 Celery worker）的缓存最多在 routing_cache_ttl 秒后过期
 """
 
+import json
+import time
+from dataclasses import dataclass
 from typing import Any
 import structlog
 from langchain_openai import ChatOpenAI
@@ -11,22 +21,142 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_anthropic import ChatAnthropic
 from langchain_core.language_models import BaseChatModel
 
+from backend.config import settings
 from backend.schemas.model_config import TaskType, ProtocolType
 
 logger = structlog.get_logger(__name__)
 
 
+class ModelNotConfiguredError(RuntimeError):
+    """任务没有可用的模型映射或服务商 API Key（结果会被负缓存）"""
+
+
+@dataclass
+class _Resolution:
+    """一次路由解析的结果"""
+
+    expires_at: float
+    user_id: str
+    model: BaseChatModel | None = None
+    model_id: str | None = None
+    error: str | None = None
+    provider_id: str | None = None
+    mapping_id: str | None = None
+
+
 class ModelRouter:
     """模型路由器"""
 
     def __init__(self, db_service):
         self._db = db_service
         self._cache: dict[str, BaseChatModel] = {}
+        self._resolved: dict[tuple[str, str, str | None], _Resolution] = {}
+        self.stats: dict[str, int] = {"hits": 0, "negative_hits": 0, "misses": 0}
 
     async def get_model(
         self, user_id: str, task_type: TaskType, project_id: str | None = None
     ) -> BaseChatModel:
-        """获取任务对应的 LLM 实例"""
+        """获取任务对应的 LLM 实例（命中路由缓存时不访问数据库）"""
+        key = (user_id, task_type.value, project_id)
+        entry = self._resolved.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            if entry.error is not None:
+                self.stats["negative_hits"] += 1
+                raise ModelNotConfiguredError(entry.error)
+            self.stats["hits"] += 1
+            return entry.model
+
+        self.stats["misses"] += 1
+        try:
+            model, mapping, model_id = await self._resolve(user_id, task_type, project_id)
+        except ModelNotConfiguredError as e:
+            self._resolved[key] = _Resolution(
+                expires_at=time.monotonic() + settings.routing_negative_ttl,
+                user_id=user_id,
+                error=str(e),
+            )
+            raise
+
+        self._resolved[key] = _Resolution(
+            expires_at=time.monotonic() + settings.routing_cache_ttl,
+            user_id=user_id,
+            model=model,
+            model_id=model_id,
+            provider_id=_str_or_none(mapping.get("llm_providers", {}).get("id")),
+            mapping_id=_str_or_none(mapping.get("id")),
+        )
+        return model
+
+    async def get_model_id(
+        self, user_id: str, task_type: TaskType, project_id: str | None = None
+    ) -> str | None:
+        """
+        任务实际使用的模型标识（服务商 + 协议 + Base URL + 模型名 + 生效参数）
+
+        与 get_model 共用路由缓存；未配置模型映射时返回 None。
+        """
+        try:
+            await self.get_model(user_id, task_type, project_id)
+        except ModelNotConfiguredError:
+            return None
+        entry = self._resolved.get((user_id, task_type.value, project_id))
+        return entry.model_id if entry is not None else None
+
+    def invalidate(
+        self,
+        user_id: str | None = None,
+        provider_id: str | None = None,
+        mapping_id: str | None = None,
+    ) -> int:
+        """
+        使路由缓存失效，返回移除的条目数
+
+        不传参数时清空全部；否则移除属于该用户、使用该服务商或该映射的条目，
+        以及所有负缓存条目（新建的映射可能让之前未配置的任务变为可用）。
+        修改服务商时同时丢弃该服务商的模型实例（API Key / Base URL 可能已变化）。
+        """
+        if user_id is None and provider_id is None and mapping_id is None:
+            count = len(self._resolved)
+            self._resolved.clear()
+            self._cache.clear()
+            return count
+
+        stale = [
+            key
+            for key, entry in self._resolved.items()
+            if entry.error is not None
+            or (user_id is not None and entry.user_id == user_id)
+            or (provider_id is not None and entry.provider_id == provider_id)
+            or (mapping_id is not None and entry.mapping_id == mapping_id)
+        ]
+        for key in stale:
+            del self._resolved[key]
+
+        if provider_id is not None:
+            for cache_key in [k for k in self._cache if k.startswith(f"{provider_id}:")]:
+                del self._cache[cache_key]
+
+        logger.info(
+            "Model routing cache invalidated",
+            user_id=user_id,
+            provider_id=provider_id,
+            mapping_id=mapping_id,
+            removed=len(stale),
+        )
+        return len(stale)
+
+    def get_stats(self) -> dict[str, Any]:
+        """路由缓存统计"""
+        return {
+            **self.stats,
+            "resolutions": len(self._resolved),
+            "models": len(self._cache),
+        }
+
+    async def _resolve(
+        self, user_id: str, task_type: TaskType, project_id: str | None
+    ) -> tuple[BaseChatModel, dict[str, Any], str]:
+        """查询映射配置并创建（或复用）模型实例，同时返回模型标识"""
         # 查找映射配置
         mapping = await self._db.get_model_mapping(user_id, task_type.value, project_id)
 
@@ -78,13 +208,12 @@ class ModelRouter:
                 task_type=task_type.value,
                 project_id=project_id,
             )
-            raise RuntimeError(
+            raise ModelNotConfiguredError(
                 f"未配置模型映射: 请前往设置 -> LLM 服务商 -> "
                 f"配置 {task_type.value} 的模型映射，或者配置其所属类别的默认模型"
             )
 
         provider = mapping.get("llm_providers", {})
-        cache_key = f"{provider.get('id')}:{mapping['model_name']}"
 
         logger.info(
             "Provider data",
@@ -95,9 +224,6 @@ class ModelRouter:
             protocol=provider.get("protocol"),
         )
 
-        if cache_key in self._cache:
-            return self._cache[cache_key]
-
         api_key = provider.get("api_key")
         if not api_key:
             logger.error(
@@ -105,7 +231,7 @@ class ModelRouter:
                 provider_id=provider.get("id"),
                 provider_keys=list(provider.keys()),
             )
-            raise RuntimeError(
+            raise ModelNotConfiguredError(
                 f"No API key configured for provider {provider.get('name', 'unknown')}"
             )
 
@@ -164,6 +290,25 @@ class ModelRouter:
             )
         # 其他任务保持用户配置或默认 0.7
 
+        # 同一服务商和模型在不同任务温度下是不同的实例
+        cache_key = (
+            f"{provider.get('id')}:{mapping['model_name']}:"
+            f"{parameters.get('temperature', 0.7)}:{parameters.get('max_tokens', 4096)}"
+        )
+        model_id = json.dumps(
+            {
+                "provider": provider.get("id"),
+                "protocol": provider.get("protocol", "openai"),
+                "base_url": provider.get("base_url"),
+                "model": mapping["model_name"],
+                "parameters": parameters,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        if cache_key in self._cache:
+            return self._cache[cache_key], mapping, model_id
+
         model = self._create_model(
             protocol=provider.get("protocol", "openai"),
             api_key=api_key,
@@ -173,7 +318,7 @@ class ModelRouter:
         )
 
         self._cache[cache_key] = model
-        return model
+        return model, mapping, model_id
 
     def _create_model(
         self,
@@ -223,6 +368,10 @@ class ModelRouter:
             raise ValueError(f"Unknown protocol: {protocol}")
 
 
+def _str_or_none(value: Any) -> str | None:
+    return str(value) if value is not None else None
+
+
 _model_router: ModelRouter | None = None
 
 
@@ -236,3 +385,13 @@ def get_model_router() -> ModelRouter:
     if _model_router is None:
         raise RuntimeError("Model router not initialized")
     return _model_router
+
+
+def invalidate_model_routing(
+    user_id: str | None = None,
+    provider_id: str | None = None,
+    mapping_id: str | None = None,
+) -> None:
+    """服务商或映射变更后调用：使当前进程的路由缓存失效（路由器未初始化时忽略）"""
+    if _model_router is not None:
+        _model_router.invalidate(user_id=user_id, provider_id=provider_id, mapping_id=mapping_id)
@@ -0,0 +1,207 @@
+"""
+Outline Store
+
+分批生成大纲时的增量持久化。
+
+旧流程：每完成一批，chat_sse_endpoint 重新解析完整 accumulated_content，
+并通过 save_outline 把完整大纲 JSON（含全部骨架文本两份）写回数据库，
+4 批生成的写入量为 O(n²)。
+
+新流程：
+- 大纲头信息记录已持久化的骨架文本长度和哈希
+- 每批只追加新增的文本片段（outline_batches），只 upsert 本批次产生的章节对应的剧集
+  （outline_episodes）
+- 大纲头信息的 metadata.version 每次保存由 bump_outline_header 原子递增，读取方可通过
+  DatabaseService.get_outline_delta 获取自已知版本以来的增量
+"""
+
+import hashlib
+import json
+from typing import Any
+
+import structlog
+
+from backend.services.database import DatabaseService
+from backend.utils.outline_index import ChapterIndex
+
+logger = structlog.get_logger(__name__)
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class OutlineStore:
+    """
+    增量大纲存储
+
+    accumulated_content 在同一轮生成中只会追加；如果发现已持久化的前缀与当前内容不一致
+    （重新生成、全量保存覆盖等），则清除增量行并从头写入。
+    """
+
+    def __init__(self, db: DatabaseService):
+        self._db = db
+
+    async def save_batch(
+        self,
+        project_id: str,
+        accumulated_content: str,
+        batch_index: int,
+        total_batches: int,
+    ) -> dict[str, Any]:
+        """
+        持久化当前批次新增的大纲内容
+
+        Args:
+            project_id: 项目 ID
+            accumulated_content: 所有已完成批次的累积骨架内容
+            batch_index: 当前批次索引（current_batch_index）
+            total_batches: 总批次数
+
+        Returns:
+            {"version": int, "episodes_written": int, "chars_written": int, "reset": bool}
+        """
+        from backend.api.skeleton_builder import (
+            build_outline_episodes,
+            extract_outline_metadata,
+            extract_story_settings,
+            parse_episode_range,
+        )
+
+        header = await self._db.get_outline_header(project_id)
+        header_metadata = (header or {}).get("metadata") or {}
+        persisted_length = header_metadata.get("content_length", 0)
+
+        # 判断已持久化的前缀是否仍然有效
+        reset = (
+            header_metadata.get("storage") != "incremental"
+            or persisted_length > len(accumulated_content)
+            or header_metadata.get("content_hash")
+            != _content_hash(accumulated_content[:persisted_length])
+        )
+        if reset:
+            if header:
+                await self._db.clear_outline_rows(project_id)
+            persisted_length = 0
+            known_chapter_map = []
+            known_paywall_info = {}
+        else:
+            known_chapter_map = header_metadata.get("chapter_map") or []
+            known_paywall_info = header_metadata.get("paywall_info") or {}
+
+        delta = accumulated_content[persisted_length:]
+
+        # chapter_map 可能只出现在某一批次中，之前批次的已知映射保存在头信息里
+        delta_metadata = extract_outline_metadata(delta) if delta else {}
+        chapter_map = delta_metadata.get("chapter_map") or known_chapter_map
+        paywall_info = delta_metadata.get("paywall_info") or known_paywall_info
+
+        episodes: list[dict[str, Any]] = []
+        if chapter_map:
+            if not known_chapter_map:
+                # 首次拿到 chapter_map：为全部已生成章节构建剧集
+                # 后续批次展开的章节覆盖骨架批次中的简版
+                chapter_index = ChapterIndex(accumulated_content, keep_last=True)
+                chapters = None
+            else:
+                # 只处理本批次新增文本中出现的章节
+                chapter_index = ChapterIndex(delta, keep_last=True)
+                chapters = set(chapter_index.numbers())
+
+            if chapters is None or chapters:
+                episodes = build_outline_episodes(
+                    chapter_index.content,
+                    project_id,
+                    chapter_map,
+                    paywall_info,
+                    chapter_index=chapter_index,
+                    chapters=chapters,
+                )
+
+        total_episodes = sum(
+            len(parse_episode_range(item.get("episodes", ""))) for item in chapter_map
+        )
+        story_settings = extract_story_settings(accumulated_content)
+        outline_header = {
+            "storage": "incremental",
+            "totalEpisodes": total_episodes or 80,
+            "storySettings": story_settings,
+            "metadata": {
+                "chapter_map": chapter_map,
+                "paywall_info": paywall_info,
+                "source": "skeleton_builder",
+                "story_settings": story_settings,
+                "current_batch": batch_index,
+                "total_batches": total_batches,
+                "needs_next_batch": batch_index < total_batches,
+                "batch_progress": f"{batch_index}/{total_batches}",
+            },
+        }
+        header_fields = {
+            "storage": "incremental",
+            "total_episodes": outline_header["totalEpisodes"],
+            "content_length": len(accumulated_content),
+            "content_hash": _content_hash(accumulated_content),
+            "chapter_map": chapter_map,
+            "paywall_info": paywall_info,
+        }
+
+        # 版本号由数据库在 upsert 头信息时原子递增，并发保存不会拿到相同的版本号
+        title = outline_header.get("title", "未命名大纲")
+        content = json.dumps(outline_header)
+        version = await self._db.bump_outline_header(
+            project_id, title=title, content=content, metadata=header_fields, reset=reset
+        )
+
+        try:
+            if delta:
+                await self._db.append_outline_batch(
+                    project_id,
+                    batch_index=batch_index,
+                    content=delta,
+                    content_offset=persisted_length,
+                    version=version,
+                )
+            episodes_written = await self._db.upsert_outline_episodes(
+                project_id, episodes, version=version, batch_index=batch_index
+            )
+        except Exception:
+            # 头信息已记录本批次内容：作废前缀哈希，下次保存从头写入
+            await self._db.bump_outline_header(
+                project_id,
+                title=title,
+                content=content,
+                metadata={**header_fields, "content_hash": None},
+            )
+            raise
+
+        logger.info(
+            "Outline batch persisted incrementally",
+            project_id=project_id,
+            version=version,
+            batch=f"{batch_index}/{total_batches}",
+            chars_written=len(delta),
+            episodes_written=episodes_written,
+            header_bytes=len(json.dumps(outline_header, ensure_ascii=False)),
+            reset=reset,
+        )
+
+        return {
+            "version": version,
+            "episodes_written": episodes_written,
+            "chars_written": len(delta),
+            "reset": reset,
+        }
+
+
+# ===== Factory =====
+
+_outline_store: OutlineStore | None = None
+
+
+def get_outline_store(db: DatabaseService) -> OutlineStore:
+    """获取增量大纲存储实例"""
+    global _outline_store
+    if _outline_store is None:
+        _outline_store = OutlineStore(db)
+    return _outline_store
@@ -0,0 +1,354 @@
+"""
+Prescreen Service
+
+质量审阅前的确定性预筛评分
+
+大纲生成后的每次质量控制都会调用 Editor LLM，即使大纲明显缺章节、缺关键部分（结果
+必然是重新生成），或者结构和张力曲线都已达标。预筛只用规则和张力曲线给出两个子分：
+- 结构分（structure）：关键部分、章节数量、每章必备要素（核心任务 / 核心冲突 / 钩子 /
+  场景清单）、付费卡点设计
+- 节奏分（pacing）：每章 "峰值张力" 组成的实际曲线与 tension_service 标准曲线的偏差
+  （calculate_curve_deviation），以及开篇 / 付费卡点 / 高潮章节的最低张力要求
+  （get_tension_requirements）
+
+总分按 calculate_weights_unified 中 logic / pacing 两个分类的权重加权。
+判定（verdict）：
+- fail:   结构分低于 qc_prescreen_fail_score，不调用 Editor，直接重新生成
+- pass:   结构分和节奏分都不低于 qc_prescreen_pass_score，跳过 Editor
+- review: 其余情况照常交给 Editor
+
+预筛结论与 Editor 评分的一致率由 PrescreenStats 统计（/api/graph/health 中的 prescreen）。
+"""
+
+import re
+from typing import Any, Dict, List, Optional
+
+from backend.services.review_service import calculate_weights_unified
+from backend.services.tension_service import (
+    calculate_curve_deviation,
+    generate_standard_curve,
+    get_tension_requirements,
+)
+from backend.utils.outline_index import ChapterIndex
+
+# 大纲必须包含的关键部分
+REQUIRED_SECTIONS = ["元数据", "核心设定", "人物体系", "情节架构", "章节大纲"]
+
+# 每章必须包含的要素（场景清单由 ChapterIndex 单独识别）
+CHAPTER_ELEMENTS = ["核心任务", "核心冲突", "钩子"]
+
+# 章节的张力值：优先 "峰值张力"，付费卡点章节可能只写 "卡点张力值"
+_TENSION_PATTERNS = [
+    re.compile(r"峰值张力[ \t]*(?:\*\*)?[ \t]*[:：][ \t]*(?:\*\*)?[ \t]*[≥>=]?[ \t]*(\d+(?:\.\d+)?)"),
+    re.compile(r"张力值[ \t]*(?:\*\*)?[ \t]*[:：][ \t]*(?:\*\*)?[ \t]*[≥>=]?[ \t]*(\d+(?:\.\d+)?)"),
+]
+
+# 结构分各项权重
+_STRUCTURE_WEIGHTS = {"sections": 0.30, "chapters": 0.35, "elements": 0.25, "paywall": 0.10}
+
+# 少于该比例的章节标注了张力值时不计算节奏分
+_MIN_CURVE_COVERAGE = 0.5
+
+
+def extract_tension_curve(index: ChapterIndex) -> List[Optional[float]]:
+    """按章节顺序提取每章的张力值，未标注的章节为 None"""
+    curve: List[Optional[float]] = []
+    for number in index.numbers():
+        section = index.section(number)
+        value = None
+        for pattern in _TENSION_PATTERNS:
+            match = pattern.search(section)
+            if match:
+                value = min(float(match.group(1)), 100.0)
+                break
+        curve.append(value)
+    return curve
+
+
+def score_structure(
+    content: str, index: ChapterIndex, expected_chapters: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    结构分
+
+    Returns:
+        {"score": 0-100, "issues": [...]}
+    """
+    issues: List[Dict[str, Any]] = []
+
+    missing_sections = [section for section in REQUIRED_SECTIONS if section not in content]
+    if missing_sections:
+        issues.append(
+            {
+                "category": "logic",
+                "severity": "critical",
+                "description": f"缺少关键部分: {', '.join(missing_sections)}",
+            }
+        )
+    sections_ratio = 1 - len(missing_sections) / len(REQUIRED_SECTIONS)
+
+    chapter_count = len(index)
+    expected = expected_chapters or chapter_count
+    chapters_ratio = min(chapter_count / expected, 1.0) if expected else 0.0
+    if chapter_count < expected:
+        issues.append(
+            {
+                "category": "logic",
+                "severity": "critical" if chapters_ratio < 0.7 else "high",
+                "description": f"章节不完整: 期望{expected}章，实际{chapter_count}章",
+            }
+        )
+
+    incomplete: List[int] = []
+    for entry in index:
+        section = index.section(entry.number)
+        if not entry.has_scene_list or any(element not in section for element in CHAPTER_ELEMENTS):
+            incomplete.append(entry.number)
+    elements_ratio = 1 - len(incomplete) / chapter_count if chapter_count else 0.0
+    if incomplete:
+        shown = ", ".join(str(number) for number in incomplete[:10])
+        issues.append(
+            {
+                "category": "logic",
+                "severity": "high" if elements_ratio < 0.7 else "medium",
+                "location": f"Chapter {shown}" + (" 等" if len(incomplete) > 10 else ""),
+                "description": f"{len(incomplete)} 章缺少必备要素（{'/'.join(CHAPTER_ELEMENTS)}/场景清单）",
+            }
+        )
+
+    has_paywall = "付费卡点" in content
+    if not has_paywall:
+        issues.append({"category": "hook", "severity": "high", "description": "缺少付费卡点专项设计"})
+
+    score = 100 * (
+        _STRUCTURE_WEIGHTS["sections"] * sections_ratio
+        + _STRUCTURE_WEIGHTS["chapters"] * chapters_ratio
+        + _STRUCTURE_WEIGHTS["elements"] * elements_ratio
+        + _STRUCTURE_WEIGHTS["paywall"] * has_paywall
+    )
+    return {"score": round(score), "issues": issues}
+
+
+def score_pacing(index: ChapterIndex, curve: List[Optional[float]]) -> Dict[str, Any]:
+    """
+    节奏分
+
+    Returns:
+        {"score": 0-100 或 None（张力值太少无法评估）, "deviation": 平均偏差, "issues": [...]}
+    """
+    known = [(number, value) for number, value in zip(index.numbers(), curve) if value is not None]
+    if not curve or len(known) < len(curve) * _MIN_CURVE_COVERAGE:
+        return {"score": None, "deviation": None, "issues": []}
+
+    total = len(curve)
+    target = generate_standard_curve(total)
+    numbers = index.numbers()
+    positions = {number: i for i, number in enumerate(numbers)}
+    actual_values = [value for _, value in known]
+    target_values = [target[positions[number]] for number, _ in known]
+    deviation, deviation_points = calculate_curve_deviation(actual_values, target_values)
+
+    issues: List[Dict[str, Any]] = []
+    for point in deviation_points:
+        number = known[point["episode"] - 1][0]
+        if point["severity"] == "high":
+            issues.append(
+                {
+                    "category": "pacing",
+                    "severity": "medium",
+                    "location": f"Chapter {number}",
+                    "description": f"张力 {point['actual']:.0f} 偏离目标曲线 {point['target']:.0f}",
+                }
+            )
+
+    # 关键节点（开篇、付费卡点、高潮章节）必须达到该位置的最低张力要求
+    climax = numbers[min(int(total * 0.875), total - 1)]
+    key_chapters = {numbers[0], climax} | {
+        entry.number for entry in index if "付费卡点" in entry.title
+    }
+    penalty = 0
+    for number, value in known:
+        if number not in key_chapters:
+            continue
+        requirement = get_tension_requirements(positions[number] + 1, total)
+        if value >= requirement["min_tension"]:
+            continue
+        penalty += 10
+        issues.append(
+            {
+                "category": "pacing",
+                "severity": "high",
+                "location": f"Chapter {number}",
+                "description": (
+                    f"张力 {value:.0f} 低于最低要求 {requirement['min_tension']}"
+                    f"（{requirement['description']}）"
+                ),
+            }
+        )
+
+    score = max(0.0, 100 - deviation * 2 - penalty)
+    return {"score": round(score), "deviation": deviation, "issues": issues}
+
+
+def prescreen_content(
+    content: str,
+    expected_chapters: Optional[int] = None,
+    genre_combination: Optional[List[str]] = None,
+    fail_score: Optional[int] = None,
+    pass_score: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    预筛大纲
+
+    Args:
+        content: 大纲全文
+        expected_chapters: 期望章节数（chapter_mapping.total_chapters），None 时按实际章节数
+        genre_combination: 题材组合（user_config.sub_tags），决定结构分 / 节奏分的权重
+        fail_score / pass_score: 判定阈值，默认读取 settings
+
+    Returns:
+        {
+            "verdict": "fail" | "pass" | "review",
+            "overall_score": int,
+            "structure_score": int,
+            "pacing_score": int | None,
+            "curve_deviation": float | None,
+            "tension_curve": [...],
+            "chapters": int,
+            "issues": [...],
+        }
+    """
+    from backend.config import settings
+
+    fail_score = settings.qc_prescreen_fail_score if fail_score is None else fail_score
+    pass_score = settings.qc_prescreen_pass_score if pass_score is None else pass_score
+
+    index = ChapterIndex(content or "")
+    curve = extract_tension_curve(index)
+    structure = score_structure(content or "", index, expected_chapters)
+    pacing = score_pacing(index, curve)
+
+    if pacing["score"] is None:
+        overall = structure["score"]
+    else:
+        weights = calculate_weights_unified(genre_combination or [], "outline")
+        w_structure, w_pacing = weights.get("logic", 0.5), weights.get("pacing", 0.5)
+        weighted = structure["score"] * w_structure + pacing["score"] * w_pacing
+        overall = round(weighted / (w_structure + w_pacing))
+
+    if structure["score"] < fail_score:
+        verdict = "fail"
+    elif structure["score"] >= pass_score and (pacing["score"] or 0) >= pass_score:
+        verdict = "pass"
+    else:
+        verdict = "review"
+
+    return {
+        "verdict": verdict,
+        "overall_score": overall,
+        "structure_score": structure["score"],
+        "pacing_score": pacing["score"],
+        "curve_deviation": pacing["deviation"],
+        "tension_curve": curve,
+        "chapters": len(index),
+        "issues": structure["issues"] + pacing["issues"],
+    }
+
+
+def prescreen_report(result: Dict[str, Any]) -> Dict[str, Any]:
+    """把预筛结果转换为 Editor 审阅报告的格式（跳过 Editor 时作为 review_report）"""
+    categories = {
+        "logic": {"score": result["structure_score"], "comment": "结构预筛"},
+    }
+    if result["pacing_score"] is not None:
+        categories["pacing"] = {"score": result["pacing_score"], "comment": "张力曲线预筛"}
+    for name, category in categories.items():
+        category["issues_count"] = sum(1 for issue in result["issues"] if issue["category"] == name)
+
+    return {
+        "overall_score": result["overall_score"],
+        "categories": categories,
+        "tension_curve": result["tension_curve"],
+        "issues": [{"id": i, **issue} for i, issue in enumerate(result["issues"], 1)],
+        "summary": (
+            f"规则预筛：结构分 {result['structure_score']}，"
+            f"节奏分 {result['pacing_score'] if result['pacing_score'] is not None else '-'}"
+        ),
+        "source": "prescreen",
+        "verdict": result["verdict"],
+    }
+
+
+# ===== 一致率统计 =====
+
+
+class PrescreenStats:
+    """
+    统计预筛结论与 Editor 评分的一致率
+
+    每次 Editor 审阅了预筛过的内容（review 判定，或按 qc_prescreen_audit_rate 抽检的 pass 判定）
+    就记录一次对比：预筛总分与 Editor 评分是否落在 target_score 的同一侧。
+    """
+
+    def __init__(self):
+        self._stats = {
+            "prescreened": 0,
+            "short_circuit_fail": 0,
+            "short_circuit_pass": 0,
+            "audited": 0,
+            "compared": 0,
+            "agreed": 0,
+            "verdict_compared": 0,
+            "verdict_agreed": 0,
+            "abs_error_total": 0.0,
+        }
+
+    def record_verdict(self, verdict: str, short_circuit: bool) -> None:
+        self._stats["prescreened"] += 1
+        if short_circuit:
+            self._stats[f"short_circuit_{verdict}"] += 1
+        elif verdict == "pass":
+            self._stats["audited"] += 1
+
+    def record_llm_score(self, result: Dict[str, Any], llm_score: float, target_score: int) -> bool:
+        """记录一次预筛与 Editor 评分的对比，返回两者是否一致"""
+        llm_passed = llm_score >= target_score
+        agreed = (result["overall_score"] >= target_score) == llm_passed
+        self._stats["compared"] += 1
+        self._stats["agreed"] += agreed
+        self._stats["abs_error_total"] += abs(result["overall_score"] - llm_score)
+        if result["verdict"] != "review":
+            # fail / pass 判定本身是否与 Editor 一致
+            self._stats["verdict_compared"] += 1
+            self._stats["verdict_agreed"] += (result["verdict"] == "pass") == llm_passed
+        return agreed
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        compared = stats.pop("compared")
+        abs_error_total = stats.pop("abs_error_total")
+        return {
+            **stats,
+            "compared": compared,
+            "llm_calls_avoided": stats["short_circuit_fail"] + stats["short_circuit_pass"],
+            "agreement_rate": round(stats["agreed"] / compared, 3) if compared else None,
+            "verdict_agreement_rate": (
+                round(stats["verdict_agreed"] / stats["verdict_compared"], 3)
+                if stats["verdict_compared"]
+                else None
+            ),
+            "mean_abs_error": round(abs_error_total / compared, 2) if compared else None,
+        }
+
+
+# ===== Singleton =====
+
+_prescreen_stats: PrescreenStats | None = None
+
+
+def get_prescreen_stats() -> PrescreenStats:
+    """获取进程内的预筛统计"""
+    global _prescreen_stats
+    if _prescreen_stats is None:
+        _prescreen_stats = PrescreenStats()
+    return _prescreen_stats
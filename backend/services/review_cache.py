@@ -0,0 +1,231 @@
+"""
+Review Cache
+
+按内容哈希缓存质量审阅结果（review_report）。
+
+run_quality_review / run_chapter_review 原先每次都调用 Editor LLM；修改一章后重新触发
+全局审阅会把 80 章全部重审一遍。审阅结果只取决于审阅文本和审阅配置，因此按
+缓存键 = sha256(审阅配置指纹 + 规范化后的文本) 复用：
+- 规范化：统一换行、去掉行尾空白、合并连续空行（只影响缓存键，不改变送审文本）
+- 审阅配置指纹：审阅模式、content_type、Editor 读取的 user_config 字段
+  （sub_tags / ending_type / total_episodes）、Editor Prompt 模板内容、
+  ModelRouter 解析出的 Editor 模型（服务商、模型名和生效参数）和 REVIEW_CACHE_VERSION
+- 存储：review_cache 表（按项目隔离），进程内 LRU 作为一级缓存；
+  缓存键由内容决定，条目不会过期，只会被 LRU 淘汰
+- 只缓存有效的审阅报告（不缓存系统错误报告）
+
+统计中的 llm_calls_avoided 为命中缓存而省去的 Editor 调用次数。
+"""
+
+import copy
+import hashlib
+import json
+import re
+from typing import Any, Iterable, Optional
+
+import structlog
+
+from backend.config import settings
+from backend.services.local_cache import MISSING, LocalCache
+
+logger = structlog.get_logger(__name__)
+
+# 审阅报告格式或解析逻辑变化时递增，使旧缓存全部失效
+REVIEW_CACHE_VERSION = 1
+
+_TRAILING_SPACE_RE = re.compile(r"[ \t　]+$", re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def normalize_review_content(content: str) -> str:
+    """规范化审阅文本（只用于计算缓存键）"""
+    text = content.replace("\r\n", "\n").replace("\r", "\n")
+    text = _TRAILING_SPACE_RE.sub("", text)
+    text = _BLANK_LINES_RE.sub("\n\n", text)
+    return text.strip()
+
+
+def _editor_prompt_hash() -> str:
+    from backend.agents.agent_pool import read_prompt_file
+    from backend.agents.quality_control.editor import EDITOR_PROMPT_PATH
+
+    try:
+        template = read_prompt_file(EDITOR_PROMPT_PATH)
+    except OSError:
+        # Editor 在模板缺失时使用内置的后备 Prompt
+        template = ""
+    return hashlib.sha1(template.encode("utf-8")).hexdigest()
+
+
+async def resolve_editor_model(user_id: str, project_id: Optional[str] = None) -> Optional[str]:
+    """Editor 实际使用的模型标识（与 editor_node 相同的路由），无法解析时返回 None"""
+    from backend.schemas.model_config import TaskType
+    from backend.services.model_router import get_model_router
+
+    try:
+        router = get_model_router()
+    except RuntimeError:
+        return None
+    return await router.get_model_id(user_id, TaskType.EDITOR, project_id)
+
+
+def review_fingerprint(
+    mode: str,
+    content_type: str,
+    user_config: Optional[dict[str, Any]] = None,
+    editor_model: Optional[str] = None,
+) -> str:
+    """审阅配置指纹（默认值与 editor_node 一致；editor_model 见 resolve_editor_model）"""
+    user_config = user_config or {}
+    config = {
+        "version": REVIEW_CACHE_VERSION,
+        "mode": mode,
+        "content_type": content_type,
+        "genre_combination": user_config.get("sub_tags", ["revenge", "romance"]),
+        "ending": user_config.get("ending_type", "HE"),
+        "total_episodes": user_config.get("total_episodes", 80),
+        "prompt": _editor_prompt_hash(),
+        "editor_model": editor_model,
+    }
+    payload = json.dumps(config, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def review_cache_key(content: str, fingerprint: str) -> str:
+    """缓存键：配置指纹 + 规范化文本的 sha256"""
+    digest = hashlib.sha256(fingerprint.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(normalize_review_content(content).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def is_cacheable_report(report: Any) -> bool:
+    """有效的审阅报告才缓存（Editor 无内容或出错时返回的 system 报告不缓存）"""
+    if not isinstance(report, dict) or "overall_score" not in report:
+        return False
+    return not any(
+        isinstance(issue, dict) and issue.get("category") == "system"
+        for issue in report.get("issues") or []
+    )
+
+
+class ReviewCache:
+    """审阅结果缓存（进程内 LRU + review_cache 表）"""
+
+    def __init__(self, maxsize: Optional[int] = None, enabled: Optional[bool] = None):
+        self.enabled = settings.review_cache_enabled if enabled is None else enabled
+        # 缓存键由内容决定，条目不会变旧，不设 TTL
+        self._local = LocalCache(
+            settings.review_cache_size if maxsize is None else maxsize, float("inf")
+        )
+        self._stats = {
+            "lookups": 0,
+            "memory_hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "errors": 0,
+            "llm_calls_avoided": 0,
+        }
+
+    @staticmethod
+    def _local_key(project_id: str, key: str) -> str:
+        return f"{project_id}:{key}"
+
+    def peek(self, project_id: str, key: str) -> Optional[dict[str, Any]]:
+        """只查进程内缓存（不计入统计）"""
+        value = self._local.get(self._local_key(project_id, key))
+        # 返回副本，调用方修改报告不影响缓存
+        return None if value is MISSING else copy.deepcopy(value)
+
+    def contains(self, project_id: str, key: str) -> bool:
+        """进程内缓存中是否有该键（不计入统计）"""
+        return self._local.get(self._local_key(project_id, key)) is not MISSING
+
+    async def get(self, db: Any, project_id: str, key: str) -> Optional[dict[str, Any]]:
+        """查询缓存的审阅报告，未命中返回 None"""
+        if not self.enabled:
+            return None
+        self._stats["lookups"] += 1
+
+        report = self.peek(project_id, key)
+        if report is not None:
+            self._stats["memory_hits"] += 1
+            self._stats["llm_calls_avoided"] += 1
+            return report
+
+        try:
+            found = await db.get_cached_reviews(project_id, [key])
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning("Review cache lookup failed", project_id=project_id, error=str(e))
+            found = {}
+
+        report = found.get(key)
+        if report is None:
+            self._stats["misses"] += 1
+            return None
+
+        self._local.set(self._local_key(project_id, key), copy.deepcopy(report))
+        self._stats["db_hits"] += 1
+        self._stats["llm_calls_avoided"] += 1
+        return report
+
+    async def prefetch(self, db: Any, project_id: str, keys: Iterable[str]) -> int:
+        """一次请求把多个键载入进程内缓存，返回已缓存的键数"""
+        if not self.enabled:
+            return 0
+        missing = [key for key in dict.fromkeys(keys) if not self.contains(project_id, key)]
+        if not missing:
+            return 0
+        try:
+            found = await db.get_cached_reviews(project_id, missing)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning("Review cache prefetch failed", project_id=project_id, error=str(e))
+            return 0
+        for key, report in found.items():
+            self._local.set(self._local_key(project_id, key), report)
+        return len(found)
+
+    async def put(
+        self,
+        db: Any,
+        project_id: str,
+        key: str,
+        report: Any,
+        review_mode: str,
+        content_type: str,
+    ) -> bool:
+        """保存审阅报告；无效报告或写入失败返回 False（失败不影响审阅流程）"""
+        if not self.enabled or not is_cacheable_report(report):
+            return False
+
+        self._local.set(self._local_key(project_id, key), copy.deepcopy(report))
+        try:
+            await db.save_cached_review(project_id, key, report, review_mode, content_type)
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.warning("Review cache write failed", project_id=project_id, error=str(e))
+            return False
+        self._stats["writes"] += 1
+        return True
+
+    def clear(self) -> None:
+        self._local.clear()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {**self._stats, "enabled": self.enabled, "local_entries": len(self._local)}
+
+
+# ===== Singleton =====
+
+_review_cache: ReviewCache | None = None
+
+
+def get_review_cache() -> ReviewCache:
+    """获取进程内的审阅结果缓存"""
+    global _review_cache
+    if _review_cache is None:
+        _review_cache = ReviewCache()
+    return _review_cache
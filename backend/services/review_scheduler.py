@@ -0,0 +1,138 @@
+"""
+Review Scheduler
+
+有界并发的审阅调度器。
+
+逐章审阅是 N 次互相独立的 LLM 往返，串行执行时 80 集大纲需要 80 个往返时间。
+调度器按 LLM 服务商维护进程级信号量，同一服务商的审阅请求最多同时运行
+review_concurrency 个（可通过 review_provider_concurrency 按服务商覆盖），
+不同项目的审阅共享同一服务商的并发额度。信号量按 (事件循环, 服务商) 区分，
+API 事件循环和 Celery worker 的事件循环各自限流。
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Iterable, Optional, TypeVar
+
+import structlog
+
+from backend.config import settings
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_PROVIDER = "default"
+
+
+class ReviewScheduler:
+    """按服务商限流的审阅调度器"""
+
+    def __init__(
+        self,
+        default_limit: Optional[int] = None,
+        provider_limits: Optional[dict[str, int]] = None,
+    ):
+        self._default_limit = default_limit or settings.review_concurrency
+        self._provider_limits = {
+            key.lower(): value
+            for key, value in (provider_limits or settings.review_provider_concurrency).items()
+        }
+        # (事件循环, 服务商) → 信号量；API 和 Celery 各自的事件循环不能共用同一个信号量
+        self._semaphores: dict[tuple, asyncio.Semaphore] = {}
+        self._limits: dict[str, int] = {}
+        self._in_flight: dict[str, int] = {}
+
+    def limit_for(self, provider: str, *aliases: str) -> int:
+        """服务商的并发上限：依次匹配 provider 和别名（名称、协议），否则使用默认值"""
+        for key in (provider, *aliases):
+            if key and key.lower() in self._provider_limits:
+                return max(1, self._provider_limits[key.lower()])
+        return max(1, self._default_limit)
+
+    def slot(self, provider: str, *aliases: str) -> asyncio.Semaphore:
+        """获取当前事件循环上服务商的并发信号量（首次使用时创建）"""
+        loop = asyncio.get_running_loop()
+        key = (loop, provider)
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            # 移除已关闭事件循环的信号量
+            for stale in [k for k in self._semaphores if k[0].is_closed()]:
+                self._semaphores.pop(stale)
+            limit = self.limit_for(provider, *aliases)
+            semaphore = asyncio.Semaphore(limit)
+            self._semaphores[key] = semaphore
+            self._limits[provider] = limit
+            self._in_flight.setdefault(provider, 0)
+        return semaphore
+
+    async def resolve_provider(
+        self, db, user_id: str, task_type: str, project_id: Optional[str] = None
+    ) -> tuple[str, ...]:
+        """
+        解析任务实际使用的服务商
+
+        Returns:
+            (provider_key, name, protocol)，未配置或查询失败时为 ("default",)
+        """
+        try:
+            mapping = await db.get_model_mapping(user_id, task_type, project_id)
+        except Exception as e:
+            logger.warning("Failed to resolve review provider", task_type=task_type, error=str(e))
+            mapping = None
+
+        provider = (mapping or {}).get("llm_providers") or {}
+        if not provider:
+            return (DEFAULT_PROVIDER,)
+        protocol = provider.get("protocol") or ""
+        key = f"{protocol}:{provider.get('id') or provider.get('name')}"
+        return (key, provider.get("name") or "", protocol)
+
+    async def map(
+        self,
+        items: Iterable[T],
+        worker: Callable[[T], Awaitable[R]],
+        provider: tuple[str, ...] = (DEFAULT_PROVIDER,),
+        on_result: Optional[Callable[[T, R], Awaitable[None]]] = None,
+    ) -> list[R]:
+        """
+        在服务商并发额度内执行 worker，结果按 items 顺序返回
+
+        worker 应自行处理单项失败；on_result 在每项完成后（释放额度后）调用，
+        用于增量保存进度。
+        """
+        semaphore = self.slot(*provider)
+        key = provider[0]
+
+        async def run_one(item: T) -> R:
+            async with semaphore:
+                self._in_flight[key] += 1
+                try:
+                    result = await worker(item)
+                finally:
+                    self._in_flight[key] -= 1
+            if on_result is not None:
+                await on_result(item, result)
+            return result
+
+        return await asyncio.gather(*(run_one(item) for item in items))
+
+    def get_stats(self) -> dict[str, Any]:
+        """各服务商的并发上限和正在执行的审阅数"""
+        return {
+            provider: {"limit": limit, "in_flight": self._in_flight[provider]}
+            for provider, limit in self._limits.items()
+        }
+
+
+# ===== Factory =====
+
+_review_scheduler: ReviewScheduler | None = None
+
+
+def get_review_scheduler() -> ReviewScheduler:
+    """获取审阅调度器实例"""
+    global _review_scheduler
+    if _review_scheduler is None:
+        _review_scheduler = ReviewScheduler()
+    return _review_scheduler
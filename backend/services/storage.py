@@ -8,10 +8,10 @@ import os
 import uuid
 from datetime import datetime, timezone
 
-import httpx
 import structlog
 
 from backend.config import settings
+from backend.services.http_pool import ScopedClient
 
 logger = structlog.get_logger(__name__)
 
@@ -29,11 +29,11 @@ class StorageService:
             "apikey": service_key,
             "Authorization": f"Bearer {service_key}",
         }
-        self._client = httpx.AsyncClient(headers=self._headers, timeout=60.0)
+        # 与 DatabaseService 共用连接池（见 http_pool）
+        self._client = ScopedClient(self._headers, timeout=60.0)
     
     async def close(self):
-        """关闭 HTTP 客户端"""
-        await self._client.aclose()
+        """连接池由 http_pool.close_http_client 统一关闭，这里无需释放资源"""
     
     async def ensure_buckets_exist(self) -> None:
         """确保 Bucket 存在"""
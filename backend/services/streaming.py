@@ -1,54 +1,184 @@
 """
 Streaming Callback Handler for LangGraph
 
-提供流式输出支持，通过回调机制在 LLM 生成 token 时实时发送 SSE 事件。
+提供流式输出支持，在 LLM 生成 token 时实时发送 SSE 事件。
+
+每个线程对应一个有界的 StreamChannel：
+- token 在通道内合并，每 stream_coalesce_ms 毫秒或累计 stream_coalesce_chars 个字符发送一次
+- 队列达到 stream_queue_size 时生产者（graph 执行）等待消费者（SSE 客户端）读取，
+  慢客户端不会让服务端内存无限增长
 """
 
 import asyncio
-import json
-from typing import Any, AsyncGenerator, Dict, Optional
+import time
+from typing import Any, AsyncGenerator, Dict, List, Optional
 from langchain_core.callbacks import AsyncCallbackHandler
-from langchain_core.messages import BaseMessage
 from langchain_core.outputs import LLMResult
 import structlog
 
+from backend.config import settings
+
 logger = structlog.get_logger(__name__)
 
+# 通道结束标记
+_STREAM_END = object()
+
+
+class StreamChannel:
+    """
+    单个线程的有界 SSE 事件通道
+
+    生产者调用 put() / put_token()，消费者通过 async for 读取 events()。
+    控制事件（node_start、progress 等）发送前会先发出已合并的 token，保证顺序。
+    """
+
+    def __init__(
+        self,
+        thread_id: str,
+        maxsize: Optional[int] = None,
+        coalesce_ms: Optional[int] = None,
+        coalesce_chars: Optional[int] = None,
+    ):
+        self.thread_id = thread_id
+        self.queue: asyncio.Queue = asyncio.Queue(
+            maxsize=maxsize if maxsize is not None else settings.stream_queue_size
+        )
+        coalesce_ms = coalesce_ms if coalesce_ms is not None else settings.stream_coalesce_ms
+        self._coalesce_seconds = max(coalesce_ms, 0) / 1000
+        self._coalesce_chars = (
+            coalesce_chars if coalesce_chars is not None else settings.stream_coalesce_chars
+        )
+        self._pending: List[str] = []
+        self._pending_chars = 0
+        self._pending_node: Optional[str] = None
+        self._last_flush = time.monotonic()
+        self.closed = False
+        self.stats: Dict[str, Any] = {
+            "events": 0,
+            "tokens": 0,
+            "max_depth": 0,
+            "blocked_ms": 0.0,
+        }
+
+    async def put(self, event: Dict[str, Any]) -> bool:
+        """发送控制事件（队列满时等待）"""
+        if self.closed:
+            return False
+        await self._flush()
+        await self._put(event)
+        return True
+
+    async def put_token(self, token: str, node: Optional[str] = None) -> bool:
+        """发送 token（合并后以 token_delta 事件发出）"""
+        if self.closed or not token:
+            return False
+        if self._pending and node != self._pending_node:
+            await self._flush()
+
+        self._pending.append(token)
+        self._pending_chars += len(token)
+        self._pending_node = node
+        self.stats["tokens"] += 1
+
+        if (
+            self._pending_chars >= self._coalesce_chars
+            or time.monotonic() - self._last_flush >= self._coalesce_seconds
+        ):
+            await self._flush()
+        return True
+
+    async def aclose(self) -> None:
+        """生产者结束：发出剩余 token 和结束标记"""
+        if self.closed:
+            return
+        await self._flush()
+        self.closed = True
+        await self.queue.put(_STREAM_END)
+
+    def abort(self) -> None:
+        """通道被中止（消费者断开或同一线程开启新流）：丢弃未发送的事件，释放等待中的生产者"""
+        self.closed = True
+        self._pending = []
+        self._pending_chars = 0
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        # 仍在读取的消费者随后收到结束标记并退出
+        self.queue.put_nowait(_STREAM_END)
+
+    async def events(self) -> AsyncGenerator[Dict[str, Any], None]:
+        """按顺序读取事件，直到生产者调用 aclose()"""
+        idle_timeout = self._coalesce_seconds or None
+        while True:
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout=idle_timeout)
+            except asyncio.TimeoutError:
+                # 队列空闲时直接取走合并中的 token，LLM 停顿期间不会滞留
+                event = self._take_pending()
+                if event:
+                    yield event
+                continue
+            if item is _STREAM_END:
+                return
+            yield item
+
+    def _take_pending(self) -> Optional[Dict[str, Any]]:
+        if not self._pending:
+            return None
+        event = {
+            "type": "token_delta",
+            "content": "".join(self._pending),
+            "node": self._pending_node,
+        }
+        self._pending = []
+        self._pending_chars = 0
+        self._last_flush = time.monotonic()
+        return event
+
+    async def _flush(self) -> None:
+        event = self._take_pending()
+        if event:
+            await self._put(event)
+
+    async def _put(self, event: Any) -> None:
+        if self.queue.full():
+            started = time.perf_counter()
+            await self.queue.put(event)
+            self.stats["blocked_ms"] += (time.perf_counter() - started) * 1000
+        else:
+            self.queue.put_nowait(event)
+        self.stats["events"] += 1
+        self.stats["max_depth"] = max(self.stats["max_depth"], self.queue.qsize())
+
 
 class StreamingCallbackHandler(AsyncCallbackHandler):
     """
     流式回调处理器
 
-    在 LLM 生成 token 时，通过队列实时发送事件。
-    与 graph.astream_events() 配合使用，确保 token 事件被正确捕获。
+    在 LLM 生成 token 时，通过线程通道实时发送事件。
+    用于不经过 graph.astream_events() 的直接 LLM 调用。
     """
 
-    def __init__(self, queue: asyncio.Queue, node_name: str):
-        self.queue = queue
+    def __init__(self, channel: StreamChannel, node_name: str):
+        self.channel = channel
         self.node_name = node_name
-        self.tokens: list[str] = []
+        self.tokens_count = 0
 
     async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
         """每当 LLM 生成新 token 时调用"""
         if token:
-            self.tokens.append(token)
-            # 发送 token 事件到队列
-            await self.queue.put(
-                {
-                    "type": "token",
-                    "content": token,
-                    "node": self.node_name,
-                }
-            )
+            self.tokens_count += 1
+            await self.channel.put_token(token, self.node_name)
 
     async def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
         """LLM 生成完成时调用"""
-        logger.debug("LLM streaming completed", node=self.node_name, tokens_count=len(self.tokens))
+        logger.debug(
+            "LLM streaming completed", node=self.node_name, tokens_count=self.tokens_count
+        )
 
     async def on_llm_error(self, error: Exception, **kwargs: Any) -> None:
         """LLM 发生错误时调用"""
         logger.error("LLM streaming error", node=self.node_name, error=str(error))
-        await self.queue.put(
+        await self.channel.put(
             {
                 "type": "error",
                 "message": str(error),
@@ -62,43 +192,67 @@ class StreamingManager:
     流式管理器
 
     管理 SSE 事件流，协调 LangGraph 节点和前端之间的流式通信。
+    每个线程同一时间只有一个通道，新请求会中止同一线程上的旧通道。
     """
 
     def __init__(self):
-        self._queues: Dict[str, asyncio.Queue] = {}
-        self._active_streams: Dict[str, bool] = {}
+        self._channels: Dict[str, StreamChannel] = {}
+
+    def open_stream(self, thread_id: str) -> StreamChannel:
+        """为指定线程创建流式通道"""
+        previous = self._channels.get(thread_id)
+        if previous is not None:
+            previous.abort()
+        channel = StreamChannel(thread_id)
+        self._channels[thread_id] = channel
+        return channel
 
     def create_stream(self, thread_id: str) -> asyncio.Queue:
         """为指定线程创建流式队列"""
-        queue = asyncio.Queue()
-        self._queues[thread_id] = queue
-        self._active_streams[thread_id] = True
-        return queue
+        return self.open_stream(thread_id).queue
+
+    def get_channel(self, thread_id: str) -> Optional[StreamChannel]:
+        """获取指定线程的通道"""
+        return self._channels.get(thread_id)
 
     def get_queue(self, thread_id: str) -> Optional[asyncio.Queue]:
         """获取指定线程的队列"""
-        return self._queues.get(thread_id)
+        channel = self._channels.get(thread_id)
+        return channel.queue if channel else None
 
     async def send_token(self, thread_id: str, token: str, node: str) -> bool:
-        """发送 token 到指定线程的队列"""
-        queue = self._queues.get(thread_id)
-        if queue and self._active_streams.get(thread_id, False):
-            await queue.put({"type": "token", "content": token, "node": node})
-            return True
-        return False
-
-    def end_stream(self, thread_id: str):
-        """结束指定线程的流"""
-        self._active_streams[thread_id] = False
-        if thread_id in self._queues:
-            del self._queues[thread_id]
+        """发送 token 到指定线程的通道"""
+        channel = self._channels.get(thread_id)
+        if channel is None:
+            return False
+        return await channel.put_token(token, node)
+
+    def end_stream(self, thread_id: str, channel: Optional[StreamChannel] = None):
+        """结束指定线程的流（传入 channel 时只结束该通道）"""
+        current = self._channels.get(thread_id)
+        if current is None or (channel is not None and current is not channel):
+            if channel is not None:
+                channel.abort()
+            return
+        current.abort()
+        del self._channels[thread_id]
+        logger.debug("Stream ended", thread_id=thread_id, **current.stats)
 
     def create_callback_handler(self, thread_id: str, node_name: str) -> StreamingCallbackHandler:
         """为指定线程和节点创建回调处理器"""
-        queue = self._queues.get(thread_id)
-        if not queue:
-            queue = self.create_stream(thread_id)
-        return StreamingCallbackHandler(queue, node_name)
+        channel = self._channels.get(thread_id)
+        if channel is None:
+            channel = self.open_stream(thread_id)
+        return StreamingCallbackHandler(channel, node_name)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """活跃通道统计（用于健康检查）"""
+        return {
+            "active_streams": len(self._channels),
+            "queued_events": sum(c.queue.qsize() for c in self._channels.values()),
+            "queue_limit": settings.stream_queue_size,
+            "coalesce_ms": settings.stream_coalesce_ms,
+        }
 
 
 # 全局流式管理器实例
@@ -7,6 +7,7 @@ Sync Service
 架构遵循: 系统架构文档.md Section 3.2 (Data Flow & Persistence)
 """
 
+import asyncio
 import uuid
 from datetime import datetime, timezone
 from typing import Any
@@ -50,13 +51,7 @@ class SyncService:
         """
         logger.info("Syncing story plans", project_id=project_id, count=len(plans))
 
-        # 可选：清除现有方案
-        if clear_existing:
-            existing_nodes = await self._db.list_nodes(project_id, node_type="story_plan")
-            for node in existing_nodes:
-                await self._db.delete_node(str(node.id))
-
-        created_ids = []
+        nodes = []
         for i, plan in enumerate(plans):
             node_data = NodeCreate(
                 project_id=uuid.UUID(project_id),
@@ -78,9 +73,12 @@ class SyncService:
                 position_x=100 + i * 400,
                 position_y=200,
             )
+            nodes.append((node_data, layout))
 
-            node = await self._db.create_node(node_data, layout)
-            created_ids.append(str(node.id))
+        # 清除现有方案与写入新方案在同一次调用中完成
+        created_ids = await self._db.create_nodes(
+            project_id, NodeType.STORY_PLAN.value, nodes, replace_existing=clear_existing
+        )
 
         logger.info("Story plans synced", created_count=len(created_ids))
         return created_ids
@@ -102,7 +100,7 @@ class SyncService:
         """
         logger.info("Syncing beat sheet", project_id=project_id, count=len(beat_sheet))
 
-        created_ids = []
+        nodes = []
         for i, episode in enumerate(beat_sheet):
             node_data = NodeCreate(
                 project_id=uuid.UUID(project_id),
@@ -122,11 +120,9 @@ class SyncService:
                 position_x=100,
                 position_y=500 + i * 150,
             )
+            nodes.append((node_data, layout))
 
-            node = await self._db.create_node(node_data, layout)
-            created_ids.append(str(node.id))
-
-        return created_ids
+        return await self._db.create_nodes(project_id, NodeType.EPISODE_OUTLINE.value, nodes)
 
     async def sync_novel_content(
         self,
@@ -167,8 +163,10 @@ class SyncService:
             position_y=100 + (episode_number - 1) * 300,
         )
 
-        node = await self._db.create_node(node_data, layout)
-        return str(node.id)
+        node_ids = await self._db.create_nodes(
+            project_id, NodeType.NOVEL_CHAPTER.value, [(node_data, layout)]
+        )
+        return node_ids[0]
 
     async def sync_script_data(
         self,
@@ -189,7 +187,7 @@ class SyncService:
         """
         logger.info("Syncing script data", project_id=project_id, count=len(scenes))
 
-        created_ids = []
+        nodes = []
         for i, scene in enumerate(scenes):
             node_data = NodeCreate(
                 project_id=uuid.UUID(project_id),
@@ -209,11 +207,9 @@ class SyncService:
                 position_x=100 + (i % 3) * 400,
                 position_y=100 + (i // 3) * 350,
             )
+            nodes.append((node_data, layout))
 
-            node = await self._db.create_node(node_data, layout)
-            created_ids.append(str(node.id))
-
-        return created_ids
+        return await self._db.create_nodes(project_id, NodeType.SCRIPT_SCENE.value, nodes)
 
     async def sync_storyboard(
         self,
@@ -234,7 +230,7 @@ class SyncService:
         """
         logger.info("Syncing storyboard", project_id=project_id, count=len(shots))
 
-        created_ids = []
+        nodes = []
         for i, shot in enumerate(shots):
             node_data = NodeCreate(
                 project_id=uuid.UUID(project_id),
@@ -257,11 +253,9 @@ class SyncService:
                 position_x=100 + (i % 4) * 350,
                 position_y=100 + (i // 4) * 500,
             )
+            nodes.append((node_data, layout))
 
-            node = await self._db.create_node(node_data, layout)
-            created_ids.append(str(node.id))
-
-        return created_ids
+        return await self._db.create_nodes(project_id, NodeType.STORYBOARD_SHOT.value, nodes)
 
     async def sync_from_state(
         self,
@@ -286,36 +280,43 @@ class SyncService:
         if not project_id:
             raise ValueError("AgentState missing project_id")
 
-        result: dict[str, list[str]] = {}
+        # 各类产物写入互不依赖，并发同步
+        tasks: dict[str, Any] = {}
 
         # 同步故事方案
         if sync_plans and state.get("story_plans"):
-            result["story_plans"] = await self.sync_story_plans(project_id, state["story_plans"])
+            tasks["story_plans"] = self.sync_story_plans(project_id, state["story_plans"])
 
         # 同步分集大纲
         if sync_beat_sheet and state.get("beat_sheet"):
-            result["beat_sheet"] = await self.sync_beat_sheet(project_id, state["beat_sheet"])
+            tasks["beat_sheet"] = self.sync_beat_sheet(project_id, state["beat_sheet"])
 
         # 同步小说内容
         if sync_novel and state.get("novel_content"):
-            node_id = await self.sync_novel_content(
+            tasks["novel"] = self._sync_novel_ids(
                 project_id,
                 state.get("current_episode", 1),
                 state["novel_content"],
             )
-            result["novel"] = [node_id]
 
         # 同步剧本
         if sync_script and state.get("script"):
-            result["script"] = await self.sync_script_data(project_id, state["script"])
+            tasks["script"] = self.sync_script_data(project_id, state["script"])
 
         # 同步分镜
         if sync_storyboard and state.get("storyboard"):
-            result["storyboard"] = await self.sync_storyboard(project_id, state["storyboard"])
+            tasks["storyboard"] = self.sync_storyboard(project_id, state["storyboard"])
+
+        synced = await asyncio.gather(*tasks.values())
+        result: dict[str, list[str]] = dict(zip(tasks.keys(), synced))
 
         logger.info("State synced to DB", project_id=project_id, result=result)
         return result
 
+    async def _sync_novel_ids(self, project_id: str, episode_number: int, content: str) -> list[str]:
+        """同步小说内容，按其他产物的格式返回节点 ID 列表"""
+        return [await self.sync_novel_content(project_id, episode_number, content)]
+
 
 # ===== Factory =====
 
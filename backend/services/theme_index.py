@@ -0,0 +1,188 @@
+"""
+Theme Element Index
+
+爆款元素的关键词倒排索引（中文按字符二元组切分）。
+
+推荐接口原先对主题的每个元素逐个执行 `kw in desc or kw in emotional_impact`，
+元素搜索把 ilike 过滤交给 PostgREST。ElementIndex 在题材库快照构建时一次性建立：
+- 索引字段：name、description、emotional_impact、usage_guidance
+  （JSONB 字段展开为其中所有的键和字符串值）
+- 切分：连续的中日韩字符取单字和相邻二元组
+- 查询：关键词中的中文切分为二元组（单字关键词用单字），倒排表求交得到候选，
+  再用原文子串校验，结果与 `kw in text` 一致；不含中文的关键词直接子串校验
+- 排序：每个命中关键词按所在字段的权重计分（name 最高），
+  再乘以 (1 + effectiveness_score / 100)
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Sequence
+
+# 字段权重：同一关键词命中多个字段时取最高权重
+FIELD_WEIGHTS: Mapping[str, float] = {
+    "name": 3.0,
+    "emotional_impact": 1.5,
+    "description": 1.0,
+    "usage_guidance": 1.0,
+}
+
+_CJK = (
+    "\u3400-\u4dbf"  # CJK 扩展 A
+    "\u4e00-\u9fff"  # CJK 统一汉字
+    "\uf900-\ufaff"  # CJK 兼容汉字
+    "\u3040-\u30ff"  # 平假名 / 片假名
+    "\uac00-\ud7af"  # 谚文
+)
+_CJK_RUN_RE = re.compile(rf"[{_CJK}]+")
+
+
+def normalize(text: str) -> str:
+    """全角转半角、统一大小写"""
+    return unicodedata.normalize("NFKC", text).lower()
+
+
+def flatten(value: Any) -> str:
+    """把 JSONB 字段展开为文本（键和字符串值，用换行分隔）"""
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    parts: list[str] = []
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+        elif isinstance(item, Mapping):
+            for key, child in item.items():
+                parts.append(str(key))
+                stack.append(child)
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+        elif item is not None:
+            parts.append(str(item))
+    return "\n".join(parts)
+
+
+def tokenize(text: str) -> set[str]:
+    """切分为索引词：连续中日韩字符的单字和相邻二元组"""
+    terms: set[str] = set()
+    for run in _CJK_RUN_RE.findall(text):
+        terms.update(run)
+        terms.update(run[i : i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+def _query_terms(keyword: str) -> set[str]:
+    """关键词的查询词：中文部分的二元组（单字部分用单字）"""
+    terms: set[str] = set()
+    for run in _CJK_RUN_RE.findall(keyword):
+        if len(run) == 1:
+            terms.add(run)
+        else:
+            terms.update(run[i : i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+@dataclass(frozen=True)
+class ElementHit:
+    """一条搜索结果"""
+
+    element: dict[str, Any]
+    score: float
+    matched: tuple[str, ...]
+
+
+class ElementIndex:
+    """不可变的元素倒排索引（随题材库快照构建和替换）"""
+
+    def __init__(self, elements: Sequence[dict[str, Any]]):
+        self._elements = tuple(elements)
+        self._theme_ids = tuple(str(e.get("theme_id")) for e in self._elements)
+        self._boost = tuple(1 + float(e.get("effectiveness_score") or 0) / 100 for e in self._elements)
+        # 每个元素每个字段的规范化文本，用于子串校验
+        self._texts: tuple[dict[str, str], ...] = tuple(
+            {f: normalize(flatten(e.get(f))) for f in FIELD_WEIGHTS} for e in self._elements
+        )
+
+        postings: dict[str, set[int]] = {}
+        for pos, texts in enumerate(self._texts):
+            for text in texts.values():
+                for term in tokenize(text):
+                    postings.setdefault(term, set()).add(pos)
+        self._postings: dict[str, frozenset[int]] = {
+            term: frozenset(ids) for term, ids in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self._elements)
+
+    @property
+    def term_count(self) -> int:
+        return len(self._postings)
+
+    def _candidates(self, keyword: str) -> Iterable[int]:
+        terms = _query_terms(keyword)
+        if not terms:
+            # 不含中文的关键词：在全部元素上做子串校验
+            return range(len(self._elements))
+        lists = sorted((self._postings.get(t, frozenset()) for t in terms), key=len)
+        result = set(lists[0])
+        for ids in lists[1:]:
+            if not result:
+                break
+            result &= ids
+        return result
+
+    def search(
+        self,
+        keywords: Iterable[str],
+        *,
+        fields: Iterable[str] | None = None,
+        theme_id: str | None = None,
+        require_all: bool = False,
+        limit: int | None = None,
+    ) -> list[ElementHit]:
+        """
+        多关键词排序查询
+
+        Args:
+            keywords: 关键词列表（任一命中即可，require_all=True 时需全部命中）
+            fields: 只在这些字段中匹配（默认全部索引字段）
+            theme_id: 只返回该主题的元素
+            require_all: 是否要求全部关键词命中
+            limit: 返回数量上限
+
+        Returns:
+            按得分降序（同分按有效性评分、原顺序）排列的结果
+        """
+        keywords = [k for k in dict.fromkeys(normalize(k).strip() for k in keywords) if k]
+        fields = tuple(fields) if fields is not None else tuple(FIELD_WEIGHTS)
+        theme_id = str(theme_id) if theme_id is not None else None
+
+        scores: dict[int, float] = {}
+        matched: dict[int, list[str]] = {}
+        for keyword in keywords:
+            for pos in self._candidates(keyword):
+                if theme_id is not None and self._theme_ids[pos] != theme_id:
+                    continue
+                texts = self._texts[pos]
+                weight = max((FIELD_WEIGHTS[f] for f in fields if keyword in texts[f]), default=0.0)
+                if weight:
+                    scores[pos] = scores.get(pos, 0.0) + weight
+                    matched.setdefault(pos, []).append(keyword)
+
+        if require_all:
+            scores = {pos: s for pos, s in scores.items() if len(matched[pos]) == len(keywords)}
+
+        ranked = sorted(scores, key=lambda pos: (-scores[pos] * self._boost[pos], -self._boost[pos], pos))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [
+            ElementHit(self._elements[pos], round(scores[pos] * self._boost[pos], 4), tuple(matched[pos]))
+            for pos in ranked
+        ]
+
+    def get_stats(self) -> dict[str, Any]:
+        return {"elements": len(self._elements), "terms": len(self._postings)}
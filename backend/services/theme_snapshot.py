@@ -0,0 +1,347 @@
+"""
+Theme Library Snapshot
+
+题材库（themes / theme_elements / hook_templates / theme_examples）的进程内只读快照。
+
+这四张表很小且很少写入，但 /api/themes 的每个路由都要先按 slug 查主题，
+再串行查询元素、钩子、案例和总数。快照在启动时一次性加载整个题材库，
+之后所有读取、分页和计数都在内存中完成，不访问数据库：
+- 快照不可变：刷新时构建新快照并整体替换引用，读取方拿到的快照不会被修改
+- 刷新按版本号判断：题材库表的写入由触发器递增 theme_library_version.version，
+  读取时若距上次检查超过 theme_snapshot_refresh_interval，在后台查询一次版本号，
+  版本变化才重新加载（读取本身不等待）
+- 未应用版本表迁移时退化为按间隔整表重新加载
+- 每张表分页读取（DatabaseService.fetch_all_rows），不会被 PostgREST 的 db-max-rows 截断
+- 返回的行是快照共享的对象，调用方不要修改
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping
+
+import structlog
+
+from backend.config import settings
+from backend.services.theme_index import ElementIndex
+
+logger = structlog.get_logger(__name__)
+
+Row = dict[str, Any]
+
+# 与 PostgREST 查询一致的默认排序
+_TABLE_ORDER = {
+    "themes": ("name", False),
+    "theme_elements": ("effectiveness_score", True),
+    "hook_templates": ("effectiveness_score", True),
+    "theme_examples": ("release_year", True),
+}
+
+
+def _sort_key(column: str):
+    """NULL 视为最大值，与 PostgreSQL 默认一致（ASC 排在最后，DESC 排在最前）"""
+
+    def key(row: Row):
+        value = row.get(column)
+        return (value is None, 0 if value is None else value)
+
+    return key
+
+
+def _sorted(rows: Iterable[Row], column: str, descending: bool) -> tuple[Row, ...]:
+    return tuple(sorted(rows, key=_sort_key(column), reverse=descending))
+
+
+def _group(rows: Iterable[Row], column: str) -> Mapping[str, tuple[Row, ...]]:
+    groups: dict[str, list[Row]] = {}
+    for row in rows:
+        groups.setdefault(str(row.get(column)), []).append(row)
+    return MappingProxyType({key: tuple(values) for key, values in groups.items()})
+
+
+def paginate(rows: tuple[Row, ...], page: int, page_size: int) -> tuple[list[Row], int]:
+    """返回 (当前页行, 总数)"""
+    offset = (page - 1) * page_size
+    return list(rows[offset : offset + page_size]), len(rows)
+
+
+@dataclass(frozen=True)
+class ThemeLibrarySnapshot:
+    """某一版本的题材库只读快照（各列表已按 API 的默认排序排好）"""
+
+    version: int | None
+    loaded_at: float
+    themes: tuple[Row, ...]
+    elements: tuple[Row, ...]
+    hooks: tuple[Row, ...]
+    examples: tuple[Row, ...]
+    themes_by_slug: Mapping[str, Row] = field(repr=False)
+    themes_by_id: Mapping[str, Row] = field(repr=False)
+    elements_by_theme: Mapping[str, tuple[Row, ...]] = field(repr=False)
+    examples_by_theme: Mapping[str, tuple[Row, ...]] = field(repr=False)
+    element_index: ElementIndex = field(repr=False)
+
+    @classmethod
+    def build(
+        cls,
+        version: int | None,
+        themes: list[Row],
+        elements: list[Row],
+        hooks: list[Row],
+        examples: list[Row],
+    ) -> "ThemeLibrarySnapshot":
+        themes_sorted = _sorted(themes, *_TABLE_ORDER["themes"])
+        elements_sorted = _sorted(elements, *_TABLE_ORDER["theme_elements"])
+        examples_sorted = _sorted(examples, *_TABLE_ORDER["theme_examples"])
+        return cls(
+            version=version,
+            loaded_at=time.time(),
+            themes=themes_sorted,
+            elements=elements_sorted,
+            hooks=_sorted(hooks, *_TABLE_ORDER["hook_templates"]),
+            examples=examples_sorted,
+            themes_by_slug=MappingProxyType({t["slug"]: t for t in themes_sorted}),
+            themes_by_id=MappingProxyType({str(t["id"]): t for t in themes_sorted}),
+            elements_by_theme=_group(elements_sorted, "theme_id"),
+            examples_by_theme=_group(examples_sorted, "theme_id"),
+            element_index=ElementIndex(elements_sorted),
+        )
+
+    # ===== 按主题读取 =====
+
+    def theme(self, slug: str) -> Row | None:
+        return self.themes_by_slug.get(slug)
+
+    def theme_elements(self, theme_id: str) -> tuple[Row, ...]:
+        """主题的元素（按 effectiveness_score 降序）"""
+        return self.elements_by_theme.get(str(theme_id), ())
+
+    def theme_examples(self, theme_id: str) -> tuple[Row, ...]:
+        """主题的案例（按 release_year 降序）"""
+        return self.examples_by_theme.get(str(theme_id), ())
+
+    # ===== PostgREST 风格查询 =====
+
+    def table(self, name: str) -> tuple[Row, ...]:
+        tables = {
+            "themes": self.themes,
+            "theme_elements": self.elements,
+            "hook_templates": self.hooks,
+            "theme_examples": self.examples,
+        }
+        if name not in tables:
+            raise ValueError(f"Table '{name}' is not part of the theme library")
+        return tables[name]
+
+    def query(self, table: str, params: Mapping[str, Any]) -> list[Row]:
+        """
+        按 PostgREST 查询参数在快照上查询
+
+        支持 eq / neq / gt / gte / lt / lte / in 过滤、order、limit、offset，
+        以及列名列表形式的 select（不支持嵌入关联表）。
+        """
+        rows: Iterable[Row] = self.table(table)
+
+        # 按主题过滤时直接取分组，避免扫描整表
+        theme_filter = params.get("theme_id")
+        if isinstance(theme_filter, str) and theme_filter.startswith("eq."):
+            if table == "theme_elements":
+                rows = self.theme_elements(theme_filter[3:])
+            elif table == "theme_examples":
+                rows = self.theme_examples(theme_filter[3:])
+
+        for column, expression in params.items():
+            if column in ("select", "order", "limit", "offset"):
+                continue
+            rows = [row for row in rows if _matches(row.get(column), str(expression))]
+
+        if "order" in params:
+            column, _, direction = str(params["order"]).partition(".")
+            rows = _sorted(rows, column, direction.startswith("desc"))
+
+        rows = list(rows)
+        offset = int(params.get("offset", 0))
+        if "limit" in params:
+            rows = rows[offset : offset + int(params["limit"])]
+        elif offset:
+            rows = rows[offset:]
+
+        select = str(params.get("select", "*"))
+        if select != "*":
+            columns = [c.strip() for c in select.split(",")]
+            if any("(" in c for c in columns):
+                raise ValueError("Embedded selects are not supported by the theme snapshot")
+            rows = [{c: row.get(c) for c in columns} for row in rows]
+        return rows
+
+
+def _equals(value: Any, operand: str) -> bool:
+    """按 PostgREST 语义比较列值和过滤值：布尔列比较 true/false，数值列按数值比较（eq.80 匹配 80.0）"""
+    if isinstance(value, bool):
+        return str(value).lower() == operand
+    if isinstance(value, (int, float)):
+        try:
+            return value == float(operand)
+        except ValueError:
+            return False
+    return str(value) == operand
+
+
+def _matches(value: Any, expression: str) -> bool:
+    op, _, operand = expression.partition(".")
+    if op == "in":
+        return any(_equals(value, v.strip()) for v in operand.strip("()").split(","))
+    if op == "eq":
+        return _equals(value, operand)
+    if op == "neq":
+        return not _equals(value, operand)
+    if value is None:
+        return False
+    comparisons = {
+        "gt": lambda a, b: a > b,
+        "gte": lambda a, b: a >= b,
+        "lt": lambda a, b: a < b,
+        "lte": lambda a, b: a <= b,
+    }
+    if op not in comparisons:
+        raise ValueError(f"Unsupported filter operator for theme snapshot: {op}")
+    return comparisons[op](float(value), float(operand))
+
+
+# ===== Store =====
+
+
+class ThemeSnapshotStore:
+    """持有当前快照，负责首次加载和按版本号刷新"""
+
+    def __init__(self, refresh_interval: float | None = None):
+        self._refresh_interval = (
+            settings.theme_snapshot_refresh_interval
+            if refresh_interval is None
+            else refresh_interval
+        )
+        self._snapshot: ThemeLibrarySnapshot | None = None
+        self._last_check = 0.0
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+        self._refreshing: asyncio.Task | None = None
+        self._stats = {"reads": 0, "loads": 0, "version_checks": 0, "load_errors": 0}
+
+    @property
+    def snapshot(self) -> ThemeLibrarySnapshot | None:
+        return self._snapshot
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def get(self) -> ThemeLibrarySnapshot:
+        """返回当前快照；未加载时加载，过期时在后台检查版本号"""
+        self._stats["reads"] += 1
+        if self._snapshot is None:
+            return await self._initial_load()
+
+        if (
+            time.monotonic() - self._last_check >= self._refresh_interval
+            and (self._refreshing is None or self._refreshing.done())
+        ):
+            self._last_check = time.monotonic()
+            self._refreshing = asyncio.create_task(self._refresh_quietly())
+        return self._snapshot
+
+    async def _refresh_quietly(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            # 刷新失败时继续使用旧快照
+            logger.warning("Theme snapshot refresh failed", error=str(e))
+
+    async def _initial_load(self) -> ThemeLibrarySnapshot:
+        async with self._get_lock():
+            # 并发的首次读取只加载一次
+            if self._snapshot is None:
+                await self._replace()
+            return self._snapshot
+
+    async def refresh(self, force: bool = False) -> ThemeLibrarySnapshot:
+        """版本号变化（或 force）时重新加载快照"""
+        async with self._get_lock():
+            current = self._snapshot
+            if current is not None and not force:
+                version = await self._fetch_version()
+                self._last_check = time.monotonic()
+                if version is not None and version == current.version:
+                    return current
+
+            await self._replace()
+            return self._snapshot
+
+    async def _replace(self) -> None:
+        try:
+            self._snapshot = await self._load()
+        except Exception:
+            self._stats["load_errors"] += 1
+            raise
+        self._last_check = time.monotonic()
+
+    async def _fetch_version(self) -> int | None:
+        """读取题材库版本号；版本表不存在时返回 None"""
+        from backend.services.database import get_db_service
+
+        self._stats["version_checks"] += 1
+        return await get_db_service().get_theme_library_version()
+
+    async def _load(self) -> ThemeLibrarySnapshot:
+        from backend.services.database import get_db_service
+
+        fetch = get_db_service().fetch_all_rows
+
+        # 先读版本号再读表：加载期间发生的写入会让下一次检查看到更新的版本
+        version = await self._fetch_version()
+        themes, elements, hooks, examples = await asyncio.gather(
+            fetch("themes"),
+            fetch("theme_elements"),
+            fetch("hook_templates"),
+            fetch("theme_examples"),
+        )
+        snapshot = ThemeLibrarySnapshot.build(version, themes, elements, hooks, examples)
+        self._stats["loads"] += 1
+        logger.info(
+            "Theme snapshot loaded",
+            version=version,
+            themes=len(themes),
+            elements=len(elements),
+            hooks=len(hooks),
+            examples=len(examples),
+        )
+        return snapshot
+
+    def get_stats(self) -> dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            **self._stats,
+            "loaded": snapshot is not None,
+            "version": snapshot.version if snapshot else None,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "element_index": snapshot.element_index.get_stats() if snapshot else None,
+            "refresh_interval": self._refresh_interval,
+        }
+
+
+# ===== Singleton =====
+
+_store = ThemeSnapshotStore()
+
+
+def get_theme_snapshot_store() -> ThemeSnapshotStore:
+    """获取进程内的题材库快照存储"""
+    return _store
+
+
+async def get_theme_snapshot() -> ThemeLibrarySnapshot:
+    """获取当前题材库快照（可作为 FastAPI 依赖）"""
+    return await _store.get()
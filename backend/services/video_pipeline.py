@@ -0,0 +1,339 @@
+"""
+Video Generation Pipeline
+
+并行的分镜视频生成流水线。
+
+旧流程逐个镜头提交并轮询（每 5 秒一次，每次轮询都写一条任务进度），
+N 个镜头的耗时是所有镜头生成时间之和。
+
+新流程：
+- 所有镜头一开始就提交，同一提供商同时进行中的生成数不超过 video_concurrency
+  （可通过 video_provider_concurrency 按提供商覆盖）；并发额度按提供商在进程内共享，
+  同一 Worker 中同时运行的多个流水线不会叠加超出提供商的限额
+- 所有进行中的生成由一个共享轮询循环查询状态；状态未变化时轮询间隔按
+  video_poll_backoff 倍数增长，直到 video_poll_max_interval
+- 单个生成的状态查询失败（网络抖动、提供商 5xx）只让该生成退避后重试，不影响轮询循环
+- 提供商回调（webhook）可通过 notify_generation() 直接结束等待，无需等下一次轮询
+- 任务进度写入合并，最多每 video_progress_interval 秒写一次
+
+N 个镜头的总耗时接近最慢的单个镜头（受并发上限约束）。
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import structlog
+
+from backend.config import settings
+from backend.services.video_generator import (
+    VideoGenerationRequest,
+    VideoGenerationResult,
+    VideoGenerator,
+    VideoProvider,
+    VideoStatus,
+)
+
+logger = structlog.get_logger(__name__)
+
+# generation_id → 等待中的生成（用于 webhook 回调）
+_pending_generations: Dict[str, "_Generation"] = {}
+
+# (事件循环, 提供商) → 该提供商共享的并发信号量
+_provider_semaphores: Dict[tuple, asyncio.Semaphore] = {}
+
+
+def _provider_semaphore(provider: VideoProvider, limit: int) -> asyncio.Semaphore:
+    """获取当前事件循环上提供商共享的信号量（不存在时按 limit 创建）"""
+    loop = asyncio.get_running_loop()
+    key = (loop, provider.value)
+    semaphore = _provider_semaphores.get(key)
+    if semaphore is None:
+        # 移除已关闭事件循环的信号量
+        for stale in [k for k in _provider_semaphores if k[0].is_closed()]:
+            _provider_semaphores.pop(stale)
+        semaphore = asyncio.Semaphore(limit)
+        _provider_semaphores[key] = semaphore
+    return semaphore
+
+
+def notify_generation(generation_id: str, result: VideoGenerationResult) -> bool:
+    """
+    提供商回调：通知某个生成已结束
+
+    Returns:
+        是否有等待该生成的流水线
+    """
+    generation = _pending_generations.get(generation_id)
+    if generation is None:
+        return False
+    generation.via_webhook = True
+    generation.resolve(result)
+    return True
+
+
+@dataclass
+class _Generation:
+    """单个进行中的生成"""
+
+    index: int
+    shot_number: str
+    generation_id: str
+    interval: float
+    next_poll: float
+    status: str = VideoStatus.PROCESSING.value
+    via_webhook: bool = False
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    result: Optional[VideoGenerationResult] = None
+
+    def resolve(self, result: VideoGenerationResult) -> None:
+        if self.result is None:
+            self.result = result
+            self.done.set()
+
+
+class VideoPipeline:
+    """
+    并行视频生成流水线
+
+    使用方式:
+        pipeline = VideoPipeline(video_gen, provider, on_progress=report)
+        results = await pipeline.run(shots)
+    """
+
+    def __init__(
+        self,
+        video_gen: VideoGenerator,
+        provider: VideoProvider,
+        on_progress: Optional[Callable[[int, str], Awaitable[None]]] = None,
+        concurrency: Optional[int] = None,
+    ):
+        self.video_gen = video_gen
+        self.provider = provider
+        self._on_progress = on_progress
+        # 显式指定 concurrency 时使用独立额度，否则共享提供商的进程级额度
+        self._shared = not concurrency
+        self._concurrency = concurrency or settings.video_provider_concurrency.get(
+            provider.value, settings.video_concurrency
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._outstanding: Dict[str, _Generation] = {}
+        self._wakeup = asyncio.Event()
+        self._total = 0
+        self._finished = 0
+        self._last_report = 0.0
+        self._reported: Optional[tuple] = None
+        self.stats: Dict[str, Any] = {
+            "polls": 0,
+            "poll_errors": 0,
+            "progress_writes": 0,
+            "webhooks": 0,
+        }
+
+    async def run(self, shots: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """生成所有镜头，结果按镜头顺序返回"""
+        self._total = len(shots)
+        started = time.monotonic()
+        if self._shared:
+            self._semaphore = _provider_semaphore(self.provider, max(1, self._concurrency))
+        else:
+            self._semaphore = asyncio.Semaphore(max(1, self._concurrency))
+        poller = asyncio.create_task(self._poll_loop())
+        try:
+            results = await asyncio.gather(
+                *(self._run_shot(i, shot) for i, shot in enumerate(shots))
+            )
+        finally:
+            poller.cancel()
+            for generation in self._outstanding.values():
+                _pending_generations.pop(generation.generation_id, None)
+            self._outstanding.clear()
+
+        await self._report(force=True)
+        logger.info(
+            "Video pipeline finished",
+            provider=self.provider.value,
+            shots=self._total,
+            concurrency=self._concurrency,
+            elapsed_s=round(time.monotonic() - started, 2),
+            **self.stats,
+        )
+        return results
+
+    # ===== 单个镜头 =====
+
+    async def _run_shot(self, index: int, shot: Dict[str, Any]) -> Dict[str, Any]:
+        shot_number = shot.get("shot_number", f"S{index + 1:02d}")
+        prompt = shot.get("nano_banana_prompt", shot.get("visual_description", ""))
+
+        try:
+            async with self._semaphore:
+                request = VideoGenerationRequest(
+                    prompt=prompt,
+                    provider=self.provider,
+                    duration=shot.get("duration", 5),
+                    aspect_ratio=shot.get("aspect_ratio", "16:9"),
+                )
+
+                # 提交生成任务
+                gen_result = await self.video_gen.generate(request)
+
+                if gen_result.status == VideoStatus.COMPLETED:
+                    result = gen_result
+                elif gen_result.status == VideoStatus.PROCESSING and gen_result.generation_id:
+                    result = await self._wait(index, shot_number, gen_result.generation_id)
+                else:
+                    # 生成失败或未启动
+                    return self._failure(
+                        shot_number,
+                        gen_result.status.value,
+                        gen_result.error_message or "Failed to start generation",
+                    )
+
+            if result is None:
+                timeout = settings.video_generation_timeout
+                return self._failure(
+                    shot_number, "timeout", f"Generation timeout after {timeout} seconds"
+                )
+            if result.status == VideoStatus.COMPLETED:
+                return {
+                    "shot_number": shot_number,
+                    "video_url": result.video_url,
+                    "generation_id": result.generation_id,
+                    "status": "completed",
+                    "provider": self.provider.value,
+                }
+            return self._failure(
+                shot_number, "failed", result.error_message or "Generation failed"
+            )
+
+        except Exception as e:
+            logger.error("Shot generation failed", shot=shot_number, error=str(e))
+            return self._failure(shot_number, "failed", str(e))
+
+        finally:
+            self._finished += 1
+            await self._report()
+
+    def _failure(self, shot_number: str, status: str, error: str) -> Dict[str, Any]:
+        return {
+            "shot_number": shot_number,
+            "status": status,
+            "error": error,
+            "provider": self.provider.value,
+        }
+
+    async def _wait(
+        self, index: int, shot_number: str, generation_id: str
+    ) -> Optional[VideoGenerationResult]:
+        """登记到共享轮询循环，等待生成结束；超时返回 None"""
+        now = time.monotonic()
+        generation = _Generation(
+            index=index,
+            shot_number=shot_number,
+            generation_id=generation_id,
+            interval=settings.video_poll_initial_interval,
+            next_poll=now + settings.video_poll_initial_interval,
+        )
+        self._outstanding[generation_id] = generation
+        _pending_generations[generation_id] = generation
+        self._wakeup.set()
+
+        try:
+            await asyncio.wait_for(
+                generation.done.wait(), timeout=settings.video_generation_timeout
+            )
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            self._outstanding.pop(generation_id, None)
+            _pending_generations.pop(generation_id, None)
+
+        if generation.via_webhook:
+            self.stats["webhooks"] += 1
+        return generation.result
+
+    # ===== 共享轮询 =====
+
+    async def _poll_loop(self) -> None:
+        """一个循环轮询所有到期的生成，然后休眠到下一个到期时间"""
+        while True:
+            now = time.monotonic()
+            waiting = [g for g in self._outstanding.values() if not g.done.is_set()]
+            due = [g for g in waiting if g.next_poll <= now]
+            if due:
+                await asyncio.gather(*(self._poll(g) for g in due))
+                await self._report()
+                continue
+
+            self._wakeup.clear()
+            sleep_for = max(0.0, min(g.next_poll for g in waiting) - now) if waiting else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=sleep_for)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll(self, generation: _Generation) -> None:
+        self.stats["polls"] += 1
+        try:
+            result = await self.video_gen.get_status(self.provider, generation.generation_id)
+        except Exception as e:
+            # 查询失败：该生成退避后重试，其他生成照常轮询，直到 video_generation_timeout
+            self.stats["poll_errors"] += 1
+            logger.warning(
+                "Video status poll failed",
+                provider=self.provider.value,
+                generation_id=generation.generation_id,
+                error=str(e),
+            )
+            self._backoff(generation)
+            return
+
+        if result.status in (VideoStatus.COMPLETED, VideoStatus.FAILED):
+            result.generation_id = result.generation_id or generation.generation_id
+            generation.resolve(result)
+            return
+
+        # 状态变化时恢复初始间隔，否则退避
+        if result.status.value != generation.status:
+            generation.status = result.status.value
+            generation.interval = settings.video_poll_initial_interval
+            generation.next_poll = time.monotonic() + generation.interval
+        else:
+            self._backoff(generation)
+
+    @staticmethod
+    def _backoff(generation: _Generation) -> None:
+        generation.interval = min(
+            generation.interval * settings.video_poll_backoff,
+            settings.video_poll_max_interval,
+        )
+        generation.next_poll = time.monotonic() + generation.interval
+
+    # ===== 进度 =====
+
+    async def _report(self, force: bool = False) -> None:
+        """合并进度写入：最多每 video_progress_interval 秒一次，且只在内容变化时写入"""
+        if self._on_progress is None or not self._total:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_report < settings.video_progress_interval:
+            return
+
+        in_flight = len(self._outstanding)
+        progress = min(95, int(self._finished / self._total * 95))
+        step = (
+            f"Generated {self._finished}/{self._total} shots with {self.provider.value}"
+            f" ({in_flight} in progress)"
+        )
+        if (progress, step) == self._reported:
+            return
+
+        self._last_report = now
+        self._reported = (progress, step)
+        self.stats["progress_writes"] += 1
+        try:
+            await self._on_progress(progress, step)
+        except Exception as e:
+            logger.warning("Failed to report video progress", error=str(e))
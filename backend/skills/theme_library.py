@@ -1,6 +1,16 @@
 from typing import Optional
 from langchain_core.tools import tool
-from backend.services.database import get_db_service
+from backend.services.theme_snapshot import get_theme_snapshot
+
+
+async def _query_rows(table: str, params: dict) -> list:
+    """
+    查询题材库表（在进程内的题材库快照上执行，不访问数据库）
+
+    快照首次加载失败时抛出异常。返回的行是快照共享的对象，调用方不要修改。
+    """
+    snapshot = await get_theme_snapshot()
+    return snapshot.query(table, params)
 
 
 @tool
@@ -46,17 +56,14 @@ async def load_genre_context(
         - Resolution: 正义伸张
         ...
     """
-    db = get_db_service()
-
     # Query theme information
     try:
         import httpx
 
-        response = await db._client.get(
-            f"{db._rest_url}/themes", params={"slug": f"eq.{genre_id}", "select": "*"}
+        themes = await _query_rows(
+            "themes",
+            {"slug": f"eq.{genre_id}", "select": "*"},
         )
-        response.raise_for_status()
-        themes = response.json()
 
         if not themes:
             return f"错误：找不到题材 '{genre_id}'"
@@ -138,17 +145,15 @@ async def load_genre_context(
     # 章节 4: 爆款元素
     if include_elements:
         try:
-            elements_response = await db._client.get(
-                f"{db._rest_url}/theme_elements",
-                params={
+            elements = await _query_rows(
+                "theme_elements",
+                {
                     "theme_id": f"eq.{theme_uuid}",
                     "select": "*",
                     "order": "effectiveness_score.desc",
                     "limit": 10,
                 },
             )
-            elements_response.raise_for_status()
-            elements = elements_response.json() or []
 
             if elements:
                 elements_text = []
@@ -181,12 +186,10 @@ async def load_genre_context(
     # 章节 5: 钩子模板
     if include_hooks:
         try:
-            hooks_response = await db._client.get(
-                f"{db._rest_url}/hook_templates",
-                params={"select": "*", "order": "effectiveness_score.desc", "limit": 5},
+            hooks = await _query_rows(
+                "hook_templates",
+                {"select": "*", "order": "effectiveness_score.desc", "limit": 5},
             )
-            hooks_response.raise_for_status()
-            hooks = hooks_response.json() or []
 
             if hooks:
                 hooks_text = []
@@ -217,12 +220,10 @@ async def load_genre_context(
     # 章节 6: 标杆案例
     if include_examples:
         try:
-            examples_response = await db._client.get(
-                f"{db._rest_url}/theme_examples",
-                params={"theme_id": f"eq.{theme_uuid}", "select": "*", "limit": 3},
+            examples = await _query_rows(
+                "theme_examples",
+                {"theme_id": f"eq.{theme_uuid}", "select": "*", "limit": 3},
             )
-            examples_response.raise_for_status()
-            examples = examples_response.json() or []
 
             if examples:
                 examples_text = []
@@ -270,15 +271,13 @@ async def load_genre_context(
     # 从元素中提取风险因素
     if include_elements:
         try:
-            elements_response = await db._client.get(
-                f"{db._rest_url}/theme_elements",
-                params={
+            elements = await _query_rows(
+                "theme_elements",
+                {
                     "theme_id": f"eq.{theme_uuid}",
                     "select": "risk_factors",
                 },
             )
-            elements_response.raise_for_status()
-            elements = elements_response.json() or []
 
             all_risks = set()
             for elem in elements:
@@ -335,15 +334,12 @@ async def search_elements_by_effectiveness(
     Returns:
         格式化的元素列表
     """
-    db = get_db_service()
-
     try:
         # 先获取主题UUID
-        theme_response = await db._client.get(
-            f"{db._rest_url}/themes", params={"slug": f"eq.{theme_id}", "select": "id,name"}
+        themes = await _query_rows(
+            "themes",
+            {"slug": f"eq.{theme_id}", "select": "id,name"},
         )
-        theme_response.raise_for_status()
-        themes = theme_response.json()
 
         if not themes:
             return f"错误：找不到题材 '{theme_id}'"
@@ -352,9 +348,9 @@ async def search_elements_by_effectiveness(
         theme_name = themes[0]["name"]
 
         # 查询高评分元素
-        elements_response = await db._client.get(
-            f"{db._rest_url}/theme_elements",
-            params={
+        elements = await _query_rows(
+            "theme_elements",
+            {
                 "theme_id": f"eq.{theme_uuid}",
                 "effectiveness_score": f"gte.{min_score}",
                 "select": "*",
@@ -362,8 +358,6 @@ async def search_elements_by_effectiveness(
                 "limit": limit,
             },
         )
-        elements_response.raise_for_status()
-        elements = elements_response.json() or []
 
         if not elements:
             return f"在题材 '{theme_name}' 中没有找到评分 ≥ {min_score} 的元素"
@@ -401,20 +395,16 @@ async def get_hook_templates_by_type(hook_type: str, limit: int = 3) -> str:
     Returns:
         格式化的钩子模板列表
     """
-    db = get_db_service()
-
     try:
-        response = await db._client.get(
-            f"{db._rest_url}/hook_templates",
-            params={
+        hooks = await _query_rows(
+            "hook_templates",
+            {
                 "hook_type": f"eq.{hook_type}",
                 "select": "*",
                 "order": "effectiveness_score.desc",
                 "limit": limit,
             },
         )
-        response.raise_for_status()
-        hooks = response.json() or []
 
         if not hooks:
             return f"未找到类型为 '{hook_type}' 的钩子模板"
@@ -459,15 +449,12 @@ async def analyze_genre_compatibility(genre1: str, genre2: str) -> str:
     Returns:
         兼容性分析报告
     """
-    db = get_db_service()
-
     try:
         # 获取两个题材的信息
-        response = await db._client.get(
-            f"{db._rest_url}/themes", params={"slug": f"in.({genre1},{genre2})", "select": "*"}
+        themes = await _query_rows(
+            "themes",
+            {"slug": f"in.({genre1},{genre2})", "select": "*"},
         )
-        response.raise_for_status()
-        themes = response.json() or []
 
         if len(themes) < 2:
             return f"错误：找不到指定的题材（{genre1} 或 {genre2}）"
@@ -532,14 +519,12 @@ async def analyze_genre_compatibility(genre1: str, genre2: str) -> str:
 # Internal implementation to avoid Tool calling Tool issues
 async def _get_tropes_impl(genre_id: str, limit: int = 5) -> str:
     """Internal implementation for getting tropes"""
-    db = get_db_service()
     try:
         # Get theme UUID
-        theme_response = await db._client.get(
-            f"{db._rest_url}/themes", params={"slug": f"eq.{genre_id}", "select": "id,name"}
+        themes = await _query_rows(
+            "themes",
+            {"slug": f"eq.{genre_id}", "select": "id,name"},
         )
-        theme_response.raise_for_status()
-        themes = theme_response.json()
 
         if not themes:
             return f"错误：找不到题材 '{genre_id}'"
@@ -548,9 +533,9 @@ async def _get_tropes_impl(genre_id: str, limit: int = 5) -> str:
         theme_name = themes[0]["name"]
 
         # Query high-effectiveness elements
-        elements_response = await db._client.get(
-            f"{db._rest_url}/theme_elements",
-            params={
+        elements = await _query_rows(
+            "theme_elements",
+            {
                 "theme_id": f"eq.{theme_uuid}",
                 "effectiveness_score": "gte.80",
                 "select": "*",
@@ -558,8 +543,6 @@ async def _get_tropes_impl(genre_id: str, limit: int = 5) -> str:
                 "limit": limit,
             },
         )
-        elements_response.raise_for_status()
-        elements = elements_response.json() or []
 
         if not elements:
             return f"在题材 '{theme_name}' 中没有找到高评分元素"
@@ -614,16 +597,12 @@ async def get_hooks(genre_id: str, hook_type: Optional[str] = None, limit: int =
     Returns:
         钩子模板列表
     """
-    db = get_db_service()
-
     try:
         params = {"select": "*", "order": "effectiveness_score.desc", "limit": limit}
         if hook_type:
             params["hook_type"] = f"eq.{hook_type}"
 
-        response = await db._client.get(f"{db._rest_url}/hook_templates", params=params)
-        response.raise_for_status()
-        hooks = response.json() or []
+        hooks = await _query_rows("hook_templates", params)
 
         if not hooks:
             return "未找到钩子模板"
@@ -724,20 +703,16 @@ async def get_market_trends(genre_id: Optional[str] = None) -> str:
     Returns:
         市场趋势报告
     """
-    db = get_db_service()
-
     try:
         if genre_id:
             # 获取特定题材的市场数据
-            response = await db._client.get(
-                f"{db._rest_url}/themes",
-                params={
+            themes = await _query_rows(
+                "themes",
+                {
                     "slug": f"eq.{genre_id}",
                     "select": "name,market_size,market_score,success_rate,trend_direction",
                 },
             )
-            response.raise_for_status()
-            themes = response.json() or []
 
             if not themes:
                 return f"未找到题材 '{genre_id}'"
@@ -755,15 +730,13 @@ async def get_market_trends(genre_id: Optional[str] = None) -> str:
 """
         else:
             # 获取所有题材的市场概览
-            response = await db._client.get(
-                f"{db._rest_url}/themes",
-                params={
+            themes = await _query_rows(
+                "themes",
+                {
                     "select": "name,slug,market_score,success_rate",
                     "order": "market_score.desc",
                 },
             )
-            response.raise_for_status()
-            themes = response.json() or []
 
             result = ["## 全题材市场概览\n"]
 
@@ -790,15 +763,11 @@ async def get_writing_keywords(genre_id: str) -> str:
     Returns:
         写作和视觉关键词列表
     """
-    db = get_db_service()
-
     try:
-        response = await db._client.get(
-            f"{db._rest_url}/themes",
-            params={"slug": f"eq.{genre_id}", "select": "name,keywords"},
+        themes = await _query_rows(
+            "themes",
+            {"slug": f"eq.{genre_id}", "select": "name,keywords"},
         )
-        response.raise_for_status()
-        themes = response.json() or []
 
         if not themes:
             return f"未找到题材 '{genre_id}'"
@@ -0,0 +1,80 @@
+-- =====================================================
+-- Migration: 011_outline_incremental.sql
+-- Description: 大纲增量存储 - 按剧集行存储大纲节点，按批次追加骨架文本
+-- Author: AI Video Engine Team
+-- Date: 2026-10-17
+-- =====================================================
+--
+-- 分批生成大纲时，每完成一批只写入本批次产生的章节/剧集和文本片段，
+-- 不再把完整大纲 JSON 重新写回 project_content。
+-- project_content (content_type='outline') 仍保留大纲头信息，
+-- 其 metadata.version 为大纲版本号，每次增量保存递增。
+-- 读取方可以通过 version > N 获取自已知版本以来的增量。
+
+-- =====================================================
+-- 表: outline_episodes (大纲剧集节点)
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS outline_episodes (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    episode_number INT NOT NULL,
+    chapter_number INT,
+    batch_index INT DEFAULT 0,                -- 写入该行的生成批次
+    data JSONB NOT NULL DEFAULT '{}'::jsonb,  -- OutlineData.episodes[] 中的单个剧集
+    version BIGINT NOT NULL DEFAULT 1,        -- 最后一次写入时的大纲版本号
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    updated_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE(project_id, episode_number)
+);
+
+CREATE INDEX IF NOT EXISTS idx_outline_episodes_version ON outline_episodes(project_id, version);
+
+CREATE TRIGGER update_outline_episodes_updated_at
+    BEFORE UPDATE ON outline_episodes
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+-- =====================================================
+-- 表: outline_batches (骨架文本批次片段)
+-- 说明: 完整骨架文本 = 按 content_offset 顺序拼接所有片段
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS outline_batches (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    batch_index INT NOT NULL,
+    content_offset INT NOT NULL DEFAULT 0,    -- 片段在完整骨架文本中的起始偏移
+    content TEXT NOT NULL,
+    version BIGINT NOT NULL DEFAULT 1,
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    UNIQUE(project_id, batch_index)
+);
+
+CREATE INDEX IF NOT EXISTS idx_outline_batches_version ON outline_batches(project_id, version);
+
+-- =====================================================
+-- RLS
+-- =====================================================
+
+ALTER TABLE outline_episodes ENABLE ROW LEVEL SECURITY;
+ALTER TABLE outline_batches ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable all access for project owners" ON outline_episodes
+    FOR ALL
+    USING (EXISTS (
+        SELECT 1 FROM projects
+        WHERE projects.id = outline_episodes.project_id
+        AND projects.user_id = auth.uid()
+    ));
+
+CREATE POLICY "Enable all access for project owners" ON outline_batches
+    FOR ALL
+    USING (EXISTS (
+        SELECT 1 FROM projects
+        WHERE projects.id = outline_batches.project_id
+        AND projects.user_id = auth.uid()
+    ));
+
+COMMENT ON TABLE outline_episodes IS '大纲剧集节点 - 分批生成时按剧集增量 upsert';
+COMMENT ON TABLE outline_batches IS '骨架文本批次片段 - 分批生成时只追加新批次文本';
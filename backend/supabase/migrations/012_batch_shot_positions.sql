@@ -0,0 +1,35 @@
+-- =====================================================
+-- Migration: 012_batch_shot_positions.sql
+-- Description: 分镜画布批量位置更新 RPC
+-- Author: AI Video Engine Team
+-- Date: 2026-10-17
+-- =====================================================
+--
+-- 拖动画布时一次请求更新所有节点位置，只修改 position_x / position_y，
+-- 不返回行数据，也不触发分镜计数的重新统计。
+
+CREATE OR REPLACE FUNCTION batch_update_shot_positions(
+    p_episode_id UUID,
+    p_positions JSONB  -- [{"shot_id": "...", "x": 0, "y": 0}, ...]
+)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    updated_count INT;
+BEGIN
+    UPDATE shot_nodes AS s
+    SET position_x = p.x,
+        position_y = p.y,
+        updated_at = NOW()
+    FROM jsonb_to_recordset(p_positions) AS p(shot_id UUID, x FLOAT, y FLOAT)
+    WHERE s.shot_id = p.shot_id
+      AND s.episode_id = p_episode_id
+      AND (s.position_x IS DISTINCT FROM p.x OR s.position_y IS DISTINCT FROM p.y);
+
+    GET DIAGNOSTICS updated_count = ROW_COUNT;
+    RETURN updated_count;
+END;
+$$;
+
+COMMENT ON FUNCTION batch_update_shot_positions(UUID, JSONB) IS '批量更新分镜画布位置（单次请求，仅修改坐标）';
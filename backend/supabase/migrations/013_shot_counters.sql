@@ -0,0 +1,88 @@
+-- =====================================================
+-- Migration: 013_shot_counters.sql
+-- Description: 分镜计数增量写入与离线对账
+-- Author: AI Video Engine Team
+-- Date: 2026-10-17
+-- =====================================================
+--
+-- 后端在内存中合并分镜数量的变化，一次调用 apply_shot_count_deltas 写入；
+-- reconcile_shot_counts 由定时任务调用，按 shot_nodes 重新统计精确计数。
+
+-- =====================================================
+-- 增量写入
+-- 参数格式: {"<episode_id>": 3, "<episode_id>": -1}
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION apply_shot_count_deltas(
+    p_episode_deltas JSONB DEFAULT '{}'::jsonb,
+    p_scene_deltas JSONB DEFAULT '{}'::jsonb
+)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE episodes AS e
+    SET storyboard_shot_count = GREATEST(0, COALESCE(e.storyboard_shot_count, 0) + d.value::INT),
+        updated_at = NOW()
+    FROM jsonb_each_text(COALESCE(p_episode_deltas, '{}'::jsonb)) AS d
+    WHERE e.episode_id = d.key::UUID;
+
+    UPDATE scenes AS sc
+    SET shot_count = GREATEST(0, COALESCE(sc.shot_count, 0) + d.value::INT),
+        updated_at = NOW()
+    FROM jsonb_each_text(COALESCE(p_scene_deltas, '{}'::jsonb)) AS d
+    WHERE sc.scene_id = d.key::UUID;
+END;
+$$;
+
+-- =====================================================
+-- 离线对账：重新统计精确计数
+-- p_episode_ids 为 NULL 时处理全部剧集，返回被修正的行数
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION reconcile_shot_counts(
+    p_episode_ids UUID[] DEFAULT NULL
+)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    fixed_episodes INT;
+    fixed_scenes INT;
+BEGIN
+    WITH actual AS (
+        SELECT e.episode_id, COUNT(s.shot_id)::INT AS shot_count
+        FROM episodes e
+        LEFT JOIN shot_nodes s ON s.episode_id = e.episode_id
+        WHERE p_episode_ids IS NULL OR e.episode_id = ANY(p_episode_ids)
+        GROUP BY e.episode_id
+    )
+    UPDATE episodes AS e
+    SET storyboard_shot_count = a.shot_count,
+        updated_at = NOW()
+    FROM actual a
+    WHERE e.episode_id = a.episode_id
+      AND e.storyboard_shot_count IS DISTINCT FROM a.shot_count;
+    GET DIAGNOSTICS fixed_episodes = ROW_COUNT;
+
+    WITH actual AS (
+        SELECT sc.scene_id, COUNT(s.shot_id)::INT AS shot_count
+        FROM scenes sc
+        LEFT JOIN shot_nodes s ON s.scene_id = sc.scene_id
+        WHERE p_episode_ids IS NULL OR sc.episode_id = ANY(p_episode_ids)
+        GROUP BY sc.scene_id
+    )
+    UPDATE scenes AS sc
+    SET shot_count = a.shot_count,
+        updated_at = NOW()
+    FROM actual a
+    WHERE sc.scene_id = a.scene_id
+      AND sc.shot_count IS DISTINCT FROM a.shot_count;
+    GET DIAGNOSTICS fixed_scenes = ROW_COUNT;
+
+    RETURN fixed_episodes + fixed_scenes;
+END;
+$$;
+
+COMMENT ON FUNCTION apply_shot_count_deltas(JSONB, JSONB) IS '合并写入剧集/场景分镜计数增量';
+COMMENT ON FUNCTION reconcile_shot_counts(UUID[]) IS '按 shot_nodes 重新统计剧集/场景分镜计数';
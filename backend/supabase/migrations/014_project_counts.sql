@@ -0,0 +1,36 @@
+-- =====================================================
+-- Migration: 014_project_counts.sql
+-- Description: 项目列表的批量节点计数
+-- Author: AI Video Engine Team
+-- Date: 2026-10-17
+-- =====================================================
+--
+-- 项目列表原先对每个项目单独发起一次 count=exact 请求（N+1）。
+-- count_project_nodes 一次返回整页项目的节点数和剧集数，
+-- 没有节点的项目也返回一行 (0, 0)。
+
+CREATE INDEX IF NOT EXISTS idx_story_nodes_project_type
+    ON story_nodes (project_id, type);
+
+CREATE OR REPLACE FUNCTION count_project_nodes(
+    p_project_ids UUID[]
+)
+RETURNS TABLE (
+    project_id UUID,
+    node_count BIGINT,
+    episode_count BIGINT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        p.id,
+        COUNT(n.node_id),
+        COUNT(n.node_id) FILTER (WHERE n.type = 'episode')
+    FROM unnest(p_project_ids) AS p(id)
+    LEFT JOIN story_nodes AS n ON n.project_id = p.id
+    GROUP BY p.id;
+END;
+$$;
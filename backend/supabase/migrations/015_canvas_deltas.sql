@@ -0,0 +1,151 @@
+-- =====================================================
+-- Migration: 015_canvas_deltas.sql
+-- Description: 剧集画布增量保存与版本号
+-- Author: AI Video Engine Team
+-- Date: 2026-10-17
+-- =====================================================
+--
+-- 画布原先每次保存都整体覆盖 canvas_data，修改视口也要先读出再写回整个画布。
+-- 本迁移：
+-- - 视口单独存放在 canvas_viewport 列，更新视口不再改写节点数据
+-- - canvas_version 在每次节点/连线变化时加一，用于乐观并发控制
+-- - apply_canvas_delta 在服务端合并增量操作（加锁读取 → 合并 → 写回）
+
+ALTER TABLE episodes
+    ADD COLUMN IF NOT EXISTS canvas_version INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS canvas_viewport JSONB;
+
+UPDATE episodes
+SET canvas_viewport = canvas_data->'viewport',
+    canvas_data = canvas_data - 'viewport'
+WHERE canvas_viewport IS NULL
+  AND canvas_data ? 'viewport';
+
+COMMENT ON COLUMN episodes.canvas_data IS '画布状态 JSONB: nodes + connections（视口见 canvas_viewport）';
+COMMENT ON COLUMN episodes.canvas_version IS '画布版本号，每次节点/连线变化加一';
+COMMENT ON COLUMN episodes.canvas_viewport IS '画布视口 { x, y, zoom }';
+
+-- =====================================================
+-- 增量操作
+-- p_ops 格式:
+--   {"op": "node_upsert", "node": {"shot_id": "...", ...}}    按 shot_id 合并字段，不存在则追加
+--   {"op": "node_move", "id": "...", "x": 0, "y": 0}
+--   {"op": "node_remove", "id": "..."}                         同时删除引用该节点的连线
+--   {"op": "connection_add", "connection": {"id": "...", ...}} 按 id 替换或追加
+--   {"op": "connection_remove", "id": "..."}
+--   {"op": "replace", "nodes": [...], "connections": [...]}    整体替换（全量保存）
+-- p_base_version 为 NULL 时跳过版本检查
+--
+-- 返回: {"found": bool, "conflict": bool, "version": int}
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION apply_canvas_delta(
+    p_episode_id UUID,
+    p_base_version INT,
+    p_ops JSONB
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    current_version INT;
+    canvas JSONB;
+    nodes JSONB;
+    connections JSONB;
+    op JSONB;
+    target TEXT;
+BEGIN
+    SELECT canvas_version, COALESCE(canvas_data, '{}'::jsonb)
+    INTO current_version, canvas
+    FROM episodes
+    WHERE episode_id = p_episode_id
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('found', false, 'conflict', false, 'version', NULL);
+    END IF;
+
+    IF p_base_version IS NOT NULL AND p_base_version <> current_version THEN
+        RETURN jsonb_build_object('found', true, 'conflict', true, 'version', current_version);
+    END IF;
+
+    nodes := COALESCE(canvas->'nodes', '[]'::jsonb);
+    connections := COALESCE(canvas->'connections', '[]'::jsonb);
+
+    FOR op IN SELECT value FROM jsonb_array_elements(COALESCE(p_ops, '[]'::jsonb)) LOOP
+        CASE op->>'op'
+        WHEN 'node_upsert' THEN
+            target := op->'node'->>'shot_id';
+            IF EXISTS (SELECT 1 FROM jsonb_array_elements(nodes) AS n WHERE n->>'shot_id' = target) THEN
+                SELECT jsonb_agg(
+                    CASE WHEN n->>'shot_id' = target THEN n || (op->'node') ELSE n END
+                    ORDER BY ord
+                )
+                INTO nodes
+                FROM jsonb_array_elements(nodes) WITH ORDINALITY AS t(n, ord);
+            ELSE
+                nodes := nodes || jsonb_build_array(op->'node');
+            END IF;
+
+        WHEN 'node_move' THEN
+            SELECT jsonb_agg(
+                CASE WHEN n->>'shot_id' = op->>'id'
+                    THEN n || jsonb_build_object('position_x', op->'x', 'position_y', op->'y')
+                    ELSE n
+                END
+                ORDER BY ord
+            )
+            INTO nodes
+            FROM jsonb_array_elements(nodes) WITH ORDINALITY AS t(n, ord);
+
+        WHEN 'node_remove' THEN
+            SELECT jsonb_agg(n ORDER BY ord)
+            INTO nodes
+            FROM jsonb_array_elements(nodes) WITH ORDINALITY AS t(n, ord)
+            WHERE n->>'shot_id' IS DISTINCT FROM op->>'id';
+
+            SELECT jsonb_agg(c ORDER BY ord)
+            INTO connections
+            FROM jsonb_array_elements(connections) WITH ORDINALITY AS t(c, ord)
+            WHERE c->>'source' IS DISTINCT FROM op->>'id'
+              AND c->>'target' IS DISTINCT FROM op->>'id';
+
+        WHEN 'connection_add' THEN
+            SELECT jsonb_agg(c ORDER BY ord)
+            INTO connections
+            FROM jsonb_array_elements(connections) WITH ORDINALITY AS t(c, ord)
+            WHERE c->>'id' IS DISTINCT FROM op->'connection'->>'id';
+
+            connections := COALESCE(connections, '[]'::jsonb) || jsonb_build_array(op->'connection');
+
+        WHEN 'connection_remove' THEN
+            SELECT jsonb_agg(c ORDER BY ord)
+            INTO connections
+            FROM jsonb_array_elements(connections) WITH ORDINALITY AS t(c, ord)
+            WHERE c->>'id' IS DISTINCT FROM op->>'id';
+
+        WHEN 'replace' THEN
+            nodes := COALESCE(op->'nodes', '[]'::jsonb);
+            connections := COALESCE(op->'connections', '[]'::jsonb);
+
+        ELSE
+            RAISE EXCEPTION 'Unknown canvas op: %', op->>'op';
+        END CASE;
+
+        -- jsonb_agg 在没有行时返回 NULL
+        nodes := COALESCE(nodes, '[]'::jsonb);
+        connections := COALESCE(connections, '[]'::jsonb);
+    END LOOP;
+
+    UPDATE episodes
+    SET canvas_data = (canvas - 'viewport')
+            || jsonb_build_object('nodes', nodes, 'connections', connections),
+        canvas_version = current_version + 1,
+        updated_at = NOW()
+    WHERE episode_id = p_episode_id;
+
+    RETURN jsonb_build_object('found', true, 'conflict', false, 'version', current_version + 1);
+END;
+$$;
+
+COMMENT ON FUNCTION apply_canvas_delta(UUID, INT, JSONB) IS '画布增量合并（带版本号的乐观并发控制）';
@@ -0,0 +1,116 @@
+-- =====================================================
+-- Migration: 016_outline_node_patch.sql
+-- Description: 大纲头信息原子 upsert 与单个剧集节点的增量修改
+-- Author: AI Video Engine Team
+-- Date: 2026-10-17
+-- =====================================================
+--
+-- save_outline 原先先读取大纲头信息再决定 POST / PATCH，并把完整大纲写回；
+-- update_outline_node 需要整体读写大纲。本迁移：
+-- - bump_outline_header: 一条语句 upsert 大纲头信息并递增版本号
+-- - patch_outline_episode: 按 episodeId 合并单个剧集行的字段，只写入该行
+
+CREATE INDEX IF NOT EXISTS idx_outline_episodes_episode_id
+    ON outline_episodes (project_id, (data->>'episodeId'));
+
+-- =====================================================
+-- 大纲头信息 upsert
+-- p_reset = TRUE 表示剧集行被整体重写，base_version 同步为新版本
+-- 返回新的版本号
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION bump_outline_header(
+    p_project_id UUID,
+    p_title TEXT,
+    p_content TEXT,
+    p_metadata JSONB,
+    p_reset BOOLEAN DEFAULT FALSE
+)
+RETURNS BIGINT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    new_version BIGINT;
+BEGIN
+    INSERT INTO project_content AS pc (project_id, content_type, title, content, metadata, status)
+    VALUES (
+        p_project_id,
+        'outline',
+        p_title,
+        p_content,
+        COALESCE(p_metadata, '{}'::jsonb) || jsonb_build_object('version', 1, 'base_version', 1),
+        'draft'
+    )
+    ON CONFLICT (project_id, content_type) DO UPDATE
+    SET title = EXCLUDED.title,
+        content = EXCLUDED.content,
+        metadata = COALESCE(p_metadata, '{}'::jsonb) || jsonb_build_object(
+            'version', COALESCE((pc.metadata->>'version')::BIGINT, 0) + 1,
+            'base_version', CASE
+                WHEN p_reset THEN COALESCE((pc.metadata->>'version')::BIGINT, 0) + 1
+                ELSE COALESCE((pc.metadata->>'base_version')::BIGINT, 0)
+            END
+        )
+    RETURNING (pc.metadata->>'version')::BIGINT INTO new_version;
+
+    RETURN new_version;
+END;
+$$;
+
+-- =====================================================
+-- 单个剧集节点修改
+-- p_patch 中除 metadata 外的字段直接覆盖，metadata 与原值合并
+-- 返回修改后的剧集数据；大纲不是按行存储或剧集不存在时返回 NULL
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION patch_outline_episode(
+    p_project_id UUID,
+    p_episode_id TEXT,
+    p_patch JSONB
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    row_id UUID;
+    new_version BIGINT;
+    result JSONB;
+BEGIN
+    SELECT id INTO row_id
+    FROM outline_episodes
+    WHERE project_id = p_project_id
+      AND data->>'episodeId' = p_episode_id
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN NULL;
+    END IF;
+
+    UPDATE project_content
+    SET metadata = jsonb_set(
+        COALESCE(metadata, '{}'::jsonb),
+        '{version}',
+        to_jsonb(COALESCE((metadata->>'version')::BIGINT, 0) + 1)
+    )
+    WHERE project_id = p_project_id
+      AND content_type = 'outline'
+    RETURNING (metadata->>'version')::BIGINT INTO new_version;
+
+    UPDATE outline_episodes
+    SET data = (data || (p_patch - 'metadata'))
+            || CASE
+                WHEN p_patch ? 'metadata' THEN jsonb_build_object(
+                    'metadata', COALESCE(data->'metadata', '{}'::jsonb) || (p_patch->'metadata')
+                )
+                ELSE '{}'::jsonb
+            END,
+        version = COALESCE(new_version, version + 1)
+    WHERE id = row_id
+    RETURNING data INTO result;
+
+    RETURN result;
+END;
+$$;
+
+COMMENT ON FUNCTION bump_outline_header(UUID, TEXT, TEXT, JSONB, BOOLEAN) IS '大纲头信息 upsert（单条语句递增版本号）';
+COMMENT ON FUNCTION patch_outline_episode(UUID, TEXT, JSONB) IS '按 episodeId 修改单个大纲剧集行';
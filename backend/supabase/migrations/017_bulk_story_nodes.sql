@@ -0,0 +1,66 @@
+-- =====================================================
+-- Migration: 017_bulk_story_nodes.sql
+-- Description: 按类型批量写入 story_nodes 与画布布局
+-- Author: AI Video Engine Team
+-- Date: 2026-10-17
+-- =====================================================
+--
+-- SyncService 原先逐条删除旧节点、逐条创建节点并再单独写入布局，
+-- 80 集的分集大纲需要 160 次往返。本迁移提供 insert_story_nodes：
+-- 一次调用（同一事务）完成按类型删除旧节点、批量插入节点和布局。
+
+-- =====================================================
+-- 批量插入节点
+-- p_nodes 格式:
+--   [{"node_id": "...", "parent_id": "..." | null, "content": {...},
+--     "layout": {"canvas_tab": "...", "position_x": 0, "position_y": 0} | null}, ...]
+-- p_replace = TRUE 时先删除该项目下同类型的全部节点（布局随外键级联删除）
+-- 返回插入的节点数
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION insert_story_nodes(
+    p_project_id UUID,
+    p_type TEXT,
+    p_nodes JSONB,
+    p_replace BOOLEAN DEFAULT FALSE
+)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    inserted INT;
+BEGIN
+    IF p_replace THEN
+        DELETE FROM story_nodes
+        WHERE project_id = p_project_id
+          AND type = p_type;
+    END IF;
+
+    INSERT INTO story_nodes (node_id, project_id, parent_id, type, content)
+    SELECT
+        (n->>'node_id')::UUID,
+        p_project_id,
+        NULLIF(n->>'parent_id', '')::UUID,
+        p_type,
+        COALESCE(n->'content', '{}'::jsonb)
+    FROM jsonb_array_elements(COALESCE(p_nodes, '[]'::jsonb)) AS n;
+
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+
+    INSERT INTO node_layouts (node_id, canvas_tab, position_x, position_y)
+    SELECT
+        (n->>'node_id')::UUID,
+        n->'layout'->>'canvas_tab',
+        COALESCE((n->'layout'->>'position_x')::FLOAT, 0),
+        COALESCE((n->'layout'->>'position_y')::FLOAT, 0)
+    FROM jsonb_array_elements(COALESCE(p_nodes, '[]'::jsonb)) AS n
+    WHERE jsonb_typeof(n->'layout') = 'object'
+    ON CONFLICT (node_id, canvas_tab) DO UPDATE
+    SET position_x = EXCLUDED.position_x,
+        position_y = EXCLUDED.position_y;
+
+    RETURN inserted;
+END;
+$$;
+
+COMMENT ON FUNCTION insert_story_nodes(UUID, TEXT, JSONB, BOOLEAN) IS '按类型批量写入 story_nodes 与布局（可选先删除同类型旧节点）';
@@ -0,0 +1,55 @@
+-- =====================================================
+-- Migration: 018_theme_library_version.sql
+-- Description: 题材库版本号（供进程内快照判断是否需要重新加载）
+-- Author: AI Video Engine Team
+-- Date: 2026-10-17
+-- =====================================================
+--
+-- /api/themes 与题材库技能改为从进程内快照读取。快照定期读取这一行版本号，
+-- 只有版本变化时才重新加载四张表。themes / theme_elements / hook_templates /
+-- theme_examples 的任何写入（语句级触发器）都会递增版本号。
+
+CREATE TABLE IF NOT EXISTS theme_library_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 1,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+INSERT INTO theme_library_version (id, version)
+VALUES (TRUE, 1)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_theme_library_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE theme_library_version
+    SET version = version + 1,
+        updated_at = NOW()
+    WHERE id;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS bump_theme_library_version_themes ON themes;
+CREATE TRIGGER bump_theme_library_version_themes
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON themes
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_theme_library_version();
+
+DROP TRIGGER IF EXISTS bump_theme_library_version_elements ON theme_elements;
+CREATE TRIGGER bump_theme_library_version_elements
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON theme_elements
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_theme_library_version();
+
+DROP TRIGGER IF EXISTS bump_theme_library_version_hooks ON hook_templates;
+CREATE TRIGGER bump_theme_library_version_hooks
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON hook_templates
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_theme_library_version();
+
+DROP TRIGGER IF EXISTS bump_theme_library_version_examples ON theme_examples;
+CREATE TRIGGER bump_theme_library_version_examples
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON theme_examples
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_theme_library_version();
+
+COMMENT ON TABLE theme_library_version IS '题材库版本号（单行），题材库表写入时递增';
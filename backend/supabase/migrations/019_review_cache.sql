@@ -0,0 +1,38 @@
+-- =====================================================
+-- Migration: 019_review_cache.sql
+-- Description: 审阅结果缓存 - 按内容哈希复用 Editor 审阅报告
+-- Author: AI Video Engine Team
+-- Date: 2026-10-17
+-- =====================================================
+--
+-- 全局审阅 / 单章审阅在送审文本和审阅配置都未变化时不再调用 Editor LLM，
+-- 直接复用之前的 review_report。
+-- cache_key = sha256(审阅配置指纹 + 规范化文本)，由 backend/services/review_cache.py 计算；
+-- 缓存键由内容决定，行写入后不会变旧。
+
+CREATE TABLE IF NOT EXISTS review_cache (
+    project_id UUID NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    cache_key CHAR(64) NOT NULL,
+    review_mode VARCHAR(50) NOT NULL,         -- 'global_review' | 'chapter_review'
+    content_type VARCHAR(50) NOT NULL,        -- 'outline' | 'novel' | 'script' | 'storyboard'
+    overall_score INT,
+    review_report JSONB NOT NULL,             -- Editor 输出的完整审阅报告
+    created_at TIMESTAMPTZ DEFAULT NOW(),
+    PRIMARY KEY (project_id, cache_key)
+);
+
+-- =====================================================
+-- RLS
+-- =====================================================
+
+ALTER TABLE review_cache ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable all access for project owners" ON review_cache
+    FOR ALL
+    USING (EXISTS (
+        SELECT 1 FROM projects
+        WHERE projects.id = review_cache.project_id
+        AND projects.user_id = auth.uid()
+    ));
+
+COMMENT ON TABLE review_cache IS '审阅结果缓存 - 送审文本和审阅配置未变时复用 Editor 审阅报告';
@@ -0,0 +1,21 @@
+-- =====================================================
+-- Migration: 020_outline_batches_offset_key.sql
+-- Description: 骨架文本片段按 content_offset 唯一，同一批次可追加多个片段
+-- Author: AI Video Engine Team
+-- Date: 2026-10-17
+-- =====================================================
+--
+-- outline_batches 原先以 (project_id, batch_index) 唯一并按此 upsert：
+-- 同一批次保存两次（最后一批重试、同一流中重复保存）时，第二个片段会覆盖第一个，
+-- 大纲头信息中的 content_length / content_hash 描述的文本就不再存在。
+-- 片段只会追加，起始偏移决定了它在完整骨架文本中的位置，因此改为按
+-- (project_id, content_offset) 唯一；batch_index 仅记录写入该片段的批次。
+
+ALTER TABLE outline_batches
+    DROP CONSTRAINT IF EXISTS outline_batches_project_id_batch_index_key;
+
+ALTER TABLE outline_batches
+    ADD CONSTRAINT outline_batches_project_id_content_offset_key
+    UNIQUE (project_id, content_offset);
+
+COMMENT ON TABLE outline_batches IS '骨架文本片段 - 按 content_offset 追加，拼接后为完整骨架文本';
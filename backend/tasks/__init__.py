@@ -2,9 +2,21 @@
 Celery Tasks Package
 
 异步任务定义。
-"""
 
-from backend.tasks.celery_app import celery_app
-from backend.tasks.job_processor import process_job
+celery_app / process_job 按需导入：导入 backend.tasks.runtime 等子模块时
+不会连带加载 Celery 应用和任务处理器的依赖。
+"""
 
 __all__ = ["celery_app", "process_job"]
+
+
+def __getattr__(name: str):
+    if name == "celery_app":
+        from backend.tasks.celery_app import celery_app
+
+        return celery_app
+    if name == "process_job":
+        from backend.tasks.job_processor import process_job
+
+        return process_job
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,8 +5,10 @@ Celery 配置和应用实例。
 """
 
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown, worker_ready, worker_shutdown
 
 from backend.config import settings
+from backend.tasks.runtime import get_worker_runtime
 
 celery_app = Celery(
     "ai_video_engine",
@@ -32,13 +34,36 @@ celery_app.conf.update(
     # 重试设置
     task_acks_late=True,
     task_reject_on_worker_lost=True,
-    # 并发设置
+    # 并发设置（任务在进程内的长驻事件循环上执行，见 backend.tasks.runtime）
+    worker_pool=settings.celery_worker_pool,
     worker_prefetch_multiplier=1,
-    worker_concurrency=4,
+    worker_concurrency=settings.celery_worker_concurrency,
     # 结果过期
     result_expires=86400,  # 24 小时
 )
 
+
+# ===== Worker Runtime =====
+# prefork 池在每个子进程中启动自己的事件循环；threads / solo 池在主进程中启动
+
+
+@worker_process_init.connect
+def _start_child_runtime(**kwargs):
+    get_worker_runtime().start()
+
+
+@worker_ready.connect
+def _start_main_runtime(**kwargs):
+    if settings.celery_worker_pool != "prefork":
+        get_worker_runtime().start()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _stop_runtime(**kwargs):
+    get_worker_runtime().shutdown()
+
+
 # 定时任务 (Beat)
 celery_app.conf.beat_schedule = {
     "watchdog-scan": {
@@ -46,6 +71,11 @@ celery_app.conf.beat_schedule = {
         "schedule": 300.0,  # 每 5 分钟
         "args": (),
     },
+    "shot-count-reconcile": {
+        "task": "backend.tasks.job_processor.reconcile_shot_counts",
+        "schedule": 3600.0,  # 每小时
+        "args": (),
+    },
     "market-analysis-weekly": {
         "task": "backend.tasks.market_analysis_task.run_weekly_analysis",
         "schedule": 604800.0,  # 每周一次 (7天)
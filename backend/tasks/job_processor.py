@@ -8,32 +8,27 @@ import asyncio
 from datetime import datetime, timedelta, timezone
 import structlog
 
+from backend.config import settings
 from backend.tasks.celery_app import celery_app
-from backend.schemas.job import JobStatus, JobProgress
+from backend.tasks.runtime import run_async
+from backend.schemas.job import JobStatus
 from backend.api.websocket import publish_event
 
 logger = structlog.get_logger(__name__)
 
 
-def run_async(coro):
-    """在 Celery Task 中运行异步代码"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
-
-
 @celery_app.task(bind=True, max_retries=3)
 def process_job(self, job_id: str):
     """处理异步任务"""
-    return run_async(_process_job_async(self, job_id))
+    return run_async(
+        _process_job_async(self, job_id), timeout=celery_app.conf.task_soft_time_limit
+    )
 
 
 async def _process_job_async(task, job_id: str):
     """异步任务处理逻辑"""
     from backend.services.database import init_db_service
+    from backend.services.job_progress import JobProgressReporter
 
     logger.info("Processing job", job_id=job_id)
 
@@ -65,19 +60,22 @@ async def _process_job_async(task, job_id: str):
         logger.warning("Failed to publish WebSocket event", error=str(e))
         # 不影响主流程
 
+    # 进度按任务合并写入，状态切换前结束上报
+    reporter = JobProgressReporter(
+        db, job_id, str(job.project_id), job.type.value, publish=publish_event
+    )
+
     try:
         # 根据任务类型执行不同逻辑
         job_type = job.type.value
 
         if job_type == "novel_writing":
-            await _process_novel_writing(db, job)
+            await _process_novel_writing(db, job, reporter)
         elif job_type == "video_generation":
-            await _process_video_generation(db, job)
-        else:
-            # 通用处理
-            await db.update_job_progress(
-                job_id, JobProgress(progress_percent=100, current_step="Completed")
-            )
+            await _process_video_generation(db, job, reporter)
+
+        # 完成状态会写入 100%，待写的中间进度直接丢弃
+        await reporter.close(flush=False)
 
         # 标记完成
         await db.update_job_status(
@@ -104,6 +102,8 @@ async def _process_job_async(task, job_id: str):
 
     except Exception as e:
         logger.error("Job failed", job_id=job_id, error=str(e))
+        # 保留失败前最后到达的步骤
+        await reporter.close()
         await db.update_job_status(job_id, JobStatus.FAILED, error_message=str(e))
 
         # 发布任务失败事件（失败不影响主流程）
@@ -124,7 +124,7 @@ async def _process_job_async(task, job_id: str):
         raise
 
 
-async def _process_novel_writing(db, job):
+async def _process_novel_writing(db, job, reporter):
     """处理小说写作任务"""
     from backend.graph import get_compiled_graph
 
@@ -137,47 +137,36 @@ async def _process_novel_writing(db, job):
 
     # 执行 Graph
     async for event in graph.astream_events(input_payload, config, version="v2"):
-        # 更新进度
-        if event.get("event") == "on_chain_end":
-            node = event.get("name", "")
-            progress = _calculate_progress(node)
-            await db.update_job_progress(
-                str(job.job_id),
-                JobProgress(progress_percent=progress, current_step=f"Processing {node}"),
-            )
+        # 只有图节点本身结束时更新进度（节点内部的 Runnable 也会产生 on_chain_end）
+        node = _graph_node_name(event)
+        if node is None:
+            continue
+        progress = _calculate_progress(node, default=reporter.progress)
+        await reporter.report(progress, f"Processing {node}")
 
-            # 发布进度更新事件（失败不影响主流程）
-            try:
-                await publish_event(
-                    project_id,
-                    "job.progress",
-                    {
-                        "job_id": str(job.job_id),
-                        "type": job.type.value,
-                        "progress": progress,
-                        "current_step": f"Processing {node}",
-                    },
-                )
-            except Exception as e:
-                logger.warning("Failed to publish WebSocket event", error=str(e))
-                # 不影响主流程
+
+def _graph_node_name(event: dict) -> str | None:
+    """on_chain_end 事件来自图节点时返回节点名，否则返回 None"""
+    if event.get("event") != "on_chain_end":
+        return None
+    name = event.get("name", "")
+    if not name or (event.get("metadata") or {}).get("langgraph_node") != name:
+        return None
+    return name
 
 
-async def _process_video_generation(db, job):
+async def _process_video_generation(db, job, reporter):
     """
     处理视频生成任务
 
     视频生成流程:
     1. 从 job.input_payload 获取分镜数据
-    2. 调用视频生成 API (Sora, Runway, Pika)
-    3. 轮询生成状态
+    2. 一次性提交所有镜头到视频生成 API (Sora, Runway, Pika)，受提供商并发上限约束
+    3. 共享轮询循环查询所有进行中的生成状态（自适应退避），进度写入合并
     4. 下载结果并存储到 Storage
     """
-    from backend.services.video_generator import (
-        VideoGenerator,
-        VideoGenerationRequest,
-        VideoProvider,
-    )
+    from backend.services.video_generator import VideoGenerator, VideoProvider
+    from backend.services.video_pipeline import VideoPipeline
 
     job_id = str(job.job_id)
     input_payload = job.input_payload or {}
@@ -185,12 +174,12 @@ async def _process_video_generation(db, job):
     storyboard_shots = input_payload.get("shots", [])
     provider_name = input_payload.get("provider", "runway")
 
-    # 初始化视频生成器
-    video_gen = VideoGenerator()
+    # 初始化视频生成器（从数据库加载提供商配置）
+    video_gen = VideoGenerator(db)
     provider = (
         VideoProvider(provider_name)
         if provider_name in ["sora", "runway", "pika"]
-        else video_gen.get_default_provider()
+        else await video_gen.get_default_provider()
     )
 
     if not provider:
@@ -204,114 +193,15 @@ async def _process_video_generation(db, job):
 
     if not storyboard_shots:
         logger.warning("No shots in payload", job_id=job_id)
-        await db.update_job_progress(
-            job_id, JobProgress(progress_percent=100, current_step="No shots to process")
-        )
+        await reporter.report(100, "No shots to process", force=True)
         return
 
     total_shots = len(storyboard_shots)
-    results = []
-
-    for i, shot in enumerate(storyboard_shots):
-        shot_number = shot.get("shot_number", f"S{i + 1:02d}")
-        prompt = shot.get("nano_banana_prompt", shot.get("visual_description", ""))
-
-        # 更新进度
-        progress = int((i / total_shots) * 100)
-        await db.update_job_progress(
-            job_id,
-            JobProgress(
-                progress_percent=progress,
-                current_step=f"Generating shot {shot_number} ({i + 1}/{total_shots}) with {provider.value}...",
-            ),
-        )
-
-        # 调用视频生成 API
-        try:
-            request = VideoGenerationRequest(
-                prompt=prompt,
-                provider=provider,
-                duration=shot.get("duration", 5),
-                aspect_ratio=shot.get("aspect_ratio", "16:9"),
-            )
 
-            # 提交生成任务
-            gen_result = await video_gen.generate(request)
-
-            if gen_result.status.value == "processing":
-                # 轮询生成状态
-                generation_id = gen_result.generation_id
-                max_retries = 60  # 最多轮询 60 次 (5分钟)
-                retry_count = 0
-
-                while retry_count < max_retries:
-                    await asyncio.sleep(5)  # 每 5 秒检查一次
-                    status_result = await video_gen.get_status(provider, generation_id)
-
-                    # 更新进度
-                    poll_progress = min(95, progress + int((retry_count / max_retries) * 30))
-                    await db.update_job_progress(
-                        job_id,
-                        JobProgress(
-                            progress_percent=poll_progress,
-                            current_step=f"Shot {shot_number}: {status_result.status.value}...",
-                        ),
-                    )
-
-                    if status_result.status.value == "completed":
-                        results.append(
-                            {
-                                "shot_number": shot_number,
-                                "video_url": status_result.video_url,
-                                "generation_id": generation_id,
-                                "status": "completed",
-                                "provider": provider.value,
-                            }
-                        )
-                        break
-                    elif status_result.status.value == "failed":
-                        results.append(
-                            {
-                                "shot_number": shot_number,
-                                "status": "failed",
-                                "error": status_result.error_message or "Generation failed",
-                                "provider": provider.value,
-                            }
-                        )
-                        break
-
-                    retry_count += 1
-
-                if retry_count >= max_retries:
-                    results.append(
-                        {
-                            "shot_number": shot_number,
-                            "status": "timeout",
-                            "error": "Generation timeout after 5 minutes",
-                            "provider": provider.value,
-                        }
-                    )
-            else:
-                # 生成失败或未启动
-                results.append(
-                    {
-                        "shot_number": shot_number,
-                        "status": gen_result.status.value,
-                        "error": gen_result.error_message or "Failed to start generation",
-                        "provider": provider.value,
-                    }
-                )
+    await reporter.report(0, f"Submitting {total_shots} shots to {provider.value}...")
 
-        except Exception as e:
-            logger.error("Shot generation failed", job_id=job_id, shot=shot_number, error=str(e))
-            results.append(
-                {
-                    "shot_number": shot_number,
-                    "status": "failed",
-                    "error": str(e),
-                    "provider": provider.value,
-                }
-            )
+    pipeline = VideoPipeline(video_gen, provider, on_progress=reporter.report)
+    results = await pipeline.run(storyboard_shots)
 
     # 存储结果到 output_payload - 使用正确的 DatabaseService 方法
     await db.update_job_status(
@@ -328,18 +218,21 @@ async def _process_video_generation(db, job):
     )
 
     # 同时存储到 video_results 表
-    for result in results:
-        if result.get("status") == "completed":
-            try:
-                await db.create_video_result(
-                    job_id=job_id,
-                    shot_number=result["shot_number"],
-                    video_url=result["video_url"],
-                    provider=provider.value,
-                    generation_id=result.get("generation_id"),
-                )
-            except Exception as e:
-                logger.error("Failed to save video result", error=str(e))
+    async def save_video_result(result):
+        try:
+            await db.create_video_result(
+                job_id=job_id,
+                shot_number=result["shot_number"],
+                video_url=result["video_url"],
+                provider=provider.value,
+                generation_id=result.get("generation_id"),
+            )
+        except Exception as e:
+            logger.error("Failed to save video result", error=str(e))
+
+    await asyncio.gather(
+        *(save_video_result(r) for r in results if r.get("status") == "completed")
+    )
 
     logger.info(
         "Video generation completed",
@@ -350,7 +243,7 @@ async def _process_video_generation(db, job):
     )
 
 
-def _calculate_progress(node_name: str) -> int:
+def _calculate_progress(node_name: str, default: int = 50) -> int:
     """根据节点名称计算进度"""
     progress_map = {
         "market_analyst": 10,
@@ -361,7 +254,7 @@ def _calculate_progress(node_name: str) -> int:
         "refiner": 80,
         "save_and_exit": 100,
     }
-    return progress_map.get(node_name, 50)
+    return progress_map.get(node_name, default)
 
 
 @celery_app.task
@@ -373,7 +266,6 @@ def watchdog_scan():
 async def _watchdog_scan_async():
     """异步看门狗逻辑"""
     from backend.services.database import init_db_service
-    from backend.config import settings
 
     if not settings.enable_watchdog:
         return
@@ -425,3 +317,23 @@ async def _watchdog_scan_async():
         logger.error("Watchdog scan failed", error=str(e))
 
     logger.info("Watchdog scan completed")
+
+
+@celery_app.task
+def reconcile_shot_counts():
+    """对账任务：按 shot_nodes 重新统计剧集/场景的分镜计数"""
+    return run_async(_reconcile_shot_counts_async())
+
+
+async def _reconcile_shot_counts_async():
+    """异步对账逻辑"""
+    from backend.services.database import init_db_service
+
+    db = await init_db_service()
+    try:
+        fixed = await db.shot_counters.reconcile()
+        logger.info("Shot count reconciliation completed", fixed=fixed)
+        return fixed
+    except Exception as e:
+        logger.error("Shot count reconciliation failed", error=str(e))
+        return 0
@@ -4,10 +4,10 @@ Market Analysis Task
 Celery 定时任务：每周执行市场分析并缓存结果。
 """
 
-import asyncio
 import structlog
 
 from backend.tasks.celery_app import celery_app
+from backend.tasks.runtime import run_async
 from backend.services.market_analysis import get_market_analysis_service
 
 logger = structlog.get_logger(__name__)
@@ -24,12 +24,8 @@ def run_weekly_analysis(self):
     logger.info("Starting weekly market analysis task")
 
     try:
-        # 创建事件循环
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-
-        # 执行分析
-        result = loop.run_until_complete(_execute_analysis())
+        # 在 Worker 进程的长驻事件循环上执行分析
+        result = run_async(_execute_analysis())
 
         logger.info("Weekly market analysis completed", genre_count=len(result.get("genres", [])))
 
@@ -49,11 +45,10 @@ async def _execute_analysis():
     """执行实际的分析"""
     service = get_market_analysis_service()
 
-    # 初始化数据库服务
+    # 初始化数据库服务（运行时预热过时直接复用）
     from backend.services.database import init_db_service
-    from backend.config import settings
 
-    init_db_service(settings.supabase_url, settings.supabase_key)
+    await init_db_service()
 
     # 执行分析
     result = await service.run_daily_analysis()
@@ -0,0 +1,174 @@
+"""
+Worker Runtime
+
+Celery Worker 进程内的长驻事件循环。
+
+原先每个任务都新建并关闭一个事件循环：共享 HTTP 连接、按事件循环缓存的
+编译图都随循环一起丢弃，数据库服务也要重新初始化。WorkerRuntime 在每个
+Worker 进程中启动一个后台线程运行事件循环，所有任务都提交到这个循环上：
+- 服务只在循环启动时预热一次（数据库服务、共享 HTTP client）
+- 多个任务线程（threads 池）可以同时提交，协程在同一个循环上并发执行
+- fork 出的子进程检测到 PID 变化后重新创建自己的循环
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Coroutine, TypeVar
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class WorkerRuntime:
+    """每个 Worker 进程一个的长驻事件循环"""
+
+    def __init__(self, name: str = "worker-runtime"):
+        self._name = name
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "started": 0,
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "in_flight": 0,
+            "max_in_flight": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return (
+            self._loop is not None
+            and self._pid == os.getpid()
+            and self._thread is not None
+            and self._thread.is_alive()
+        )
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """启动事件循环线程并预热服务（已启动时直接返回）"""
+        with self._lock:
+            if self.running:
+                return self._loop
+
+            # fork 继承来的循环属于父进程的线程，子进程中不可用，直接丢弃
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run() -> None:
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=run, name=self._name, daemon=True)
+            thread.start()
+            ready.wait()
+
+            self._loop = loop
+            self._thread = thread
+            self._pid = os.getpid()
+            self._stats["started"] += 1
+
+        asyncio.run_coroutine_threadsafe(self._warm_up(), loop).result()
+        logger.info("Worker runtime started", pid=self._pid)
+        return loop
+
+    async def _warm_up(self) -> None:
+        """预热进程级服务，后续任务直接复用"""
+        from backend.services.database import init_db_service
+        from backend.services.http_pool import get_http_client
+
+        await init_db_service()
+        get_http_client()
+
+        # 题材库技能从内存快照读取，加载失败时首次使用再加载
+        try:
+            from backend.services.theme_snapshot import get_theme_snapshot_store
+
+            await get_theme_snapshot_store().refresh(force=True)
+        except Exception as e:
+            logger.warning("Theme snapshot preload failed", error=str(e))
+
+    def submit(self, coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+        """在长驻循环上执行协程并阻塞等待结果（线程安全）
+
+        Args:
+            coro: 要执行的协程
+            timeout: 超时秒数，超时后取消协程并抛出 TimeoutError
+
+        Returns:
+            协程的返回值
+        """
+        loop = self.start()
+        future = asyncio.run_coroutine_threadsafe(self._track(coro), loop)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            self._stats["timeouts"] += 1
+            raise TimeoutError(f"Task exceeded {timeout}s on worker runtime") from None
+
+    async def _track(self, coro: Coroutine[Any, Any, T]) -> T:
+        # 统计只在循环线程内修改，无需加锁
+        stats = self._stats
+        stats["submitted"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            result = await coro
+        except BaseException:
+            stats["failed"] += 1
+            raise
+        else:
+            stats["completed"] += 1
+            return result
+        finally:
+            stats["in_flight"] -= 1
+
+    def shutdown(self, timeout: float = 10.0) -> None:
+        """释放共享连接并停止事件循环"""
+        from backend.services.http_pool import close_http_client
+
+        with self._lock:
+            if not self.running:
+                self._loop = None
+                self._thread = None
+                return
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_http_client(), loop).result(timeout)
+        except Exception as e:
+            logger.warning("Failed to close HTTP client on runtime shutdown", error=str(e))
+
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        loop.close()
+        logger.info("Worker runtime stopped", pid=os.getpid())
+
+    def get_stats(self) -> dict[str, Any]:
+        return {**self._stats, "running": self.running, "pid": self._pid}
+
+
+# ===== Process Singleton =====
+
+_runtime = WorkerRuntime()
+
+
+def get_worker_runtime() -> WorkerRuntime:
+    """获取当前进程的 Worker 运行时"""
+    return _runtime
+
+
+def run_async(coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+    """在当前进程的长驻事件循环上运行协程（供 Celery Task 调用）"""
+    return _runtime.submit(coro, timeout=timeout)
@@ -0,0 +1,41 @@
+"""
+测试公共夹具
+
+直接驱动 DatabaseService 的单元测试共用的假 PostgREST 响应，
+以及绑定假 HTTP 客户端的 DatabaseService 工厂。各测试的假客户端只模拟自己用到的表或 RPC。
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.database import DatabaseService
+
+
+class FakeResponse:
+    """假 HTTP 响应：json() 返回 body，headers 用于 Content-Range 等响应头"""
+
+    def __init__(self, body=None, headers=None):
+        self._body = body
+        self.headers = headers or {}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._body
+
+
+@pytest.fixture
+def make_db():
+    """返回工厂函数：用给定的假客户端构造 DatabaseService"""
+
+    def make(client) -> DatabaseService:
+        db = DatabaseService("http://supabase.test", "key")
+        db._client = client
+        return db
+
+    return make
@@ -0,0 +1,82 @@
+"""
+单元测试：Agent 复用池
+
+验证相同 Prompt / 工具 / 模型复用已编译的 Agent，任一输入变化时重新构建，
+LRU 淘汰，请求级统计，以及 Prompt 文件按修改时间缓存。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_agent_pool.py
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.agents import agent_pool
+from backend.agents.agent_pool import AgentPool, read_prompt_file, track_request
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    calls = []
+
+    def fake_create_react_agent(model, tools, prompt):
+        calls.append(prompt)
+        return object()
+
+    monkeypatch.setattr(agent_pool, "create_react_agent", fake_create_react_agent)
+    return calls
+
+
+async def test_same_inputs_reuse_compiled_agent(builds):
+    pool = AgentPool(max_size=8)
+    model = object()
+    metrics = track_request()
+
+    first = await pool.get_or_create("editor", model=model, tools=[], prompt="审阅")
+    second = await pool.get_or_create("editor", model=model, tools=[], prompt="审阅")
+
+    assert first is second
+    assert builds == ["审阅"]
+    assert metrics["agents_built"] == 1
+    assert metrics["agents_reused"] == 1
+    assert pool.get_stats()["agents"]["editor"]["reused"] == 1
+
+
+async def test_changed_prompt_or_model_rebuilds(builds):
+    pool = AgentPool(max_size=8)
+    model = object()
+
+    await pool.get_or_create("editor", model=model, tools=[], prompt="审阅 A")
+    await pool.get_or_create("editor", model=model, tools=[], prompt="审阅 B")
+    await pool.get_or_create("editor", model=object(), tools=[], prompt="审阅 A")
+
+    assert len(builds) == 3
+
+
+async def test_least_recently_used_agent_is_evicted(builds):
+    pool = AgentPool(max_size=1)
+    model = object()
+
+    await pool.get_or_create("refiner", model=model, tools=[], prompt="A")
+    await pool.get_or_create("refiner", model=model, tools=[], prompt="B")
+    await pool.get_or_create("refiner", model=model, tools=[], prompt="A")
+
+    assert builds == ["A", "B", "A"]
+
+
+def test_prompt_file_is_reread_only_after_modification(tmp_path):
+    path = tmp_path / "prompt.md"
+    path.write_text("v1", encoding="utf-8")
+    assert read_prompt_file(path) == "v1"
+
+    path.write_text("v2", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert read_prompt_file(path) == "v2"
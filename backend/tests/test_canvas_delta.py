@@ -0,0 +1,118 @@
+"""
+单元测试：画布增量保存
+
+验证增量操作的请求校验、RPC 返回的版本冲突 / 剧集不存在的处理、
+全量保存改为 replace 操作，以及视口单独写入且不读取画布。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_canvas_delta.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from pydantic import ValidationError
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from conftest import FakeResponse
+
+from backend.schemas.canvas import CanvasDeltaRequest
+from backend.services.database import CanvasVersionConflict
+
+EPISODE_ID = "00000000-0000-0000-0000-0000000000e1"
+
+
+class FakeClient:
+    def __init__(self, rpc_result=None, patched_rows=1):
+        self.rpc_result = rpc_result
+        self.patched_rows = patched_rows
+        self.requests = []
+
+    async def get(self, url, params=None, headers=None):
+        self.requests.append(("GET", url, params))
+        return FakeResponse([])
+
+    async def post(self, url, json=None, headers=None):
+        self.requests.append(("POST", url, json))
+        return FakeResponse(self.rpc_result)
+
+    async def patch(self, url, params=None, json=None, headers=None):
+        self.requests.append(("PATCH", url, json, headers))
+        return FakeResponse(headers={"content-range": f"*/{self.patched_rows}"})
+
+
+def test_delta_request_parses_ops_by_type():
+    request = CanvasDeltaRequest(
+        base_version=3,
+        ops=[
+            {"op": "node_move", "id": "s1", "x": 10, "y": 20},
+            {"op": "connection_add", "connection": {"id": "c1", "source": "s1", "target": "s2"}},
+            {"op": "node_upsert", "node": {"shot_id": "s3", "title": "近景"}},
+        ],
+    )
+
+    assert [op.op for op in request.ops] == ["node_move", "connection_add", "node_upsert"]
+    assert request.ops[1].model_dump(mode="json")["connection"]["type"] == "sequence"
+
+
+def test_delta_request_rejects_unknown_op_and_node_without_id():
+    with pytest.raises(ValidationError):
+        CanvasDeltaRequest(base_version=0, ops=[{"op": "node_resize", "id": "s1"}])
+    with pytest.raises(ValidationError):
+        CanvasDeltaRequest(base_version=0, ops=[{"op": "node_upsert", "node": {"title": "x"}}])
+
+
+async def test_apply_delta_returns_new_version(make_db):
+    client = FakeClient({"found": True, "conflict": False, "version": 4})
+    db = make_db(client)
+    ops = [{"op": "node_remove", "id": "s1"}]
+
+    assert await db.apply_canvas_delta(EPISODE_ID, ops, base_version=3) == 4
+    method, url, payload = client.requests[0]
+    assert url.endswith("/rpc/apply_canvas_delta")
+    assert payload == {"p_episode_id": EPISODE_ID, "p_base_version": 3, "p_ops": ops}
+
+
+async def test_apply_delta_raises_on_stale_version(make_db):
+    db = make_db(FakeClient({"found": True, "conflict": True, "version": 7}))
+
+    with pytest.raises(CanvasVersionConflict) as exc_info:
+        await db.apply_canvas_delta(EPISODE_ID, [], base_version=3)
+
+    assert exc_info.value.current_version == 7
+
+
+async def test_apply_delta_on_missing_episode_returns_none(make_db):
+    db = make_db(FakeClient({"found": False, "conflict": False, "version": None}))
+
+    assert await db.apply_canvas_delta(EPISODE_ID, [], base_version=0) is None
+
+
+async def test_full_save_replaces_nodes_and_writes_viewport_separately(make_db):
+    client = FakeClient({"found": True, "conflict": False, "version": 1})
+    db = make_db(client)
+
+    result = await db.save_episode_canvas(
+        EPISODE_ID,
+        {"viewport": {"x": 1, "y": 2, "zoom": 1.5}, "nodes": [{"shot_id": "s1"}], "connections": []},
+    )
+
+    assert result["version"] == 1
+    rpc, patch = client.requests
+    assert rpc[2]["p_ops"] == [{"op": "replace", "nodes": [{"shot_id": "s1"}], "connections": []}]
+    assert patch[2] == {"canvas_viewport": {"x": 1, "y": 2, "zoom": 1.5}}
+
+
+async def test_viewport_update_does_not_read_canvas(make_db):
+    client = FakeClient()
+    db = make_db(client)
+
+    assert await db.update_episode_viewport(EPISODE_ID, x=5, y=6, zoom=2) == {"x": 5, "y": 6, "zoom": 2}
+    assert [r[0] for r in client.requests] == ["PATCH"]
+    assert client.requests[0][3] == {"Prefer": "return=minimal,count=exact"}
+
+    client.patched_rows = 0
+    assert await db.update_episode_viewport(EPISODE_ID, x=5, y=6, zoom=2) is None
@@ -0,0 +1,113 @@
+"""
+单元测试：分镜计数延迟维护
+
+验证 ShotCounterService 在合并窗口内把多次变化合并为一次写入，
+写入失败时保留增量并重新安排写入，以及写入进行中记录的增量不会丢失。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_counter_service.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.counter_service import ShotCounterService
+
+
+class FakeDB:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = []
+        self.on_apply = None
+
+    async def apply_shot_count_deltas(self, episode_deltas, scene_deltas):
+        if self.on_apply:
+            await self.on_apply()
+        if self.fail:
+            raise RuntimeError("PostgREST unavailable")
+        self.calls.append((episode_deltas, scene_deltas))
+
+    async def reconcile_shot_counts(self, episode_ids=None):
+        return 2
+
+
+async def test_changes_in_window_are_coalesced_into_one_write():
+    db = FakeDB()
+    counters = ShotCounterService(db, flush_delay=0.02)
+
+    for _ in range(10):
+        counters.record("ep-1", "scene-1", 1)
+    counters.record("ep-1", "scene-2", 1)
+    counters.record("ep-2", None, 1)
+    counters.record("ep-2", None, -1)
+
+    await asyncio.sleep(0.05)
+
+    assert db.calls == [({"ep-1": 11}, {"scene-1": 10, "scene-2": 1})]
+    assert counters.pending == 0
+
+
+async def test_failed_flush_keeps_deltas_for_retry():
+    db = FakeDB(fail=True)
+    counters = ShotCounterService(db, flush_delay=10)
+    counters.record("ep-1", "scene-1", 3)
+
+    assert await counters.flush() == 0
+    assert counters.pending == 2
+
+    db.fail = False
+    counters.record("ep-1", None, -1)
+    assert await counters.flush() == 2
+    assert db.calls == [({"ep-1": 2}, {"scene-1": 3})]
+
+
+async def test_changes_recorded_during_flush_are_written():
+    db = FakeDB()
+    counters = ShotCounterService(db, flush_delay=0.02)
+    in_flight = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_rpc():
+        in_flight.set()
+        await release.wait()
+
+    db.on_apply = slow_rpc
+    counters.record("ep-1", "scene-1", 1)
+    await in_flight.wait()
+
+    # 缓冲区已交换、RPC 尚未返回时记录的变化
+    counters.record("ep-1", "scene-1", 1)
+    db.on_apply = None
+    release.set()
+    await asyncio.sleep(0.05)
+
+    assert db.calls == [({"ep-1": 1}, {"scene-1": 1}), ({"ep-1": 1}, {"scene-1": 1})]
+    assert counters.pending == 0
+
+
+async def test_failed_delayed_flush_is_rescheduled():
+    db = FakeDB(fail=True)
+    counters = ShotCounterService(db, flush_delay=0.05)
+    counters.record("ep-1", None, 2)
+
+    await asyncio.sleep(0.075)
+    assert counters.stats["failed_flushes"] == 1
+    assert counters.pending == 1
+
+    db.fail = False
+    await asyncio.sleep(0.1)
+    assert db.calls == [({"ep-1": 2}, {})]
+    assert counters.pending == 0
+
+
+async def test_reconcile_flushes_pending_deltas_first():
+    db = FakeDB()
+    counters = ShotCounterService(db, flush_delay=10)
+    counters.record("ep-1", None, 1)
+
+    assert await counters.reconcile() == 2
+    assert db.calls == [({"ep-1": 1}, {})]
@@ -0,0 +1,119 @@
+"""
+单元测试：轻量计数
+
+验证 count_rows 使用 HEAD 请求并只携带过滤条件、Content-Range 的解析，
+以及项目列表整页只发起一次批量计数 RPC。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_counts.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from conftest import FakeResponse
+
+from backend.services import database
+
+PROJECT_ROW = {
+    "user_id": "00000000-0000-0000-0000-000000000001",
+    "name": "测试项目",
+    "cover_image": None,
+    "meta": {},
+    "is_temporary": False,
+    "created_at": "2026-10-17T00:00:00+00:00",
+    "updated_at": "2026-10-17T00:00:00+00:00",
+}
+
+
+class FakeClient:
+    def __init__(self, rows=(), counts=(), total="*/0"):
+        self.rows = list(rows)
+        self.counts = list(counts)
+        self.total = total
+        self.requests = []
+
+    async def get(self, url, params=None, headers=None):
+        self.requests.append(("GET", url, params))
+        return FakeResponse(self.rows)
+
+    async def head(self, url, params=None, headers=None):
+        self.requests.append(("HEAD", url, params, headers))
+        return FakeResponse(headers={"content-range": self.total})
+
+    async def post(self, url, json=None, headers=None):
+        self.requests.append(("POST", url, json))
+        return FakeResponse(self.counts)
+
+
+def test_parse_content_range():
+    assert database._parse_content_range("0-24/3573") == 3573
+    assert database._parse_content_range("*/0") == 0
+    assert database._parse_content_range("0-24/*") is None
+    assert database._parse_content_range(None) is None
+
+
+async def test_count_rows_sends_head_with_filters_only(make_db):
+    client = FakeClient(total="*/42")
+    db = make_db(client)
+
+    total = await db.count_rows(
+        "theme_elements",
+        {"theme_id": "eq.t1", "select": "*", "order": "name", "limit": 20, "offset": 40},
+        mode="estimated",
+    )
+
+    assert total == 42
+    method, url, params, headers = client.requests[0]
+    assert (method, url) == ("HEAD", "http://supabase.test/rest/v1/theme_elements")
+    assert params == {"theme_id": "eq.t1"}
+    assert headers == {"Prefer": "count=estimated"}
+
+
+async def test_count_jobs_estimates_only_unfiltered_totals(make_db):
+    client = FakeClient(total="*/7")
+    db = make_db(client)
+
+    await db.count_jobs()
+    await db.count_jobs(status="running")
+
+    assert client.requests[0][3] == {"Prefer": "count=estimated"}
+    assert client.requests[1][3] == {"Prefer": "count=exact"}
+
+
+async def test_temp_project_count_uses_total_not_row_length(make_db):
+    client = FakeClient(total="*/3")
+    db = make_db(client)
+
+    assert await db.count_temp_projects("u1") == 3
+
+
+async def test_list_projects_counts_whole_page_in_one_rpc(make_db):
+    rows = [{**PROJECT_ROW, "id": f"00000000-0000-0000-0000-00000000000{n}"} for n in (1, 2, 3)]
+    counts = [
+        {"project_id": rows[0]["id"], "node_count": 12, "episode_count": 3},
+        {"project_id": rows[1]["id"], "node_count": 0, "episode_count": 0},
+    ]
+    client = FakeClient(rows=rows, counts=counts)
+    db = make_db(client)
+
+    projects = await db.list_projects("u1")
+
+    assert [r[0] for r in client.requests] == ["GET", "POST"]
+    assert client.requests[1][2] == {"p_project_ids": [row["id"] for row in rows]}
+    assert [(p.node_count, p.episode_count) for p in projects] == [(12, 3), (0, 0), (0, 0)]
+
+
+async def test_get_projects_by_ids_uses_one_in_query(make_db):
+    rows = [{**PROJECT_ROW, "id": f"00000000-0000-0000-0000-00000000000{n}"} for n in (1, 2)]
+    client = FakeClient(rows=rows, counts=[])
+    db = make_db(client)
+
+    projects = await db.get_projects_by_ids([row["id"] for row in rows])
+
+    assert sorted(projects) == [row["id"] for row in rows]
+    get = next(r for r in client.requests if r[0] == "GET")
+    assert get[2]["id"] == f"in.({rows[0]['id']},{rows[1]['id']})"
@@ -0,0 +1,63 @@
+"""
+单元测试：进程级编译图缓存
+
+验证 get_graph_for_request() 在同一事件循环内复用编译结果，
+在不同 checkpointer / 事件循环之间隔离。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_graph_cache.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.graph import main_graph
+
+
+@pytest.fixture(autouse=True)
+def fake_compile(monkeypatch):
+    """用轻量对象替换真实编译，只统计编译次数"""
+    calls = []
+
+    def _create(checkpointer=None):
+        calls.append(checkpointer)
+        return object()
+
+    monkeypatch.setattr(main_graph, "create_main_graph", _create)
+    main_graph.clear_graph_cache()
+    yield calls
+    main_graph.clear_graph_cache()
+
+
+async def test_same_loop_reuses_compiled_graph(fake_compile):
+    checkpointer = object()
+    first = await main_graph.get_graph_for_request(checkpointer)
+    second = await main_graph.get_graph_for_request(checkpointer)
+
+    assert first is second
+    assert len(fake_compile) == 1
+
+
+async def test_different_checkpointer_compiles_separately(fake_compile):
+    first = await main_graph.get_graph_for_request(object())
+    second = await main_graph.get_graph_for_request(object())
+
+    assert first is not second
+    assert len(fake_compile) == 2
+
+
+def test_different_loops_are_isolated(fake_compile):
+    checkpointer = object()
+    first = asyncio.run(main_graph.get_graph_for_request(checkpointer))
+    second = asyncio.run(main_graph.get_graph_for_request(checkpointer))
+
+    assert first is not second
+    assert len(fake_compile) == 2
+    # 已关闭循环的条目在下一次编译时被清理
+    assert main_graph.get_graph_cache_stats()["size"] == 1
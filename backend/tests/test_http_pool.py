@@ -0,0 +1,88 @@
+"""
+单元测试：共享 HTTP 连接池
+
+验证同一事件循环内 DatabaseService / StorageService 共用一个 client、
+不同事件循环互相隔离、关闭循环前释放连接、未释放的已关闭循环被清理，
+以及 ScopedClient 合并默认请求头。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_http_pool.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services import http_pool
+from backend.services.http_pool import ScopedClient
+
+
+@pytest.fixture(autouse=True)
+def clean_pool(monkeypatch):
+    monkeypatch.setattr(http_pool, "_clients", {})
+    monkeypatch.setattr(
+        http_pool, "_stats", {"requests": 0, "created": 0, "closed": 0, "abandoned": 0}
+    )
+
+
+async def test_same_loop_shares_one_client():
+    first = http_pool.get_http_client()
+    second = http_pool.get_http_client()
+
+    assert first is second
+    assert http_pool.get_pool_stats()["clients"] == 1
+
+    await http_pool.close_http_client()
+    assert http_pool.get_pool_stats()["closed"] == 1
+
+
+def test_loops_are_isolated_and_closed_before_loop_ends():
+    async def job():
+        client = http_pool.get_http_client()
+        await http_pool.close_http_client()
+        return client
+
+    first = asyncio.run(job())
+    second = asyncio.run(job())
+
+    assert first is not second
+    stats = http_pool.get_pool_stats()
+    assert (stats["created"], stats["closed"], stats["clients"]) == (2, 2, 0)
+
+
+def test_clients_of_closed_loops_are_pruned():
+    async def leak():
+        http_pool.get_http_client()
+
+    asyncio.run(leak())
+    asyncio.run(leak())
+
+    stats = http_pool.get_pool_stats()
+    assert stats["abandoned"] == 1
+    assert stats["clients"] == 1
+
+
+class RecordingClient:
+    def __init__(self):
+        self.calls = []
+
+    async def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs))
+
+
+async def test_scoped_client_merges_default_headers(monkeypatch):
+    recording = RecordingClient()
+    monkeypatch.setattr(http_pool, "get_http_client", lambda: recording)
+    client = ScopedClient({"apikey": "k", "Prefer": "return=representation"}, timeout=5.0)
+
+    await client.head("http://supabase.test/rest/v1/projects", headers={"Prefer": "count=exact"})
+
+    method, url, kwargs = recording.calls[0]
+    assert method == "HEAD"
+    assert kwargs["headers"] == {"apikey": "k", "Prefer": "count=exact"}
+    assert kwargs["timeout"] == 5.0
@@ -0,0 +1,106 @@
+"""
+单元测试：任务进度合并上报
+
+验证时间窗口内的小幅进度更新被合并、增量达到阈值时立即写入、尾随写入保证
+最后一次更新不丢失、进度只增不减、丢弃待写内容的 close 等待进行中的尾随写入，以及只有图节点本身的 on_chain_end 计入进度。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_job_progress.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.job_progress import JobProgressReporter
+
+JOB_ID = "00000000-0000-0000-0000-00000000000j"
+
+
+class FakeDB:
+    def __init__(self):
+        self.writes = []
+        self.write_delay = 0.0
+
+    async def update_job_progress(self, job_id, progress):
+        await asyncio.sleep(self.write_delay)
+        self.writes.append((progress.progress_percent, progress.current_step))
+        return True
+
+
+async def test_small_updates_are_coalesced():
+    db = FakeDB()
+    reporter = JobProgressReporter(db, JOB_ID, min_interval=60, min_delta=10)
+
+    for n in range(1, 1001):
+        await reporter.report(n // 100, f"step {n}")
+    await reporter.close()
+
+    # 首次立即写入；之后每跨过 10% 写一次；close 写入最后状态
+    assert db.writes[0] == (0, "step 1")
+    assert db.writes[-1] == (10, "step 1000")
+    assert len(db.writes) <= 3
+    assert reporter.stats["reports"] == 1000
+
+
+async def test_trailing_write_delivers_last_update():
+    db = FakeDB()
+    reporter = JobProgressReporter(db, JOB_ID, min_interval=0.05, min_delta=50)
+
+    await reporter.report(10, "writer")
+    await reporter.report(12, "editor")
+    assert db.writes == [(10, "writer")]
+
+    await asyncio.sleep(0.1)
+    assert db.writes == [(10, "writer"), (12, "editor")]
+
+
+async def test_progress_never_goes_backwards_and_duplicates_are_skipped():
+    db = FakeDB()
+    publishes = []
+
+    async def publish(project_id, event, data):
+        publishes.append((event, data["progress"]))
+
+    reporter = JobProgressReporter(
+        db, JOB_ID, "project", "novel_writing", publish=publish, min_interval=0, min_delta=1
+    )
+
+    await reporter.report(70, "editor")
+    await reporter.report(50, "unknown")
+    await reporter.report(50, "unknown")
+
+    assert db.writes == [(70, "editor"), (70, "unknown")]
+    assert publishes == [("job.progress", 70), ("job.progress", 70)]
+
+
+async def test_close_without_flush_drops_pending():
+    db = FakeDB()
+    reporter = JobProgressReporter(db, JOB_ID, min_interval=60, min_delta=50)
+
+    await reporter.report(10, "writer")
+    await reporter.report(20, "editor")
+    await reporter.close(flush=False)
+    await asyncio.sleep(0)
+
+    assert db.writes == [(10, "writer")]
+
+
+async def test_close_without_flush_waits_for_trailing_write():
+    db = FakeDB()
+    reporter = JobProgressReporter(db, JOB_ID, min_interval=0.02, min_delta=50)
+
+    await reporter.report(10, "writer")
+    await reporter.report(20, "editor")
+    db.write_delay = 0.05
+    # 尾随写入已触发、正在写入
+    await asyncio.sleep(0.03)
+    await reporter.close(flush=False)
+
+    # close 返回时尾随写入已经完成，之后的状态更新不会被进度写入覆盖
+    assert db.writes == [(10, "writer"), (20, "editor")]
+    await asyncio.sleep(0.1)
+    assert db.writes == [(10, "writer"), (20, "editor")]
@@ -0,0 +1,127 @@
+"""
+单元测试：批量读取器
+
+验证同一轮次的 load 合并为一次批量查询、请求内重复读取命中缓存、
+超过批量上限时拆分、失败结果不缓存，以及项目批量读取只发起一次 in.(…) 查询。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_loader.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.loader import DataLoader, DatabaseLoaders
+
+
+class FakeBatch:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = []
+
+    async def __call__(self, keys):
+        self.calls.append(list(keys))
+        if self.fail:
+            raise RuntimeError("PostgREST unavailable")
+        return {key: {"id": key} for key in keys if key != "missing"}
+
+
+async def test_loads_in_same_tick_are_batched():
+    batch = FakeBatch()
+    loader = DataLoader(batch)
+
+    results = await asyncio.gather(loader.load("a"), loader.load("b"), loader.load("missing"))
+
+    assert results == [{"id": "a"}, {"id": "b"}, None]
+    assert batch.calls == [["a", "b", "missing"]]
+
+
+async def test_repeated_loads_are_memoized():
+    batch = FakeBatch()
+    loader = DataLoader(batch)
+
+    first = await loader.load("a")
+    again, other = await loader.load_many(["a", "b"])
+
+    assert first is again
+    assert other == {"id": "b"}
+    assert batch.calls == [["a"], ["b"]]
+    assert loader.stats == {"loads": 3, "batches": 2, "keys": 2}
+
+
+async def test_large_batches_are_split():
+    batch = FakeBatch()
+    loader = DataLoader(batch, max_batch_size=2)
+
+    pending = asyncio.ensure_future(loader.load_many(["a", "b", "c"]))
+    while not batch.calls:
+        await asyncio.sleep(0)
+    # 进行中的批量查询任务由读取器持有，完成后释放
+    assert len(loader._tasks) == 2
+    await pending
+
+    assert batch.calls == [["a", "b"], ["c"]]
+    assert not loader._tasks
+
+
+async def test_failed_batch_is_not_cached():
+    batch = FakeBatch(fail=True)
+    loader = DataLoader(batch)
+
+    with pytest.raises(RuntimeError):
+        await loader.load("a")
+
+    batch.fail = False
+    assert await loader.load("a") == {"id": "a"}
+    assert len(batch.calls) == 2
+
+
+async def test_clear_does_not_orphan_pending_loads():
+    batch = FakeBatch()
+    loader = DataLoader(batch)
+
+    pending = loader.load("a")
+    loader.clear()
+
+    assert await pending == {"id": "a"}
+
+
+class FakeDB:
+    def __init__(self):
+        self.calls = []
+
+    async def get_projects_by_ids(self, ids):
+        self.calls.append(("projects", ids))
+        return {pid: {"id": pid} for pid in ids}
+
+    async def get_episodes_by_ids(self, ids):
+        self.calls.append(("episodes", ids))
+        return {}
+
+    async def get_scenes_by_ids(self, ids):
+        return {}
+
+    async def get_shot_nodes_by_ids(self, ids):
+        self.calls.append(("shots", ids))
+        return {sid: {"shot_id": sid} for sid in ids}
+
+
+async def test_database_loaders_batch_per_table():
+    db = FakeDB()
+    loaders = DatabaseLoaders(db)
+
+    episode, shots = await asyncio.gather(
+        loaders.episodes.load("ep-1"),
+        loaders.shots.load_many(["s1", "s2"]),
+    )
+
+    assert episode is None
+    assert [shot["shot_id"] for shot in shots] == ["s1", "s2"]
+    assert sorted(db.calls) == [("episodes", ["ep-1"]), ("shots", ["s1", "s2"])]
+    assert loaders.get_stats()["shots"]["batches"] == 1
@@ -0,0 +1,38 @@
+"""
+单元测试：进程内 LRU + TTL 缓存
+
+验证 LocalCache 按最近使用淘汰条目，以及条目过期后返回 MISSING。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_local_cache.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.local_cache import MISSING, LocalCache
+
+
+def test_local_cache_evicts_least_recently_used():
+    local = LocalCache(maxsize=2, ttl=60)
+    local.set("a", 1)
+    local.set("b", 2)
+    assert local.get("a") == 1
+    local.set("c", 3)
+
+    assert local.get("b") is MISSING
+    assert local.get("a") == 1
+    assert local.get("c") == 3
+
+
+def test_local_cache_expires_entries():
+    local = LocalCache(maxsize=10, ttl=0.01)
+    local.set("a", 1)
+    time.sleep(0.02)
+
+    assert local.get("a") is MISSING
+    assert len(local) == 0
@@ -0,0 +1,113 @@
+"""
+单元测试：模型路由缓存
+
+验证路由结果命中缓存时不访问数据库、未配置映射的结果被负缓存、
+不同任务温度不共用模型实例、模型标识随服务商 / 模型 / 参数变化，
+以及服务商/映射变更后的失效。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_model_router.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.schemas.model_config import TaskType
+from backend.services.model_router import ModelNotConfiguredError, ModelRouter
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+
+
+class FakeDB:
+    def __init__(self, mappings):
+        self.mappings = mappings
+        self.lookups = []
+
+    async def get_model_mapping(self, user_id, task_type, project_id=None):
+        self.lookups.append(task_type)
+        return self.mappings.get(task_type)
+
+
+def _mapping(task_type: str, provider_id: str = "p1") -> dict:
+    return {
+        "id": f"m-{task_type}",
+        "model_name": "gpt-4o",
+        "parameters": {},
+        "llm_providers": {"id": provider_id, "api_key": "sk-test", "protocol": "openai"},
+    }
+
+
+@pytest.fixture
+def router():
+    db = FakeDB({"editor": _mapping("editor"), "novel_writer": _mapping("novel_writer")})
+    instance = ModelRouter(db)
+    instance._create_model = lambda **kwargs: kwargs
+    return instance
+
+
+async def test_repeated_lookups_skip_the_database(router):
+    first = await router.get_model(USER_ID, TaskType.EDITOR)
+    second = await router.get_model(USER_ID, TaskType.EDITOR)
+
+    assert first is second
+    assert router._db.lookups == ["editor"]
+    assert router.stats == {"hits": 1, "negative_hits": 0, "misses": 1}
+
+
+async def test_tasks_with_different_temperatures_get_separate_models(router):
+    editor = await router.get_model(USER_ID, TaskType.EDITOR)
+    writer = await router.get_model(USER_ID, TaskType.NOVEL_WRITER)
+
+    assert editor["parameters"]["temperature"] == 0.4
+    assert writer["parameters"]["temperature"] == 0.85
+
+
+async def test_missing_mapping_is_negatively_cached(router):
+    for _ in range(3):
+        with pytest.raises(ModelNotConfiguredError):
+            await router.get_model(USER_ID, TaskType.SCRIPT_FORMATTER)
+
+    assert router._db.lookups == ["script_formatter"]
+    assert router.stats["negative_hits"] == 2
+
+
+async def test_mapping_change_invalidates_user_and_negative_entries(router):
+    await router.get_model(USER_ID, TaskType.EDITOR)
+    with pytest.raises(ModelNotConfiguredError):
+        await router.get_model(USER_ID, TaskType.SCRIPT_FORMATTER)
+
+    router._db.mappings["script_formatter"] = _mapping("script_formatter")
+    router.invalidate(user_id=USER_ID)
+
+    await router.get_model(USER_ID, TaskType.SCRIPT_FORMATTER)
+    await router.get_model(USER_ID, TaskType.EDITOR)
+    assert router._db.lookups == ["editor", "script_formatter", "script_formatter", "editor"]
+
+
+async def test_provider_change_drops_its_models(router):
+    before = await router.get_model(USER_ID, TaskType.EDITOR)
+
+    router.invalidate(provider_id="p1")
+    after = await router.get_model(USER_ID, TaskType.EDITOR)
+
+    assert after is not before
+    assert router.get_stats()["models"] == 1
+
+
+async def test_model_id_tracks_provider_model_and_parameters(router):
+    editor_id = await router.get_model_id(USER_ID, TaskType.EDITOR)
+    assert editor_id == await router.get_model_id(USER_ID, TaskType.EDITOR)
+    assert editor_id != await router.get_model_id(USER_ID, TaskType.NOVEL_WRITER)
+    assert '"temperature": 0.4' in editor_id
+    assert router._db.lookups == ["editor", "novel_writer"]
+
+    router._db.mappings["editor"]["model_name"] = "gpt-4o-mini"
+    router.invalidate(mapping_id="m-editor")
+    assert await router.get_model_id(USER_ID, TaskType.EDITOR) != editor_id
+
+    assert await router.get_model_id(USER_ID, TaskType.SCRIPT_FORMATTER) is None
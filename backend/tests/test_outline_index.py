@@ -0,0 +1,98 @@
+"""
+单元测试：大纲章节索引
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_outline_index.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.utils.outline_index import ChapterIndex
+
+OUTLINE = """## 四、情节架构（Plot Architecture）
+- Chapter 1-3：开篇钩子，男女主初次相遇
+
+## 五、章节大纲（Chapter Outlines）
+
+### Chapter 1: 婚礼惊变
+**摘要**：苏清新婚之夜遭遇灭门惨案，
+侥幸逃脱，誓要复仇。
+
+**场景清单**：
+1. **喜房**：新娘等待新郎，气氛温馨
+2. **前院**：突然闯入的黑衣人，屠杀开始
+
+**张力值**：95
+
+### Chapter 2: 五年蛰伏
+- **一句话摘要**：五年后，苏清化名归来。
+
+#### 场景清单
+1. **医馆**：苏清坐诊，名声渐起
+
+## 六、改编映射（Adaptation Mapping）
+**整体比例**：1章小说 ≈ 1.51集短剧
+"""
+
+
+def test_indexes_chapter_headers_only():
+    index = ChapterIndex(OUTLINE)
+
+    # "- Chapter 1-3：" 是范围引用，不是章节标题
+    assert index.numbers() == [1, 2]
+    assert index.get(1).title == "婚礼惊变"
+    assert index.get("2").title == "五年蛰伏"
+    assert index.get(3) is None
+
+
+def test_summary_and_scene_spans():
+    index = ChapterIndex(OUTLINE)
+
+    assert index.get(1).summary == "苏清新婚之夜遭遇灭门惨案， 侥幸逃脱，誓要复仇。"
+    assert index.get(2).summary == "五年后，苏清化名归来。"
+
+    scenes = index.scene_text(1)
+    assert "**喜房**" in scenes and "**前院**" in scenes
+    assert "张力值" not in scenes
+    assert "**医馆**" in index.scene_text(2)
+
+
+def test_chapter_ends_at_higher_level_section():
+    index = ChapterIndex(OUTLINE)
+
+    assert "张力值" in index.body(1)
+    assert "Chapter 2" not in index.body(1)
+    assert "改编映射" not in index.body(2)
+    assert index.section(2).startswith("### Chapter 2")
+
+
+def test_first_occurrence_wins():
+    content = "### Chapter 1: 第一版\n正文\n### Chapter 1: 重复\n重复正文\n"
+    index = ChapterIndex(content)
+
+    assert len(index) == 1
+    assert index.get(1).title == "第一版"
+    assert index.body(1) == "正文\n"
+
+
+def test_keep_last_prefers_expanded_chapter():
+    content = "### Chapter 1: 简版\n一句话\n\n---\n\n### Chapter 1: 展开版\n**摘要**：完整摘要\n"
+    index = ChapterIndex(content, keep_last=True)
+
+    assert index.get(1).title == "展开版"
+    assert index.get(1).summary == "完整摘要"
+
+
+def test_replace_sections_keeps_surrounding_text():
+    index = ChapterIndex(OUTLINE)
+
+    merged = index.replace_sections({2: "### Chapter 2: 五年蛰伏（修订）\n苏清提前归来。\n", 9: "不存在"})
+
+    assert merged == OUTLINE.replace(index.section(2).rstrip(), "### Chapter 2: 五年蛰伏（修订）\n苏清提前归来。")
+    assert merged.startswith(OUTLINE[: index.get(2).header_start])
+    assert merged.endswith("## 六、改编映射（Adaptation Mapping）\n**整体比例**：1章小说 ≈ 1.51集短剧\n")
+    assert index.replace_sections({}) == OUTLINE
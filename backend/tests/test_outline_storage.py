@@ -0,0 +1,118 @@
+"""
+单元测试：大纲按行存储的全量保存和单节点修改
+
+验证 save_outline 不再先读取大纲、只用一次 RPC upsert 头信息并按行写入剧集，
+update_outline_node 只发送单个剧集的字段，以及旧版整体存储的大纲先转换再修改。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_outline_storage.py
+"""
+
+import json
+
+from conftest import FakeResponse
+
+PROJECT_ID = "00000000-0000-0000-0000-000000000001"
+EPISODE_ID = f"ep_{PROJECT_ID}_57"
+
+
+class FakeClient:
+    """按 URL 结尾返回预设结果，记录所有请求"""
+
+    def __init__(self, routes=None):
+        self.routes = {key: list(values) for key, values in (routes or {}).items()}
+        self.requests = []
+
+    def _reply(self, method, url, payload):
+        self.requests.append((method, url.rsplit("/", 1)[-1], payload))
+        replies = self.routes.get(f"{method} {url.rsplit('/', 1)[-1]}")
+        return FakeResponse(replies.pop(0) if replies else None)
+
+    async def get(self, url, params=None, headers=None):
+        return self._reply("GET", url, params)
+
+    async def post(self, url, params=None, json=None, headers=None):
+        return self._reply("POST", url, json)
+
+    async def patch(self, url, params=None, json=None, headers=None):
+        return self._reply("PATCH", url, json)
+
+    async def delete(self, url, params=None, headers=None):
+        return self._reply("DELETE", url, params)
+
+
+def _outline(episodes: int = 3) -> dict:
+    return {
+        "projectId": PROJECT_ID,
+        "title": "重生之逆袭",
+        "totalEpisodes": episodes,
+        "content": "# 骨架\n" * 10,
+        "episodes": [
+            {"episodeId": f"ep_{PROJECT_ID}_{n}", "episodeNumber": n, "title": f"第{n}集"}
+            for n in range(1, episodes + 1)
+        ],
+        "metadata": {"chapter_map": [{"chapter": 1, "episodes": "1-3"}], "skeleton_content": "x"},
+    }
+
+
+async def test_save_outline_upserts_without_reading_first(make_db):
+    client = FakeClient({"POST bump_outline_header": [5]})
+    db = make_db(client)
+
+    assert await db.save_outline(PROJECT_ID, _outline()) is True
+
+    methods = [(method, target) for method, target, _ in client.requests]
+    assert methods[0] == ("POST", "bump_outline_header")
+    assert ("GET", "project_content") not in methods
+    assert sorted(methods[1:3]) == [("POST", "outline_batches"), ("POST", "outline_episodes")]
+    assert sorted(methods[3:]) == [("DELETE", "outline_batches"), ("DELETE", "outline_episodes")]
+
+    header = json.loads(client.requests[0][2]["p_content"])
+    assert "episodes" not in header and "content" not in header
+    assert "skeleton_content" not in header["metadata"]
+    assert client.requests[0][2]["p_reset"] is True
+    assert client.requests[3][2]["version"] == "lt.5"
+
+
+async def test_update_outline_node_sends_only_the_patch(make_db):
+    client = FakeClient({"POST patch_outline_episode": [{"episodeId": EPISODE_ID, "title": "新"}]})
+    db = make_db(client)
+
+    ok = await db.update_outline_node(PROJECT_ID, EPISODE_ID, {"title": "新", "content": "摘要"})
+
+    assert ok is True
+    assert client.requests == [
+        (
+            "POST",
+            "patch_outline_episode",
+            {
+                "p_project_id": PROJECT_ID,
+                "p_episode_id": EPISODE_ID,
+                "p_patch": {"title": "新", "summary": "摘要"},
+            },
+        )
+    ]
+
+
+async def test_legacy_outline_is_converted_before_patching(make_db):
+    legacy = _outline(episodes=60)
+    legacy.pop("projectId")
+    client = FakeClient(
+        {
+            "POST patch_outline_episode": [None, {"episodeId": EPISODE_ID}],
+            "GET project_content": [
+                [{"metadata": {"storage": "full", "version": 2}}],
+                [{"content": json.dumps(legacy), "metadata": {"version": 2}}],
+            ],
+            "POST bump_outline_header": [3],
+        }
+    )
+    db = make_db(client)
+
+    assert await db.update_outline_node(PROJECT_ID, EPISODE_ID, {"title": "新"}) is True
+
+    targets = [target for _, target, _ in client.requests]
+    assert targets.count("patch_outline_episode") == 2
+    assert "bump_outline_header" in targets
+    assert "episodes" not in targets
@@ -0,0 +1,238 @@
+"""
+单元测试：大纲增量存储
+
+验证 OutlineStore.save_batch 每批只追加新增文本（同一批次重复保存也不会覆盖之前的片段），
+已持久化前缀不一致时清空重写，并发保存拿到不同的版本号，以及 get_outline_delta 和 GET /skeleton/{project_id}/delta
+按版本号返回增量。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_outline_store.py
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from conftest import FakeResponse
+
+from backend.api import skeleton_builder
+from backend.services.outline_store import OutlineStore
+
+PROJECT_ID = "00000000-0000-0000-0000-000000000001"
+
+CHAPTER_MAP = {
+    "chapter_map": [
+        {"chapter": 1, "episodes": "1-2"},
+        {"chapter": 2, "episodes": "3-4"},
+        {"chapter": 3, "episodes": "5-6"},
+    ],
+    "paywall_info": {},
+}
+
+SKELETON = f"# 《测试》大纲\n\n```json\n{json.dumps(CHAPTER_MAP)}\n```\n\n"
+BATCHES = [
+    SKELETON + "### Chapter 1: 开局\n**摘要**：主角登场。\n\n",
+    "### Chapter 2: 冲突\n**摘要**：矛盾升级。\n\n",
+    "### Chapter 3: 反转\n**摘要**：真相大白。\n\n",
+]
+
+
+class FakePostgrest:
+    """模拟 project_content / outline_batches / outline_episodes 三张表的 PostgREST 接口"""
+
+    def __init__(self):
+        self.tables = {"project_content": {}, "outline_batches": {}, "outline_episodes": {}}
+
+    @staticmethod
+    def _matches(row, params):
+        for column, condition in (params or {}).items():
+            if column in ("select", "order", "limit", "on_conflict"):
+                continue
+            op, value = condition.split(".", 1)
+            actual = row.get(column)
+            if op == "eq" and str(actual) != value:
+                return False
+            if op == "gt" and not actual > int(value):
+                return False
+            if op == "lt" and not actual < int(value):
+                return False
+        return True
+
+    async def get(self, url, params=None, headers=None):
+        table = self.tables[url.rsplit("/", 1)[-1]]
+        rows = [row for row in table.values() if self._matches(row, params)]
+        # 读取后让出事件循环，并发保存可以读到同一份旧数据
+        await asyncio.sleep(0)
+        order = (params or {}).get("order")
+        if order:
+            column = order.split(".")[0]
+            rows.sort(key=lambda row: row[column])
+        return FakeResponse([dict(row) for row in rows])
+
+    def _bump_outline_header(self, args):
+        """与 bump_outline_header RPC 相同：upsert 头信息并原子递增版本号"""
+        key = (args["p_project_id"], "outline")
+        previous = (self.tables["project_content"].get(key) or {}).get("metadata") or {}
+        version = previous.get("version", 0) + 1
+        base_version = version if args["p_reset"] else previous.get("base_version", 0)
+        self.tables["project_content"][key] = {
+            "project_id": args["p_project_id"],
+            "content_type": "outline",
+            "title": args["p_title"],
+            "content": args["p_content"],
+            "metadata": {**args["p_metadata"], "version": version, "base_version": base_version},
+        }
+        return FakeResponse(version)
+
+    async def post(self, url, params=None, json=None, headers=None):
+        if url.endswith("/rpc/bump_outline_header"):
+            return self._bump_outline_header(json)
+        table = self.tables[url.rsplit("/", 1)[-1]]
+        keys = params["on_conflict"].split(",")
+        for row in json if isinstance(json, list) else [json]:
+            table[tuple(row[key] for key in keys)] = dict(row)
+        return FakeResponse()
+
+    async def delete(self, url, params=None, headers=None):
+        table = self.tables[url.rsplit("/", 1)[-1]]
+        for key in [key for key, row in table.items() if self._matches(row, params)]:
+            del table[key]
+        return FakeResponse()
+
+
+@pytest.fixture
+def db(make_db):
+    return make_db(FakePostgrest())
+
+
+async def test_repeated_batch_saves_append_instead_of_overwrite(db):
+    store = OutlineStore(db)
+    accumulated = ""
+    results = []
+    # 第 2 批保存两次（例如最后一批重试）
+    for batch_index, text in zip((1, 2, 2), BATCHES):
+        accumulated += text
+        results.append(await store.save_batch(PROJECT_ID, accumulated, batch_index, 3))
+
+    assert [r["reset"] for r in results] == [True, False, False]
+    assert [r["version"] for r in results] == [1, 2, 3]
+    assert [r["chars_written"] for r in results] == [len(text) for text in BATCHES]
+    assert len(db._client.tables["outline_batches"]) == 3
+
+    assert await db.get_outline_skeleton_content(PROJECT_ID) == accumulated
+    header = await db.get_outline_header(PROJECT_ID)
+    assert header["metadata"]["content_length"] == len(accumulated)
+
+    episodes = await db.list_outline_episodes(PROJECT_ID)
+    assert [episode["episodeNumber"] for episode in episodes] == [1, 2, 3, 4, 5, 6]
+
+
+async def test_unchanged_content_writes_nothing_and_changed_prefix_resets(db):
+    store = OutlineStore(db)
+    first = BATCHES[0] + BATCHES[1]
+    await store.save_batch(PROJECT_ID, first, 1, 2)
+
+    again = await store.save_batch(PROJECT_ID, first, 1, 2)
+    assert again["reset"] is False
+    assert again["chars_written"] == 0
+
+    # 重新生成：已持久化的前缀与新内容不一致，清除旧片段从头写入
+    regenerated = SKELETON + "### Chapter 1: 新的开局\n**摘要**：重写。\n\n"
+    result = await store.save_batch(PROJECT_ID, regenerated, 1, 2)
+    assert result["reset"] is True
+    assert await db.get_outline_skeleton_content(PROJECT_ID) == regenerated
+    assert len(db._client.tables["outline_batches"]) == 1
+
+
+async def test_concurrent_batch_saves_get_distinct_versions(db):
+    store = OutlineStore(db)
+    await store.save_batch(PROJECT_ID, BATCHES[0], 1, 2)
+
+    # 两次保存读到同一个头信息，版本号仍由数据库依次分配
+    accumulated = BATCHES[0] + BATCHES[1]
+    results = await asyncio.gather(
+        store.save_batch(PROJECT_ID, accumulated, 2, 2),
+        store.save_batch(PROJECT_ID, accumulated, 2, 2),
+    )
+
+    assert sorted(r["version"] for r in results) == [2, 3]
+    header = await db.get_outline_header(PROJECT_ID)
+    assert header["metadata"]["version"] == 3
+    assert header["metadata"]["base_version"] == 1
+    assert await db.get_outline_skeleton_content(PROJECT_ID) == accumulated
+
+
+async def test_failed_row_write_resets_next_save(db, monkeypatch):
+    store = OutlineStore(db)
+    await store.save_batch(PROJECT_ID, BATCHES[0], 1, 2)
+
+    async def broken(*args, **kwargs):
+        raise RuntimeError("connection reset")
+
+    accumulated = BATCHES[0] + BATCHES[1]
+    with monkeypatch.context() as patch:
+        patch.setattr(db, "append_outline_batch", broken)
+        with pytest.raises(RuntimeError):
+            await store.save_batch(PROJECT_ID, accumulated, 2, 2)
+
+    result = await store.save_batch(PROJECT_ID, accumulated, 2, 2)
+    assert result["reset"] is True
+    assert await db.get_outline_skeleton_content(PROJECT_ID) == accumulated
+
+
+async def test_get_outline_delta(db):
+    store = OutlineStore(db)
+    accumulated = ""
+    for batch_index, text in enumerate(BATCHES, 1):
+        accumulated += text
+        await store.save_batch(PROJECT_ID, accumulated, batch_index, 3)
+
+    full = await db.get_outline_delta(PROJECT_ID, since_version=0)
+    assert full["version"] == 3
+    assert full["full"] is True
+    assert "".join(part["content"] for part in full["contentAppends"]) == accumulated
+
+    delta = await db.get_outline_delta(PROJECT_ID, since_version=2)
+    assert delta["full"] is False
+    assert delta["contentAppends"] == [
+        {"offset": len(BATCHES[0]) + len(BATCHES[1]), "content": BATCHES[2]}
+    ]
+    assert [episode["episodeNumber"] for episode in delta["episodes"]] == [5, 6]
+
+    current = await db.get_outline_delta(PROJECT_ID, since_version=3)
+    assert current["contentAppends"] == [] and current["episodes"] == []
+
+    missing = await db.get_outline_delta("00000000-0000-0000-0000-000000000002", since_version=0)
+    assert missing["version"] == 0 and missing["full"] is True
+
+
+async def test_delta_endpoint(db, monkeypatch):
+    store = OutlineStore(db)
+    await store.save_batch(PROJECT_ID, BATCHES[0], 1, 2)
+    await store.save_batch(PROJECT_ID, BATCHES[0] + BATCHES[1], 2, 2)
+    monkeypatch.setattr(skeleton_builder, "get_db_service", lambda: db)
+
+    app = FastAPI()
+    app.include_router(skeleton_builder.router, prefix="/api")
+    client = TestClient(app)
+
+    response = client.get(f"/api/skeleton/{PROJECT_ID}/delta", params={"since_version": 1})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["version"] == 2
+    assert body["full"] is False
+    assert body["contentAppends"] == [{"offset": len(BATCHES[0]), "content": BATCHES[1]}]
+
+    async def broken(*args, **kwargs):
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(db, "get_outline_delta", broken)
+    assert client.get(f"/api/skeleton/{PROJECT_ID}/delta").status_code == 500
@@ -0,0 +1,151 @@
+"""
+单元测试：质量审阅前的规则预筛
+
+验证结构分和张力曲线节奏分的计算、fail / pass / review 判定，
+质量控制节点在预筛合格时跳过 Editor，以及预筛与 Editor 评分一致率的统计。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_prescreen.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.config import settings
+from backend.graph.workflows import skeleton_builder_graph
+from backend.services import prescreen_service
+from backend.services.prescreen_service import PrescreenStats, prescreen_content
+from backend.services.tension_service import generate_standard_curve
+
+CHAPTERS = 20
+
+
+def build_outline(chapters: int = CHAPTERS, tension=None, drop_elements=()) -> str:
+    """生成与骨架构建器输出格式一致的大纲，tension 为每章峰值张力"""
+    tension = tension or generate_standard_curve(chapters)
+    parts = [
+        "# 《预筛测试》小说大纲\n\n## 一、元数据（Metadata）\n- **付费卡点**: 第12集\n\n",
+        "## 二、核心设定（Core Setting）\n世界观\n\n## 三、人物体系（Character System）\n人物\n\n",
+        "## 四、情节架构（Plot Architecture）\n梗概\n\n## 五、章节大纲（Chapter Outlines）\n\n",
+    ]
+    for n in range(1, chapters + 1):
+        elements = {
+            "核心任务": f"- **核心任务**: 第{n}章任务\n",
+            "核心冲突": f"- **核心冲突**: 第{n}章冲突\n",
+            "钩子": "- **钩子类型**: 情境钩子\n",
+        }
+        parts.append(
+            f"### Chapter {n}: 第{n}章\n**核心要素**:\n"
+            + "".join(text for name, text in elements.items() if name not in drop_elements)
+            + f"**情绪曲线**:\n- **峰值张力**: {tension[n - 1]:.0f}\n\n"
+            "**场景清单**:\n1. **场景1**: 宴会厅 - 主角 - 对峙 - 紧张\n\n"
+        )
+    return "".join(parts)
+
+
+def test_well_formed_outline_passes():
+    result = prescreen_content(
+        build_outline(), expected_chapters=CHAPTERS, fail_score=50, pass_score=90
+    )
+
+    assert result["verdict"] == "pass"
+    assert result["structure_score"] == 100
+    assert result["pacing_score"] >= 90
+    assert result["chapters"] == CHAPTERS
+    assert len(result["tension_curve"]) == CHAPTERS
+
+
+def test_broken_outline_fails():
+    # 只有一半章节、缺少章节要素、人物体系和情节架构
+    content = build_outline(CHAPTERS // 2, drop_elements=("核心冲突",))
+    content = content.replace("人物体系", "").replace("情节架构", "")
+    result = prescreen_content(content, expected_chapters=CHAPTERS, fail_score=50, pass_score=90)
+
+    assert result["verdict"] == "fail"
+    assert result["structure_score"] < 50
+    descriptions = " ".join(issue["description"] for issue in result["issues"])
+    assert "人物体系" in descriptions
+    assert "期望20章，实际10章" in descriptions
+
+
+def test_flat_tension_curve_needs_review():
+    flat = build_outline(tension=[62] * CHAPTERS)
+    result = prescreen_content(flat, expected_chapters=CHAPTERS, fail_score=50, pass_score=90)
+
+    assert result["verdict"] == "review"
+    assert result["structure_score"] == 100
+    assert result["pacing_score"] < 90
+    # 开篇章节低于最低张力要求
+    assert any(issue.get("location") == "Chapter 1" for issue in result["issues"])
+
+    # 没有张力值时不评估节奏分，也不会判定为 pass
+    untagged = build_outline().replace("峰值张力", "张力描述")
+    result = prescreen_content(untagged, expected_chapters=CHAPTERS, fail_score=50, pass_score=90)
+    assert result["pacing_score"] is None
+    assert result["verdict"] == "review"
+
+
+def test_agreement_stats():
+    stats = PrescreenStats()
+    passed = {"verdict": "pass", "overall_score": 95}
+    uncertain = {"verdict": "review", "overall_score": 70}
+
+    assert stats.record_llm_score(passed, 88, 80)
+    assert not stats.record_llm_score(uncertain, 85, 80)
+    stats.record_verdict("pass", short_circuit=True)
+    stats.record_verdict("fail", short_circuit=True)
+
+    result = stats.get_stats()
+    assert result["compared"] == 2
+    assert result["agreement_rate"] == 0.5
+    assert result["verdict_agreement_rate"] == 1.0
+    assert result["mean_abs_error"] == (7 + 15) / 2
+    assert result["llm_calls_avoided"] == 2
+
+
+@pytest.fixture
+def section_cycle(monkeypatch):
+    calls = []
+
+    async def fake_section_cycle(**kwargs):
+        calls.append(kwargs)
+        return {"review_report": {"overall_score": 84}, "final_score": 84, "initial_score": 84}
+
+    monkeypatch.setattr(skeleton_builder_graph, "run_section_quality_cycle", fake_section_cycle)
+    monkeypatch.setattr(settings, "qc_section_refine", True)
+    monkeypatch.setattr(settings, "qc_prescreen_enabled", True)
+    monkeypatch.setattr(settings, "qc_prescreen_audit_rate", 0.0)
+    monkeypatch.setattr(prescreen_service, "_prescreen_stats", PrescreenStats())
+    return calls
+
+
+async def test_quality_control_skips_editor_when_prescreen_passes(section_cycle):
+    state = {
+        "user_id": "u1",
+        "project_id": "p1",
+        "skeleton_content": build_outline(),
+        "chapter_mapping": {"total_chapters": CHAPTERS},
+        "user_config": {"sub_tags": ["revenge"]},
+    }
+
+    result = await skeleton_builder_graph.quality_control_node(state)
+
+    assert section_cycle == []
+    assert result["review_report"]["source"] == "prescreen"
+    assert result["quality_score"] == result["review_report"]["overall_score"]
+    assert result["refined_content"] is None
+
+    # 预筛不确定时照常审阅，并记录与 Editor 评分的对比
+    state["skeleton_content"] = build_outline(tension=[62] * CHAPTERS)
+    result = await skeleton_builder_graph.quality_control_node(state)
+
+    assert len(section_cycle) == 1
+    assert result["quality_score"] == 84
+    stats = prescreen_service.get_prescreen_stats().get_stats()
+    assert stats["short_circuit_pass"] == 1
+    assert stats["compared"] == 1
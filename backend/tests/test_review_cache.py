@@ -0,0 +1,181 @@
+"""
+单元测试：审阅结果缓存
+
+验证缓存键对空白差异不敏感、随审阅配置变化，review_cache 表的批量读取和 upsert，
+内容未变时 run_chapter_review 不再调用 Editor、统计省去的 LLM 调用次数，
+以及 Editor 模型切换后不复用旧模型的审阅结果。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_review_cache.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from conftest import FakeResponse
+
+from backend.graph.workflows import quality_control_graph
+from backend.schemas.model_config import TaskType
+from backend.services import database, model_router, review_cache
+from backend.services.model_router import ModelRouter
+from backend.services.review_cache import ReviewCache, review_cache_key, review_fingerprint
+
+PROJECT = "00000000-0000-0000-0000-000000000001"
+REPORT = {"overall_score": 86, "issues": [{"category": "pacing", "description": "节奏偏慢"}]}
+
+
+class FakeClient:
+    """模拟 review_cache 表"""
+
+    def __init__(self):
+        self.rows = {}
+        self.requests = []
+
+    async def get(self, url, params=None, headers=None):
+        self.requests.append(("GET", params))
+        keys = params["cache_key"][len("in.(") : -1].split(",")
+        return FakeResponse(
+            [{"cache_key": k, "review_report": self.rows[k]} for k in keys if k in self.rows]
+        )
+
+    async def post(self, url, params=None, json=None, headers=None):
+        self.requests.append(("POST", params))
+        assert params == {"on_conflict": "project_id,cache_key"}
+        assert "merge-duplicates" in headers["Prefer"]
+        self.rows[json["cache_key"]] = json["review_report"]
+        return FakeResponse()
+
+
+class FakeGraph:
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def ainvoke(self, state):
+        self.calls.append(state)
+        return {"review_report": dict(REPORT), "final_score": REPORT["overall_score"]}
+
+
+@pytest.fixture
+def client(monkeypatch, make_db):
+    fake = FakeClient()
+    monkeypatch.setattr(database, "_db_service", make_db(fake))
+    monkeypatch.setattr(review_cache, "_review_cache", ReviewCache(maxsize=16, enabled=True))
+    return fake
+
+
+def test_cache_key_normalizes_whitespace_and_tracks_config():
+    fingerprint = review_fingerprint("chapter_review", "outline", {"sub_tags": ["revenge"]})
+
+    key = review_cache_key("# 第一章\n\n简介: 开局\n", fingerprint)
+    assert key == review_cache_key("# 第一章  \r\n\r\n\r\n简介: 开局", fingerprint)
+    assert key != review_cache_key("# 第一章\n\n简介: 反转", fingerprint)
+
+    for other in (
+        review_fingerprint("global_review", "outline", {"sub_tags": ["revenge"]}),
+        review_fingerprint("chapter_review", "novel", {"sub_tags": ["revenge"]}),
+        review_fingerprint("chapter_review", "outline", {"sub_tags": ["romance"]}),
+        review_fingerprint("chapter_review", "outline", {"sub_tags": ["revenge"]}, "gpt-4o"),
+    ):
+        assert review_cache_key("# 第一章\n\n简介: 开局", other) != key
+
+
+async def test_get_put_prefetch(client):
+    cache = review_cache.get_review_cache()
+    db = database.get_db_service()
+
+    assert await cache.get(db, PROJECT, "a" * 64) is None
+    assert await cache.put(db, PROJECT, "a" * 64, REPORT, "chapter_review", "outline")
+    # 系统错误报告不缓存
+    broken = {"overall_score": 0, "issues": [{"category": "system", "description": "没有可审阅的内容"}]}
+    assert not await cache.put(db, PROJECT, "b" * 64, broken, "chapter_review", "outline")
+    assert not await cache.put(db, PROJECT, "b" * 64, None, "chapter_review", "outline")
+
+    # 新进程：进程内缓存为空，一次请求从表中载入
+    fresh = ReviewCache(maxsize=16, enabled=True)
+    client.requests.clear()
+    assert await fresh.prefetch(db, PROJECT, ["a" * 64, "b" * 64, "a" * 64]) == 1
+    assert len(client.requests) == 1
+    assert fresh.contains(PROJECT, "a" * 64)
+    assert await fresh.get(db, PROJECT, "a" * 64) == REPORT
+    assert len(client.requests) == 1
+
+    assert fresh.get_stats()["llm_calls_avoided"] == 1
+
+
+async def test_unchanged_chapter_is_not_reviewed_again(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        quality_control_graph, "build_quality_control_graph", lambda checkpointer=None: FakeGraph(calls)
+    )
+    user_config = {"sub_tags": ["revenge"], "total_episodes": 60}
+
+    async def review(content, **kwargs):
+        return await quality_control_graph.run_chapter_review(
+            user_id="u1",
+            project_id=PROJECT,
+            chapter_id="ep_1",
+            content=content,
+            user_config=user_config,
+            **kwargs,
+        )
+
+    first = await review("# 第一章\n简介: 开局")
+    assert first["cached"] is False
+    assert calls[0]["user_config"] == user_config
+    assert calls[0]["current_stage"] == "L3"
+
+    second = await review("# 第一章  \n简介: 开局\n")
+    assert second["cached"] is True
+    assert second["review_report"] == REPORT
+    assert len(calls) == 1
+
+    # 修改后的章节和关闭缓存时都会调用 Editor
+    assert (await review("# 第一章\n简介: 反转"))["cached"] is False
+    assert (await review("# 第一章\n简介: 开局", use_cache=False))["cached"] is False
+    assert len(calls) == 3
+
+    assert review_cache.get_review_cache().get_stats()["llm_calls_avoided"] == 1
+
+
+class FakeMappingDB:
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    async def get_model_mapping(self, user_id, task_type, project_id=None):
+        if task_type != TaskType.EDITOR.value:
+            return None
+        return {
+            "id": "m-editor",
+            "model_name": self.model_name,
+            "parameters": {},
+            "llm_providers": {"id": "p1", "api_key": "sk-test", "protocol": "openai"},
+        }
+
+
+async def test_editor_model_change_is_not_served_from_cache(client, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        quality_control_graph, "build_quality_control_graph", lambda checkpointer=None: FakeGraph(calls)
+    )
+    router = ModelRouter(FakeMappingDB("gpt-4o"))
+    router._create_model = lambda **kwargs: kwargs
+    monkeypatch.setattr(model_router, "_model_router", router)
+
+    async def review():
+        return await quality_control_graph.run_chapter_review(
+            user_id="u1", project_id=PROJECT, chapter_id="ep_1", content="# 第一章\n简介: 开局"
+        )
+
+    assert (await review())["cached"] is False
+    assert (await review())["cached"] is True
+
+    # 用户把 Editor 换成另一个模型：同一文本需要重新审阅
+    router._db.model_name = "deepseek-chat"
+    router.invalidate(mapping_id="m-editor")
+    assert (await review())["cached"] is False
+    assert len(calls) == 2
@@ -0,0 +1,82 @@
+"""
+单元测试：审阅调度器
+
+验证 ReviewScheduler 按服务商限制并发、保持结果顺序，并在每项完成后回调。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_review_scheduler.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.review_scheduler import ReviewScheduler
+
+
+async def test_concurrency_is_bounded_per_provider():
+    scheduler = ReviewScheduler(default_limit=3)
+    running = 0
+    peak = 0
+
+    async def worker(item: int) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return item * 2
+
+    results = await scheduler.map(range(10), worker, provider=("openai:p1",))
+
+    assert results == [i * 2 for i in range(10)]
+    assert peak == 3
+    assert scheduler.get_stats()["openai:p1"] == {"limit": 3, "in_flight": 0}
+
+
+async def test_provider_override_by_name_or_protocol():
+    scheduler = ReviewScheduler(default_limit=4, provider_limits={"DeepSeek": 8, "gemini": 1})
+
+    assert scheduler.limit_for("openai:p1", "DeepSeek", "openai") == 8
+    assert scheduler.limit_for("gemini:p2", "My Gemini", "gemini") == 1
+    assert scheduler.limit_for("anthropic:p3", "Claude", "anthropic") == 4
+
+
+async def test_on_result_called_for_each_item():
+    scheduler = ReviewScheduler(default_limit=2)
+    seen = []
+
+    async def worker(item: str) -> str:
+        return item.upper()
+
+    async def on_result(item: str, result: str) -> None:
+        seen.append((item, result))
+
+    await scheduler.map(["a", "b", "c"], worker, on_result=on_result)
+
+    assert sorted(seen) == [("a", "A"), ("b", "B"), ("c", "C")]
+
+
+def test_each_event_loop_gets_its_own_semaphore():
+    # API 事件循环和 Celery worker 的长期事件循环共用同一个进程级调度器
+    scheduler = ReviewScheduler(default_limit=1)
+
+    async def worker(item: int) -> int:
+        await asyncio.sleep(0.001)
+        return item
+
+    async def review() -> list[int]:
+        return await scheduler.map(range(3), worker, provider=("openai:p1",))
+
+    worker_loop = asyncio.new_event_loop()
+    try:
+        assert worker_loop.run_until_complete(review()) == [0, 1, 2]
+        assert asyncio.run(review()) == [0, 1, 2]
+        assert worker_loop.run_until_complete(review()) == [0, 1, 2]
+    finally:
+        worker_loop.close()
+
+    assert scheduler.get_stats()["openai:p1"] == {"limit": 1, "in_flight": 0}
@@ -0,0 +1,268 @@
+"""
+单元测试：按章节定向修复
+
+验证 run_section_quality_cycle 第一遍只做一次全局审阅，按其 chapter_reviews 的总分和分类评分
+找出不达标章节（全局报告缺少的章节才逐章审阅），每轮一次 Refiner 调用只修复这些章节，
+修复后的章节按原顺序合并回全文，合并后的全文审阅作为最终总分并只更新修改过的章节的评分，
+Refiner 丢掉标题行时补回原标题，以及没有章节标题、或全文不达标却没有不达标章节时
+带着 user_config 退回整篇修复循环。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_section_refinement.py
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.graph.workflows import quality_control_graph
+from backend.graph.workflows.quality_control_graph import (
+    global_unit_reports,
+    run_section_quality_cycle,
+    unit_defects,
+)
+from backend.services import database, review_cache
+from backend.services.review_cache import ReviewCache
+
+FIXED = "【已修复】"
+
+OUTLINE = "".join(
+    [
+        "# 《合成测试》小说大纲\n\n## 五、章节大纲（Chapter Outlines）\n\n",
+        *(f"### Chapter {n}: 第{n}章\n**摘要**：第{n}章剧情。\n\n" for n in range(1, 7)),
+        "## 六、改编映射（Adaptation Mapping）\n**整体比例**：1章 ≈ 1.5集\n",
+    ]
+)
+
+
+def _report(score: int, pacing: int = 85) -> dict:
+    return {
+        "overall_score": score,
+        "categories": {"pacing": {"score": pacing}, "hook": {"score": 88}},
+        "issues": [] if score >= 80 else [{"category": "pacing", "description": "节奏拖沓"}],
+    }
+
+
+def _chapters(text: str) -> list[int]:
+    return [int(n) for n in re.findall(r"### Chapter (\d+):", text)]
+
+
+class FakeGraph:
+    """
+    默认第 2 章总分不达标、第 5 章只有节奏分不达标；修复后的章节全部达标
+
+    全局审阅给出每章总分和分类评分，全文总分在仍有不达标章节时低于目标；
+    omitted 中的章节不出现在 chapter_reviews 中，overall 覆盖全局审阅的总分
+    """
+
+    def __init__(self, calls, omitted=(), defects=None, overall=None):
+        self.calls = calls
+        self.omitted = set(omitted)
+        self.defects = {2: (62, 50), 5: (84, 60)} if defects is None else defects
+        self.overall = overall
+
+    def _scores(self, section: str, number: int) -> tuple[int, int]:
+        if FIXED in section or number not in self.defects:
+            return 90 if FIXED in section else 88, 86
+        return self.defects[number]
+
+    async def ainvoke(self, state):
+        mode = state["mode"]
+        text = state["input_content"]
+        numbers = _chapters(text)
+        self.calls.append((mode, state.get("chapter_id"), numbers))
+
+        if mode == "refine_only":
+            sections = re.split(r"\n(?=### Chapter)", text.strip())
+            refined = "\n\n".join(section.rstrip() + FIXED for section in sections)
+            if numbers == [5]:
+                # 模拟 Refiner 丢掉标题行
+                refined = refined.split("\n", 1)[1]
+            return {"refined_content": refined}
+
+        if mode == "global_review":
+            sections = dict(zip(numbers, re.split(r"(?=### Chapter)", text)[1:]))
+            scores = {n: self._scores(sections[n], n) for n in numbers}
+            open_defects = any(score < 80 or pacing < 70 for score, pacing in scores.values())
+            overall = self.overall or (74 if open_defects else 90)
+            report = {
+                "overall_score": overall,
+                "categories": {"pacing": {"score": 72 if open_defects else 86}},
+                "chapter_reviews": {
+                    f"ep_{n:03d}": {
+                        "score": score,
+                        "status": "passed",
+                        "issues": [],
+                        "categories": {"pacing": pacing, "hook": 88},
+                    }
+                    for n, (score, pacing) in scores.items()
+                    if n not in self.omitted
+                },
+            }
+        else:
+            score, pacing = self._scores(text, numbers[0])
+            report = _report(score, pacing)
+        return {"review_report": report, "final_score": report["overall_score"]}
+
+
+class FakeDB:
+    async def get_model_mapping(self, user_id, task_type, project_id=None):
+        return None
+
+
+@pytest.fixture
+def graph_options():
+    return {}
+
+
+@pytest.fixture
+def calls(monkeypatch, graph_options):
+    calls = []
+    monkeypatch.setattr(
+        quality_control_graph,
+        "build_quality_control_graph",
+        lambda checkpointer=None: FakeGraph(calls, **graph_options),
+    )
+    monkeypatch.setattr(database, "_db_service", FakeDB())
+    monkeypatch.setattr(review_cache, "_review_cache", ReviewCache(enabled=False))
+    return calls
+
+
+@pytest.fixture
+def full_cycle(monkeypatch):
+    seen = {}
+
+    async def fake_full_cycle(**kwargs):
+        seen.update(kwargs)
+        return {"review_report": None, "refined_content": None, "final_score": 0, "iterations": 0}
+
+    monkeypatch.setattr(quality_control_graph, "run_full_quality_cycle", fake_full_cycle)
+    return seen
+
+
+def _fixed(*numbers: int) -> str:
+    expected = OUTLINE
+    for n in numbers:
+        expected = expected.replace(f"第{n}章剧情。", f"第{n}章剧情。" + FIXED)
+    return expected
+
+
+def test_unit_defects():
+    assert unit_defects(_report(88), 80, 70) == []
+    assert unit_defects(_report(62, pacing=50), 80, 70) == ["overall", "pacing"]
+    assert unit_defects(_report(84, pacing=60), 80, 70) == ["pacing"]
+    assert unit_defects(None, 80, 70) == []
+
+
+def test_global_unit_reports_carry_category_scores():
+    report = {
+        "chapter_reviews": {
+            "chapter_005": {"score": 84, "categories": {"pacing": 60, "hook": {"score": 88}}},
+            "ep_006": {"score": "n/a"},
+            "chapter_009": {"score": 90},
+        }
+    }
+
+    units = global_unit_reports(report, [5, 6])
+
+    assert list(units) == [5]
+    assert units[5]["categories"] == {"pacing": {"score": 60}, "hook": {"score": 88}}
+    assert unit_defects(units[5], 80, 70) == ["pacing"]
+
+
+async def test_only_defective_sections_are_refined_and_re_reviewed(calls):
+    result = await run_section_quality_cycle(
+        "u1", "p1", OUTLINE, target_score=80, max_iterations=3, category_threshold=70
+    )
+
+    # 全文审阅 → 一次修复第 2、5 章 → 合并后的全文审阅
+    assert calls == [
+        ("global_review", None, [1, 2, 3, 4, 5, 6]),
+        ("refine_only", None, [2, 5]),
+        ("global_review", None, [1, 2, 3, 4, 5, 6]),
+    ]
+
+    assert result["iterations"] == 1
+    assert result["units_total"] == 6
+    assert result["units_refined"] == [2, 5]
+    assert result["stats"]["global_reviews"] == 2
+    assert result["stats"]["reviews"] == 0
+    assert result["stats"]["refines"] == 1
+    assert result["stats"]["refine_chars"] == len(
+        re.search(r"### Chapter 2:.*?\n\n", OUTLINE, re.S).group()
+    ) + len(re.search(r"### Chapter 5:.*?\n\n", OUTLINE, re.S).group())
+
+    # 总分和分类评分取修复前后两次全文审阅，而不是章节平均分或修复前的分类评分
+    assert result["initial_score"] == 74
+    assert result["final_score"] == 90
+    assert result["review_report"]["overall_score"] == 90
+    assert result["review_report"]["categories"] == {"pacing": {"score": 86}}
+    assert result["review_report"]["chapter_reviews"]["chapter_005"]["score"] == 90
+
+    # 修复后的章节按原位置合并，其余内容不变
+    assert result["refined_content"] == _fixed(2, 5)
+
+
+@pytest.mark.parametrize("graph_options", [{"defects": {5: (84, 60)}}])
+async def test_single_section_keeps_its_header(calls, graph_options):
+    result = await run_section_quality_cycle("u1", "p1", OUTLINE, category_threshold=70)
+
+    # 第 5 章只有节奏分不达标；Refiner 丢掉的标题行被补回
+    assert ("refine_only", "chapter_005", [5]) in calls
+    assert result["units_refined"] == [5]
+    assert result["refined_content"] == _fixed(5)
+
+
+async def test_no_defects_means_no_refinement(calls):
+    clean = OUTLINE.replace("### Chapter 2", "### Chapter 12").replace("### Chapter 5", "### Chapter 15")
+
+    result = await run_section_quality_cycle("u1", "p1", clean, category_threshold=70)
+
+    assert result["refined_content"] is None
+    assert result["iterations"] == 0
+    assert result["final_score"] == 90
+    assert [mode for mode, *_ in calls] == ["global_review"]
+
+
+@pytest.mark.parametrize("graph_options", [{"omitted": {1, 5}}])
+async def test_chapters_missing_from_global_review_are_reviewed_individually(calls, graph_options):
+    result = await run_section_quality_cycle("u1", "p1", OUTLINE, category_threshold=70)
+
+    # 全局审阅之后只逐章审阅 chapter_reviews 中缺少的第 1、5 章
+    assert calls[0][0] == "global_review"
+    assert sorted(call[:2] for call in calls[1:3]) == [
+        ("chapter_review", "chapter_001"),
+        ("chapter_review", "chapter_005"),
+    ]
+    # 第 5 章的逐章审阅发现节奏分不达标；修复后第 5 章仍不在全局报告中，再逐章重审
+    assert calls[3] == ("refine_only", None, [2, 5])
+    assert calls[4][0] == "global_review"
+    assert calls[5][:2] == ("chapter_review", "chapter_005")
+    assert result["units_refined"] == [2, 5]
+    assert result["review_report"]["chapter_reviews"]["chapter_005"]["score"] == 90
+
+
+@pytest.mark.parametrize("graph_options", [{"defects": {}, "overall": 70}])
+async def test_low_overall_score_without_defective_chapters_runs_full_cycle(
+    calls, graph_options, full_cycle
+):
+    await run_section_quality_cycle("u1", "p1", OUTLINE, category_threshold=70)
+
+    assert [mode for mode, *_ in calls] == ["global_review"]
+    assert full_cycle["content"] == OUTLINE
+
+
+async def test_falls_back_to_full_cycle_without_chapters(calls, full_cycle):
+    await run_section_quality_cycle(
+        "u1", "p1", "没有章节标题的正文", max_iterations=2, user_config={"sub_tags": ["revenge"]}
+    )
+
+    assert full_cycle["content"] == "没有章节标题的正文"
+    assert full_cycle["max_iterations"] == 2
+    assert full_cycle["user_config"] == {"sub_tags": ["revenge"]}
+    assert calls == []
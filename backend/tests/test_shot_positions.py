@@ -0,0 +1,126 @@
+"""
+单元测试：分镜位置批量更新
+
+验证 batch_update_shot_positions 一次 RPC 提交所有位置（两种入参格式），
+空输入不发起请求，以及 PUT /episodes/{episode_id}/shots/batch/position
+在剧集不存在时返回 404。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_shot_positions.py
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from conftest import FakeResponse
+
+from backend.api import shots
+from backend.services import get_db_service
+
+EPISODE_ID = "00000000-0000-0000-0000-0000000000e1"
+SHOT_A = "00000000-0000-0000-0000-00000000000a"
+SHOT_B = "00000000-0000-0000-0000-00000000000b"
+
+
+class FakeClient:
+    def __init__(self, updated=0, episodes=()):
+        self.updated = updated
+        self.episodes = list(episodes)
+        self.requests = []
+
+    async def get(self, url, params=None, headers=None):
+        self.requests.append(("GET", url, params))
+        return FakeResponse(self.episodes)
+
+    async def post(self, url, json=None, headers=None):
+        self.requests.append(("POST", url, json))
+        return FakeResponse(self.updated)
+
+
+async def test_positions_are_sent_in_one_rpc(make_db):
+    client = FakeClient(updated=2)
+    db = make_db(client)
+
+    updated = await db.batch_update_shot_positions(
+        EPISODE_ID, {SHOT_A: (10.0, 20.0), SHOT_B: (30.5, -4.0)}
+    )
+
+    assert updated == 2
+    assert client.requests == [
+        (
+            "POST",
+            "http://supabase.test/rest/v1/rpc/batch_update_shot_positions",
+            {
+                "p_episode_id": EPISODE_ID,
+                "p_positions": [
+                    {"shot_id": SHOT_A, "x": 10.0, "y": 20.0},
+                    {"shot_id": SHOT_B, "x": 30.5, "y": -4.0},
+                ],
+            },
+        )
+    ]
+
+
+async def test_empty_positions_skip_the_rpc(make_db):
+    client = FakeClient(updated=5)
+    db = make_db(client)
+
+    assert await db.batch_update_shot_positions(EPISODE_ID, []) == 0
+    assert await db.batch_update_shot_positions(EPISODE_ID, {}) == 0
+    assert client.requests == []
+
+
+@pytest.fixture
+def api(make_db):
+    def make(client: FakeClient) -> TestClient:
+        app = FastAPI()
+        app.include_router(shots.router, prefix="/api")
+        app.dependency_overrides[get_db_service] = lambda: make_db(client)
+        return TestClient(app)
+
+    return make
+
+
+def test_endpoint_returns_updated_count(api):
+    client = FakeClient(updated=1)
+
+    response = api(client).put(
+        f"/api/episodes/{EPISODE_ID}/shots/batch/position",
+        json={"positions": [{"shotId": SHOT_A, "x": 1, "y": 2}]},
+    )
+
+    assert response.status_code == 200
+    assert response.json()["data"]["updated_count"] == 1
+    # 有行被更新时不再查询剧集
+    assert [request[0] for request in client.requests] == ["POST"]
+    assert client.requests[0][2]["p_positions"] == [{"shot_id": SHOT_A, "x": 1.0, "y": 2.0}]
+
+
+def test_endpoint_handles_empty_input_and_missing_episode(api):
+    existing = FakeClient(updated=0, episodes=[{"episode_id": EPISODE_ID}])
+    response = api(existing).put(
+        f"/api/episodes/{EPISODE_ID}/shots/batch/position", json={"positions": []}
+    )
+    assert response.status_code == 200
+    assert response.json()["data"]["updated_count"] == 0
+    assert [request[0] for request in existing.requests] == ["GET"]
+
+    missing = FakeClient(updated=0)
+    response = api(missing).put(
+        f"/api/episodes/{EPISODE_ID}/shots/batch/position",
+        json={"positions": [{"shotId": SHOT_A, "x": 1, "y": 2}]},
+    )
+    assert response.status_code == 404
+
+    response = api(missing).put(
+        f"/api/episodes/{EPISODE_ID}/shots/batch/position",
+        json={"positions": [{"shotId": "not-a-uuid", "x": 1, "y": 2}]},
+    )
+    assert response.status_code == 422
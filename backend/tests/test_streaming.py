@@ -0,0 +1,112 @@
+"""
+单元测试：SSE 流式通道
+
+验证 StreamChannel 的 token 合并、事件顺序和有界队列背压，
+以及只有面向用户的节点的 LLM 输出作为 token_delta 转发。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_streaming.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.api.graph import is_token_stream_event
+from backend.services.streaming import StreamChannel, StreamingManager
+
+
+async def _collect(channel: StreamChannel) -> list[dict]:
+    return [event async for event in channel.events()]
+
+
+async def test_tokens_are_coalesced_and_ordered():
+    channel = StreamChannel("t1", maxsize=16, coalesce_ms=10_000, coalesce_chars=1_000)
+    await channel.put({"type": "node_start", "node": "story_planner"})
+    for token in ["你", "好", "，", "世界"]:
+        await channel.put_token(token, "story_planner")
+    await channel.put({"type": "node_end", "node": "story_planner"})
+    await channel.aclose()
+
+    events = await _collect(channel)
+
+    assert [e["type"] for e in events] == ["node_start", "token_delta", "node_end"]
+    assert events[1] == {"type": "token_delta", "content": "你好，世界", "node": "story_planner"}
+
+
+async def test_slow_consumer_applies_backpressure():
+    channel = StreamChannel("t2", maxsize=4, coalesce_ms=0)
+
+    async def produce():
+        for i in range(50):
+            await channel.put_token(f"{i},", "skeleton_builder")
+        await channel.aclose()
+
+    producer = asyncio.create_task(produce())
+    await asyncio.sleep(0.05)
+    # 消费者尚未读取：生产者停在队列上限处
+    assert channel.queue.qsize() <= 4
+    assert not producer.done()
+
+    events = await _collect(channel)
+    await producer
+
+    assert "".join(e["content"] for e in events) == "".join(f"{i}," for i in range(50))
+    assert channel.stats["max_depth"] <= 4
+    assert channel.stats["blocked_ms"] > 0
+
+
+async def test_new_stream_aborts_previous_channel():
+    manager = StreamingManager()
+    first = manager.open_stream("thread")
+    second = manager.open_stream("thread")
+
+    assert first.closed
+    assert not await first.put_token("x")
+    assert manager.get_channel("thread") is second
+
+    manager.end_stream("thread", first)
+    assert manager.get_channel("thread") is second
+    manager.end_stream("thread", second)
+    assert manager.get_channel("thread") is None
+
+
+async def test_aborted_stream_ends_its_consumer():
+    manager = StreamingManager()
+    first = manager.open_stream("thread")
+    first_consumer = asyncio.create_task(_collect(first))
+    await first.put({"type": "node_start", "node": "story_planner"})
+    await asyncio.sleep(0.01)
+
+    # 同一线程开启新流：旧的 SSE 响应结束，不再挂起
+    second = manager.open_stream("thread")
+    second_consumer = asyncio.create_task(_collect(second))
+    assert await asyncio.wait_for(first_consumer, timeout=1) == [
+        {"type": "node_start", "node": "story_planner"}
+    ]
+
+    await second.put({"type": "node_end", "node": "story_planner"})
+    await second.aclose()
+    assert await asyncio.wait_for(second_consumer, timeout=1) == [
+        {"type": "node_end", "node": "story_planner"}
+    ]
+
+
+def test_only_user_facing_nodes_stream_tokens():
+    def meta(node, namespace=""):
+        return {"langgraph_node": node, "langgraph_checkpoint_ns": namespace}
+
+    assert is_token_stream_event(meta("story_planner", "story_planner:1"))
+    # ReAct Agent 的模型节点
+    assert is_token_stream_event(meta("agent", "story_planner:1|agent:2"))
+    # 骨架子图中的生成节点
+    assert is_token_stream_event(meta("skeleton_builder", "skeleton_builder:1|skeleton_builder:2"))
+
+    # 路由决策 JSON、Agent 工具内部调用、质检子图不转发
+    assert not is_token_stream_event(meta("master_router", "master_router:1"))
+    assert not is_token_stream_event(meta("tools", "story_planner:1|tools:3"))
+    assert not is_token_stream_event(meta("quality_control", "skeleton_builder:1|quality_control:4"))
+    assert not is_token_stream_event({})
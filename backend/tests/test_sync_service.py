@@ -0,0 +1,91 @@
+"""
+单元测试：SyncService 批量写入
+
+验证每类产物只发送一次 RPC（节点与布局一起写入）、故事方案的清除与写入
+在同一次调用中完成，以及 sync_from_state 并发同步各类产物。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_sync_service.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from conftest import FakeResponse
+
+from backend.services.sync_service import SyncService
+
+PROJECT_ID = "00000000-0000-0000-0000-000000000001"
+
+
+class FakeClient:
+    """记录请求；in_flight 统计同时进行中的请求数"""
+
+    def __init__(self):
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def post(self, url, json=None, headers=None):
+        self.requests.append((url.rsplit("/", 1)[-1], json))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        return FakeResponse()
+
+
+async def test_beat_sheet_is_one_round_trip(make_db):
+    client = FakeClient()
+    sync = SyncService(make_db(client))
+    beat_sheet = [{"episode_number": n, "title": f"第{n}集"} for n in range(1, 81)]
+
+    ids = await sync.sync_beat_sheet(PROJECT_ID, beat_sheet)
+
+    assert len(ids) == 80 and len(set(ids)) == 80
+    assert len(client.requests) == 1
+    target, payload = client.requests[0]
+    assert target == "insert_story_nodes"
+    assert payload["p_type"] == "episode_outline"
+    assert payload["p_replace"] is False
+    assert [node["node_id"] for node in payload["p_nodes"]] == ids
+    assert payload["p_nodes"][79]["layout"] == {
+        "canvas_tab": "planning",
+        "position_x": 100,
+        "position_y": 500 + 79 * 150,
+    }
+
+
+async def test_story_plans_replace_existing_in_same_call(make_db):
+    client = FakeClient()
+    sync = SyncService(make_db(client))
+
+    await sync.sync_story_plans(PROJECT_ID, [{"title": "A"}, {"title": "B"}])
+
+    assert len(client.requests) == 1
+    payload = client.requests[0][1]
+    assert payload["p_replace"] is True
+    assert [node["content"]["title"] for node in payload["p_nodes"]] == ["A", "B"]
+
+
+async def test_sync_from_state_runs_artifacts_concurrently(make_db):
+    client = FakeClient()
+    sync = SyncService(make_db(client))
+    state = {
+        "project_id": PROJECT_ID,
+        "story_plans": [{"title": "A"}],
+        "beat_sheet": [{"title": "第1集"}],
+        "novel_content": "正文",
+        "storyboard": [{"subject": "主角"}],
+    }
+
+    result = await sync.sync_from_state(state)
+
+    assert sorted(result) == ["beat_sheet", "novel", "story_plans", "storyboard"]
+    assert all(len(ids) == 1 for ids in result.values())
+    assert [target for target, _ in client.requests] == ["insert_story_nodes"] * 4
+    assert client.max_in_flight == 4
@@ -0,0 +1,117 @@
+"""
+单元测试：爆款元素倒排索引
+
+验证二元组倒排查询与 `kw in text` 子串匹配结果一致、按字段权重和有效性评分排序、
+字段 / 主题 / 全部命中过滤、JSONB 字段展开，以及单字和非中文关键词。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_theme_index.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services.theme_index import ElementIndex, tokenize
+
+REVENGE = "00000000-0000-0000-0000-0000000000a1"
+ROMANCE = "00000000-0000-0000-0000-0000000000a2"
+
+ELEMENTS = [
+    {
+        "id": "e1",
+        "theme_id": REVENGE,
+        "name": "隐藏大佬",
+        "description": "主角隐藏身份忍辱负重，关键时刻揭露身份反击",
+        "emotional_impact": "爽感、反转",
+        "usage_guidance": "发展阶段埋下伏笔，高潮揭露",
+        "effectiveness_score": 92,
+    },
+    {
+        "id": "e2",
+        "theme_id": REVENGE,
+        "name": "当众打脸",
+        "description": "反派当众羞辱主角后被身份反转打脸",
+        "emotional_impact": "紧张后释放",
+        "usage_guidance": "全剧适用",
+        "effectiveness_score": 60,
+    },
+    {
+        "id": "e3",
+        "theme_id": ROMANCE,
+        "name": "契约婚姻",
+        "description": "两人因利益签下 CEO 契约，逐渐心动",
+        "emotional_impact": {"primary": "甜宠", "secondary": ["暧昧", "心动"]},
+        "usage_guidance": {"stage": "开头", "tips": ["铺垫契约条款"]},
+        "effectiveness_score": 95,
+    },
+    {
+        "id": "e4",
+        "theme_id": ROMANCE,
+        "name": "待评估",
+        "description": None,
+        "emotional_impact": None,
+        "usage_guidance": None,
+        "effectiveness_score": None,
+    },
+]
+
+
+def _ids(hits):
+    return [hit.element["id"] for hit in hits]
+
+
+def test_tokenize_unigrams_and_bigrams():
+    assert tokenize("打脸") == {"打", "脸", "打脸"}
+    assert tokenize("ceo 契约") == {"契", "约", "契约"}
+
+
+def test_matches_substring_semantics():
+    index = ElementIndex(ELEMENTS)
+    fields = ("description", "emotional_impact")
+    for keywords in (["身份"], ["身份反转"], ["紧张", "甜宠"], ["羞辱主角后"], ["不存在的词"]):
+        expected = {
+            e["id"]
+            for e in ELEMENTS
+            if any(kw in (e["description"] or "") or kw in str(e["emotional_impact"] or "") for kw in keywords)
+        }
+        assert set(_ids(index.search(keywords, fields=fields))) == expected, keywords
+
+
+def test_ranking_by_field_weight_and_effectiveness():
+    index = ElementIndex(ELEMENTS)
+
+    # e2 名称命中（权重最高），e1 只在描述中命中
+    assert _ids(index.search(["打脸"])) == ["e2"]
+    hits = index.search(["身份", "打脸"])
+    assert _ids(hits) == ["e2", "e1"]
+    assert hits[0].matched == ("身份", "打脸")
+
+    # 同样只在描述中命中一次时，有效性评分高的排前
+    assert _ids(index.search(["身份"], fields=("description",))) == ["e1", "e2"]
+    assert _ids(index.search(["身份"], fields=("description",), limit=1)) == ["e1"]
+
+
+def test_filters():
+    index = ElementIndex(ELEMENTS)
+
+    assert _ids(index.search(["心动", "反击"], theme_id=ROMANCE)) == ["e3"]
+    assert _ids(index.search(["身份", "反击"], require_all=True)) == ["e1"]
+    assert index.search(["全剧"], fields=("description",)) == []
+    assert _ids(index.search(["全剧", "开头"], fields=("usage_guidance",))) == ["e3", "e2"]
+
+
+def test_jsonb_single_char_and_latin_keywords():
+    index = ElementIndex(ELEMENTS)
+
+    # JSONB 字段中的嵌套值可被检索
+    assert _ids(index.search(["暧昧"])) == ["e3"]
+    assert _ids(index.search(["铺垫"], fields=("usage_guidance",))) == ["e3"]
+    # 单字关键词和不含中文的关键词（大小写不敏感）
+    assert set(_ids(index.search(["脸"]))) == {"e2"}
+    assert _ids(index.search(["ceo"])) == ["e3"]
+    assert _ids(index.search(["ＣＥＯ"])) == ["e3"]
+    # 空关键词不命中
+    assert index.search(["", "  "]) == []
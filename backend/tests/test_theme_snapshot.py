@@ -0,0 +1,179 @@
+"""
+单元测试：题材库内存快照
+
+验证快照上的 PostgREST 风格查询（过滤、排序、分页、列选择）与数据库一致、
+并发的首次读取只加载一次、版本号不变时不重新加载、版本变化后后台刷新，
+读取不访问数据库，加载时分页读取（不被 db-max-rows 截断），
+以及 Story Planner 的主题列表从快照读取。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_theme_snapshot.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from conftest import FakeResponse
+
+from backend.services import database, theme_snapshot
+from backend.services.theme_snapshot import ThemeLibrarySnapshot, ThemeSnapshotStore, paginate
+
+REVENGE = "00000000-0000-0000-0000-0000000000a1"
+ROMANCE = "00000000-0000-0000-0000-0000000000a2"
+
+TABLES = {
+    "themes": [
+        {"id": ROMANCE, "slug": "romance", "name": "甜宠恋爱", "category": "romance"},
+        {"id": REVENGE, "slug": "revenge", "name": "复仇逆袭", "category": "drama"},
+    ],
+    "theme_elements": [
+        {"id": "e1", "theme_id": REVENGE, "name": "隐藏大佬", "effectiveness_score": 92, "element_type": "trope"},
+        {"id": "e2", "theme_id": REVENGE, "name": "当众打脸", "effectiveness_score": 88, "element_type": "plot"},
+        {"id": "e3", "theme_id": REVENGE, "name": "待评估", "effectiveness_score": None, "element_type": "trope"},
+        {"id": "e4", "theme_id": ROMANCE, "name": "契约婚姻", "effectiveness_score": 95, "element_type": "trope"},
+    ],
+    "hook_templates": [
+        {"id": "h1", "name": "极限羞辱", "hook_type": "situation", "effectiveness_score": 90},
+        {"id": "h2", "name": "身份悬念", "hook_type": "question", "effectiveness_score": 97},
+    ],
+    "theme_examples": [
+        {"id": "x1", "theme_id": REVENGE, "title": "旧案", "release_year": 2021},
+        {"id": "x2", "theme_id": REVENGE, "title": "新案", "release_year": 2024},
+    ],
+}
+
+
+class FakeClient:
+    """max_rows 模拟 PostgREST 的 db-max-rows：每次响应最多返回这么多行"""
+
+    def __init__(self, version=1, max_rows=1000):
+        self.version = version
+        self.max_rows = max_rows
+        self.requests = []
+
+    async def get(self, url, params=None, headers=None):
+        table = url.rsplit("/", 1)[-1]
+        self.requests.append(table)
+        await asyncio.sleep(0)
+        if table == "theme_library_version":
+            return FakeResponse([{"version": self.version}])
+        rows = sorted(TABLES[table], key=lambda row: row[params["order"]])
+        offset = params.get("offset", 0)
+        limit = min(params.get("limit", len(rows)), self.max_rows)
+        return FakeResponse([dict(row) for row in rows[offset : offset + limit]])
+
+
+@pytest.fixture
+def client(monkeypatch, make_db):
+    fake = FakeClient()
+    monkeypatch.setattr(database, "_db_service", make_db(fake))
+    return fake
+
+
+def _snapshot() -> ThemeLibrarySnapshot:
+    return ThemeLibrarySnapshot.build(1, *(TABLES[t] for t in TABLES))
+
+
+def test_query_matches_postgrest_semantics():
+    snapshot = _snapshot()
+
+    elements = snapshot.query(
+        "theme_elements",
+        {"theme_id": f"eq.{REVENGE}", "select": "*", "order": "effectiveness_score.desc"},
+    )
+    # NULL 在降序中排在最前，与 PostgreSQL 默认一致
+    assert [e["id"] for e in elements] == ["e3", "e1", "e2"]
+
+    top = snapshot.query(
+        "theme_elements",
+        {"effectiveness_score": "gte.90", "select": "id,name", "order": "effectiveness_score.desc", "limit": 1},
+    )
+    assert top == [{"id": "e4", "name": "契约婚姻"}]
+
+    pair = snapshot.query("themes", {"slug": "in.(revenge,romance)", "select": "slug"})
+    assert [t["slug"] for t in pair] == ["revenge", "romance"]
+
+    # 数值列按数值比较
+    assert [e["id"] for e in snapshot.query("theme_elements", {"effectiveness_score": "eq.92.0"})] == ["e1"]
+    scored = ThemeLibrarySnapshot.build(1, [], [], [{"id": "h3", "effectiveness_score": 80.0}], [])
+    assert [h["id"] for h in scored.query("hook_templates", {"effectiveness_score": "eq.80"})] == ["h3"]
+    assert scored.query("hook_templates", {"effectiveness_score": "neq.80"}) == []
+
+
+def test_default_orders_and_pagination():
+    snapshot = _snapshot()
+
+    assert [t["slug"] for t in snapshot.themes] == ["revenge", "romance"]
+    assert [h["id"] for h in snapshot.hooks] == ["h2", "h1"]
+    assert [x["title"] for x in snapshot.theme_examples(REVENGE)] == ["新案", "旧案"]
+
+    page, total = paginate(snapshot.theme_elements(REVENGE), page=2, page_size=2)
+    assert ([e["id"] for e in page], total) == (["e2"], 3)
+
+
+def test_unsupported_query_is_rejected():
+    with pytest.raises(ValueError):
+        _snapshot().query("theme_elements", {"select": "*,themes(name,slug)"})
+    with pytest.raises(ValueError):
+        _snapshot().query("projects", {})
+
+
+async def test_concurrent_first_reads_load_once(client):
+    store = ThemeSnapshotStore(refresh_interval=60)
+
+    first, second = await asyncio.gather(store.get(), store.get())
+
+    assert first is second
+    assert sorted(client.requests) == sorted(["theme_library_version", *TABLES])
+
+    await store.get()
+    assert len(client.requests) == 5
+
+
+async def test_tables_are_read_page_by_page(client, make_db):
+    client.max_rows = 2
+    db = make_db(client)
+
+    elements = await db.fetch_all_rows("theme_elements", page_size=2)
+
+    # 2 + 2 + 0 行：被 max_rows 截断的整页之后继续读取，直到不满一页
+    assert [e["id"] for e in elements] == ["e1", "e2", "e3", "e4"]
+    assert client.requests == ["theme_elements"] * 3
+
+
+async def test_refresh_reloads_only_when_version_changes(client):
+    store = ThemeSnapshotStore(refresh_interval=0)
+    loaded = await store.get()
+    client.requests.clear()
+
+    # 版本未变：后台只检查一次版本号
+    assert await store.get() is loaded
+    await asyncio.sleep(0.01)
+    assert client.requests == ["theme_library_version"]
+    assert store.snapshot is loaded
+
+    # 版本变化：后台重新加载，读取方不等待
+    client.version = 2
+    client.requests.clear()
+    assert await store.get() is loaded
+    await asyncio.sleep(0.01)
+    assert store.snapshot.version == 2
+    assert store.snapshot is not loaded
+    assert store.get_stats()["loads"] == 2
+
+
+async def test_story_planner_reads_theme_slugs_from_snapshot(client, monkeypatch):
+    from backend.agents import story_planner
+
+    monkeypatch.setattr(theme_snapshot, "_store", ThemeSnapshotStore(refresh_interval=60))
+
+    assert sorted(await story_planner._get_all_theme_slugs()) == ["revenge", "romance"]
+    await story_planner._get_all_theme_slugs()
+    # 只有首次加载快照时访问数据库
+    assert len(client.requests) == 5
@@ -0,0 +1,161 @@
+"""
+单元测试：并行视频生成流水线
+
+使用假的 VideoGenerator（每个生成在固定时间后完成），验证：
+- N 个镜头的总耗时接近最慢的单个镜头，而不是所有镜头之和
+- 同一提供商的并发上限（多个流水线共享）
+- 进度写入被合并
+- webhook 回调可以直接结束等待
+- 单个生成的状态查询失败不会中断其他生成的轮询
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_video_pipeline.py
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.config import settings
+from backend.services import video_pipeline
+from backend.services.video_generator import (
+    VideoGenerationResult,
+    VideoProvider,
+    VideoStatus,
+)
+from backend.services.video_pipeline import VideoPipeline, notify_generation
+
+
+class FakeVideoGenerator:
+    """每个生成在 durations[i] 秒后完成"""
+
+    def __init__(self, durations):
+        self.durations = durations
+        self.submitted = {}
+        self.active = 0
+        self.peak = 0
+
+    async def generate(self, request):
+        generation_id = f"gen-{len(self.submitted)}"
+        self.submitted[generation_id] = time.monotonic() + self.durations[len(self.submitted)]
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        return VideoGenerationResult(
+            status=VideoStatus.PROCESSING,
+            provider=request.provider,
+            generation_id=generation_id,
+        )
+
+    async def get_status(self, provider, generation_id):
+        if time.monotonic() >= self.submitted[generation_id]:
+            self.active -= 1
+            return VideoGenerationResult(
+                status=VideoStatus.COMPLETED,
+                provider=provider,
+                generation_id=generation_id,
+                video_url=f"https://videos.example/{generation_id}.mp4",
+            )
+        return VideoGenerationResult(status=VideoStatus.PROCESSING, provider=provider)
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(settings, "video_poll_initial_interval", 0.01)
+    monkeypatch.setattr(settings, "video_poll_max_interval", 0.05)
+    monkeypatch.setattr(settings, "video_poll_backoff", 1.5)
+    monkeypatch.setattr(settings, "video_progress_interval", 0.1)
+    monkeypatch.setattr(settings, "video_generation_timeout", 5)
+    monkeypatch.setattr(video_pipeline, "_provider_semaphores", {})
+
+
+async def test_wall_clock_approaches_slowest_shot():
+    durations = [0.1, 0.3, 0.2, 0.15, 0.25, 0.1]
+    generator = FakeVideoGenerator(durations)
+    progress_writes = []
+
+    async def on_progress(progress, step):
+        progress_writes.append(progress)
+
+    pipeline = VideoPipeline(
+        generator, VideoProvider.RUNWAY, on_progress=on_progress, concurrency=len(durations)
+    )
+    started = time.monotonic()
+    results = await pipeline.run([{"shot_number": f"S{i:02d}"} for i in range(len(durations))])
+    elapsed = time.monotonic() - started
+
+    assert [r["status"] for r in results] == ["completed"] * len(durations)
+    assert [r["shot_number"] for r in results] == [f"S{i:02d}" for i in range(len(durations))]
+    assert elapsed < max(durations) + 0.2 < sum(durations)
+    # 进度写入被合并，远少于轮询次数
+    assert len(progress_writes) < pipeline.stats["polls"]
+
+
+async def test_concurrency_limit_per_provider():
+    generator = FakeVideoGenerator([0.05] * 8)
+    pipeline = VideoPipeline(generator, VideoProvider.PIKA, concurrency=2)
+
+    results = await pipeline.run([{} for _ in range(8)])
+
+    assert all(r["status"] == "completed" for r in results)
+    assert generator.peak == 2
+
+
+async def test_pipelines_share_provider_limit(monkeypatch):
+    monkeypatch.setattr(settings, "video_provider_concurrency", {"runway": 3})
+    generator = FakeVideoGenerator([0.05] * 12)
+    pipelines = [VideoPipeline(generator, VideoProvider.RUNWAY) for _ in range(3)]
+
+    results = await asyncio.gather(*(p.run([{} for _ in range(4)]) for p in pipelines))
+
+    assert all(r["status"] == "completed" for batch in results for r in batch)
+    assert generator.peak == 3
+
+
+async def test_failed_poll_does_not_stop_other_generations():
+    class FlakyVideoGenerator(FakeVideoGenerator):
+        """gen-0 的前两次状态查询失败（模拟网络抖动 / 提供商 5xx）"""
+
+        failures = 2
+
+        async def get_status(self, provider, generation_id):
+            if generation_id == "gen-0" and self.failures:
+                self.failures -= 1
+                raise RuntimeError("502 Bad Gateway")
+            return await super().get_status(provider, generation_id)
+
+    generator = FlakyVideoGenerator([0.05, 0.05, 0.05])
+    pipeline = VideoPipeline(generator, VideoProvider.RUNWAY, concurrency=3)
+
+    results = await asyncio.wait_for(pipeline.run([{} for _ in range(3)]), timeout=2)
+
+    assert [r["status"] for r in results] == ["completed"] * 3
+    assert pipeline.stats["poll_errors"] == 2
+
+
+async def test_webhook_resolves_without_polling(monkeypatch):
+    monkeypatch.setattr(settings, "video_poll_initial_interval", 10)
+    generator = FakeVideoGenerator([60])
+    pipeline = VideoPipeline(generator, VideoProvider.SORA)
+
+    async def deliver_webhook():
+        while "gen-0" not in video_pipeline._pending_generations:
+            await asyncio.sleep(0.01)
+        notify_generation(
+            "gen-0",
+            VideoGenerationResult(
+                status=VideoStatus.COMPLETED, generation_id="gen-0", video_url="https://v/0.mp4"
+            ),
+        )
+
+    webhook = asyncio.create_task(deliver_webhook())
+    results = await pipeline.run([{"shot_number": "S01"}])
+    await webhook
+
+    assert results[0]["video_url"] == "https://v/0.mp4"
+    assert pipeline.stats == {"polls": 0, "poll_errors": 0, "progress_writes": 0, "webhooks": 1}
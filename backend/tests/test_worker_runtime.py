@@ -0,0 +1,117 @@
+"""
+单元测试：Worker 长驻事件循环
+
+验证多次提交复用同一个事件循环且只预热一次、多个线程提交的任务在同一循环上
+并发执行、超时取消协程、fork 后（PID 变化）重新创建循环，以及关闭时释放共享连接。
+
+Usage:
+    cd /Users/ariesmartin/Documents/new-video/backend
+    pytest tests/test_worker_runtime.py
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from backend.services import http_pool
+from backend.tasks import runtime as runtime_module
+from backend.tasks.runtime import WorkerRuntime
+
+
+@pytest.fixture
+def runtime(monkeypatch):
+    warmups = []
+
+    async def warm_up(self):
+        warmups.append(asyncio.get_running_loop())
+
+    monkeypatch.setattr(WorkerRuntime, "_warm_up", warm_up)
+    rt = WorkerRuntime(name="test-runtime")
+    rt.warmups = warmups
+    yield rt
+    rt.shutdown()
+
+
+def test_submissions_share_one_warm_loop(runtime):
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    first = runtime.submit(current_loop())
+    second = runtime.submit(current_loop())
+
+    assert first is second
+    assert runtime.warmups == [first]
+    assert runtime.get_stats()["completed"] == 2
+
+
+def test_threads_run_jobs_concurrently_on_one_loop(runtime):
+    barrier = asyncio.Event()
+    results = []
+
+    async def job(n):
+        if n == 3:
+            barrier.set()
+        await asyncio.wait_for(barrier.wait(), timeout=2)
+        return n
+
+    runtime.start()
+    threads = [
+        threading.Thread(target=lambda n=n: results.append(runtime.submit(job(n))))
+        for n in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == [0, 1, 2, 3]
+    assert runtime.get_stats()["max_in_flight"] == 4
+
+
+def test_timeout_cancels_coroutine(runtime):
+    cancelled = threading.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(TimeoutError):
+        runtime.submit(slow(), timeout=0.05)
+
+    assert cancelled.wait(1)
+    assert runtime.get_stats()["timeouts"] == 1
+
+
+def test_forked_process_gets_its_own_loop(runtime, monkeypatch):
+    parent_loop = runtime.start()
+
+    monkeypatch.setattr(runtime_module.os, "getpid", lambda: -1)
+    child_loop = runtime.start()
+
+    assert child_loop is not parent_loop
+    assert runtime.get_stats()["started"] == 2
+    parent_loop.call_soon_threadsafe(parent_loop.stop)
+
+
+def test_shutdown_closes_shared_client(runtime, monkeypatch):
+    closed = []
+
+    async def close_http_client():
+        closed.append(asyncio.get_running_loop())
+
+    monkeypatch.setattr(http_pool, "close_http_client", close_http_client)
+    loop = runtime.start()
+
+    runtime.shutdown()
+
+    assert closed == [loop]
+    assert loop.is_closed()
+    assert runtime.running is False
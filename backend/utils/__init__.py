@@ -7,9 +7,12 @@ from backend.utils.message_converter import (
     normalize_messages,
     ensure_messages_are_objects,
 )
+from backend.utils.outline_index import ChapterEntry, ChapterIndex
 
 __all__ = [
     "convert_to_langchain_message",
     "normalize_messages",
     "ensure_messages_are_objects",
+    "ChapterEntry",
+    "ChapterIndex",
 ]
@@ -0,0 +1,224 @@
+"""
+大纲章节索引
+
+一次扫描骨架/大纲 Markdown，建立 章节号 → (标题, 摘要, 场景清单区间) 的偏移索引。
+
+问题场景:
+旧实现对 chapter_map 中的每一章（甚至每一集）分别对整篇 skeleton_content
+执行多次 re.search（其中两次带 DOTALL），60~100 章大纲的解析成本为 O(N²)，
+并且分批生成时每完成一批都会重新解析一遍。
+
+解决方案:
+逐行扫描一次全文，记录每个章节标题、摘要、场景清单在原文中的偏移，
+各提取函数只读取索引和对应的切片。
+
+支持格式:
+    ### Chapter 1: 婚礼惊变
+    **摘要**：苏清新婚之夜遭遇灭门惨案……
+    **场景清单**：
+    1. **喜房**：新娘等待新郎，气氛温馨
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+
+# 章节标题行：### Chapter 1: 标题 / **Chapter 1：标题** / Chapter 1: 标题
+# (?![\d\-–~]) 排除 "Chapter 1-3：..." 这类范围引用
+_CHAPTER_HEADER = re.compile(
+    r"^[ \t]*(?P<hashes>#{1,6})?[ \t]*(?P<bold>\*\*)?[ \t]*Chapter[ \t]*(?P<num>\d+)(?![\d\-–~])"
+    r"[ \t]*(?:\*\*)?[ \t]*(?P<colon>[:：])?[ \t]*(?P<title>.*?)[ \t]*(?:\*\*)?[ \t]*$",
+    re.IGNORECASE,
+)
+_HEADING = re.compile(r"^[ \t]*(#{1,6})[ \t]")
+_SUMMARY = re.compile(r"摘要[ \t]*(?:\*\*)?[ \t]*[:：][ \t]*(?:\*\*)?[ \t]*(.*)")
+_STRUCTURAL_LINE = re.compile(r"^[ \t]*(?:#|\*\*|[-*+][ \t]|\d+[.、]|\|)")
+
+_SCENE_LIST_MARKER = "场景清单"
+# 无 # 前缀的章节标题视为最深层级，任何 Markdown 标题都会结束该章节
+_PLAIN_HEADER_LEVEL = 7
+
+
+@dataclass
+class ChapterEntry:
+    """单个章节在原文中的偏移信息"""
+
+    number: int
+    title: str
+    header_start: int
+    body_start: int
+    end: int
+    level: int = _PLAIN_HEADER_LEVEL
+    summary: str = ""
+    scene_start: int = -1
+    scene_end: int = -1
+
+    @property
+    def has_scene_list(self) -> bool:
+        return self.scene_start >= 0
+
+
+class ChapterIndex:
+    """
+    章节偏移索引
+
+    使用方式:
+        index = ChapterIndex(skeleton_content)
+        chapter = index.get(3)
+        if chapter:
+            print(chapter.title, chapter.summary)
+            print(index.scene_text(3))
+
+    同一章节号出现多次时默认以第一次出现为准（与旧的 re.search 语义一致）；
+    keep_last=True 时以最后一次出现为准（分批生成中后续批次展开的章节覆盖骨架批次的简版）。
+    """
+
+    def __init__(self, content: str, keep_last: bool = False):
+        self.content = content or ""
+        self.keep_last = keep_last
+        self._chapters: Dict[int, ChapterEntry] = {}
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self._chapters)
+
+    def __contains__(self, chapter_num: object) -> bool:
+        return self.get(chapter_num) is not None
+
+    def __iter__(self) -> Iterator[ChapterEntry]:
+        return iter(self._chapters.values())
+
+    def numbers(self) -> List[int]:
+        """按出现顺序返回已索引的章节号"""
+        return list(self._chapters.keys())
+
+    def get(self, chapter_num: object) -> Optional[ChapterEntry]:
+        """获取章节索引项，chapter_num 可以是 int 或数字字符串"""
+        try:
+            return self._chapters.get(int(chapter_num))
+        except (TypeError, ValueError):
+            return None
+
+    def section(self, chapter_num: object) -> str:
+        """章节完整原文（含标题行）"""
+        entry = self.get(chapter_num)
+        if entry is None:
+            return ""
+        return self.content[entry.header_start : entry.end]
+
+    def body(self, chapter_num: object) -> str:
+        """章节正文（不含标题行）"""
+        entry = self.get(chapter_num)
+        if entry is None:
+            return ""
+        return self.content[entry.body_start : entry.end]
+
+    def scene_text(self, chapter_num: object) -> str:
+        """章节场景清单部分的原文（不含 "场景清单" 标记行）"""
+        entry = self.get(chapter_num)
+        if entry is None or not entry.has_scene_list:
+            return ""
+        return self.content[entry.scene_start : entry.scene_end]
+
+    def replace_sections(self, replacements: Dict[int, str]) -> str:
+        """
+        用新文本替换指定章节（含标题行），返回合并后的全文
+
+        未索引的章节号被忽略，其余内容原样保留；每个被替换章节保留原文末尾的空白，
+        相同输入总是得到相同输出。
+        """
+        entries = sorted(
+            (self._chapters[number] for number in replacements if number in self._chapters),
+            key=lambda entry: entry.header_start,
+        )
+        parts: List[str] = []
+        cursor = 0
+        for entry in entries:
+            original = self.content[entry.header_start : entry.end]
+            trailing = original[len(original.rstrip()) :]
+            parts.append(self.content[cursor : entry.header_start])
+            parts.append(replacements[entry.number].strip() + trailing)
+            cursor = entry.end
+        parts.append(self.content[cursor:])
+        return "".join(parts)
+
+    # ===== 构建 =====
+
+    def _build(self) -> None:
+        content = self.content
+        current: Optional[ChapterEntry] = None
+        in_summary = False
+        in_scenes = False
+        summary_parts: List[str] = []
+
+        def close(entry: ChapterEntry, end: int) -> None:
+            entry.end = end
+            if entry.has_scene_list and entry.scene_end < 0:
+                entry.scene_end = end
+            entry.summary = " ".join(summary_parts).strip()
+
+        offset = 0
+        for line in content.splitlines(keepends=True):
+            line_start = offset
+            offset += len(line)
+            text = line.rstrip("\r\n")
+
+            header = _CHAPTER_HEADER.match(text)
+            if header and (header.group("hashes") or header.group("bold") or header.group("colon")):
+                if current is not None:
+                    close(current, line_start)
+                number = int(header.group("num"))
+                in_summary = in_scenes = False
+                summary_parts = []
+                if number in self._chapters and not self.keep_last:
+                    current = None
+                    continue
+                hashes = header.group("hashes")
+                current = ChapterEntry(
+                    number=number,
+                    title=header.group("title").strip(),
+                    header_start=line_start,
+                    body_start=offset,
+                    end=len(content),
+                    level=len(hashes) if hashes else _PLAIN_HEADER_LEVEL,
+                )
+                self._chapters[number] = current
+                continue
+
+            if current is None:
+                continue
+
+            heading = _HEADING.match(text)
+            if heading and len(heading.group(1)) <= current.level:
+                # 同级或更高级标题（如 "## 六、改编映射"）结束当前章节
+                close(current, line_start)
+                current = None
+                in_summary = in_scenes = False
+                continue
+
+            stripped = text.strip()
+
+            if in_scenes and (heading or stripped.startswith("**")):
+                current.scene_end = line_start
+                in_scenes = False
+
+            if in_summary:
+                if stripped and not _STRUCTURAL_LINE.match(text):
+                    summary_parts.append(stripped)
+                else:
+                    in_summary = False
+
+            if not summary_parts:
+                summary = _SUMMARY.search(text)
+                if summary:
+                    summary_parts.append(summary.group(1).strip().strip("*").strip())
+                    in_summary = True
+                    continue
+
+            if not current.has_scene_list and _SCENE_LIST_MARKER in text:
+                current.scene_start = offset
+                in_scenes = True
+
+        if current is not None:
+            close(current, len(content))
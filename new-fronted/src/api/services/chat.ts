@@ -13,6 +13,7 @@ export interface Message {
     action?: string;
     from_state?: boolean;
     from_ui_interaction?: boolean;
+    streaming?: boolean;
   };
 }
 
@@ -39,7 +40,7 @@ export interface ChatStreamCallbacks {
 
 // 后端 SSE 事件类型定义（与 backend/api/graph.py 对应）
 interface BackendSSEEvent {
-  type: 'node_start' | 'node_end' | 'token' | 'done' | 'error' | 'status' | 'ui_interaction' | 'progress';
+  type: 'node_start' | 'node_end' | 'token' | 'token_delta' | 'done' | 'error' | 'status' | 'ui_interaction' | 'progress';
   node?: string;
   content?: string;
   data?: any;
@@ -415,6 +416,8 @@ export const chatService = {
 
     let assistantMessage = '';
     let messageId = `ai-${Date.now()}`;
+    // 当前正在流式输出的节点（切换节点时重新累积）
+    let streamingNode: string | undefined;
 
     eventSource.onmessage = (event) => {
       try {
@@ -451,8 +454,29 @@ export const chatService = {
             }
             break;
 
+          case 'token_delta':
+            // 实时 token 增量：按节点累积
+            if (data.content) {
+              if (data.node !== streamingNode) {
+                streamingNode = data.node;
+                assistantMessage = '';
+              }
+              assistantMessage += data.content;
+              callbacks.onMessage({
+                id: messageId,
+                role: 'assistant',
+                content: assistantMessage,
+                timestamp: new Date(),
+                metadata: {
+                  node_id: nodeId,
+                  streaming: true,
+                },
+              });
+            }
+            break;
+
           case 'token':
-            // 一次性接收完整内容（不再累积）
+            // 完整内容（替换流式累积的增量）
             if (data.content) {
               assistantMessage = data.content;
               callbacks.onMessage({